@@ -9,7 +9,7 @@ NOTE: Many functions have been extracted to service modules:
 All prompts and calculations are preserved exactly in their respective service modules.
 """
 
-from fastapi import FastAPI, HTTPException, Request, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, Request, BackgroundTasks, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
@@ -94,6 +94,7 @@ from routers.famous_people_routes import router as famous_people_router
 
 # --- Import Similarity Service ---
 from services.similarity_service import find_similar_famous_people_internal
+from services.similarity_index import famous_people_signature
 
 # --- Import Extracted Services ---
 # LLM Service
@@ -119,6 +120,12 @@ from app.services.llm_prompts import (
     generate_comprehensive_synastry
 )
 
+# Chat context cache
+from app.services.chat_context import ChatContext, chart_context_version, chat_context_cache
+from app.services.chat_history import (
+    CHAT_HISTORY_MESSAGES, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, message_counts, page_conversations, page_messages, recent_messages,
+)
+
 # Email Service
 from app.services.email_service import (
     send_snapshot_email_via_sendgrid,
@@ -479,6 +486,41 @@ async def startup_cache_warming():
         logger.warning(f"Cache warming failed: {e}", exc_info=True)
 
 
+@app.on_event("startup")
+async def startup_timezone_resolver():
+    """Load the offline timezone boundary index before the first chart request."""
+    try:
+        from app.services.timezone_resolver import warm_timezone_resolver
+        if warm_timezone_resolver():
+            logger.info("Timezone resolver ready")
+    except Exception as e:
+        logger.warning(f"Timezone resolver warm-up failed: {e}")
+
+
+@app.on_event("startup")
+async def startup_ephemeris_pool():
+    """Configure Swiss Ephemeris once and start the ephemeris worker processes."""
+    try:
+        from app.services.ephemeris_pool import HousesRequest, compute_async, configure_ephemeris
+        logger.info(f"Swiss Ephemeris path: {configure_ephemeris()}")
+        await compute_async(HousesRequest(2451545.0, 0.0, 0.0))
+    except Exception as e:
+        logger.warning(f"Ephemeris pool warm-up failed: {e}")
+
+
+@app.on_event("startup")
+async def startup_job_worker():
+    """Run a durable job queue worker in the web process (disable with JOB_WORKER_EMBEDDED=false)."""
+    try:
+        from app.config import JOB_WORKER_EMBEDDED
+        if JOB_WORKER_EMBEDDED:
+            from app.services.job_queue import start_embedded_worker
+            worker = start_embedded_worker()
+            logger.info(f"Embedded job worker started: {worker.worker_id}")
+    except Exception as e:
+        logger.warning(f"Embedded job worker failed to start: {e}")
+
+
 async def startup_health_check():
     """Perform health checks on startup and log status."""
     try:
@@ -515,6 +557,20 @@ async def graceful_shutdown():
     logger.info("Graceful Shutdown Initiated")
     logger.info("=" * 60)
     
+    try:
+        # Stop the job worker first; unfinished jobs go back to the queue
+        from app.services.job_queue import stop_embedded_worker
+        await stop_embedded_worker()
+    except Exception as e:
+        logger.warning(f"Error stopping job worker: {e}")
+    
+    try:
+        # Stop the compute executors (including the ephemeris pool); queued tasks are dropped
+        from app.core.executors import shutdown_executors
+        shutdown_executors(wait=False)
+    except Exception as e:
+        logger.warning(f"Error stopping compute executors: {e}")
+    
     try:
         # Close database connections
         from database import engine
@@ -534,6 +590,13 @@ async def graceful_shutdown():
     except Exception as e:
         logger.warning(f"Error closing Redis connection: {e}")
     
+    try:
+        # Close the geocoding HTTP client and cache
+        from app.services.geocoding_service import _close_geocoding_service
+        await _close_geocoding_service()
+    except Exception as e:
+        logger.warning(f"Error closing geocoding service: {e}")
+    
     logger.info("Graceful shutdown complete")
     logger.info("=" * 60)
 
@@ -595,7 +658,8 @@ from app.core.exceptions import (
     ValidationError,
     AuthenticationError,
     AuthorizationError,
-    NotFoundError
+    NotFoundError,
+    ServiceOverloadedError
 )
 from app.core.responses import success_response, error_response
 from app.utils.dev_tools import is_development, log_request_details
@@ -761,6 +825,20 @@ async def not_found_error_handler(request: Request, exc: NotFoundError):
         )
     )
 
+@app.exception_handler(ServiceOverloadedError)
+async def service_overloaded_error_handler(request: Request, exc: ServiceOverloadedError):
+    """Handle compute executor backpressure (503 with Retry-After)."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=build_error_response(
+            error="Service overloaded",
+            detail=exc.detail,
+            exc=exc,
+            request=request
+        ),
+        headers=exc.headers
+    )
+
 @app.exception_handler(RateLimitExceeded)
 async def custom_rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(
@@ -1596,25 +1674,8 @@ WHEN ASKED ABOUT SERIOUS MATTERS:
 Remember: Your purpose is to facilitate self-reflection and exploration through the symbolic language of astrology. You illuminate possibilities; the user decides what resonates and what to do with that understanding."""
 
 
-async def get_gemini_chat_response(
-    chart_data: dict,
-    reading: Optional[str],
-    conversation_history: List[dict],
-    user_message: str,
-    chart_name: str = "User",
-    famous_matches: Optional[List[dict]] = None,
-    db: Optional[Session] = None
-) -> str:
-    """Generate a chat response using Gemini based on the user's chart.
-    
-    SECURITY: This function receives chart data that has already been verified
-    to belong to the authenticated user by the calling endpoint.
-    """
-    if not GEMINI_API_KEY and AI_MODE != "stub":
-        raise Exception("Gemini API key not configured. Chat is unavailable.")
-    
-    llm = Gemini3Client()
-    
+def build_chat_prompt_prefix(chart_data: dict, reading: Optional[str], famous_matches: Optional[List[dict]]) -> str:
+    """Build the part of the chat prompt that is the same on every turn: chart data, reading and famous matches."""
     # Build context from chart data
     try:
         serialized_chart = serialize_chart_for_llm(chart_data, unknown_time=chart_data.get('unknown_time', False))
@@ -1623,14 +1684,6 @@ async def get_gemini_chat_response(
         logger.warning(f"Could not serialize chart for chat: {e}")
         chart_summary = json.dumps(chart_data, indent=2)
     
-    # Build conversation context (last 10 messages for continuity)
-    conversation_context = ""
-    if conversation_history:
-        conversation_context = "\n\n=== PREVIOUS CONVERSATION ===\n"
-        for msg in conversation_history[-10:]:
-            role = "User" if msg['role'] == 'user' else "Astrologer"
-            conversation_context += f"{role}: {msg['content']}\n"
-    
     # Include the COMPLETE personalized reading as context
     # This reading was generated specifically for this user's chart
     reading_context = ""
@@ -1647,10 +1700,7 @@ Reference this reading when answering questions - it contains deep insights abou
 """
     
     # Include famous people matches (if available)
-    # Also check if user is asking about a specific famous person and include their full chart data
     famous_matches_context = ""
-    famous_person_chart_context = ""
-    
     if famous_matches:
         top_famous = famous_matches[:10]  # limit for prompt size
         lines = ["", "=== FAMOUS PEOPLE MATCHES FOR THIS CHART ==="]
@@ -1667,30 +1717,43 @@ Reference this reading when answering questions - it contains deep insights abou
         lines.append("=== END OF FAMOUS PEOPLE MATCHES ===")
         famous_matches_context = "\n".join(lines)
     
-    # Check if user is asking about a specific famous person and fetch their full chart data
-    if db and famous_matches:
-        user_message_lower = user_message.lower()
-        for match in famous_matches[:10]:  # Check top 10 matches
-            famous_name = match.get("name", "").lower()
-            if famous_name and famous_name in user_message_lower:
-                # User is asking about this famous person - fetch their full chart data
-                try:
-                    from database import FamousPerson
-                    # Get the FamousPerson object from database
-                    fp = db.query(FamousPerson).filter(
-                        FamousPerson.name.ilike(f"%{match.get('name')}%")
-                    ).first()
-                    
-                    if fp and fp.chart_data_json:
-                        fp_chart_data = json.loads(fp.chart_data_json)
-                        # Serialize the famous person's chart for LLM
-                        fp_serialized = serialize_chart_for_llm(
-                            fp_chart_data, 
-                            unknown_time=fp.unknown_time if hasattr(fp, 'unknown_time') else True
-                        )
-                        fp_chart_summary = format_serialized_chart_for_prompt(fp_serialized)
-                        
-                        famous_person_chart_context = f"""
+    return f"""=== CHART OWNER ===
+You are speaking directly with the chart owner about THEIR chart. All data below belongs to them.
+
+=== CHART DATA ===
+{chart_summary}
+{reading_context}
+{famous_matches_context}
+"""
+
+
+def build_famous_person_chart_context(match: dict, db: Session) -> Optional[str]:
+    """
+    Full chart block for a famous person the user is asking about.
+
+    Returns:
+        The block, "" if the person has no chart data, or None if it could not be fetched
+    """
+    try:
+        # Get the FamousPerson object from database
+        fp = db.query(FamousPerson).filter(
+            FamousPerson.name.ilike(f"%{match.get('name')}%")
+        ).first()
+        
+        if not (fp and fp.chart_data_json):
+            return ""
+        fp_chart_data = json.loads(fp.chart_data_json)
+        # Serialize the famous person's chart for LLM
+        fp_serialized = serialize_chart_for_llm(
+            fp_chart_data, 
+            unknown_time=fp.unknown_time if hasattr(fp, 'unknown_time') else True
+        )
+        fp_chart_summary = format_serialized_chart_for_prompt(fp_serialized)
+    except Exception as e:
+        logger.warning(f"Could not fetch full chart data for famous person: {e}")
+        return None
+    
+    return f"""
 
 === FULL CHART DATA FOR {match.get('name').upper()} ===
 You have access to the complete birth chart data for {match.get('name')} ({match.get('occupation', '')}).
@@ -1703,20 +1766,112 @@ Birth Location: {match.get('birth_location', 'Unknown')}
 
 === END OF {match.get('name').upper()}'S CHART DATA ===
 """
-                        logger.info(f"Including full chart data for {match.get('name')} in chat context")
-                        break  # Only include the first matching famous person's chart
-                except Exception as e:
-                    logger.warning(f"Could not fetch full chart data for famous person: {e}")
-                    # Continue without the full chart data
+
+
+async def load_chat_context(conversation_id: int, chart: SavedChart, db: Session) -> ChatContext:
+    """
+    Prebuilt chat prompt context for a conversation.
+
+    Served from the chat context cache while the chart (data and reading)
+    and the famous people corpus are unchanged; otherwise the chart is
+    parsed, famous people are matched and the context is rebuilt.
+    """
+    chart_version = chart_context_version(chart)
+    corpus_version = famous_people_signature(db)
+    context = chat_context_cache.get(conversation_id, chart_version, corpus_version)
+    if context is not None:
+        return context
     
-    user_prompt = f"""=== CHART OWNER ===
-You are speaking directly with the chart owner about THEIR chart. All data below belongs to them.
+    # Parse chart data
+    chart_data = json.loads(chart.chart_data_json) if chart.chart_data_json else {}
 
-=== CHART DATA ===
-{chart_summary}
-{reading_context}
-{famous_matches_context}
-{famous_person_chart_context}
+    # Compute famous-people matches for this chart so chat AI can reference them
+    famous_matches: List[dict] = []
+    matched = True
+    try:
+        if chart_data:
+            matches_result = await find_similar_famous_people_internal(
+                chart_data=chart_data,
+                limit=30,
+                db=db,
+            )
+            famous_matches = matches_result.get("matches", []) or []
+    except Exception as e:
+        logger.warning(f"Could not compute famous people matches for chat context: {e}")
+        matched = False
+
+    context = ChatContext(
+        chart_version=chart_version,
+        corpus_version=corpus_version,
+        prefix=build_chat_prompt_prefix(chart_data, chart.ai_reading, famous_matches),
+        famous_matches=famous_matches[:10],
+    )
+    if matched:
+        # A failed match is retried on the next turn rather than cached
+        chat_context_cache.put(conversation_id, context)
+    return context
+
+
+async def get_gemini_chat_response(
+    chart_data: dict,
+    reading: Optional[str],
+    conversation_history: List[dict],
+    user_message: str,
+    chart_name: str = "User",
+    famous_matches: Optional[List[dict]] = None,
+    db: Optional[Session] = None,
+    context: Optional[ChatContext] = None
+) -> str:
+    """Generate a chat response using Gemini based on the user's chart.
+    
+    chart_data, reading and famous_matches are only used when no prebuilt
+    context (see load_chat_context) is passed. The context is the stable
+    start of the prompt and is sent as the LLM prefix, so the provider can
+    cache it across turns.
+    
+    SECURITY: This function receives chart data that has already been verified
+    to belong to the authenticated user by the calling endpoint.
+    """
+    if not GEMINI_API_KEY and AI_MODE != "stub":
+        raise Exception("Gemini API key not configured. Chat is unavailable.")
+    
+    llm = Gemini3Client()
+    
+    if context is None:
+        context = ChatContext(
+            chart_version="",
+            corpus_version=(),
+            prefix=build_chat_prompt_prefix(chart_data, reading, famous_matches),
+            famous_matches=(famous_matches or [])[:10],
+        )
+    
+    # Build conversation context (last 10 messages for continuity)
+    conversation_context = ""
+    if conversation_history:
+        conversation_context = "\n\n=== PREVIOUS CONVERSATION ===\n"
+        for msg in conversation_history[-CHAT_HISTORY_MESSAGES:]:
+            role = "User" if msg['role'] == 'user' else "Astrologer"
+            conversation_context += f"{role}: {msg['content']}\n"
+    
+    # Check if user is asking about a specific famous person and include their full chart data
+    famous_person_chart_context = ""
+    if db and context.famous_matches:
+        user_message_lower = user_message.lower()
+        for match in context.famous_matches:  # Check top 10 matches
+            famous_name = match.get("name", "").lower()
+            if famous_name and famous_name in user_message_lower:
+                # User is asking about this famous person - formatted once per context
+                if famous_name not in context.famous_charts:
+                    block = build_famous_person_chart_context(match, db)
+                    if block is None:
+                        continue  # Fetch failed; retry on a later turn
+                    context.famous_charts[famous_name] = block
+                if context.famous_charts[famous_name]:
+                    famous_person_chart_context = context.famous_charts[famous_name]
+                    logger.info(f"Including full chart data for {match.get('name')} in chat context")
+                    break  # Only include the first matching famous person's chart
+    
+    user_prompt = f"""{famous_person_chart_context}
 {conversation_context}
 
 === USER'S CURRENT QUESTION ===
@@ -1736,7 +1891,8 @@ Provide a helpful, personalized response that:
         user=user_prompt,
         max_output_tokens=2500,
         temperature=0.7,
-        call_label="chart_chat"
+        call_label="chart_chat",
+        prefix=context.prefix
     )
     
     return response
@@ -1784,14 +1940,10 @@ async def send_chat_message_endpoint(
         db.commit()
         db.refresh(conversation)
     
-    # Get conversation history
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.conversation_id == conversation.id
-    ).order_by(ChatMessage.created_at).all()
-    
+    # Get conversation history (only the messages the prompt includes)
     conversation_history = [
         {"role": msg.role, "content": msg.content}
-        for msg in messages
+        for msg in recent_messages(db, conversation.id, CHAT_HISTORY_MESSAGES)
     ]
     
     # Save user message
@@ -1841,33 +1993,20 @@ async def send_chat_message_endpoint(
         else:
             raise
     
-    # Parse chart data
-    chart_data = json.loads(chart.chart_data_json) if chart.chart_data_json else {}
+    # Chart, reading and famous matches, prebuilt once per conversation
+    context = await load_chat_context(conversation.id, chart, db)
 
-    # Compute famous-people matches for this chart so chat AI can reference them
-    famous_matches: List[dict] = []
     try:
-        if chart_data:
-            matches_result = await find_similar_famous_people_internal(
-                chart_data=chart_data,
-                limit=30,
-                db=db,
-            )
-            famous_matches = matches_result.get("matches", []) or []
-    except Exception as e:
-        logger.warning(f"Could not compute famous people matches for chat context: {e}")
-
-    try:
-        # Get AI response - passing verified user's chart data and famous matches
+        # Get AI response - passing verified user's chart context
         # Security: chart ownership already verified above (user_id check)
         ai_response = await get_gemini_chat_response(
-            chart_data=chart_data,
-            reading=chart.ai_reading,
+            chart_data={},
+            reading=None,
             conversation_history=conversation_history,
             user_message=data.message,
             chart_name=chart.chart_name,
-            famous_matches=famous_matches,
             db=db,
+            context=context,
         )
         
         # Save AI response
@@ -1938,10 +2077,16 @@ async def send_chat_message_endpoint(
 @app.get("/chat/conversations/{chart_id}")
 async def list_conversations_endpoint(
     chart_id: int,
+    response: Response,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all chat conversations for a specific chart.
+    """List chat conversations for a specific chart, most recently updated first.
+    
+    Paginated: when more conversations exist, the X-Next-Cursor header holds
+    the cursor to pass for the next page.
     
     SECURITY: Only returns conversations for charts owned by the authenticated user.
     """
@@ -1954,30 +2099,45 @@ async def list_conversations_endpoint(
     if not chart:
         raise HTTPException(status_code=404, detail="Chart not found.")
     
-    conversations = db.query(ChatConversation).filter(
+    query = db.query(ChatConversation).filter(
         ChatConversation.chart_id == chart_id,
         ChatConversation.user_id == current_user.id
-    ).order_by(ChatConversation.updated_at.desc()).all()
+    )
+    try:
+        page = page_conversations(query, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
     
+    counts = message_counts(db, [conv.id for conv in page.items])
     return [
         {
             "id": conv.id,
             "title": conv.title,
             "created_at": conv.created_at.isoformat(),
             "updated_at": conv.updated_at.isoformat(),
-            "message_count": len(conv.messages)
+            "message_count": counts.get(conv.id, 0)
         }
-        for conv in conversations
+        for conv in page.items
     ]
 
 
 @app.get("/chat/conversation/{conversation_id}")
 async def get_conversation_endpoint(
     conversation_id: int,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get a specific conversation with all messages."""
+    """Get a specific conversation with its messages, oldest first.
+    
+    Returns every message unless paging is requested: limit returns the
+    newest page, next_cursor as before loads older ones, and a message's
+    cursor as after loads newer ones.
+    """
     conversation = db.query(ChatConversation).filter(
         ChatConversation.id == conversation_id,
         ChatConversation.user_id == current_user.id
@@ -1986,9 +2146,10 @@ async def get_conversation_endpoint(
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found.")
     
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.conversation_id == conversation_id
-    ).order_by(ChatMessage.created_at).all()
+    try:
+        page = page_messages(db, conversation_id, limit=limit, before=before, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "id": conversation.id,
@@ -2003,8 +2164,10 @@ async def get_conversation_endpoint(
                 "content": msg.content,
                 "created_at": msg.created_at.isoformat()
             }
-            for msg in messages
-        ]
+            for msg in page.items
+        ],
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more
     }
 
 
@@ -2029,6 +2192,7 @@ async def delete_conversation_endpoint(
     
     db.delete(conversation)
     db.commit()
+    chat_context_cache.invalidate(conversation_id)
     
     return {"message": "Conversation deleted successfully."}
 
@@ -4,26 +4,33 @@ Advanced Charts API Routes
 Endpoints for advanced astrology features:
 - Synastry (relationship compatibility)
 - Composite charts
-- Transit calculations
+- Transit calculations and transit timelines
 - Progressed charts
-- Solar return charts
+- Solar return charts and planetary return times
 """
 
+import asyncio
 import logging
 import pendulum
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from fastapi import APIRouter, HTTPException, Request, Depends
 from pydantic import BaseModel, Field, validator
 from sqlalchemy.orm import Session
 
 from app.core.logging_config import setup_logger
-from app.core.exceptions import ChartCalculationError, GeocodingError, ValidationError
+from app.core.query_optimizer import QueryOptimizer
+from app.core.exceptions import ChartCalculationError, GeocodingError, ServiceOverloadedError, ValidationError
+from app.core.executors import run_chart_task
 from app.services.synastry_service import calculate_synastry
 from app.services.composite_service import calculate_composite
-from app.services.transit_service import calculate_current_transits
+from app.services.transit_service import MAX_TIMELINE_DAYS, calculate_current_transits, calculate_transit_timeline
 from app.services.progression_service import calculate_progressed_chart
-from app.services.solar_return_service import calculate_solar_return_chart
+from app.services.solar_return_service import (
+    RETURN_BODIES, calculate_solar_return_chart, find_solar_returns
+)
+from app.services.chart_cache import get_cached_chart
+from app.services.ephemeris_pool import ReturnRequest, compute_async
 from database import get_db, User, SavedChart
 from auth import get_current_user_optional
 from natal_chart import NatalChart
@@ -34,9 +41,7 @@ logger = setup_logger(__name__)
 # Create router
 router = APIRouter(prefix="/api/v1", tags=["advanced-charts"])
 
-# Import centralized configuration
-from app.config import OPENCAGE_KEY
-import requests
+from app.services.geocoding_service import geocode_location as geocode_cached
 
 
 # Pydantic Models
@@ -73,7 +78,7 @@ class ChartDataRequest(BaseModel):
     unknown_time: bool = False
 
 
-def geocode_location(location: str) -> tuple:
+async def geocode_location(location: str) -> tuple:
     """
     Geocode a location string to get latitude, longitude, and timezone.
     
@@ -83,45 +88,14 @@ def geocode_location(location: str) -> tuple:
     Returns:
         Tuple of (latitude, longitude, timezone_name)
     """
-    try:
-        url = "https://api.opencagedata.com/geocode/v1/json"
-        params = {
-            "q": location,
-            "key": OPENCAGE_KEY,
-            "limit": 1,
-            "no_annotations": 1
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("results"):
-            raise GeocodingError(f"Could not find location: {location}")
-        
-        result = data["results"][0]
-        geometry = result["geometry"]
-        lat = geometry["lat"]
-        lng = geometry["lng"]
-        
-        # Get timezone
-        components = result.get("components", {})
-        timezone_name = result.get("annotations", {}).get("timezone", {}).get("name")
-        
-        if not timezone_name:
-            # Try to infer from country code
-            country_code = components.get("country_code", "").upper()
-            # Default timezones by country (simplified)
-            timezone_name = "UTC"  # Default fallback
-        
-        return lat, lng, timezone_name
+    result = await geocode_cached(location)
+    if result is None:
+        raise GeocodingError(f"Could not find location: {location}")
     
-    except requests.RequestException as e:
-        logger.error(f"Geocoding error: {e}")
-        raise GeocodingError(f"Failed to geocode location: {location}")
+    return result.latitude, result.longitude, result.timezone or "UTC"
 
 
-def create_chart_from_data(chart_data: Dict[str, Any]) -> NatalChart:
+async def create_chart_from_data(chart_data: Dict[str, Any]) -> NatalChart:
     """
     Create a NatalChart instance from chart data dictionary.
     
@@ -144,7 +118,7 @@ def create_chart_from_data(chart_data: Dict[str, Any]) -> NatalChart:
         )
         
         # Geocode location
-        lat, lng, timezone_name = geocode_location(chart_data["location"])
+        lat, lng, timezone_name = await geocode_location(chart_data["location"])
         
         if not timezone_name:
             timezone_name = "UTC"
@@ -160,26 +134,73 @@ def create_chart_from_data(chart_data: Dict[str, Any]) -> NatalChart:
         )
         utc_time = local_time.in_timezone('UTC')
         
-        # Create and calculate chart
-        chart = NatalChart(
-            name=chart_data["full_name"],
-            year=utc_time.year,
-            month=utc_time.month,
-            day=utc_time.day,
-            hour=utc_time.hour,
-            minute=utc_time.minute,
-            latitude=lat,
-            longitude=lng
+        # Calculated charts are shared across endpoints via the chart cache
+        return await run_chart_task(
+            get_cached_chart,
+            chart_data["full_name"],
+            utc_time.year,
+            utc_time.month,
+            utc_time.day,
+            utc_time.hour,
+            utc_time.minute,
+            lat,
+            lng,
+            unknown_time=chart_data.get("unknown_time", False)
         )
-        chart.calculate_chart(unknown_time=chart_data.get("unknown_time", False))
-        
-        return chart
     
+    except ServiceOverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Error creating chart: {e}", exc_info=True)
         raise ChartCalculationError(f"Failed to create chart: {str(e)}")
 
 
+def saved_chart_to_chart_data(saved_chart: SavedChart) -> Dict[str, Any]:
+    """
+    Build the chart data dictionary create_chart_from_data expects from a saved chart.
+    
+    Args:
+        saved_chart: SavedChart row
+    
+    Returns:
+        Chart data dictionary
+    
+    Raises:
+        HTTPException: 400 if the saved chart has no birth data
+    """
+    import json
+    chart_data_json = json.loads(saved_chart.chart_data_json)
+    
+    # Extract birth data
+    birth_data = chart_data_json.get("birth_data", {})
+    if not birth_data:
+        raise HTTPException(status_code=400, detail="Invalid chart data format")
+    
+    return {
+        "full_name": saved_chart.chart_name,
+        "year": saved_chart.birth_year,
+        "month": saved_chart.birth_month,
+        "day": saved_chart.birth_day,
+        "hour": saved_chart.birth_hour,
+        "minute": saved_chart.birth_minute,
+        "location": saved_chart.birth_location,
+        "unknown_time": saved_chart.unknown_time
+    }
+
+
+def parse_iso_date(value: str) -> datetime:
+    """
+    Parse an ISO date or datetime string.
+    
+    Raises:
+        ValidationError: If the string is not ISO formatted
+    """
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValidationError("Invalid date format. Use ISO format (e.g., 2025-01-22T12:00:00Z)")
+
+
 @router.post(
     "/charts/synastry",
     summary="Calculate Synastry",
@@ -207,17 +228,21 @@ async def calculate_synastry_endpoint(
     """
     try:
         # Create charts from data
-        chart1 = create_chart_from_data(data.chart1)
-        chart2 = create_chart_from_data(data.chart2)
+        chart1, chart2 = await asyncio.gather(
+            create_chart_from_data(data.chart1),
+            create_chart_from_data(data.chart2)
+        )
         
         # Calculate synastry
-        synastry_result = calculate_synastry(chart1, chart2, system=data.system)
+        synastry_result = await run_chart_task(calculate_synastry, chart1, chart2, system=data.system)
         
         return {
             "status": "success",
             "synastry": synastry_result
         }
     
+    except ServiceOverloadedError:
+        raise
     except GeocodingError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ChartCalculationError as e:
@@ -273,17 +298,21 @@ async def calculate_composite_endpoint(
     """
     try:
         # Create charts from data
-        chart1 = create_chart_from_data(data.chart1)
-        chart2 = create_chart_from_data(data.chart2)
+        chart1, chart2 = await asyncio.gather(
+            create_chart_from_data(data.chart1),
+            create_chart_from_data(data.chart2)
+        )
         
         # Calculate composite
-        composite_result = calculate_composite(chart1, chart2, system=data.system)
+        composite_result = await run_chart_task(calculate_composite, chart1, chart2, system=data.system)
         
         return {
             "status": "success",
             "composite": composite_result
         }
     
+    except ServiceOverloadedError:
+        raise
     except GeocodingError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ChartCalculationError as e:
@@ -340,7 +369,7 @@ async def calculate_transits_endpoint(
     """
     try:
         # Create natal chart from data
-        natal_chart = create_chart_from_data(data.chart_data)
+        natal_chart = await create_chart_from_data(data.chart_data)
         
         # Parse target date if provided
         target_date = None
@@ -351,13 +380,15 @@ async def calculate_transits_endpoint(
                 raise ValidationError("Invalid date format. Use ISO format (e.g., 2025-01-22T12:00:00Z)")
         
         # Calculate transits
-        transit_result = calculate_current_transits(natal_chart, target_date, system=data.system)
+        transit_result = await run_chart_task(calculate_current_transits, natal_chart, target_date, system=data.system)
         
         return {
             "status": "success",
             "transits": transit_result
         }
     
+    except ServiceOverloadedError:
+        raise
     except GeocodingError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ChartCalculationError as e:
@@ -400,36 +431,15 @@ async def get_transits_by_hash_endpoint(
             raise ValidationError("System must be 'sidereal' or 'tropical'")
         
         # Try to find saved chart by hash
-        saved_chart = db.query(SavedChart).filter(
-            SavedChart.chart_data_json.contains(f'"chart_hash":"{chart_hash}"')
-        ).first()
+        saved_chart = QueryOptimizer.get_chart_by_hash(db, chart_hash)
         
         if not saved_chart:
             raise HTTPException(status_code=404, detail="Chart not found")
         
-        # Parse chart data from JSON
-        import json
-        chart_data_json = json.loads(saved_chart.chart_data_json)
-        
-        # Extract birth data
-        birth_data = chart_data_json.get("birth_data", {})
-        if not birth_data:
-            raise HTTPException(status_code=400, detail="Invalid chart data format")
-        
-        # Create chart data dict
-        chart_data = {
-            "full_name": saved_chart.chart_name,
-            "year": saved_chart.birth_year,
-            "month": saved_chart.birth_month,
-            "day": saved_chart.birth_day,
-            "hour": saved_chart.birth_hour,
-            "minute": saved_chart.birth_minute,
-            "location": saved_chart.birth_location,
-            "unknown_time": saved_chart.unknown_time
-        }
+        chart_data = saved_chart_to_chart_data(saved_chart)
         
         # Create natal chart
-        natal_chart = create_chart_from_data(chart_data)
+        natal_chart = await create_chart_from_data(chart_data)
         
         # Parse target date if provided
         target_date_obj = None
@@ -440,7 +450,7 @@ async def get_transits_by_hash_endpoint(
                 raise ValidationError("Invalid date format. Use ISO format (e.g., 2025-01-22T12:00:00Z)")
         
         # Calculate transits
-        transit_result = calculate_current_transits(natal_chart, target_date_obj, system=system)
+        transit_result = await run_chart_task(calculate_current_transits, natal_chart, target_date_obj, system=system)
         
         return {
             "status": "success",
@@ -457,6 +467,145 @@ async def get_transits_by_hash_endpoint(
         raise HTTPException(status_code=500, detail=f"Failed to get transits: {str(e)}")
 
 
+class TransitTimelineRequest(BaseModel):
+    """Request model for a transit timeline."""
+    chart_data: Dict[str, Any] = Field(..., description="Natal chart data")
+    start_date: str = Field(..., description="Start of the range (ISO format)")
+    end_date: str = Field(..., description=f"End of the range (ISO format, at most {MAX_TIMELINE_DAYS} days after start)")
+    system: str = Field("sidereal", description="Zodiac system: 'sidereal' or 'tropical'")
+    planets: Optional[List[str]] = Field(None, description="Transiting planets to include (defaults to Sun through Pluto)")
+    
+    @validator('system')
+    def validate_system(cls, v):
+        if v not in ['sidereal', 'tropical']:
+            raise ValueError("System must be 'sidereal' or 'tropical'")
+        return v
+    
+    @validator('chart_data')
+    def validate_chart_data(cls, v):
+        required_fields = ['full_name', 'year', 'month', 'day', 'hour', 'minute', 'location']
+        for field in required_fields:
+            if field not in v:
+                raise ValueError(f"Missing required field: {field}")
+        return v
+
+
+def build_transit_timeline(natal_chart: NatalChart, start_date: str, end_date: str, system: str, planets: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Parse the range and calculate a transit timeline.
+    
+    Raises:
+        ValidationError: If the dates, range or planets are invalid
+    """
+    try:
+        return calculate_transit_timeline(
+            natal_chart, parse_iso_date(start_date), parse_iso_date(end_date),
+            system=system, planets=planets, use_ephemeris_table=True
+        )
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+
+@router.post(
+    "/charts/transits/timeline",
+    summary="Calculate Transit Timeline",
+    description=f"""
+    Calculate a transit forecast for a natal chart over a date range.
+    
+    Returns when each transit aspect enters orb, perfects and leaves orb,
+    plus sign ingresses and retrograde/direct stations of the transiting
+    planets. Ranges are limited to {MAX_TIMELINE_DAYS} days.
+    
+    **Rate Limit**: 100 requests per day per IP address
+    """,
+    response_description="Transit timeline",
+    tags=["advanced-charts"]
+)
+async def calculate_transit_timeline_endpoint(
+    request: Request,
+    data: TransitTimelineRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Calculate a transit timeline for a natal chart.
+    """
+    try:
+        natal_chart = await create_chart_from_data(data.chart_data)
+        timeline = await run_chart_task(build_transit_timeline, natal_chart, data.start_date, data.end_date, data.system, data.planets)
+        
+        return {
+            "status": "success",
+            "timeline": timeline
+        }
+    
+    except ServiceOverloadedError:
+        raise
+    except GeocodingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ChartCalculationError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error calculating transit timeline: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to calculate transit timeline: {str(e)}")
+
+
+@router.get(
+    "/charts/{chart_hash}/transits/timeline",
+    summary="Get Transit Timeline for Saved Chart",
+    description=f"""
+    Get a transit timeline for a chart by its hash.
+    
+    Same result as POST /charts/transits/timeline for a previously saved
+    chart. Ranges are limited to {MAX_TIMELINE_DAYS} days.
+    
+    **Rate Limit**: 100 requests per day per IP address
+    """,
+    response_description="Transit timeline",
+    tags=["advanced-charts"]
+)
+async def get_transit_timeline_by_hash_endpoint(
+    request: Request,
+    chart_hash: str,
+    start_date: str,
+    end_date: str,
+    system: str = "sidereal",
+    planets: Optional[str] = None,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get a transit timeline for a chart by hash. planets is a comma-separated list.
+    """
+    try:
+        if system not in ['sidereal', 'tropical']:
+            raise ValidationError("System must be 'sidereal' or 'tropical'")
+        
+        saved_chart = QueryOptimizer.get_chart_by_hash(db, chart_hash)
+        if not saved_chart:
+            raise HTTPException(status_code=404, detail="Chart not found")
+        
+        natal_chart = await create_chart_from_data(saved_chart_to_chart_data(saved_chart))
+        planet_list = [p.strip() for p in planets.split(",") if p.strip()] if planets else None
+        timeline = await run_chart_task(build_transit_timeline, natal_chart, start_date, end_date, system, planet_list)
+        
+        return {
+            "status": "success",
+            "chart_hash": chart_hash,
+            "timeline": timeline
+        }
+    
+    except HTTPException:
+        raise
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting transit timeline: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to get transit timeline: {str(e)}")
+
+
 class ProgressedRequest(BaseModel):
     """Request model for progressed chart calculation."""
     chart_data: Dict[str, Any] = Field(..., description="Natal chart data")
@@ -494,7 +643,7 @@ async def calculate_progressed_endpoint(
     """
     try:
         # Create natal chart
-        natal_chart = create_chart_from_data(data.chart_data)
+        natal_chart = await create_chart_from_data(data.chart_data)
         
         # Parse target date
         try:
@@ -503,13 +652,15 @@ async def calculate_progressed_endpoint(
             raise ValidationError("Invalid date format. Use ISO format (e.g., 2025-01-22T12:00:00Z)")
         
         # Calculate progressed chart
-        progressed_result = calculate_progressed_chart(natal_chart, target_date, system=data.system)
+        progressed_result = await run_chart_task(calculate_progressed_chart, natal_chart, target_date, system=data.system)
         
         return {
             "status": "success",
             "progressed": progressed_result
         }
     
+    except ServiceOverloadedError:
+        raise
     except GeocodingError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ChartCalculationError as e:
@@ -558,16 +709,18 @@ async def calculate_solar_return_endpoint(
     """
     try:
         # Create natal chart
-        natal_chart = create_chart_from_data(data.chart_data)
+        natal_chart = await create_chart_from_data(data.chart_data)
         
         # Calculate solar return
-        solar_return_result = calculate_solar_return_chart(natal_chart, data.target_year, system=data.system)
+        solar_return_result = await run_chart_task(calculate_solar_return_chart, natal_chart, data.target_year, system=data.system)
         
         return {
             "status": "success",
             "solar_return": solar_return_result
         }
     
+    except ServiceOverloadedError:
+        raise
     except GeocodingError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ChartCalculationError as e:
@@ -578,3 +731,92 @@ async def calculate_solar_return_endpoint(
         logger.error(f"Error calculating solar return chart: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to calculate solar return chart: {str(e)}")
 
+
+class PlanetaryReturnsRequest(BaseModel):
+    """Request model for planetary return times over a range of years."""
+    chart_data: Dict[str, Any] = Field(..., description="Natal chart data")
+    body: str = Field("Sun", description="Returning planet: Sun through Pluto")
+    start_year: int = Field(..., description="First year", ge=1900, le=2100)
+    end_year: int = Field(..., description="Last year (inclusive, at most 100 years after start_year)", ge=1900, le=2100)
+    system: str = Field("sidereal", description="Zodiac system: 'sidereal' or 'tropical'")
+    
+    @validator('system')
+    def validate_system(cls, v):
+        if v not in ['sidereal', 'tropical']:
+            raise ValueError("System must be 'sidereal' or 'tropical'")
+        return v
+    
+    @validator('body')
+    def validate_body(cls, v):
+        if v not in RETURN_BODIES:
+            raise ValueError(f"Body must be one of: {', '.join(RETURN_BODIES)}")
+        return v
+
+
+@router.post(
+    "/charts/returns",
+    summary="Calculate Planetary Returns",
+    description="""
+    Calculate the exact moments a planet returns to its natal position for a range of years.
+    
+    Solar returns are given once per year (the return around the birthday);
+    other planets list every return in the range, including the repeated
+    crossings of a retrograde loop. Times are UTC, accurate to the second.
+    
+    **Rate Limit**: 50 requests per day per IP address
+    """,
+    response_description="Planetary return times",
+    tags=["advanced-charts"]
+)
+async def calculate_planetary_returns_endpoint(
+    request: Request,
+    data: PlanetaryReturnsRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Calculate planetary return times.
+    """
+    try:
+        if data.end_year < data.start_year or data.end_year - data.start_year >= 100:
+            raise ValidationError("end_year must be within 100 years after start_year")
+        
+        natal_chart = await create_chart_from_data(data.chart_data)
+        
+        if data.body == "Sun":
+            returns = await run_chart_task(find_solar_returns, natal_chart, data.start_year, data.end_year, system=data.system)
+        else:
+            response = await compute_async(ReturnRequest.for_chart(
+                natal_chart,
+                data.body,
+                datetime(data.start_year, 1, 1),
+                datetime(data.end_year + 1, 1, 1),
+                system=data.system,
+                use_ephemeris_table=True
+            ))
+            returns = [{"year": moment.year, "date": moment.isoformat()} for moment in response.moments()]
+        
+        return {
+            "status": "success",
+            "returns": {
+                "natal_chart_name": natal_chart.name,
+                "body": data.body,
+                "system": data.system,
+                "start_year": data.start_year,
+                "end_year": data.end_year,
+                "returns": returns,
+                "count": len(returns)
+            }
+        }
+    
+    except ServiceOverloadedError:
+        raise
+    except GeocodingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ChartCalculationError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error calculating planetary returns: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to calculate planetary returns: {str(e)}")
@@ -6,7 +6,7 @@ Allows users to process multiple chart calculations or readings in batch.
 
 import logging
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
@@ -14,8 +14,7 @@ from app.core.logging_config import setup_logger
 from database import get_db, User
 from auth import get_current_user
 from app.services.batch_service import (
-    create_batch_job, get_batch_job, list_batch_jobs,
-    start_batch_job, BatchJobStatus
+    create_batch_job, get_batch_job, list_batch_jobs, BatchJobStatus
 )
 
 logger = setup_logger(__name__)
@@ -100,7 +99,6 @@ class BatchJobDetailResponse(BatchJobResponse):
 @router.post("/charts", response_model=BatchJobResponse)
 async def create_batch_charts(
     data: BatchChartRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -116,12 +114,9 @@ async def create_batch_charts(
             detail="Maximum 100 items allowed per batch"
         )
     
-    # Create batch job
+    # Enqueue the batch job; a job worker picks it up
     job_id = create_batch_job("charts", data.items, current_user.id)
     
-    # Start processing in background
-    background_tasks.add_task(start_batch_job, job_id)
-    
     job = get_batch_job(job_id)
     
     return BatchJobResponse(
@@ -142,7 +137,6 @@ async def create_batch_charts(
 @router.post("/readings", response_model=BatchJobResponse)
 async def create_batch_readings(
     data: BatchReadingRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -158,12 +152,9 @@ async def create_batch_readings(
             detail="Maximum 50 items allowed per batch"
         )
     
-    # Create batch job
+    # Enqueue the batch job; a job worker picks it up
     job_id = create_batch_job("readings", data.items, current_user.id)
     
-    # Start processing in background
-    background_tasks.add_task(start_batch_job, job_id)
-    
     job = get_batch_job(job_id)
     
     return BatchJobResponse(
@@ -16,8 +16,9 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.core.logging_config import setup_logger
+from app.core.query_optimizer import QueryOptimizer
 from app.core.exceptions import NotFoundError
-from database import get_db, User, SavedChart, ChatConversation, ChatMessage
+from database import get_db, User, ChatConversation, ChatMessage
 from auth import get_current_user_optional
 from app.services.chart_service import generate_chart_hash
 from services.similarity_service import find_similar_famous_people_internal
@@ -63,9 +64,7 @@ async def get_full_results_endpoint(
         # In a real implementation, you might cache chart data by hash
         
         # Try to find saved chart
-        saved_chart = db.query(SavedChart).filter(
-            SavedChart.chart_data_json.contains(f'"chart_hash":"{data.chart_hash}"')
-        ).first()
+        saved_chart = QueryOptimizer.get_chart_by_hash(db, data.chart_hash)
         
         if not saved_chart:
             raise NotFoundError(
@@ -5,15 +5,13 @@ Endpoints for chart calculation, reading generation, and reading retrieval.
 """
 
 import json
-import os
 import asyncio
-import requests
 import pendulum
-import swisseph as swe
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query
 from fastapi import Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, validator
 from sqlalchemy.orm import Session
 
@@ -23,6 +21,7 @@ from app.core.exceptions import (
     GeocodingError,
     ReadingGenerationError
 )
+from app.core.executors import run_chart_task
 # Limiter will be set from main app - create placeholder for decorators
 try:
     from slowapi import Limiter
@@ -40,14 +39,18 @@ except ImportError:
 from database import get_db, User, SavedChart
 from auth import get_current_user_optional
 from natal_chart import (
-    NatalChart,
     calculate_numerology, get_chinese_zodiac_and_element,
     calculate_name_numerology,
     TRUE_SIDEREAL_SIGNS
 )
-from app.services.chart_service import generate_chart_hash, get_quick_highlights
+from app.services.chart_service import (
+    chart_sections_for_fields, generate_chart_hash, get_quick_highlights, resolve_chart_fields
+)
+from app.services.chart_cache import get_cached_chart_data
+from app.services.geocoding_service import geocode_location
 from app.services.llm_prompts import generate_snapshot_reading
 from app.services.email_service import send_snapshot_email_via_sendgrid
+from app.utils.field_selection import filter_dict_fields
 from app.utils.validators import validate_chart_request_data, sanitize_string
 
 logger = setup_logger(__name__)
@@ -58,15 +61,12 @@ router = APIRouter(tags=["charts"])
 # Import centralized configuration
 from app.config import (
     ADMIN_SECRET_KEY, ADMIN_EMAIL, SENDGRID_API_KEY, SENDGRID_FROM_EMAIL,
-    SWEP_PATH, DEFAULT_SWISS_EPHEMERIS_PATH, OPENCAGE_KEY
+    READING_STREAMING_ENABLED
 )
-import pathlib
-# Convert Path objects to strings for compatibility
-if isinstance(DEFAULT_SWISS_EPHEMERIS_PATH, pathlib.Path):
-    DEFAULT_SWISS_EPHEMERIS_PATH = str(DEFAULT_SWISS_EPHEMERIS_PATH)
 
 # Reading cache (shared cache module)
 from app.core.cache import get_reading_from_cache, set_reading_in_cache, CACHE_EXPIRY_HOURS, reading_cache
+from app.core.events import EventQueue, EventType, event_broadcaster
 
 
 # Pydantic Models
@@ -195,7 +195,9 @@ async def generate_reading_and_send_email(chart_data: Dict, unknown_time: bool,
             db = SessionLocal()
             try:
                 from app.services.llm_prompts import get_gemini3_reading
-                reading_text = await get_gemini3_reading(chart_data, unknown_time, db=db)
+                # Stream sections to /ws/reading/{chart_hash} and /stream_reading/{chart_hash} subscribers
+                stream_topic = generate_chart_hash(chart_data, unknown_time) if READING_STREAMING_ENABLED else None
+                reading_text = await get_gemini3_reading(chart_data, unknown_time, db=db, stream_topic=stream_topic)
             finally:
                 db.close()
             
@@ -412,8 +414,8 @@ async def generate_reading_and_send_email(chart_data: Dict, unknown_time: bool,
         # Generate PDF report
         try:
             logger.info("Generating PDF report...")
-            from pdf_generator import generate_pdf_report
-            pdf_bytes = generate_pdf_report(chart_data, reading_text, user_inputs)
+            from app.services.pdf_service import get_pdf_report_bytes
+            pdf_bytes = await get_pdf_report_bytes(chart_data, reading_text, user_inputs)
             logger.info(f"PDF generated successfully ({len(pdf_bytes)} bytes)")
         except Exception as e:
             logger.error(f"Error generating PDF: {e}", exc_info=True)
@@ -491,6 +493,9 @@ async def generate_reading_and_send_email(chart_data: Dict, unknown_time: bool,
     **Rate Limit**: 200 requests per day per IP address
     
     **Transit Charts**: Set `full_name` to "Current Transits" to calculate current planetary positions
+    
+    **Field Selection**: `fields=sidereal_major_positions,chart_hash` (or `profile=lightweight`) returns
+    only those fields, and the chart work, highlights and snapshot reading behind other fields are skipped
     """,
     response_description="Complete chart data with all astrological information",
     tags=["charts"]
@@ -501,7 +506,9 @@ async def calculate_chart_endpoint(
     data: ChartRequest, 
     background_tasks: BackgroundTasks,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to compute and return"),
+    profile: Optional[str] = Query(None, description="Named field set (full, lightweight); ignored when fields is given")
 ) -> Dict[str, Any]:
     """
     Calculate a birth chart with all astrological data.
@@ -512,8 +519,18 @@ async def calculate_chart_endpoint(
     - Numerology
     - Chinese zodiac
     - Snapshot reading (if not a transit chart)
+    
+    With fields or profile, only the selected fields are computed.
     """
     try:
+        try:
+            selected_fields = resolve_chart_fields(fields, profile)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        def wants(field: str) -> bool:
+            return selected_fields is None or field in selected_fields
+
         log_data = data.dict()
         if 'full_name' in log_data:
             log_data['chart_name'] = log_data.pop('full_name')
@@ -525,104 +542,15 @@ async def calculate_chart_endpoint(
         else:
             logger.info("New chart request received", extra=log_data)
 
-        # Ensure ephemeris files are accessible
-        # Try SWEP_PATH first (if set), then DEFAULT_SWISS_EPHEMERIS_PATH, then BASE_DIR/swiss_ephemeris, then BASE_DIR
-        ephe_path = None
-        if SWEP_PATH and os.path.exists(SWEP_PATH):
-            ephe_path = SWEP_PATH
-        elif DEFAULT_SWISS_EPHEMERIS_PATH and os.path.exists(DEFAULT_SWISS_EPHEMERIS_PATH):
-            ephe_path = DEFAULT_SWISS_EPHEMERIS_PATH
-        else:
-            # Try relative to BASE_DIR
-            from app.config import BASE_DIR
-            swiss_ephe_dir = BASE_DIR / "swiss_ephemeris"
-            if swiss_ephe_dir.exists():
-                ephe_path = str(swiss_ephe_dir)
-            else:
-                # Final fallback to BASE_DIR (ephemeris files might be in root)
-                ephe_path = str(BASE_DIR)
-                logger.info(f"Using BASE_DIR as ephemeris path: {ephe_path}")
-        
-        swe.set_ephe_path(ephe_path)
-        logger.debug(f"Swiss Ephemeris path set to: {ephe_path}") 
-
-        # Geocoding with fallback: Try OpenCage first, then Nominatim
-        lat, lng, timezone_name = None, None, None
-        
+        # Geocoding (cached, non-blocking): OpenCage first, then Nominatim
         logger.info(f"Geocoding location: {data.location}")
+        try:
+            geo = await geocode_location(data.location)
+        except GeocodingError as e:
+            logger.error(f"Geocoding failed: {e.detail}")
+            raise HTTPException(status_code=503, detail="Could not connect to the geocoding service.")
         
-        # Try OpenCage first (if key is available)
-        opencage_key = OPENCAGE_KEY
-        if opencage_key:
-            try:
-                geo_url = f"https://api.opencagedata.com/geocode/v1/json?q={data.location}&key={opencage_key}"
-                response = requests.get(geo_url, timeout=10)
-                
-                # Check for 402 Payment Required - don't fail, just fall back
-                if response.status_code == 402:
-                    logger.warning("OpenCage API returned 402 Payment Required. Falling back to Nominatim.")
-                else:
-                    response.raise_for_status()
-                    geo_res = response.json()
-                    results = geo_res.get("results", [])
-                    if results:
-                        result = results[0]
-                        geometry = result.get("geometry", {})
-                        annotations = result.get("annotations", {}).get("timezone", {})
-                        lat = geometry.get("lat")
-                        lng = geometry.get("lng")
-                        timezone_name = annotations.get("name")
-                        logger.info(f"OpenCage geocoding successful: lat={lat}, lng={lng}, timezone={timezone_name}")
-                    else:
-                        logger.warning(f"OpenCage returned no results for location: {data.location}")
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"OpenCage geocoding failed: {e}. Falling back to Nominatim.")
-        
-        # Fallback to Nominatim if OpenCage failed or returned 402
-        if not lat or not lng:
-            try:
-                nominatim_url = "https://nominatim.openstreetmap.org/search"
-                params = {
-                    "q": data.location,
-                    "format": "json",
-                    "limit": 1
-                }
-                headers = {
-                    "User-Agent": "SynthesisAstrology/1.0 (contact@example.com)"  # Required by Nominatim
-                }
-                response = requests.get(nominatim_url, params=params, headers=headers, timeout=10)
-                response.raise_for_status()
-                nominatim_data = response.json()
-                
-                if nominatim_data and len(nominatim_data) > 0:
-                    result_data = nominatim_data[0]
-                    lat = float(result_data.get("lat", 0))
-                    lng = float(result_data.get("lon", 0))
-                    logger.info(f"Nominatim geocoding successful: lat={lat}, lng={lng}")
-                    
-                    # Nominatim doesn't provide timezone directly, so we'll use a timezone lookup
-                    # Use a free timezone API
-                    if lat and lng:
-                        try:
-                            # Use timezone lookup API
-                            tz_url = f"https://timeapi.io/api/TimeZone/coordinate?latitude={lat}&longitude={lng}"
-                            tz_response = requests.get(tz_url, timeout=5)
-                            if tz_response.status_code == 200:
-                                tz_data = tz_response.json()
-                                timezone_name = tz_data.get("timeZone", "UTC")
-                                logger.info(f"Timezone lookup successful: {timezone_name}")
-                            else:
-                                # Fallback: use UTC and let pendulum handle it
-                                logger.warning(f"Timezone API returned status {tz_response.status_code}, using UTC")
-                                timezone_name = "UTC"
-                        except Exception as tz_e:
-                            logger.warning(f"Timezone lookup failed: {tz_e}. Using UTC.")
-                            timezone_name = "UTC"
-                else:
-                    logger.warning(f"Nominatim returned no results for location: {data.location}")
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Nominatim geocoding failed: {e}")
-                raise HTTPException(status_code=400, detail=f"Could not find location data for '{data.location}'. Please be more specific (e.g., City, State, Country).")
+        lat, lng, timezone_name = (geo.latitude, geo.longitude, geo.timezone) if geo else (None, None, None)
         
         # Final validation
         if not lat or not lng:
@@ -648,12 +576,6 @@ async def calculate_chart_endpoint(
 
         utc_time = local_time.in_timezone('UTC')
 
-        chart = NatalChart(
-            name=data.full_name, year=utc_time.year, month=utc_time.month, day=utc_time.day,
-            hour=utc_time.hour, minute=utc_time.minute, latitude=lat, longitude=lng
-        )
-        chart.calculate_chart(unknown_time=data.unknown_time)
-        
         numerology_raw = calculate_numerology(data.day, data.month, data.year)
         # Convert to expected format: {"life_path": ...} -> {"life_path_number": ...}
         numerology = {
@@ -677,15 +599,29 @@ async def calculate_chart_endpoint(
             
         chinese_zodiac = get_chinese_zodiac_and_element(data.year, data.month, data.day)
         
-        full_response = chart.get_full_chart_data(numerology, name_numerology, chinese_zodiac, data.unknown_time)
+        # Chart calculation is memoized on the UTC birth moment and coordinates, and runs
+        # on the chart executor so it does not block the event loop
+        birth = (utc_time.year, utc_time.month, utc_time.day, utc_time.hour, utc_time.minute, lat, lng)
+        full_response = await run_chart_task(
+            get_cached_chart_data, data.full_name, *birth, data.unknown_time, numerology, name_numerology, chinese_zodiac,
+            sections=chart_sections_for_fields(selected_fields)
+        )
+
+        async def full_chart_data() -> Dict[str, Any]:
+            """Every chart section, for work that needs the whole chart (readings, saved charts)."""
+            if selected_fields is None:
+                return full_response
+            return await run_chart_task(
+                get_cached_chart_data, data.full_name, *birth, data.unknown_time, numerology, name_numerology, chinese_zodiac
+            )
         
         # Validate that transit charts have all required data for rendering
         if is_transit_chart:
-            required_fields = [
+            required_fields = [field for field in [
                 'sidereal_major_positions', 'tropical_major_positions',
                 'sidereal_aspects', 'tropical_aspects',
                 'sidereal_house_cusps', 'tropical_house_cusps'
-            ]
+            ] if wants(field)]
             missing_fields = [field for field in required_fields if field not in full_response or not full_response[field]]
             if missing_fields:
                 logger.error(f"Transit chart missing required fields: {missing_fields}")
@@ -706,16 +642,17 @@ async def calculate_chart_endpoint(
             logger.info(f"Transit chart calculated successfully - Sidereal Ascendant: {sidereal_asc.get('degrees') if sidereal_asc else 'N/A'}, Tropical Ascendant: {tropical_asc.get('degrees') if tropical_asc else 'N/A'}")
         
         # Add quick highlights to the response
-        try:
-            quick_highlights = get_quick_highlights(full_response, data.unknown_time)
-            full_response["quick_highlights"] = quick_highlights
-        except Exception as e:
-            logger.warning(f"Could not generate quick highlights: {e}")
-            full_response["quick_highlights"] = "Quick highlights are unavailable for this chart."
+        if wants("quick_highlights"):
+            try:
+                quick_highlights = get_quick_highlights(full_response, data.unknown_time)
+                full_response["quick_highlights"] = quick_highlights
+            except Exception as e:
+                logger.warning(f"Could not generate quick highlights: {e}")
+                full_response["quick_highlights"] = "Quick highlights are unavailable for this chart."
         
         # Generate snapshot reading (blinded, limited data) - only for actual birth charts, not transit charts
         # (is_transit_chart already determined earlier)
-        if not is_transit_chart:
+        if not is_transit_chart and wants("snapshot_reading"):
             logger.info("Generating snapshot reading...")
             try:
                 snapshot_reading = await asyncio.wait_for(
@@ -785,7 +722,8 @@ async def calculate_chart_endpoint(
             if ADMIN_SECRET_KEY and friends_and_family_key == ADMIN_SECRET_KEY:
                 if not is_transit_chart and data.user_email:
                     logger.info(f"FRIENDS_AND_FAMILY_KEY detected - automatically generating full reading for {data.full_name}")
-                    chart_hash = generate_chart_hash(full_response, data.unknown_time)
+                    reading_chart_data = await full_chart_data()
+                    chart_hash = generate_chart_hash(reading_chart_data, data.unknown_time)
                     
                     if not data.unknown_time:
                         hour_12 = data.hour % 12
@@ -806,7 +744,7 @@ async def calculate_chart_endpoint(
                     
                     background_tasks.add_task(
                         generate_reading_and_send_email,
-                        chart_data=full_response,
+                        chart_data=reading_chart_data,
                         unknown_time=data.unknown_time,
                         user_inputs=user_inputs
                     )
@@ -816,8 +754,8 @@ async def calculate_chart_endpoint(
                     logger.info(f"Full reading queued for FRIENDS_AND_FAMILY_KEY user with chart_hash: {chart_hash}")
         
         # Generate chart_hash for all charts
-        chart_hash = generate_chart_hash(full_response, data.unknown_time)
-        full_response["chart_hash"] = chart_hash
+        if wants("chart_hash"):
+            full_response["chart_hash"] = generate_chart_hash(full_response, data.unknown_time)
         
         # Auto-save chart if user is logged in
         if current_user:
@@ -842,7 +780,8 @@ async def calculate_chart_endpoint(
                         birth_minute=data.minute if not data.unknown_time else 0,
                         birth_location=data.location,
                         unknown_time=data.unknown_time,
-                        chart_data_json=json.dumps(full_response)
+                        # Saved charts always hold the whole chart, whatever fields this request selected
+                        chart_data_json=json.dumps(await full_chart_data())
                     )
                     db.add(saved_chart)
                     db.commit()
@@ -879,15 +818,15 @@ async def calculate_chart_endpoint(
             )
         except Exception as e:
             logger.debug(f"Analytics tracking failed: {e}")
-            
+        
+        if selected_fields is not None:
+            # Drop sections computed only as inputs to other fields (e.g. aspects for chart_hash)
+            full_response = filter_dict_fields(full_response, selected_fields)
         return full_response
 
     except HTTPException as e:
         logger.error(f"HTTP Exception in /calculate_chart: {e.status_code} - {e.detail}", exc_info=True)
         raise e
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Geocoding API request failed: {e}", exc_info=True)
-        raise HTTPException(status_code=503, detail="Could not connect to the geocoding service.")
     except Exception as e:
         logger.error(f"An unexpected error occurred in /calculate_chart: {type(e).__name__} - {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An unexpected server error occurred: {type(e).__name__}")
@@ -1077,3 +1016,67 @@ async def get_reading_endpoint(
             "message": "Reading is still being generated. Please check again in a moment."
         }
 
+
+
+READING_STREAM_EVENTS = {
+    EventType.READING_STARTED,
+    EventType.READING_PROGRESS,
+    EventType.READING_DELTA,
+    EventType.READING_SECTION,
+    EventType.READING_COMPLETED,
+    EventType.READING_FAILED
+}
+READING_STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _sse_event(event_type: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/stream_reading/{chart_hash}")
+async def stream_reading_endpoint(
+    request: Request,
+    chart_hash: str,
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """
+    Stream a reading as it is generated (Server-Sent Events).
+    
+    Emits reading.progress, reading.delta and reading.section events while the
+    background task runs, then reading.completed (or reading.failed). If the
+    reading is already cached, reading.completed is sent immediately.
+    Same events as /ws/reading/{chart_hash}.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required to access full reading")
+    
+    subscriber = EventQueue()
+    await event_broadcaster.connect(subscriber, event_types=READING_STREAM_EVENTS, topic=chart_hash)
+    
+    async def event_stream():
+        try:
+            yield _sse_event("connected", {"chart_hash": chart_hash})
+            
+            # Subscribed before checking the cache, so a reading finishing in between is not missed
+            cached_data = get_reading_from_cache(chart_hash)
+            if cached_data:
+                yield _sse_event(EventType.READING_COMPLETED.value, {"reading": cached_data['reading']})
+                return
+            
+            while not await request.is_disconnected():
+                event = await subscriber.get(timeout=READING_STREAM_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_event(event["type"], event["data"])
+                if event["type"] in (EventType.READING_COMPLETED.value, EventType.READING_FAILED.value):
+                    return
+        finally:
+            await event_broadcaster.disconnect(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
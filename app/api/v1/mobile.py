@@ -6,14 +6,16 @@ Mobile-optimized endpoints and PWA support.
 
 import logging
 from typing import Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Depends, Query
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.core.logging_config import setup_logger
+from app.core.query_optimizer import QueryOptimizer
 from app.core.exceptions import NotFoundError
-from database import get_db, User, SavedChart
+from database import get_db, User
 from auth import get_current_user_optional
+from app.api.v1.charts import ChartRequest, calculate_chart_endpoint
 
 logger = setup_logger(__name__)
 
@@ -104,6 +106,38 @@ async def unregister_device_endpoint(
         raise HTTPException(status_code=500, detail=f"Failed to unregister device: {str(e)}")
 
 
+@router.post(
+    "/mobile/calculate_chart",
+    summary="Calculate Birth Chart (Mobile)",
+    description="""
+    Calculate a birth chart for mobile clients.
+    
+    Same as `/calculate_chart`, but returns the `lightweight` profile by default: the sidereal
+    placements, aspects and house cusps needed for the chart wheel plus the chart hash, without the
+    tropical chart, patterns, highlights or snapshot reading. Pass `profile=full` or `fields=` for more.
+    """,
+    response_description="Chart data for the selected profile",
+    tags=["mobile"]
+)
+async def calculate_chart_mobile_endpoint(
+    request: Request,
+    data: ChartRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to compute and return"),
+    profile: str = Query("lightweight", description="Named field set (full, lightweight); ignored when fields is given")
+) -> Dict[str, Any]:
+    """
+    Calculate a chart with the lightweight field profile by default.
+    """
+    # Shares /calculate_chart's rate limit
+    return await calculate_chart_endpoint(
+        request=request, data=data, background_tasks=background_tasks,
+        current_user=current_user, db=db, fields=fields, profile=profile
+    )
+
+
 @router.get(
     "/mobile/chart-summary/{chart_hash}",
     summary="Get Mobile-Optimized Chart Summary",
@@ -126,9 +160,7 @@ async def get_chart_summary_endpoint(
     """
     try:
         # Find chart by hash
-        saved_chart = db.query(SavedChart).filter(
-            SavedChart.chart_data_json.contains(f'"chart_hash":"{chart_hash}"')
-        ).first()
+        saved_chart = QueryOptimizer.get_chart_by_hash(db, chart_hash)
         
         if not saved_chart:
             raise NotFoundError(
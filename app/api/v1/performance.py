@@ -13,6 +13,7 @@ from app.core.logging_config import setup_logger
 from app.core.rbac import require_admin
 from app.utils.query_analyzer import get_query_statistics, reset_query_statistics
 from app.core.cache_enhancements import get_cache_statistics, reset_cache_statistics
+from app.core.executors import get_executor_stats, reset_executor_stats
 from database import get_db, User
 
 logger = setup_logger(__name__)
@@ -110,6 +111,52 @@ async def reset_cache_stats(
         )
 
 
+@router.get("/executors", response_model=Dict[str, Any])
+async def get_executor_performance(
+    current_user: User = Depends(require_admin()),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get compute executor statistics: load, rejections, timeouts, and queue
+    wait vs. run time for chart math and PDF rendering.
+    
+    Requires admin access.
+    """
+    try:
+        stats = get_executor_stats()
+        return {
+            "status": "success",
+            "statistics": stats
+        }
+    except Exception as e:
+        logger.error(f"Error getting executor statistics: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get executor statistics: {str(e)}"
+        )
+
+
+@router.post("/executors/reset")
+async def reset_executor_stats_endpoint(
+    current_user: User = Depends(require_admin()),
+    db: Session = Depends(get_db)
+) -> Dict[str, str]:
+    """
+    Reset compute executor statistics.
+    
+    Requires admin access.
+    """
+    try:
+        reset_executor_stats()
+        return {"message": "Executor statistics reset successfully"}
+    except Exception as e:
+        logger.error(f"Error resetting executor statistics: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to reset executor statistics: {str(e)}"
+        )
+
+
 @router.get("/summary", response_model=Dict[str, Any])
 async def get_performance_summary(
     current_user: User = Depends(require_admin()),
@@ -128,6 +175,7 @@ async def get_performance_summary(
             "status": "success",
             "queries": query_stats,
             "cache": cache_stats,
+            "executors": get_executor_stats(),
             "recommendations": []
         }
     except Exception as e:
@@ -6,15 +6,20 @@ CRUD operations for user's saved charts.
 
 import json
 import logging
+import re
+import unicodedata
 from datetime import datetime
+from urllib.parse import quote
 from typing import Optional, Dict, Any, List
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, validator
 from sqlalchemy.orm import Session
 
 from app.core.logging_config import setup_logger
 from database import get_db, SavedChart
 from auth import get_current_user, User
+from app.services.pdf_service import get_pdf_report, open_pdf_report
 from app.utils.query_optimization import get_user_charts_optimized, get_chart_with_conversations
 
 logger = setup_logger(__name__)
@@ -179,6 +184,55 @@ async def get_chart_endpoint(
     }
 
 
+def _attachment_disposition(filename: str) -> str:
+    """
+    Content-Disposition header for a download of any file name.
+
+    Headers are latin-1, so the name goes in filename* (RFC 5987, UTF-8) with an
+    ASCII filename= fallback for older clients.
+    """
+    ascii_name = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+    ascii_name = re.sub(r'[^A-Za-z0-9._-]', "_", ascii_name)
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+@router.get("/{chart_id}/pdf")
+async def download_chart_pdf_endpoint(
+    chart_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """Download a saved chart's reading as a PDF report (streamed, cached after the first render)."""
+    chart = db.query(SavedChart).filter(
+        SavedChart.id == chart_id,
+        SavedChart.user_id == current_user.id
+    ).first()
+    
+    if not chart:
+        raise HTTPException(status_code=404, detail="Chart not found.")
+    if not chart.chart_data_json or not chart.ai_reading:
+        raise HTTPException(status_code=404, detail="This chart has no reading to download yet.")
+    
+    chart_data = json.loads(chart.chart_data_json)
+    user_inputs = {
+        "full_name": chart.chart_name,
+        "birth_date": f"{chart.birth_month}/{chart.birth_day}/{chart.birth_year}",
+        "birth_time": None if chart.unknown_time else f"{chart.birth_hour:02d}:{chart.birth_minute:02d}",
+        "location": chart.birth_location
+    }
+    path = await get_pdf_report(chart_data, chart.ai_reading, user_inputs)
+    chunks, size = open_pdf_report(path)
+    filename = f"Astrology_Report_{chart.chart_name.replace(' ', '_')}.pdf"
+    return StreamingResponse(
+        chunks,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": _attachment_disposition(filename),
+            "Content-Length": str(size)
+        }
+    )
+
+
 @router.delete("/{chart_id}")
 async def delete_chart_endpoint(
     chart_id: int,
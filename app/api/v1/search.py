@@ -204,11 +204,12 @@ async def search_messages(
     conversation_id: Optional[int] = None,
     role: Optional[str] = Query(None, regex="^(user|assistant)$"),
     limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     current_user: User = Depends(require_admin()),
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
-    Search messages by content.
+    Search messages by content, newest first.
     
     Requires admin access.
     """
@@ -218,14 +219,18 @@ async def search_messages(
             query=q,
             conversation_id=conversation_id,
             role=role,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
         
         return {
             "query": q,
             "results": results,
-            "count": len(results)
+            "count": len(results),
+            "next_cursor": results[-1]["cursor"] if len(results) == limit else None
         }
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Error searching messages: {str(e)}")
         raise HTTPException(
@@ -11,7 +11,7 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
 from fastapi.websockets import WebSocketState
 
 from app.core.logging_config import setup_logger
-from app.core.events import EventBroadcaster, EventType, event_broadcaster
+from app.core.events import READING_CONTENT_EVENTS, EventBroadcaster, EventType, event_broadcaster
 from database import get_db, User
 
 logger = setup_logger(__name__)
@@ -55,6 +55,10 @@ async def get_websocket_user(websocket: WebSocket, token: Optional[str] = None)
     return None
 
 
+# Event types the global feed may subscribe to; reading text is only streamed on /ws/reading/{chart_hash}
+GLOBAL_FEED_EVENTS = frozenset(set(EventType) - READING_CONTENT_EVENTS)
+
+
 @router.websocket("")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -66,7 +70,7 @@ async def websocket_endpoint(
     
     Query Parameters:
         token: Optional JWT token for authenticated connections
-        events: Optional comma-separated list of event types (default: all)
+        events: Optional comma-separated list of event types (default: all but reading content)
     
     Example:
         ws://api.example.com/ws?token=eyJ...&events=batch.job.progress,reading.progress
@@ -82,7 +86,7 @@ async def websocket_endpoint(
     if events:
         try:
             event_type_strings = [e.strip() for e in events.split(",")]
-            event_types = {EventType(et) for et in event_type_strings if et in [e.value for e in EventType]}
+            event_types = {EventType(et) for et in event_type_strings if et in [e.value for e in EventType]} & GLOBAL_FEED_EVENTS
         except (ValueError, KeyError) as e:
             logger.warning(f"Invalid event types: {events}, error: {e}")
             await websocket.send_json({
@@ -92,6 +96,9 @@ async def websocket_endpoint(
             await websocket.close()
             return
     
+    if event_types is None:
+        event_types = set(GLOBAL_FEED_EVENTS)
+    
     # Register connection
     await event_broadcaster.connect(websocket, event_types=event_types, user_id=user_id)
     
@@ -101,7 +108,7 @@ async def websocket_endpoint(
             "type": "connected",
             "message": "WebSocket connection established",
             "user_id": user_id,
-            "subscribed_events": [et.value for et in (event_types or set(EventType))]
+            "subscribed_events": [et.value for et in event_types]
         })
         
         # Keep connection alive and handle incoming messages
@@ -120,7 +127,7 @@ async def websocket_endpoint(
                         # Subscribe to additional event types
                         new_events = message.get("events", [])
                         try:
-                            new_event_types = {EventType(et) for et in new_events if et in [e.value for e in EventType]}
+                            new_event_types = {EventType(et) for et in new_events if et in [e.value for e in EventType]} & GLOBAL_FEED_EVENTS
                             await event_broadcaster.connect(websocket, event_types=new_event_types, user_id=user_id)
                             await websocket.send_json({
                                 "type": "subscribed",
@@ -238,7 +245,9 @@ async def reading_websocket(
     """
     WebSocket endpoint for reading generation progress.
     
-    Subscribes to events for a specific reading generation.
+    Subscribes to events for a specific reading generation, including
+    reading.delta (LLM text as it streams) and reading.section (each
+    section as soon as it is complete).
     """
     await websocket.accept()
     
@@ -256,11 +265,13 @@ async def reading_websocket(
     event_types = {
         EventType.READING_STARTED,
         EventType.READING_PROGRESS,
+        EventType.READING_DELTA,
+        EventType.READING_SECTION,
         EventType.READING_COMPLETED,
         EventType.READING_FAILED
     }
     
-    await event_broadcaster.connect(websocket, event_types=event_types, user_id=user.id)
+    await event_broadcaster.connect(websocket, event_types=event_types, user_id=user.id, topic=chart_hash)
     
     try:
         await websocket.send_json({
@@ -42,6 +42,14 @@ ADMIN_SECRET_KEY = os.getenv("FRIENDS_AND_FAMILY_KEY")
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 AI_MODE = os.getenv("AI_MODE", "real").lower()  # "real" or "stub" for local testing
+READING_STREAMING_ENABLED = os.getenv("READING_STREAMING_ENABLED", "true").lower() == "true"  # Publish reading deltas/sections as they generate
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"  # Reuse identical LLM calls
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "disk").lower()  # "disk" or "redis"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(BASE_DIR / "llm_cache.sqlite3"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # Compressed bytes before LRU eviction
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))  # 30 days
+LLM_PROVIDER_CACHE_TTL_SECONDS = int(os.getenv("LLM_PROVIDER_CACHE_TTL_SECONDS", "900"))  # Provider-side prompt prefix caches; 0 disables
+CHAT_CONTEXT_CACHE_MAX_SIZE = int(os.getenv("CHAT_CONTEXT_CACHE_MAX_SIZE", "512"))  # Conversations whose prebuilt chat context stays in memory
 
 # ============================================================
 # Email Configuration (SendGrid)
@@ -65,6 +73,10 @@ STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 
 OPENCAGE_KEY = os.getenv("OPENCAGE_KEY")
 NOMINATIM_USER_AGENT = os.getenv("NOMINATIM_USER_AGENT", "SynthesisAstrology/1.0 (contact@example.com)")
+GEOCODING_PROVIDER = os.getenv("GEOCODING_PROVIDER", "real").lower()  # "real" or "stub" for offline testing
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", str(BASE_DIR / "geocode_cache.sqlite3"))
+GEOCODE_CACHE_TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))  # 30 days
+GEOCODE_NEGATIVE_TTL_SECONDS = int(os.getenv("GEOCODE_NEGATIVE_TTL_SECONDS", str(24 * 3600)))  # 1 day for "not found"
 
 # ============================================================
 # Swiss Ephemeris Configuration
@@ -72,6 +84,12 @@ NOMINATIM_USER_AGENT = os.getenv("NOMINATIM_USER_AGENT", "SynthesisAstrology/1.0
 
 SWEP_PATH = os.getenv("SWEP_PATH")
 DEFAULT_SWISS_EPHEMERIS_PATH = BASE_DIR / "swiss_ephemeris"
+EPHEMERIS_TABLE_ENABLED = os.getenv("EPHEMERIS_TABLE_ENABLED", "true").lower() == "true"  # Interpolate hot date-range scans from the precomputed table
+EPHEMERIS_TABLE_PATH = os.getenv("EPHEMERIS_TABLE_PATH", str(BASE_DIR / "ephemeris_table"))  # Built by scripts/build_ephemeris_table.py
+# Ephemeris worker processes shared by chart requests and batch jobs (0 computes in the calling process)
+EPHEMERIS_POOL_WORKERS = int(os.getenv("EPHEMERIS_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+EPHEMERIS_POOL_MAX_QUEUE = int(os.getenv("EPHEMERIS_POOL_MAX_QUEUE", "256"))  # Waiting requests (batch shards count one each)
+EPHEMERIS_TASK_TIMEOUT_SECONDS = float(os.getenv("EPHEMERIS_TASK_TIMEOUT_SECONDS", "60"))
 
 # ============================================================
 # Deployment Configuration
@@ -96,6 +114,37 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 CACHE_EXPIRY_HOURS = int(os.getenv("CACHE_EXPIRY_HOURS", "24"))
 REDIS_URL = os.getenv("REDIS_URL")  # Optional Redis URL for caching
 
+# ============================================================
+# Background Job Configuration
+# ============================================================
+
+JOB_WORKER_EMBEDDED = os.getenv("JOB_WORKER_EMBEDDED", "true").lower() == "true"  # Run a job worker inside the web process
+JOB_CONCURRENCY = os.getenv("JOB_CONCURRENCY", "")  # Per job type, e.g. "batch.charts=4,batch.readings=2"
+JOB_DEFAULT_CONCURRENCY = int(os.getenv("JOB_DEFAULT_CONCURRENCY", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))  # Jobs whose worker stops heartbeating are re-queued after this
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# ============================================================
+# Compute Executor Configuration
+# ============================================================
+
+# Chart math runs on threads (it shares the in-process chart cache); PDF rendering in worker processes
+CHART_EXECUTOR_WORKERS = int(os.getenv("CHART_EXECUTOR_WORKERS", "4"))
+CHART_EXECUTOR_MAX_QUEUE = int(os.getenv("CHART_EXECUTOR_MAX_QUEUE", "64"))  # Waiting tasks beyond the workers before 503
+CHART_TASK_TIMEOUT_SECONDS = float(os.getenv("CHART_TASK_TIMEOUT_SECONDS", "30"))
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", "2"))
+CPU_EXECUTOR_MAX_QUEUE = int(os.getenv("CPU_EXECUTOR_MAX_QUEUE", "8"))
+CPU_TASK_TIMEOUT_SECONDS = float(os.getenv("CPU_TASK_TIMEOUT_SECONDS", "120"))
+EXECUTOR_RETRY_AFTER_SECONDS = int(os.getenv("EXECUTOR_RETRY_AFTER_SECONDS", "5"))  # Retry-After sent with 503s
+
+# ============================================================
+# PDF Report Configuration
+# ============================================================
+
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", str(BASE_DIR / "pdf_cache"))  # Rendered chart wheels and finished PDFs
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))  # Least recently used files evicted beyond this
+
 # ============================================================
 # Rate Limiting Configuration
 # ============================================================
@@ -69,28 +69,18 @@ def get_from_cache(key: str) -> Optional[Dict[str, Any]]:
             _l1_cache_timestamps.pop(l1_key, None)
     
     # Try L2 cache (Redis)
-    if REDIS_AVAILABLE and REDIS_URL and _redis_client:
+    data = get_from_l2_cache(key)
+    if data is not None:
+        # Promote to L1 cache
+        _set_l1_cache(key, data)
+        logger.debug(f"L2 cache hit (promoted to L1): {key}")
+        # Track cache hit
         try:
-            l2_key = _get_l2_cache_key(key)
-            cached_data = _redis_client.get(l2_key)
-            if cached_data:
-                data = json.loads(cached_data)
-                timestamp = datetime.fromisoformat(data["timestamp"])
-                if datetime.now() - timestamp < timedelta(hours=CACHE_EXPIRY_HOURS):
-                    # Promote to L1 cache
-                    _set_l1_cache(key, data)
-                    logger.debug(f"L2 cache hit (promoted to L1): {key}")
-                    # Track cache hit
-                    try:
-                        from app.core.cache_analytics import track_cache_hit
-                        track_cache_hit(key, source="l2")
-                    except ImportError:
-                        pass
-                    return data
-                else:
-                    _redis_client.delete(l2_key)
-        except Exception as e:
-            logger.warning(f"L2 cache read error: {e}")
+            from app.core.cache_analytics import track_cache_hit
+            track_cache_hit(key, source="l2")
+        except ImportError:
+            pass
+        return data
     
     logger.debug(f"Cache miss: {key}")
     # Track cache miss
@@ -122,18 +112,7 @@ def set_in_cache(key: str, value: Dict[str, Any], expiry_hours: Optional[int] =
     _set_l1_cache(key, cache_data)
     
     # Store in L2 cache (Redis)
-    if REDIS_AVAILABLE and REDIS_URL and _redis_client:
-        try:
-            l2_key = _get_l2_cache_key(key)
-            expiry = expiry_hours or CACHE_EXPIRY_HOURS
-            _redis_client.setex(
-                l2_key,
-                timedelta(hours=expiry),
-                json.dumps(cache_data)
-            )
-            logger.debug(f"Stored in L2 cache: {key}")
-        except Exception as e:
-            logger.warning(f"L2 cache write error: {e}")
+    _set_l2_cache(key, cache_data, expiry_hours)
     
     # Track cache set
     try:
@@ -143,6 +122,64 @@ def set_in_cache(key: str, value: Dict[str, Any], expiry_hours: Optional[int] =
         pass
 
 
+def get_from_l2_cache(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Get value from the L2 (Redis) cache only.
+    
+    For callers that keep their own L1 (e.g. live objects that can't be
+    stored as dicts). Does not track analytics; callers do.
+    
+    Args:
+        key: Cache key
+        
+    Returns:
+        Cached value or None
+    """
+    if not (REDIS_AVAILABLE and REDIS_URL and _redis_client):
+        return None
+    try:
+        l2_key = _get_l2_cache_key(key)
+        cached_data = _redis_client.get(l2_key)
+        if cached_data:
+            data = json.loads(cached_data)
+            timestamp = datetime.fromisoformat(data["timestamp"])
+            if datetime.now() - timestamp < timedelta(hours=CACHE_EXPIRY_HOURS):
+                return data
+            _redis_client.delete(l2_key)
+    except Exception as e:
+        logger.warning(f"L2 cache read error: {e}")
+    return None
+
+
+def set_in_l2_cache(key: str, value: Dict[str, Any], expiry_hours: Optional[int] = None):
+    """
+    Set value in the L2 (Redis) cache only.
+    
+    Args:
+        key: Cache key
+        value: Value to cache (must be JSON serializable)
+        expiry_hours: Optional expiry time (defaults to CACHE_EXPIRY_HOURS)
+    """
+    _set_l2_cache(key, {**value, "timestamp": datetime.now().isoformat()}, expiry_hours)
+
+
+def _set_l2_cache(key: str, cache_data: Dict[str, Any], expiry_hours: Optional[int] = None):
+    """Write an already timestamped value to Redis."""
+    if not (REDIS_AVAILABLE and REDIS_URL and _redis_client):
+        return
+    try:
+        l2_key = _get_l2_cache_key(key)
+        expiry = expiry_hours or CACHE_EXPIRY_HOURS
+        _redis_client.setex(
+            l2_key,
+            timedelta(hours=expiry),
+            json.dumps(cache_data)
+        )
+        logger.debug(f"Stored in L2 cache: {key}")
+    except Exception as e:
+        logger.warning(f"L2 cache write error: {e}")
+
+
 def _set_l1_cache(key: str, value: Dict[str, Any]):
     """Set value in L1 cache with size management."""
     l1_key = _get_l1_cache_key(key)
@@ -6,7 +6,7 @@ Track and analyze cache performance metrics.
 
 import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from collections import defaultdict
 from datetime import datetime, timedelta
 
@@ -26,6 +26,8 @@ class EventType(str, Enum):
     # Reading generation events
     READING_STARTED = "reading.started"
     READING_PROGRESS = "reading.progress"
+    READING_DELTA = "reading.delta"
+    READING_SECTION = "reading.section"
     READING_COMPLETED = "reading.completed"
     READING_FAILED = "reading.failed"
     
@@ -42,6 +44,14 @@ class EventType(str, Enum):
     SYSTEM_ERROR = "system.error"
 
 
+# Events carrying a user's reading text; only delivered to connections scoped to the reading's topic
+READING_CONTENT_EVENTS = frozenset({
+    EventType.READING_DELTA,
+    EventType.READING_SECTION,
+    EventType.READING_COMPLETED,
+})
+
+
 class EventBroadcaster:
     """
     Simple event broadcaster for WebSocket connections.
@@ -53,18 +63,29 @@ class EventBroadcaster:
         """Initialize the event broadcaster."""
         self._connections: Dict[str, Set[Any]] = {}  # event_type -> set of websockets
         self._user_connections: Dict[int, Set[Any]] = {}  # user_id -> set of websockets
+        self._topics: Dict[Any, str] = {}  # websocket -> topic filter (e.g. a chart hash)
         self._lock = asyncio.Lock()
     
-    async def connect(self, websocket: Any, event_types: Optional[Set[EventType]] = None, user_id: Optional[int] = None):
+    async def connect(
+        self,
+        websocket: Any,
+        event_types: Optional[Set[EventType]] = None,
+        user_id: Optional[int] = None,
+        topic: Optional[str] = None
+    ):
         """
         Register a WebSocket connection.
         
         Args:
-            websocket: WebSocket connection
+            websocket: WebSocket connection (or any object with async send_text)
             event_types: Set of event types to subscribe to (None = all)
             user_id: Optional user ID for user-specific events
+            topic: Only receive events broadcast for this topic
         """
         async with self._lock:
+            if topic is not None:
+                self._topics[websocket] = topic
+            
             if event_types is None:
                 event_types = set(EventType)
             
@@ -95,23 +116,39 @@ class EventBroadcaster:
             # Remove from user connections
             for user_id, connections in self._user_connections.items():
                 connections.discard(websocket)
+            
+            self._topics.pop(websocket, None)
         
         logger.info("WebSocket disconnected")
     
-    async def broadcast(self, event_type: EventType, data: Dict[str, Any], user_id: Optional[int] = None):
+    async def broadcast(
+        self,
+        event_type: EventType,
+        data: Dict[str, Any],
+        user_id: Optional[int] = None,
+        topic: Optional[str] = None
+    ):
         """
         Broadcast an event to all subscribed connections.
         
+        Connections registered with a topic only receive events for that topic,
+        and an event broadcast with a topic only reaches connections registered
+        with that same topic. Reading content events (READING_CONTENT_EVENTS)
+        never reach connections without a topic.
+        
         Args:
             event_type: Type of event
             data: Event data
             user_id: Optional user ID for user-specific events
+            topic: Optional topic (e.g. chart hash) the event belongs to
         """
         event = {
             "type": event_type.value,
             "data": data,
             "timestamp": datetime.utcnow().isoformat()
         }
+        if topic is not None:
+            event["topic"] = topic
         
         message = json.dumps(event)
         
@@ -126,6 +163,15 @@ class EventBroadcaster:
             # Add user-specific connections if user_id provided
             if user_id is not None and user_id in self._user_connections:
                 connections_to_notify.update(self._user_connections[user_id])
+            
+            # Topic events go only to connections scoped to that topic; unscoped
+            # connections get untopiced events, minus reading content
+            if topic is not None:
+                connections_to_notify = {c for c in connections_to_notify if self._topics.get(c) == topic}
+            elif event_type in READING_CONTENT_EVENTS:
+                connections_to_notify = set()
+            else:
+                connections_to_notify = {c for c in connections_to_notify if c not in self._topics}
         
         # Send to all connections
         disconnected = set()
@@ -143,6 +189,8 @@ class EventBroadcaster:
                     connections -= disconnected
                 for user_id, connections in self._user_connections.items():
                     connections -= disconnected
+                for connection in disconnected:
+                    self._topics.pop(connection, None)
         
         logger.debug(f"Broadcasted event {event_type.value} to {len(connections_to_notify)} connections")
     
@@ -171,6 +219,49 @@ class EventBroadcaster:
         }
 
 
+class EventQueue:
+    """
+    Queue-backed subscriber for non-WebSocket consumers (e.g. Server-Sent Events).
+    
+    Register it with EventBroadcaster.connect like a WebSocket; broadcast
+    messages are queued as JSON strings. When a slow consumer lets the queue
+    fill up, the oldest message is dropped.
+    """
+    
+    def __init__(self, maxsize: int = 1000):
+        """
+        Initialize the queue.
+        
+        Args:
+            maxsize: Maximum number of undelivered messages
+        """
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+    
+    async def send_text(self, message: str):
+        """Queue a broadcast message."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(message)
+    
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event.
+        
+        Args:
+            timeout: Seconds to wait (None = forever)
+        
+        Returns:
+            Decoded event, or None on timeout
+        """
+        try:
+            message = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        return json.loads(message)
+
+
 # Global event broadcaster instance
 event_broadcaster = EventBroadcaster()
 
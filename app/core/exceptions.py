@@ -189,3 +189,21 @@ class NotFoundError(SynthesisAPIException):
             error_code=error_code or "NOT_FOUND_ERROR"
         )
 
+
+class ServiceOverloadedError(SynthesisAPIException):
+    """Raised when a compute executor is full or a task exceeds its timeout."""
+    
+    def __init__(
+        self,
+        detail: str = "Server is busy, please retry shortly",
+        retry_after: int = 5,
+        context: Optional[Dict[str, Any]] = None,
+        error_code: Optional[str] = None
+    ):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+            context=context,
+            error_code=error_code or "SERVICE_OVERLOADED"
+        )
@@ -0,0 +1,367 @@
+"""
+Bounded Compute Executors
+
+Keeps CPU-bound work (chart math, PDF rendering) off the asyncio event loop
+so one slow request does not stall every other request on the worker.
+
+- "chart": a thread pool for chart calculation, which must share the
+  in-process chart cache (pyswisseph holds the GIL for each call, so Swiss
+  Ephemeris calls from these threads never interleave; its state is per
+  thread, so each thread configures the ephemeris path when it starts)
+- "cpu": a process pool for heavy rendering (PDF reports, chart wheels)
+- "ephemeris": Swiss Ephemeris worker processes, registered by
+  app.services.ephemeris_pool on first use
+
+Each executor admits at most max_workers running plus max_queue waiting
+tasks; beyond that, and when a task exceeds its timeout, callers get
+ServiceOverloadedError (503 with Retry-After). Queue wait and run time are
+recorded per executor and exposed at /performance/executors.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import (
+    CHART_EXECUTOR_MAX_QUEUE, CHART_EXECUTOR_WORKERS, CHART_TASK_TIMEOUT_SECONDS,
+    CPU_EXECUTOR_MAX_QUEUE, CPU_EXECUTOR_WORKERS, CPU_TASK_TIMEOUT_SECONDS,
+    EXECUTOR_RETRY_AFTER_SECONDS
+)
+from app.core.exceptions import ServiceOverloadedError
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 1000  # Recent tasks kept per executor for percentiles
+
+
+def _timed_call(func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[float, Any]:
+    """Run func in the worker and return (run seconds, result)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+class _LatencyWindow:
+    """Recent latency samples with summary statistics in milliseconds."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": len(samples),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2),
+        }
+
+
+class BoundedExecutor:
+    """
+    A thread or process pool with admission control, timeouts and latency metrics.
+
+    The pool is created on first use. Queue wait is the time from submission
+    to the worker starting the task (total latency minus run time measured in
+    the worker), so it is comparable across thread and process pools.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        max_workers: int,
+        max_queue: int,
+        timeout: float,
+        retry_after: int = EXECUTOR_RETRY_AFTER_SECONDS,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = ()
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind '{kind}'")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._initializer = initializer
+        self._initargs = initargs
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+        self._queue_wait = _LatencyWindow()
+        self._run_time = _LatencyWindow()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self._initializer, initargs=self._initargs)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"{self.name}-executor",
+                    initializer=self._initializer, initargs=self._initargs
+                )
+        return self._pool
+
+    def _overloaded(self, reason: str) -> ServiceOverloadedError:
+        return ServiceOverloadedError(
+            detail=f"Server is busy ({self.name} {reason}), please retry shortly",
+            retry_after=self.retry_after,
+            context={"executor": self.name, "reason": reason}
+        )
+
+    def _release(self, submitted_at: float, future) -> None:
+        """Done callback: free the slot and record latency once the task really ends."""
+        elapsed = time.perf_counter() - submitted_at
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self._counts["failed"] += 1
+                return
+            run_seconds = future.result()[0]
+            self._counts["completed"] += 1
+            self._run_time.add(run_seconds)
+            self._queue_wait.add(max(0.0, elapsed - run_seconds))
+
+    def _submit(self, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Future:
+        """Admit a task and submit it to the pool; the future resolves to (run seconds, result)."""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._counts["rejected"] += 1
+                raise self._overloaded("queue full")
+            self._in_flight += 1
+            self._counts["submitted"] += 1
+        submitted_at = time.perf_counter()
+        try:
+            future = self._get_pool().submit(_timed_call, func, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(partial(self._release, submitted_at))
+        return future
+
+    def _timed_out(self, func: Callable[..., Any], timeout: float) -> ServiceOverloadedError:
+        with self._lock:
+            self._counts["timed_out"] += 1
+        logger.warning(f"{self.name} executor task {getattr(func, '__name__', func)} timed out after {timeout}s")
+        return self._overloaded("timeout")
+
+    def _pool_broken(self) -> None:
+        logger.error(f"{self.name} executor process pool broke; it will be recreated")
+        with self._lock:
+            self._pool = None
+
+    def _wait(self, future: Future, func: Callable[..., Any], timeout: float) -> Any:
+        """Block until a submitted task ends and return its result."""
+        try:
+            return future.result(max(0.0, timeout))[1]
+        except FutureTimeoutError:
+            future.cancel()
+            raise self._timed_out(func, timeout)
+        except BrokenProcessPool:
+            self._pool_broken()
+            raise
+
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Run func(*args, **kwargs) in the pool and await its result.
+
+        For process pools func, its arguments and its result must be picklable.
+
+        Args:
+            func: Callable to run
+            *args, **kwargs: Arguments for func
+            timeout: Seconds to wait for the result (default: the executor's timeout)
+
+        Returns:
+            func's result
+
+        Raises:
+            ServiceOverloadedError: If the executor is full or the task times out
+            Exception: Whatever func raises
+        """
+        future = self._submit(func, args, kwargs)
+        try:
+            # A task still waiting for a worker is cancelled on timeout; a running one
+            # finishes in the background and keeps its slot until it does
+            _, result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise self._timed_out(func, timeout or self.timeout)
+        except BrokenProcessPool:
+            self._pool_broken()
+            raise
+        return result
+
+    def call(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Blocking counterpart of run() for callers that are not coroutines
+        (e.g. code already running on the chart executor).
+
+        Raises:
+            ServiceOverloadedError: If the executor is full or the task times out
+            Exception: Whatever func raises
+        """
+        return self._wait(self._submit(func, args, kwargs), func, timeout or self.timeout)
+
+    def map(self, func: Callable[..., Any], items: Iterable[Any], timeout: Optional[float] = None) -> List[Any]:
+        """
+        Run func(item) for every item in the pool and block until all finish.
+
+        All items are admitted up front (a batch larger than the free capacity
+        is rejected as a whole) and share one deadline.
+
+        Args:
+            func: Callable taking one item
+            items: Items to process
+            timeout: Seconds to wait for all results (default: the executor's timeout)
+
+        Returns:
+            Results in the order of items
+
+        Raises:
+            ServiceOverloadedError: If the executor is full or the deadline passes
+            Exception: Whatever func raises
+        """
+        timeout = timeout or self.timeout
+        futures = []
+        try:
+            for item in items:
+                futures.append(self._submit(func, (item,), {}))
+            deadline = time.monotonic() + timeout
+            return [self._wait(future, func, deadline - time.monotonic()) for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics.
+
+        Returns:
+            Dictionary with configuration, counters, current load and
+            queue wait / run time summaries
+        """
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.max_workers),
+                **self._counts,
+                "queue_wait": self._queue_wait.summary(),
+                "run_time": self._run_time.summary(),
+            }
+
+    def reset_stats(self) -> None:
+        """Reset counters and latency samples (current load is kept)."""
+        with self._lock:
+            self._counts = dict.fromkeys(self._counts, 0)
+            self._queue_wait = _LatencyWindow()
+            self._run_time = _LatencyWindow()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the pool down; it is recreated if the executor is used again."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _init_chart_thread() -> None:
+    """Chart executor thread initializer: point this thread's Swiss Ephemeris at the data files."""
+    from app.services.ephemeris_pool import configure_ephemeris
+    configure_ephemeris()
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+_EXECUTOR_CONFIG = {
+    "chart": dict(kind="thread", max_workers=CHART_EXECUTOR_WORKERS, max_queue=CHART_EXECUTOR_MAX_QUEUE, timeout=CHART_TASK_TIMEOUT_SECONDS,
+                  initializer=_init_chart_thread),
+    "cpu": dict(kind="process", max_workers=CPU_EXECUTOR_WORKERS, max_queue=CPU_EXECUTOR_MAX_QUEUE, timeout=CPU_TASK_TIMEOUT_SECONDS),
+}
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """
+    Get a process-wide executor by name ("chart" or "cpu").
+
+    Returns:
+        BoundedExecutor
+    """
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            if name not in _EXECUTOR_CONFIG:
+                raise ValueError(f"Unknown executor '{name}'")
+            executor = _executors[name] = BoundedExecutor(name, **_EXECUTOR_CONFIG[name])
+        return executor
+
+
+def set_executor(name: str, executor: Optional[BoundedExecutor]) -> None:
+    """Replace (or with None, drop) a process-wide executor, e.g. in tests."""
+    with _executors_lock:
+        if executor is None:
+            _executors.pop(name, None)
+        else:
+            _executors[name] = executor
+
+
+async def run_chart_task(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run chart math on the chart executor (see BoundedExecutor.run)."""
+    return await get_executor("chart").run(func, *args, **kwargs)
+
+
+async def run_cpu_task(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run heavy CPU work in the process pool (see BoundedExecutor.run)."""
+    return await get_executor("cpu").run(func, *args, **kwargs)
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """
+    Get statistics for every executor that has been used.
+
+    Returns:
+        Dictionary of executor name to BoundedExecutor.stats()
+    """
+    with _executors_lock:
+        executors = dict(_executors)
+    return {name: executor.stats() for name, executor in executors.items()}
+
+
+def reset_executor_stats() -> None:
+    """Reset statistics of every executor."""
+    with _executors_lock:
+        executors = list(_executors.values())
+    for executor in executors:
+        executor.reset_stats()
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down every executor's pool (application shutdown)."""
+    with _executors_lock:
+        executors = list(_executors.values())
+    for executor in executors:
+        executor.shutdown(wait=wait)
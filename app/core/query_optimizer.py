@@ -138,3 +138,30 @@ class QueryOptimizer:
         
         return db.query(SavedChart).filter(SavedChart.id.in_(chart_ids)).all()
 
+    
+    @staticmethod
+    def get_chart_by_hash(
+        db: Session,
+        chart_hash: str,
+        user_id: Optional[int] = None
+    ) -> Optional[SavedChart]:
+        """
+        Get a saved chart by its chart hash using the chart_hash index.
+        
+        Args:
+            db: Database session
+            chart_hash: Chart hash (see generate_chart_hash)
+            user_id: Restrict to this user's charts if given
+        
+        Returns:
+            Most recently saved matching chart, or None
+        """
+        if not chart_hash:
+            return None
+        
+        query = db.query(SavedChart).filter(SavedChart.chart_hash == chart_hash)
+        
+        if user_id is not None:
+            query = query.filter(SavedChart.user_id == user_id)
+        
+        return query.order_by(SavedChart.id.desc()).first()
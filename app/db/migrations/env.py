@@ -11,7 +11,7 @@ from alembic import context
 
 # Import the Base and models to ensure they're registered
 from database import Base
-from database import User, SavedChart, ChatConversation, ChatMessage, CreditTransaction, SubscriptionPayment, AdminBypassLog, FamousPerson
+from database import User, SavedChart, ChatConversation, ChatMessage, CreditTransaction, SubscriptionPayment, AdminBypassLog, FamousPerson, FamousPersonPlacement, FamousPersonAspect, FamousPersonNeighbor, FamousPersonNeighborSource, BackgroundJob
 
 # Import configuration
 from app.config import DATABASE_URL
@@ -0,0 +1,92 @@
+"""Add indexed chart_hash column to saved_charts
+
+Revision ID: 0001_saved_chart_hash
+Revises:
+Create Date: 2026-10-16 00:00:00.000000
+
+Chart lookups by hash used to LIKE-scan chart_data_json. This adds an
+indexed chart_hash column and backfills existing rows in id-ordered
+batches so memory stays flat on large tables.
+
+Databases are also bootstrapped by init_db() (create_all), so the schema
+changes are skipped when the table or column already exists.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_saved_chart_hash'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_saved_charts_chart_hash'
+BACKFILL_BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'saved_charts' not in inspector.get_table_names():
+        # Fresh database: init_db() will create the table with the column
+        return
+
+    columns = {column['name'] for column in inspector.get_columns('saved_charts')}
+    if 'chart_hash' not in columns:
+        op.add_column('saved_charts', sa.Column('chart_hash', sa.String(length=64), nullable=True))
+
+    indexes = {index['name'] for index in inspector.get_indexes('saved_charts')}
+    if INDEX_NAME not in indexes:
+        op.create_index(INDEX_NAME, 'saved_charts', ['chart_hash'], unique=False)
+
+    backfill_chart_hashes(bind)
+
+
+def backfill_chart_hashes(bind, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Fill chart_hash for rows that have chart data but no hash yet.
+
+    Args:
+        bind: Connection to run against
+        batch_size: Rows read and updated per round trip
+
+    Returns:
+        Number of rows updated
+    """
+    from app.services.chart_service import saved_chart_hash
+
+    select_batch = sa.text(
+        "SELECT id, chart_data_json, unknown_time FROM saved_charts "
+        "WHERE id > :last_id AND chart_hash IS NULL AND chart_data_json IS NOT NULL "
+        "ORDER BY id LIMIT :batch_size"
+    )
+    update_row = sa.text("UPDATE saved_charts SET chart_hash = :chart_hash WHERE id = :id")
+
+    last_id = 0
+    updated = 0
+    while True:
+        rows = bind.execute(select_batch, {"last_id": last_id, "batch_size": batch_size}).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row_id, chart_data_json, unknown_time in rows:
+            chart_hash = saved_chart_hash(chart_data_json, bool(unknown_time))
+            if chart_hash:
+                params.append({"id": row_id, "chart_hash": chart_hash})
+        if params:
+            bind.execute(update_row, params)
+            updated += len(params)
+
+        last_id = rows[-1][0]
+
+    return updated
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('saved_charts') as batch_op:
+        batch_op.drop_index(INDEX_NAME)
+        batch_op.drop_column('chart_hash')
@@ -0,0 +1,57 @@
+"""Add background_jobs table for the durable job queue
+
+Revision ID: 0002_background_jobs
+Revises: 0001_saved_chart_hash
+Create Date: 2026-10-16 00:00:00.000000
+
+Jobs used to live in process memory (JobQueue and the batch service's
+_batch_jobs dict) and were lost on restart. They now live in this table
+and are claimed by workers under a lease.
+
+Databases are also bootstrapped by init_db() (create_all), so the table is
+only created when it does not exist yet.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_background_jobs'
+down_revision: Union[str, None] = '0001_saved_chart_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'background_jobs' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'background_jobs',
+        sa.Column('id', sa.String(length=36), primary_key=True),
+        sa.Column('job_type', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('payload_json', sa.Text(), nullable=False),
+        sa.Column('result_json', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('progress', sa.Float(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(), nullable=False),
+        sa.Column('lease_owner', sa.String(length=100), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_background_jobs_user_id', 'background_jobs', ['user_id'])
+    op.create_index('ix_background_jobs_created_at', 'background_jobs', ['created_at'])
+    op.create_index('ix_background_jobs_claim', 'background_jobs', ['job_type', 'status', 'run_after'])
+
+
+def downgrade() -> None:
+    op.drop_table('background_jobs')
@@ -0,0 +1,71 @@
+"""Add famous_person_placements and famous_person_aspects tables
+
+Revision ID: 0003_famous_person_placements
+Revises: 0002_background_jobs
+Create Date: 2026-10-16 00:00:00.000000
+
+Per-planet signs and top aspects of famous people only lived in
+planetary_placements_json and top_aspects_json, so matching had to load
+every row. These normalized tables, with composite indexes on the matched
+columns, let candidates be prefiltered in SQL. Existing rows are backfilled
+in id-ordered batches.
+
+Databases are also bootstrapped by init_db() (create_all), so tables are
+only created when they do not exist yet.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_famous_person_placements'
+down_revision: Union[str, None] = '0002_background_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+    if 'famous_people' not in tables:
+        # Fresh database: init_db() will create every table
+        return
+
+    if 'famous_person_placements' not in tables:
+        op.create_table(
+            'famous_person_placements',
+            sa.Column('person_id', sa.Integer(), sa.ForeignKey('famous_people.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('system', sa.String(length=10), primary_key=True),
+            sa.Column('body', sa.String(length=50), primary_key=True),
+            sa.Column('sign_code', sa.Integer(), nullable=False),
+            sa.Column('degree', sa.Float(), nullable=True),
+            sa.Column('retro', sa.Boolean(), nullable=False),
+        )
+        op.create_index(
+            'ix_famous_person_placements_match', 'famous_person_placements',
+            ['system', 'body', 'sign_code', 'person_id']
+        )
+
+    if 'famous_person_aspects' not in tables:
+        op.create_table(
+            'famous_person_aspects',
+            sa.Column('person_id', sa.Integer(), sa.ForeignKey('famous_people.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('system', sa.String(length=10), primary_key=True),
+            sa.Column('body1', sa.String(length=50), primary_key=True),
+            sa.Column('body2', sa.String(length=50), primary_key=True),
+            sa.Column('aspect_type', sa.String(length=50), primary_key=True),
+        )
+        op.create_index(
+            'ix_famous_person_aspects_match', 'famous_person_aspects',
+            ['system', 'body1', 'body2', 'aspect_type', 'person_id']
+        )
+
+    from services.famous_people_placements import backfill_famous_person_rows
+    backfill_famous_person_rows(bind)
+
+
+def downgrade() -> None:
+    op.drop_table('famous_person_aspects')
+    op.drop_table('famous_person_placements')
@@ -0,0 +1,55 @@
+"""Add famous_person_neighbors and famous_person_neighbor_sources tables
+
+Revision ID: 0004_famous_person_neighbors
+Revises: 0003_famous_person_placements
+Create Date: 2026-10-16 00:00:00.000000
+
+Precomputed nearest neighbors of every famous person ("celebrity twins"),
+read by the twins endpoint with a single primary key range scan. The graph
+is built offline by scripts/maintenance/build_famous_people_neighbors.py,
+which is too slow to run on deploy, so nothing is backfilled here.
+
+Databases are also bootstrapped by init_db() (create_all), so tables are
+only created when they do not exist yet.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_famous_person_neighbors'
+down_revision: Union[str, None] = '0003_famous_person_placements'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+    if 'famous_people' not in tables:
+        # Fresh database: init_db() will create every table
+        return
+
+    if 'famous_person_neighbors' not in tables:
+        op.create_table(
+            'famous_person_neighbors',
+            sa.Column('person_id', sa.Integer(), sa.ForeignKey('famous_people.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('rank', sa.Integer(), primary_key=True),
+            sa.Column('neighbor_id', sa.Integer(), nullable=False),
+            sa.Column('score', sa.Float(), nullable=False),
+        )
+        op.create_index('ix_famous_person_neighbors_neighbor_id', 'famous_person_neighbors', ['neighbor_id'])
+
+    if 'famous_person_neighbor_sources' not in tables:
+        op.create_table(
+            'famous_person_neighbor_sources',
+            sa.Column('person_id', sa.Integer(), primary_key=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('famous_person_neighbor_sources')
+    op.drop_table('famous_person_neighbors')
@@ -0,0 +1,46 @@
+"""Add keyset pagination indexes to chat_messages and chat_conversations
+
+Revision ID: 0005_chat_history_indexes
+Revises: 0004_famous_person_neighbors
+Create Date: 2026-10-16 00:00:00.000000
+
+Message history and conversation lists are read in (created_at, id) and
+(updated_at, id) keyset pages, and chat prompts read a conversation's last
+N messages (see app.services.chat_history). These composite indexes let
+each of those be a bounded index range scan.
+
+Databases are also bootstrapped by init_db() (create_all), so indexes are
+only created when they do not exist yet.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_chat_history_indexes'
+down_revision: Union[str, None] = '0004_famous_person_neighbors'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_chat_messages_conversation_created', 'chat_messages', ['conversation_id', 'created_at', 'id']),
+    ('ix_chat_conversations_user_updated', 'chat_conversations', ['user_id', 'updated_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            # Fresh database: init_db() will create the table with its indexes
+            continue
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,152 @@
+"""
+Aspect Kernel
+
+Finds every in-orb aspect between two sets of longitudes with NumPy. The
+angular distance between all body pairs is computed once as a broadcasted
+matrix and compared against every aspect in ASPECTS_CONFIG at the same time,
+replacing the per-pair Python loops that natal, tropical, synastry, transit
+and composite aspect calculations used to run.
+
+Inputs may carry leading batch dimensions, e.g. a (charts x bodies) array of
+longitudes, so many charts are scanned in one call.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from natal_chart import ASPECT_LUMINARY_ORBS, ASPECT_SCORES, ASPECTS_CONFIG
+
+ASPECT_NAMES: Tuple[str, ...] = tuple(name for name, _, _ in ASPECTS_CONFIG)
+ASPECT_ANGLES = np.array([angle for _, angle, _ in ASPECTS_CONFIG], dtype=np.float64)
+ASPECT_ORBS = np.array([orb for _, _, orb in ASPECTS_CONFIG], dtype=np.float64)
+ASPECT_LUMINARY_ORB_LIMITS = np.array(
+    [ASPECT_LUMINARY_ORBS.get(name, orb) for name, _, orb in ASPECTS_CONFIG], dtype=np.float64
+)
+ASPECT_WEIGHTS = np.array([ASPECT_SCORES.get(name, 1.0) for name in ASPECT_NAMES], dtype=np.float64)
+
+
+@dataclass
+class AspectHits:
+    """
+    In-orb aspects as parallel columns, one entry per aspect found.
+
+    Entries are ordered by (chart, first body, second body, ASPECTS_CONFIG
+    position), the order the nested loops produced them in.
+
+    Attributes:
+        chart: Index into the leading batch dimensions (flattened); all zeros for 1-D input
+        first: Index of the body in the first longitude vector
+        second: Index of the body in the second longitude vector
+        aspect: Index into ASPECTS_CONFIG / ASPECT_NAMES
+        separation: Angular distance between the two bodies (0-180)
+        orb: Signed distance from exact (separation - aspect angle)
+        orb_limit: Maximum orb that applied to the pair
+        strength: Closeness to exact, 1 - |orb| / orb_limit
+        score: Aspect weight from ASPECT_SCORES
+    """
+    chart: np.ndarray
+    first: np.ndarray
+    second: np.ndarray
+    aspect: np.ndarray
+    separation: np.ndarray
+    orb: np.ndarray
+    orb_limit: np.ndarray
+    strength: np.ndarray
+    score: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.aspect)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(ASPECT_NAMES[i] for i in self.aspect)
+
+    @property
+    def angles(self) -> np.ndarray:
+        return ASPECT_ANGLES[self.aspect]
+
+
+def angular_distance(longitudes1: np.ndarray, longitudes2: np.ndarray) -> np.ndarray:
+    """
+    Shortest arc between every pair of longitudes.
+
+    Args:
+        longitudes1: Array of shape (..., n)
+        longitudes2: Array of shape (..., m)
+
+    Returns:
+        Array of shape (..., n, m) with values in [0, 180]
+    """
+    diff = np.abs(longitudes1[..., :, None] - longitudes2[..., None, :])
+    return np.minimum(diff, 360 - diff)
+
+
+def find_aspects(
+    longitudes1: Sequence[float],
+    longitudes2: Optional[Sequence[float]] = None,
+    luminaries1: Optional[Sequence[bool]] = None,
+    luminaries2: Optional[Sequence[bool]] = None,
+    pair_mask: Optional[np.ndarray] = None,
+) -> AspectHits:
+    """
+    Find all in-orb aspects between two longitude vectors.
+
+    When longitudes2 is omitted the first vector is compared with itself and
+    only pairs i < j are reported (each pair once, no body with itself).
+    NaN longitudes never match.
+
+    Args:
+        longitudes1: Longitudes of shape (n,) or (..., n), e.g. (charts, bodies)
+        longitudes2: Longitudes of shape (m,) or (..., m); broadcast against longitudes1
+        luminaries1: Optional (..., n) flags; pairs involving a flagged body use ASPECT_LUMINARY_ORBS
+        luminaries2: Optional (..., m) flags for the second vector (defaults to luminaries1 when comparing with itself)
+        pair_mask: Optional boolean array broadcastable to (..., n, m); False excludes a pair
+
+    Returns:
+        AspectHits with one row per aspect found
+    """
+    lon1 = np.asarray(longitudes1, dtype=np.float64)
+    same = longitudes2 is None
+    lon2 = lon1 if same else np.asarray(longitudes2, dtype=np.float64)
+    if same and luminaries2 is None:
+        luminaries2 = luminaries1
+
+    separation = angular_distance(lon1, lon2)
+    n, m = separation.shape[-2:]
+
+    # (..., n, m, aspects)
+    orb = separation[..., None] - ASPECT_ANGLES
+    if luminaries1 is None and luminaries2 is None:
+        orb_limit = ASPECT_ORBS
+    else:
+        lum1 = np.zeros(lon1.shape, dtype=bool) if luminaries1 is None else np.asarray(luminaries1, dtype=bool)
+        lum2 = np.zeros(lon2.shape, dtype=bool) if luminaries2 is None else np.asarray(luminaries2, dtype=bool)
+        luminary_pair = lum1[..., :, None] | lum2[..., None, :]
+        orb_limit = np.where(luminary_pair[..., None], ASPECT_LUMINARY_ORB_LIMITS, ASPECT_ORBS)
+
+    keep = np.triu(np.ones((n, m), dtype=bool), k=1) if same else np.ones((n, m), dtype=bool)
+    if pair_mask is not None:
+        keep = keep & np.asarray(pair_mask, dtype=bool)
+    in_orb = (np.abs(orb) <= orb_limit) & keep[..., None]
+
+    # Flatten any batch dimensions; nonzero returns hits in row-major order,
+    # which is the order the nested loops produced them in
+    shape = (int(np.prod(in_orb.shape[:-3])), n, m, len(ASPECT_NAMES))
+    chart, first, second, aspect = np.nonzero(in_orb.reshape(shape))
+    hit_orb = np.broadcast_to(orb, in_orb.shape).reshape(shape)[chart, first, second, aspect]
+    hit_limit = np.broadcast_to(orb_limit, in_orb.shape).reshape(shape)[chart, first, second, aspect]
+    hit_separation = np.broadcast_to(separation, in_orb.shape[:-1]).reshape(shape[:-1])[chart, first, second]
+
+    return AspectHits(
+        chart=chart,
+        first=first,
+        second=second,
+        aspect=aspect,
+        separation=hit_separation,
+        orb=hit_orb,
+        orb_limit=hit_limit,
+        strength=1.0 - np.abs(hit_orb) / hit_limit,
+        score=ASPECT_WEIGHTS[aspect],
+    )
@@ -1,19 +1,24 @@
 """
 Batch processing service for handling multiple chart calculations and readings.
 
-Provides batch operations with progress tracking and result aggregation.
+Batch jobs run on the durable job queue (app.services.job_queue) as job
+types "batch.charts" and "batch.readings", so they survive restarts and
+are picked up by any worker. Progress and partial counts are stored on
+the job and broadcast as batch.job.* events.
 """
 
 import logging
 import asyncio
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-from uuid import uuid4
+
+from app.services.job_queue import Job, JobContext, JobStatus, job_queue
 
 logger = logging.getLogger(__name__)
 
-# In-memory job storage (in production, use database or Redis)
-_batch_jobs: Dict[str, Dict[str, Any]] = {}
+BATCH_JOB_TYPES = {"charts": "batch.charts", "readings": "batch.readings"}
+
+# Report progress at most this often (in items) to keep job-row writes low
+PROGRESS_EVERY_ITEMS = 5
 
 
 class BatchJobStatus(str):
@@ -31,155 +36,189 @@ def create_batch_job(
     user_id: Optional[int] = None
 ) -> str:
     """
-    Create a new batch job.
+    Create and enqueue a new batch job.
     
     Args:
-        job_type: Type of batch job ("charts", "readings", "famous_people")
+        job_type: Type of batch job ("charts", "readings")
         items: List of items to process
         user_id: Optional user ID
         
     Returns:
         Job ID
     """
-    job_id = str(uuid4())
+    if job_type not in BATCH_JOB_TYPES:
+        raise ValueError(f"Unknown job type: {job_type}")
     
-    _batch_jobs[job_id] = {
-        "id": job_id,
-        "type": job_type,
-        "user_id": user_id,
-        "status": BatchJobStatus.PENDING,
-        "total_items": len(items),
-        "processed_items": 0,
-        "successful_items": 0,
-        "failed_items": 0,
-        "items": items,
-        "results": [],
-        "errors": [],
-        "created_at": datetime.now(),
-        "started_at": None,
-        "completed_at": None,
-        "progress_percent": 0.0
-    }
+    job = job_queue.create_job(BATCH_JOB_TYPES[job_type], {"items": items}, user_id=user_id)
+    
+    logger.info(f"Batch job created: {job.id} ({job_type}, {len(items)} items)")
+    return job.id
+
+
+class _BatchProgress:
+    """Per-item counters for one batch run, reported through the job context."""
+    
+    def __init__(self, total_items: int, context: Optional[JobContext]):
+        self.total_items = total_items
+        self.context = context
+        self.processed_items = 0
+        self.successful_items = 0
+        self.failed_items = 0
+        self._last_reported = 0
+    
+    def record(self, success: bool):
+        self.processed_items += 1
+        if success:
+            self.successful_items += 1
+        else:
+            self.failed_items += 1
+    
+    def counts(self) -> Dict[str, Any]:
+        return {
+            "total_items": self.total_items,
+            "processed_items": self.processed_items,
+            "successful_items": self.successful_items,
+            "failed_items": self.failed_items
+        }
+    
+    @property
+    def percent(self) -> float:
+        return (self.processed_items / self.total_items) * 100 if self.total_items else 100.0
+    
+    async def report(self, force: bool = False):
+        if self.context is None:
+            return
+        if not force and self.processed_items - self._last_reported < PROGRESS_EVERY_ITEMS:
+            return
+        self._last_reported = self.processed_items
+        counts = self.counts()
+        await self.context.report_progress(self.percent, partial_result=counts, **counts)
+    
+    def final_result(self, results: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # Determine final status
+        if self.failed_items == 0:
+            status = BatchJobStatus.COMPLETED
+        elif self.successful_items == 0:
+            status = BatchJobStatus.FAILED
+        else:
+            status = BatchJobStatus.PARTIAL
+        return {**self.counts(), "status": status, "results": results, "errors": errors}
+
+
+async def _resolve_chart_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Geocode a batch chart item and convert its local birth time to UTC.
+    
+    Args:
+        item: Chart calculation request
+        
+    Returns:
+        Dictionary with UTC date/time fields and coordinates
+    """
+    import pendulum
+    from app.services.geocoding_service import geocode_location
     
-    logger.info(f"Batch job created: {job_id} ({job_type}, {len(items)} items)")
-    return job_id
+    geo = await geocode_location(item['location'])
+    if geo is None:
+        raise ValueError(f"Could not geocode location: {item.get('location')}")
+    
+    local_time = pendulum.datetime(
+        item['year'], item['month'], item['day'], 
+        item['hour'], item['minute'], tz=geo.timezone or "UTC"
+    )
+    utc_time = local_time.in_timezone('UTC')
+    
+    return {
+        "year": utc_time.year, "month": utc_time.month, "day": utc_time.day,
+        "hour": utc_time.hour, "minute": utc_time.minute,
+        "latitude": geo.latitude, "longitude": geo.longitude
+    }
 
 
 async def process_batch_charts(
-    job_id: str,
-    items: List[Dict[str, Any]]
+    payload: Dict[str, Any],
+    context: Optional[JobContext] = None
 ) -> Dict[str, Any]:
     """
-    Process batch chart calculations.
+    Process batch chart calculations ("batch.charts" job handler).
+    
+    Items are geocoded concurrently, then the ephemeris for every resolved
+    item is computed in one sharded call to the ephemeris worker pool and
+    each chart is built from its precomputed row.
     
     Args:
-        job_id: Job ID
-        items: List of chart calculation requests
+        payload: Job payload with "items", a list of chart calculation requests
+        context: Job context for progress reporting (None when called directly)
         
     Returns:
-        Job result dictionary
+        Batch result with item counts, status, results and errors
     """
-    job = _batch_jobs.get(job_id)
-    if not job:
-        raise ValueError(f"Job not found: {job_id}")
-    
-    job["status"] = BatchJobStatus.PROCESSING
-    job["started_at"] = datetime.now()
+    from natal_chart import NatalChart, calculate_numerology, get_chinese_zodiac_and_element
+    from app.services.ephemeris_batch import make_births
+    from app.services.ephemeris_pool import compute_charts_async
     
+    items = payload["items"]
+    progress = _BatchProgress(len(items), context)
     results = []
     errors = []
     
-    for i, item in enumerate(items):
+    def record_failure(i: int, item: Dict[str, Any], e: Exception) -> None:
+        logger.error(f"Batch chart calculation failed for item {i}: {e}")
+        errors.append({
+            "index": i,
+            "item": item,
+            "error": str(e),
+            "success": False
+        })
+        progress.record(False)
+    
+    # Resolve locations and UTC times first (concurrently; repeated locations share one lookup)
+    resolved = []
+    outcomes = await asyncio.gather(*(_resolve_chart_item(item) for item in items), return_exceptions=True)
+    for i, (item, outcome) in enumerate(zip(items, outcomes)):
+        if isinstance(outcome, Exception):
+            record_failure(i, item, outcome)
+        else:
+            resolved.append((i, item, outcome))
+    await progress.report()
+    
+    # One ephemeris pass for every resolved item, spread over the worker pool
+    ephemeris = None
+    if resolved:
         try:
-            # Import chart calculation logic
-            from app.api.v1.charts import calculate_chart_endpoint
-            from fastapi import Request
-            from app.core.responses import success_response
-            
-            # Create a mock request for the endpoint
-            # Note: In production, extract chart calculation logic to a service function
-            # For now, we'll process items directly using the chart calculation logic
-            import swisseph as swe
-            import pendulum
-            from natal_chart import NatalChart, calculate_numerology, get_chinese_zodiac_and_element
-            from app.services.chart_service import generate_chart_hash
-            import requests
-            import os
-            from app.config import OPENCAGE_KEY, SWEP_PATH, DEFAULT_SWISS_EPHEMERIS_PATH
-            
-            # Simplified chart calculation for batch processing
-            # Geocoding
-            lat, lng, timezone_name = None, None, None
-            if OPENCAGE_KEY:
-                try:
-                    geo_url = f"https://api.opencagedata.com/geocode/v1/json?q={item['location']}&key={OPENCAGE_KEY}"
-                    response = requests.get(geo_url, timeout=10)
-                    if response.status_code != 402:
-                        response.raise_for_status()
-                        geo_res = response.json()
-                        if geo_res.get("results"):
-                            result = geo_res["results"][0]
-                            lat = result["geometry"]["lat"]
-                            lng = result["geometry"]["lng"]
-                            timezone_name = result.get("annotations", {}).get("timezone", {}).get("name")
-                except:
-                    pass
-            
-            if not lat or not lng:
-                try:
-                    nominatim_url = "https://nominatim.openstreetmap.org/search"
-                    response = requests.get(nominatim_url, params={"q": item['location'], "format": "json", "limit": 1}, 
-                                           headers={"User-Agent": "SynthesisAstrology/1.0"}, timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    if data:
-                        lat = float(data[0]["lat"])
-                        lng = float(data[0]["lon"])
-                        timezone_name = timezone_name or "UTC"
-                except:
-                    timezone_name = "UTC"
-            
-            if not timezone_name:
-                timezone_name = "UTC"
-            
-            # Calculate chart
-            local_time = pendulum.datetime(
-                item['year'], item['month'], item['day'], 
-                item['hour'], item['minute'], tz=timezone_name
-            )
-            utc_time = local_time.in_timezone('UTC')
-            
-            # Try SWEP_PATH first (if set), then DEFAULT_SWISS_EPHEMERIS_PATH, then BASE_DIR/swiss_ephemeris, then BASE_DIR
-            ephe_path = None
-            if SWEP_PATH and os.path.exists(SWEP_PATH):
-                ephe_path = SWEP_PATH
-            elif DEFAULT_SWISS_EPHEMERIS_PATH and os.path.exists(DEFAULT_SWISS_EPHEMERIS_PATH):
-                ephe_path = DEFAULT_SWISS_EPHEMERIS_PATH
-            else:
-                # Try relative to BASE_DIR
-                from app.config import BASE_DIR
-                swiss_ephe_dir = BASE_DIR / "swiss_ephemeris"
-                if swiss_ephe_dir.exists():
-                    ephe_path = str(swiss_ephe_dir)
-                else:
-                    # Final fallback to BASE_DIR (ephemeris files might be in root)
-                    ephe_path = str(BASE_DIR)
-            
-            swe.set_ephe_path(ephe_path)
-            
+            ephemeris = await compute_charts_async(make_births(
+                (r["year"], r["month"], r["day"], r["hour"], r["minute"], r["latitude"], r["longitude"])
+                for _, _, r in resolved
+            ))
+        except Exception as e:
+            for i, item, _ in resolved:
+                record_failure(i, item, e)
+            resolved = []
+    
+    for row, (i, item, utc) in enumerate(resolved):
+        try:
+            unknown_time = item.get('unknown_time', False)
             chart = NatalChart(
                 name=item.get('full_name', 'Unknown'),
-                year=utc_time.year, month=utc_time.month, day=utc_time.day,
-                hour=utc_time.hour, minute=utc_time.minute,
-                latitude=lat, longitude=lng
+                year=utc["year"], month=utc["month"], day=utc["day"],
+                hour=utc["hour"], minute=utc["minute"],
+                latitude=utc["latitude"], longitude=utc["longitude"]
             )
-            chart.calculate_chart(unknown_time=item.get('unknown_time', False))
+            chart.calculate_chart(unknown_time=unknown_time, ephemeris=ephemeris[row])
+            
+            numerology_raw = calculate_numerology(item['day'], item['month'], item['year'])
+            numerology = {
+                "life_path_number": numerology_raw.get("life_path", "N/A"),
+                "day_number": numerology_raw.get("day_number", "N/A"),
+                "lucky_number": numerology_raw.get("lucky_number", "N/A")
+            }
+            chinese_zodiac = get_chinese_zodiac_and_element(item['year'], item['month'], item['day'])
             
             # Build result
             result = {
-                "chart_data": chart.to_dict(),
-                "numerology": calculate_numerology(item['day'], item['month'], item['year']),
-                "chinese_zodiac": get_chinese_zodiac_and_element(item['year'])
+                "chart_data": chart.get_full_chart_data(numerology, None, chinese_zodiac, unknown_time),
+                "numerology": numerology_raw,
+                "chinese_zodiac": chinese_zodiac
             }
             
             results.append({
@@ -188,71 +227,43 @@ async def process_batch_charts(
                 "result": result,
                 "success": True
             })
-            job["successful_items"] += 1
+            progress.record(True)
             
         except Exception as e:
-            logger.error(f"Batch chart calculation failed for item {i}: {e}")
-            errors.append({
-                "index": i,
-                "item": item,
-                "error": str(e),
-                "success": False
-            })
-            job["failed_items"] += 1
-        
-        job["processed_items"] += 1
-        job["progress_percent"] = (job["processed_items"] / job["total_items"]) * 100
-    
-    job["results"] = results
-    job["errors"] = errors
-    job["completed_at"] = datetime.now()
-    
-    # Determine final status
-    if job["failed_items"] == 0:
-        job["status"] = BatchJobStatus.COMPLETED
-    elif job["successful_items"] == 0:
-        job["status"] = BatchJobStatus.FAILED
-    else:
-        job["status"] = BatchJobStatus.PARTIAL
+            record_failure(i, item, e)
+        await progress.report()
     
+    batch_result = progress.final_result(sorted(results, key=lambda r: r["index"]), sorted(errors, key=lambda e: e["index"]))
     logger.info(
-        f"Batch job completed: {job_id} "
-        f"({job['successful_items']} successful, {job['failed_items']} failed)"
+        f"Batch chart job completed: {context.job_id if context else 'direct'} "
+        f"({progress.successful_items} successful, {progress.failed_items} failed)"
     )
-    
-    return job
+    return batch_result
 
 
 async def process_batch_readings(
-    job_id: str,
-    items: List[Dict[str, Any]]
+    payload: Dict[str, Any],
+    context: Optional[JobContext] = None
 ) -> Dict[str, Any]:
     """
-    Process batch reading generation.
+    Process batch reading generation ("batch.readings" job handler).
     
     Args:
-        job_id: Job ID
-        items: List of reading generation requests
+        payload: Job payload with "items", a list of reading generation requests
+        context: Job context for progress reporting (None when called directly)
         
     Returns:
-        Job result dictionary
+        Batch result with item counts, status, results and errors
     """
-    job = _batch_jobs.get(job_id)
-    if not job:
-        raise ValueError(f"Job not found: {job_id}")
-    
-    job["status"] = BatchJobStatus.PROCESSING
-    job["started_at"] = datetime.now()
+    from app.core.cache import get_reading_from_cache, set_reading_in_cache
     
+    items = payload["items"]
+    progress = _BatchProgress(len(items), context)
     results = []
     errors = []
     
     for i, item in enumerate(items):
         try:
-            # Import reading generation
-            from app.services.llm_prompts import generate_snapshot_reading
-            from app.core.cache import get_reading_from_cache, set_reading_in_cache
-            
             chart_hash = item.get('chart_hash')
             chart_name = item.get('chart_name', 'Unknown')
             
@@ -279,7 +290,7 @@ async def process_batch_readings(
                 "result": result,
                 "success": True
             })
-            job["successful_items"] += 1
+            progress.record(True)
             
         except Exception as e:
             logger.error(f"Batch reading generation failed for item {i}: {e}")
@@ -289,29 +300,59 @@ async def process_batch_readings(
                 "error": str(e),
                 "success": False
             })
-            job["failed_items"] += 1
+            progress.record(False)
         
-        job["processed_items"] += 1
-        job["progress_percent"] = (job["processed_items"] / job["total_items"]) * 100
+        await progress.report()
     
-    job["results"] = results
-    job["errors"] = errors
-    job["completed_at"] = datetime.now()
+    batch_result = progress.final_result(results, errors)
+    logger.info(
+        f"Batch reading job completed: {context.job_id if context else 'direct'} "
+        f"({progress.successful_items} successful, {progress.failed_items} failed)"
+    )
+    return batch_result
+
+
+job_queue.register_handler(BATCH_JOB_TYPES["charts"], process_batch_charts, concurrency=2)
+job_queue.register_handler(BATCH_JOB_TYPES["readings"], process_batch_readings, concurrency=2)
+
+
+def _batch_view(job: Job) -> Dict[str, Any]:
+    """Present a queue job in the batch API's job shape."""
+    items = job.payload.get("items", [])
+    state = job.result or {}
     
-    # Determine final status
-    if job["failed_items"] == 0:
-        job["status"] = BatchJobStatus.COMPLETED
-    elif job["successful_items"] == 0:
-        job["status"] = BatchJobStatus.FAILED
+    if job.status == JobStatus.PENDING:
+        status = BatchJobStatus.PENDING
+    elif job.status == JobStatus.RUNNING:
+        status = BatchJobStatus.PROCESSING
+    elif job.status == JobStatus.COMPLETED:
+        status = state.get("status", BatchJobStatus.COMPLETED)
     else:
-        job["status"] = BatchJobStatus.PARTIAL
+        # Failed or cancelled before finishing
+        status = BatchJobStatus.FAILED
     
-    logger.info(
-        f"Batch job completed: {job_id} "
-        f"({job['successful_items']} successful, {job['failed_items']} failed)"
-    )
+    errors = state.get("errors", [])
+    if job.status in (JobStatus.FAILED, JobStatus.CANCELLED) and job.error and not errors:
+        errors = [{"error": job.error, "success": False}]
     
-    return job
+    return {
+        "id": job.id,
+        "type": job.job_type.split(".", 1)[-1],
+        "user_id": job.user_id,
+        "status": status,
+        "total_items": len(items),
+        "processed_items": state.get("processed_items", 0),
+        "successful_items": state.get("successful_items", 0),
+        "failed_items": state.get("failed_items", 0),
+        "items": items,
+        "results": state.get("results", []),
+        "errors": errors,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "completed_at": job.completed_at,
+        "progress_percent": job.progress,
+        "attempts": job.attempts
+    }
 
 
 def get_batch_job(job_id: str) -> Optional[Dict[str, Any]]:
@@ -324,7 +365,10 @@ def get_batch_job(job_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Job dictionary or None
     """
-    return _batch_jobs.get(job_id)
+    job = job_queue.get_job(job_id)
+    if job is None or job.job_type not in BATCH_JOB_TYPES.values():
+        return None
+    return _batch_view(job)
 
 
 def list_batch_jobs(
@@ -341,44 +385,15 @@ def list_batch_jobs(
         limit: Maximum number of jobs to return
         
     Returns:
-        List of job dictionaries
+        List of job dictionaries, newest first
     """
-    jobs = list(_batch_jobs.values())
-    
-    # Filter by user_id
-    if user_id:
-        jobs = [j for j in jobs if j.get("user_id") == user_id]
-    
-    # Filter by status
+    # Batch statuses (e.g. partial) are derived from the result, so filter after mapping
+    jobs = job_queue.list_jobs(
+        user_id=user_id,
+        job_types=list(BATCH_JOB_TYPES.values()),
+        limit=limit if not status else max(limit * 5, 250)
+    )
+    views = [_batch_view(job) for job in jobs]
     if status:
-        jobs = [j for j in jobs if j.get("status") == status]
-    
-    # Sort by created_at (newest first)
-    jobs.sort(key=lambda x: x.get("created_at", datetime.min), reverse=True)
-    
-    # Limit results
-    return jobs[:limit]
-
-
-async def start_batch_job(job_id: str) -> None:
-    """
-    Start processing a batch job asynchronously.
-    
-    Args:
-        job_id: Job ID
-    """
-    job = _batch_jobs.get(job_id)
-    if not job:
-        raise ValueError(f"Job not found: {job_id}")
-    
-    if job["status"] != BatchJobStatus.PENDING:
-        raise ValueError(f"Job {job_id} is not in pending status")
-    
-    # Start processing in background
-    if job["type"] == "charts":
-        asyncio.create_task(process_batch_charts(job_id, job["items"]))
-    elif job["type"] == "readings":
-        asyncio.create_task(process_batch_readings(job_id, job["items"]))
-    else:
-        raise ValueError(f"Unknown job type: {job['type']}")
-
+        views = [v for v in views if v["status"] == status]
+    return views[:limit]
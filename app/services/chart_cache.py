@@ -0,0 +1,338 @@
+"""
+Chart Cache
+
+Memoizes natal chart computation by canonical birth input:
+(UTC datetime, latitude/longitude rounded to 4 places, unknown_time,
+engine version). The person's name, numerology and Chinese zodiac are not
+part of the key; they are applied to the cached result on the way out.
+
+- L1: in-process LRU of live NatalChart objects plus their chart data
+- L2: Redis via app.core.advanced_cache, storing the raw ephemeris (so a
+  NatalChart can be rehydrated without Swiss Ephemeris) and the serialized
+  get_full_chart_data output
+
+The full chart data is only built the first time a caller asks for all of
+it; requests for a subset of sections are served from the live chart, whose
+sections are computed on demand.
+
+Hits and misses are reported to app.core.cache_analytics under "chart:".
+"""
+
+import copy
+import logging
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from natal_chart import CHART_DATA_SECTIONS, NatalChart
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever chart calculation output changes so stale entries are ignored
+CHART_ENGINE_VERSION = "1"
+COORDINATE_PRECISION = 4  # ~11 m
+CHART_CACHE_L1_MAX_SIZE = 512
+
+
+@dataclass
+class ChartCacheEntry:
+    """A computed chart and its serialized data (personal fields neutral; None until first needed)."""
+    chart: NatalChart
+    chart_data: Optional[Dict[str, Any]]
+    ephemeris: Dict[str, Any]
+    key: str = ""
+
+
+_l1_cache: "OrderedDict[str, ChartCacheEntry]" = OrderedDict()
+_l1_lock = threading.Lock()
+_stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+
+
+def chart_cache_key(
+    year: int, month: int, day: int, hour: int, minute: int,
+    latitude: float, longitude: float, unknown_time: bool
+) -> str:
+    """
+    Build the canonical cache key for a birth.
+
+    Args:
+        year, month, day, hour, minute: Birth date and time in UTC
+        latitude, longitude: Birth coordinates
+        unknown_time: Whether the birth time is unknown
+
+    Returns:
+        Cache key string
+    """
+    lat, lng = _round_coordinates(latitude, longitude)
+    return (
+        f"chart:v{CHART_ENGINE_VERSION}:"
+        f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:"
+        f"{lat:.{COORDINATE_PRECISION}f}:{lng:.{COORDINATE_PRECISION}f}:{int(bool(unknown_time))}"
+    )
+
+
+def _round_coordinates(latitude: float, longitude: float) -> Tuple[float, float]:
+    # + 0.0 turns -0.0 into 0.0 so both hemispheres share a key at the equator
+    return round(latitude, COORDINATE_PRECISION) + 0.0, round(longitude, COORDINATE_PRECISION) + 0.0
+
+
+def _track(key: str, source: Optional[str]) -> None:
+    """Report a hit (source "l1"/"l2") or a miss (source None) to cache analytics."""
+    try:
+        from app.core.cache_analytics import track_cache_hit, track_cache_miss
+        if source:
+            track_cache_hit(key, source=source)
+        else:
+            track_cache_miss(key)
+    except ImportError:
+        pass
+
+
+def _neutral_chart_data(chart: NatalChart, unknown_time: bool, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Chart data (all sections by default) with the person-specific fields left blank."""
+    return chart.get_full_chart_data({}, None, {}, unknown_time, sections=sections)
+
+
+def _personalize(
+    chart_data: Dict[str, Any],
+    name: str,
+    numerology: Dict[str, Any],
+    name_numerology: Optional[Dict[str, Any]],
+    chinese_zodiac: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Apply person-specific fields present in chart_data, formatted exactly as get_full_chart_data does."""
+    data = dict(chart_data)
+    if "name" in data:
+        data["name"] = name
+    if "chinese_zodiac" in data:
+        data["chinese_zodiac"] = f"{chinese_zodiac.get('element', '')} {chinese_zodiac.get('animal', '')}"
+    if "numerology_analysis" in data:
+        data["numerology_analysis"] = {
+            "life_path_number": numerology.get("life_path_number", "N/A"),
+            "day_number": numerology.get("day_number", "N/A"),
+            "lucky_number": numerology.get("lucky_number", "N/A"),
+            "name_numerology": name_numerology
+        }
+    return data
+
+
+def _ephemeris_to_dict(row) -> Dict[str, Any]:
+    """Serialize a batch ephemeris row to the subset NatalChart reads (JSON-safe)."""
+    return {
+        "valid": bool(row["valid"]),
+        "tropical_asc": float(row["tropical_asc"]),
+        "mc": float(row["mc"]),
+        "tropical_lon": [None if math.isnan(v) else float(v) for v in row["tropical_lon"].tolist()],
+        "speed": [None if math.isnan(v) else float(v) for v in row["speed"].tolist()],
+    }
+
+
+def _ephemeris_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of _ephemeris_to_dict: restore NaN for bodies that failed."""
+    nan = float("nan")
+    return {
+        "valid": data["valid"],
+        "tropical_asc": nan if data["tropical_asc"] is None else data["tropical_asc"],
+        "mc": nan if data["mc"] is None else data["mc"],
+        "tropical_lon": [nan if v is None else v for v in data["tropical_lon"]],
+        "speed": [nan if v is None else v for v in data["speed"]],
+    }
+
+
+def _compute_entry(
+    year: int, month: int, day: int, hour: int, minute: int,
+    latitude: float, longitude: float, unknown_time: bool
+) -> ChartCacheEntry:
+    from app.services.ephemeris_batch import make_births
+    from app.services.ephemeris_pool import compute_charts
+
+    row = compute_charts(make_births([(year, month, day, hour, minute, latitude, longitude)]))[0]
+    ephemeris = _ephemeris_to_dict(row)
+    chart = NatalChart("", year, month, day, hour, minute, latitude, longitude)
+    chart.calculate_chart(unknown_time=unknown_time, ephemeris=_ephemeris_from_dict(ephemeris))
+    return ChartCacheEntry(chart, None, ephemeris)
+
+
+def _rehydrate_entry(
+    payload: Dict[str, Any],
+    year: int, month: int, day: int, hour: int, minute: int,
+    latitude: float, longitude: float, unknown_time: bool
+) -> ChartCacheEntry:
+    chart = NatalChart("", year, month, day, hour, minute, latitude, longitude)
+    chart.calculate_chart(unknown_time=unknown_time, ephemeris=_ephemeris_from_dict(payload["ephemeris"]))
+    return ChartCacheEntry(chart, payload.get("chart_data"), payload["ephemeris"])
+
+
+def _store_l1(key: str, entry: ChartCacheEntry) -> None:
+    with _l1_lock:
+        _l1_cache[key] = entry
+        _l1_cache.move_to_end(key)
+        while len(_l1_cache) > CHART_CACHE_L1_MAX_SIZE:
+            _l1_cache.popitem(last=False)
+
+
+def get_chart_entry(
+    year: int, month: int, day: int, hour: int, minute: int,
+    latitude: float, longitude: float, unknown_time: bool = False
+) -> ChartCacheEntry:
+    """
+    Get the cached chart for a birth, computing it on a miss.
+
+    Args:
+        year, month, day, hour, minute: Birth date and time in UTC
+        latitude, longitude: Birth coordinates (rounded for the key and the calculation)
+        unknown_time: Whether the birth time is unknown
+
+    Returns:
+        ChartCacheEntry (shared; do not mutate)
+    """
+    latitude, longitude = _round_coordinates(latitude, longitude)
+    key = chart_cache_key(year, month, day, hour, minute, latitude, longitude, unknown_time)
+
+    with _l1_lock:
+        entry = _l1_cache.get(key)
+        if entry is not None:
+            _l1_cache.move_to_end(key)
+    if entry is not None:
+        _stats["l1_hits"] += 1
+        _track(key, "l1")
+        return entry
+
+    from app.core.advanced_cache import get_from_l2_cache, set_in_l2_cache
+
+    payload = get_from_l2_cache(key)
+    if payload is not None:
+        try:
+            entry = _rehydrate_entry(payload, year, month, day, hour, minute, latitude, longitude, unknown_time)
+            entry.key = key
+            _stats["l2_hits"] += 1
+            _track(key, "l2")
+            _store_l1(key, entry)
+            return entry
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Discarding unreadable chart cache entry {key}: {e}")
+
+    _stats["misses"] += 1
+    _track(key, None)
+    entry = _compute_entry(year, month, day, hour, minute, latitude, longitude, unknown_time)
+    entry.key = key
+    _store_l1(key, entry)
+    set_in_l2_cache(key, {"ephemeris": entry.ephemeris, "chart_data": entry.chart_data})
+    try:
+        from app.core.cache_analytics import track_cache_set
+        track_cache_set(key)
+    except ImportError:
+        pass
+    return entry
+
+
+def _full_chart_data(entry: ChartCacheEntry, unknown_time: bool) -> Dict[str, Any]:
+    """The entry's full neutral chart data, built and written through to L2 on first use."""
+    if entry.chart_data is None:
+        # Concurrent first requests may both build it; the results are identical
+        entry.chart_data = _neutral_chart_data(entry.chart, unknown_time)
+        from app.core.advanced_cache import set_in_l2_cache
+        set_in_l2_cache(entry.key, {"ephemeris": entry.ephemeris, "chart_data": entry.chart_data})
+    return entry.chart_data
+
+
+def get_cached_chart(
+    name: str,
+    year: int, month: int, day: int, hour: int, minute: int,
+    latitude: float, longitude: float, unknown_time: bool = False
+) -> NatalChart:
+    """
+    Get a calculated NatalChart for a birth, from cache when possible.
+
+    Returns a shallow copy carrying the given name; the calculated bodies,
+    aspects and patterns are shared with the cache and must not be mutated.
+
+    Args:
+        name: Person's name
+        year, month, day, hour, minute: Birth date and time in UTC
+        latitude, longitude: Birth coordinates
+        unknown_time: Whether the birth time is unknown
+
+    Returns:
+        Calculated NatalChart
+    """
+    entry = get_chart_entry(year, month, day, hour, minute, latitude, longitude, unknown_time)
+    chart = copy.copy(entry.chart)
+    chart.name = name
+    return chart
+
+
+def get_cached_chart_data(
+    name: str,
+    year: int, month: int, day: int, hour: int, minute: int,
+    latitude: float, longitude: float, unknown_time: bool,
+    numerology: Dict[str, Any],
+    name_numerology: Optional[Dict[str, Any]],
+    chinese_zodiac: Dict[str, Any],
+    sections: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    Get get_full_chart_data output for a birth, from cache when possible.
+
+    With sections, only those sections are returned, and on a cold entry only
+    the chart work they need is done (see NatalChart.get_full_chart_data).
+
+    Args:
+        name: Person's name
+        year, month, day, hour, minute: Birth date and time in UTC
+        latitude, longitude: Birth coordinates
+        unknown_time: Whether the birth time is unknown
+        numerology: Numerology dict as passed to get_full_chart_data
+        name_numerology: Optional name numerology
+        chinese_zodiac: Chinese zodiac dict ({"animal", "element"})
+        sections: Keys of natal_chart.CHART_DATA_SECTIONS to return; None for all
+
+    Returns:
+        Chart data dictionary (a fresh copy the caller may modify)
+
+    Raises:
+        ValueError: If sections names an unknown section
+    """
+    entry = get_chart_entry(year, month, day, hour, minute, latitude, longitude, unknown_time)
+    if sections is None:
+        chart_data = _full_chart_data(entry, unknown_time)
+    elif entry.chart_data is not None:
+        chart_data = _select_sections(entry.chart_data, sections)
+    else:
+        chart_data = _neutral_chart_data(entry.chart, unknown_time, sections)
+    return copy.deepcopy(_personalize(chart_data, name, numerology, name_numerology, chinese_zodiac))
+
+
+def _select_sections(chart_data: Dict[str, Any], sections: Iterable[str]) -> Dict[str, Any]:
+    """Select sections from full chart data, validated and ordered as get_full_chart_data would."""
+    requested = set(sections)
+    unknown = requested.difference(CHART_DATA_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown chart sections: {', '.join(sorted(unknown))}")
+    return {key: chart_data[key] for key in CHART_DATA_SECTIONS if key in requested}
+
+
+def clear_chart_cache() -> None:
+    """Drop all L1 entries (L2 entries expire on their own or with an engine version bump)."""
+    with _l1_lock:
+        _l1_cache.clear()
+
+
+def get_chart_cache_stats() -> Dict[str, Any]:
+    """
+    Get chart cache statistics.
+
+    Returns:
+        Dictionary with L1 size and hit/miss counters
+    """
+    total = _stats["l1_hits"] + _stats["l2_hits"] + _stats["misses"]
+    hits = _stats["l1_hits"] + _stats["l2_hits"]
+    return {
+        **_stats,
+        "l1_size": len(_l1_cache),
+        "l1_max_size": CHART_CACHE_L1_MAX_SIZE,
+        "hit_rate_percent": round(hits / total * 100, 2) if total else 0.0,
+        "engine_version": CHART_ENGINE_VERSION
+    }
@@ -6,7 +6,8 @@ NOTE: Actual chart calculations are in natal_chart.py and MUST NOT be modified.
 
 This service only contains:
 - Chart formatting functions (get_full_text_report, format_full_report_for_email)
-- Chart utility functions (generate_chart_hash, get_quick_highlights)
+- Chart utility functions (generate_chart_hash, saved_chart_hash, get_quick_highlights)
+- Response field selection (CHART_FIELD_PROFILES, resolve_chart_fields, chart_sections_for_fields)
 - Chart parsing functions (parse_pasted_chart_data)
 
 CRITICAL: Do NOT include any calculation logic here. All calculations are in natal_chart.py.
@@ -15,9 +16,11 @@ CRITICAL: Do NOT include any calculation logic here. All calculations are in nat
 import json
 import hashlib
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set
 
 from app.core.logging_config import get_logger
+from app.utils.field_selection import parse_fields_param
+from natal_chart import CHART_DATA_SECTIONS
 
 logger = get_logger(__name__)
 
@@ -40,6 +43,36 @@ def generate_chart_hash(chart_data: Dict, unknown_time: bool) -> str:
     return hashlib.sha256(key_string.encode()).hexdigest()[:16]  # Use first 16 chars
 
 
+def saved_chart_hash(chart_data_json: Optional[str], unknown_time: bool) -> Optional[str]:
+    """
+    Derive the chart_hash for a SavedChart row from its stored JSON.
+
+    Uses the chart_hash stored with the chart data when present, otherwise
+    recomputes it with generate_chart_hash.
+
+    Args:
+        chart_data_json: SavedChart.chart_data_json
+        unknown_time: SavedChart.unknown_time
+
+    Returns:
+        Chart hash, or None if the JSON is missing or has no positions
+    """
+    if not chart_data_json:
+        return None
+    try:
+        chart_data = json.loads(chart_data_json)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(chart_data, dict):
+        return None
+    stored_hash = chart_data.get('chart_hash')
+    if isinstance(stored_hash, str) and stored_hash:
+        return stored_hash
+    if not chart_data.get('sidereal_major_positions'):
+        return None
+    return generate_chart_hash(chart_data, unknown_time)
+
+
 def get_full_text_report(res: dict) -> str:
     """Format chart data as a full text report."""
     out = f"=== SIDEREAL CHART: {res.get('name', 'N/A')} ===\n"
@@ -345,6 +378,78 @@ def get_quick_highlights(chart_data: dict, unknown_time: bool) -> str:
     return f"{intro}\n{body}"
 
 
+# Fields /calculate_chart adds to get_full_chart_data output, with the chart sections each is built from
+CHART_RESPONSE_FIELDS = {
+    "quick_highlights": (
+        "sidereal_major_positions", "tropical_major_positions", "sidereal_additional_points", "tropical_additional_points",
+        "sidereal_chart_analysis", "tropical_chart_analysis", "numerology_analysis", "sidereal_aspects"
+    ),
+    "chart_hash": ("sidereal_major_positions", "sidereal_aspects"),
+    # The snapshot prompt is serialized from the whole chart
+    "snapshot_reading": CHART_DATA_SECTIONS,
+    "saved_chart_id": (),
+    "full_reading_queued": (),
+}
+
+# Named field sets for the `profile` parameter; None means every field
+CHART_FIELD_PROFILES: Dict[str, Optional[frozenset]] = {
+    "full": None,
+    # Sidereal wheel, placements and aspects plus the hash needed to fetch readings
+    "lightweight": frozenset({
+        "name", "utc_datetime", "location", "day_night_status", "chinese_zodiac", "numerology_analysis", "unknown_time",
+        "true_sidereal_signs", "sidereal_house_cusps", "sidereal_major_positions", "sidereal_retrogrades", "sidereal_aspects",
+        "chart_hash", "saved_chart_id"
+    }),
+}
+
+
+def resolve_chart_fields(fields_param: Optional[str], profile: Optional[str] = None) -> Optional[Set[str]]:
+    """
+    Resolve the `fields` and `profile` parameters of a chart request.
+
+    Args:
+        fields_param: Comma-separated response fields; takes precedence over profile
+        profile: Name of a CHART_FIELD_PROFILES entry
+
+    Returns:
+        Set of response fields, or None for every field
+
+    Raises:
+        ValueError: If a field or the profile is unknown
+    """
+    fields = parse_fields_param(fields_param)
+    if not fields:
+        if profile is None:
+            return None
+        if profile not in CHART_FIELD_PROFILES:
+            raise ValueError(f"Unknown profile '{profile}'. Available: {', '.join(CHART_FIELD_PROFILES)}")
+        profile_fields = CHART_FIELD_PROFILES[profile]
+        return set(profile_fields) if profile_fields is not None else None
+    unknown = fields.difference(CHART_DATA_SECTIONS, CHART_RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def chart_sections_for_fields(fields: Optional[Set[str]]) -> Optional[List[str]]:
+    """
+    Chart sections to compute for a set of response fields.
+
+    Args:
+        fields: Response fields from resolve_chart_fields (None for every field)
+
+    Returns:
+        Keys of CHART_DATA_SECTIONS, including those the requested extra fields
+        are built from, or None for every section
+    """
+    if fields is None:
+        return None
+    needed = set(fields.intersection(CHART_DATA_SECTIONS))
+    for field in fields.intersection(CHART_RESPONSE_FIELDS):
+        needed.update(CHART_RESPONSE_FIELDS[field])
+    return [key for key in CHART_DATA_SECTIONS if key in needed]
+
+
 def parse_pasted_chart_data(pasted_text: str) -> Dict[str, Any]:
     """
     Parse pasted chart data and full reading text.
@@ -0,0 +1,133 @@
+"""
+Chat Context Cache
+
+Prebuilt prompt context for chart chat, kept per conversation so a chat
+turn does not re-serialize the chart, re-rank famous people or rebuild the
+multi-kilobyte start of the prompt:
+
+- Entries are keyed by conversation and valid for one chart version (the
+  saved chart's data and AI reading, see chart_context_version) and one
+  famous people corpus version (famous_people_signature); when either moves
+  the entry is rebuilt, since the chart or its matches may have changed
+- The prefix is the part of every turn's prompt that does not change
+  between turns, so the LLM clients can hand it to provider-side prompt
+  caching (the prefix argument of Gemini3Client/ClaudeClient.generate)
+- Full charts of famous people the user asks about are formatted once per
+  entry, on first mention
+
+In-process LRU bounded by CHAT_CONTEXT_CACHE_MAX_SIZE. Hits and misses are
+reported to app.core.cache_analytics under "chat_context:".
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import CHAT_CONTEXT_CACHE_MAX_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChatContext:
+    """Prompt context of one conversation at one chart and corpus version."""
+    chart_version: str
+    corpus_version: Tuple[Any, ...]
+    prefix: str
+    famous_matches: List[Dict[str, Any]]
+    # Lowercased famous person name -> formatted chart block ("" if they have no chart)
+    famous_charts: Dict[str, str] = field(default_factory=dict)
+
+
+def chart_context_version(chart: Any) -> str:
+    """
+    Version of the saved chart content a chat context is built from.
+
+    Covers the chart data (through the indexed chart_hash when present) and
+    the AI reading, both of which end up in the prompt.
+
+    Args:
+        chart: SavedChart (or any object with chart_hash, chart_data_json, ai_reading)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update((chart.chart_hash or chart.chart_data_json or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((chart.ai_reading or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _track(key: str, hit: bool) -> None:
+    try:
+        from app.core.cache_analytics import track_cache_hit, track_cache_miss
+        if hit:
+            track_cache_hit(key, source="memory")
+        else:
+            track_cache_miss(key)
+    except ImportError:
+        pass
+
+
+class ChatContextCache:
+    """LRU of ChatContext by conversation id."""
+
+    def __init__(self, max_size: int = CHAT_CONTEXT_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, ChatContext]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0}
+
+    def get(self, conversation_id: int, chart_version: str, corpus_version: Tuple[Any, ...]) -> Optional[ChatContext]:
+        """
+        Get a conversation's context if it was built from the given versions.
+
+        Args:
+            conversation_id: Chat conversation id
+            chart_version: chart_context_version of the conversation's chart
+            corpus_version: famous_people_signature of the famous people table
+
+        Returns:
+            ChatContext, or None on a miss (stale entries are dropped)
+        """
+        key = f"chat_context:{conversation_id}"
+        with self._lock:
+            context = self._entries.get(conversation_id)
+            if context is not None and (context.chart_version, context.corpus_version) != (chart_version, corpus_version):
+                del self._entries[conversation_id]
+                self._stats["stale"] += 1
+                context = None
+            if context is None:
+                self._stats["misses"] += 1
+            else:
+                self._entries.move_to_end(conversation_id)
+                self._stats["hits"] += 1
+        _track(key, context is not None)
+        return context
+
+    def put(self, conversation_id: int, context: ChatContext) -> None:
+        """Store a conversation's context, evicting the least recently used beyond max_size."""
+        with self._lock:
+            self._entries[conversation_id] = context
+            self._entries.move_to_end(conversation_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, conversation_id: Optional[int] = None) -> None:
+        """Drop one conversation's context, or every context."""
+        with self._lock:
+            if conversation_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(conversation_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), max_size=self.max_size)
+
+
+chat_context_cache = ChatContextCache()
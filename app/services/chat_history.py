@@ -0,0 +1,180 @@
+"""
+Chat History
+
+Keyset (cursor) pagination over chat conversations and messages, so opening
+a long conversation or listing many conversations reads one bounded page
+instead of whole relationship collections:
+
+- Messages are ordered by (created_at, id), conversations by (updated_at, id),
+  both served by composite indexes (ix_chat_messages_conversation_created,
+  ix_chat_conversations_user_updated)
+- A cursor is the "timestamp,id" of the last row of a page; the next page
+  starts strictly after it, so pages stay stable when new messages arrive
+  and never degrade like large OFFSETs
+- recent_messages() is the bounded "last N messages" query for LLM prompts
+- Paging is opt-in for clients: without a limit or cursor, page_messages()
+  returns the whole conversation, as the unpaginated frontend expects
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query, Session
+
+from database import ChatConversation, ChatMessage
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Messages of history included in a chat prompt
+CHAT_HISTORY_MESSAGES = 10
+
+
+@dataclass
+class Page:
+    """One page of rows and the cursor of the next page (None on the last page)."""
+    items: List
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Cursor pointing at one row: "<ISO timestamp>,<id>"."""
+    return f"{timestamp.isoformat()},{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Parse a cursor made by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    timestamp, sep, row_id = cursor.rpartition(",")
+    if not sep:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+def after_cursor(timestamp_column, id_column, cursor: str, descending: bool = True):
+    """
+    Filter for rows strictly past a cursor in (timestamp, id) order.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    timestamp, row_id = decode_cursor(cursor)
+    if descending:
+        return or_(timestamp_column < timestamp, and_(timestamp_column == timestamp, id_column < row_id))
+    return or_(timestamp_column > timestamp, and_(timestamp_column == timestamp, id_column > row_id))
+
+
+def _page(query: Query, timestamp_column, id_column, timestamp_attr: str,
+          limit: int, cursor: Optional[str], descending: bool) -> Page:
+    if cursor:
+        query = query.filter(after_cursor(timestamp_column, id_column, cursor, descending))
+    if descending:
+        query = query.order_by(timestamp_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(timestamp_column, id_column)
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = query.limit(limit + 1).all()  # One extra row tells whether another page exists
+    if len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(rows, encode_cursor(getattr(last, timestamp_attr), last.id))
+
+
+def page_messages(
+    db: Session,
+    conversation_id: int,
+    limit: Optional[int] = DEFAULT_PAGE_SIZE,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+) -> Page:
+    """
+    One page of a conversation's messages, in chronological order.
+
+    Without a cursor this is the newest page. Older history is read by
+    passing the returned next_cursor as before; messages that arrived since
+    a known message are read with after (next_cursor then continues forward).
+    With no limit and no cursor, every message is returned as a single page.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation to read
+        limit: Page size (capped at MAX_PAGE_SIZE); None for the whole
+            conversation, or DEFAULT_PAGE_SIZE when a cursor is given
+        before: Cursor; return messages older than it
+        after: Cursor; return messages newer than it
+
+    Returns:
+        Page of ChatMessage rows, oldest first
+
+    Raises:
+        ValueError: If both cursors are given or a cursor is malformed
+    """
+    if before and after:
+        raise ValueError("Pass either before or after, not both")
+
+    query = db.query(ChatMessage).filter(ChatMessage.conversation_id == conversation_id)
+    if limit is None:
+        if not (before or after):
+            return Page(query.order_by(ChatMessage.created_at, ChatMessage.id).all())
+        limit = DEFAULT_PAGE_SIZE
+    if after:
+        return _page(query, ChatMessage.created_at, ChatMessage.id, "created_at", limit, after, descending=False)
+
+    page = _page(query, ChatMessage.created_at, ChatMessage.id, "created_at", limit, before, descending=True)
+    page.items.reverse()
+    return page
+
+
+def recent_messages(db: Session, conversation_id: int, limit: int = CHAT_HISTORY_MESSAGES) -> List[ChatMessage]:
+    """The last limit messages of a conversation, oldest first (one bounded index scan)."""
+    messages = (
+        db.query(ChatMessage)
+        .filter(ChatMessage.conversation_id == conversation_id)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(limit)
+        .all()
+    )
+    messages.reverse()
+    return messages
+
+
+def page_conversations(query: Query, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Page:
+    """
+    One page of conversations, most recently updated first.
+
+    Args:
+        query: ChatConversation query with the caller's filters (owner, chart)
+        limit: Page size (capped at MAX_PAGE_SIZE)
+        cursor: next_cursor of the previous page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    return _page(query, ChatConversation.updated_at, ChatConversation.id, "updated_at",
+                 limit, cursor, descending=True)
+
+
+def message_counts(db: Session, conversation_ids: Iterable[int]) -> Dict[int, int]:
+    """Number of messages per conversation, in one grouped query (missing ids have none)."""
+    conversation_ids = list(conversation_ids)
+    if not conversation_ids:
+        return {}
+    rows = (
+        db.query(ChatMessage.conversation_id, func.count(ChatMessage.id))
+        .filter(ChatMessage.conversation_id.in_(conversation_ids))
+        .group_by(ChatMessage.conversation_id)
+        .all()
+    )
+    return dict(rows)
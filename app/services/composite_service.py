@@ -10,6 +10,10 @@ from typing import Dict, List, Any, Optional
 from natal_chart import NatalChart, CelestialBody, ASPECTS_CONFIG, ASPECT_SCORES
 import math
 
+import numpy as np
+
+from app.services.aspect_kernel import find_aspects
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,8 +61,8 @@ def calculate_composite_planets(
     composite_planets = []
     
     # Create lookup dictionaries
-    chart1_lookup = {body.name: body for body in chart1_bodies}
-    chart2_lookup = {body.name: body for body in chart2_bodies}
+    chart1_lookup = {body.name: body for body in chart1_bodies if body.degree is not None}
+    chart2_lookup = {body.name: body for body in chart2_bodies if body.degree is not None}
     
     # Calculate midpoints for each planet
     planet_names = ["Sun", "Moon", "Mercury", "Venus", "Mars", 
@@ -69,13 +73,14 @@ def calculate_composite_planets(
             body1 = chart1_lookup[planet_name]
             body2 = chart2_lookup[planet_name]
             
-            pos1 = body1.sidereal_longitude if system == "sidereal" else body1.tropical_longitude
-            pos2 = body2.sidereal_longitude if system == "sidereal" else body2.tropical_longitude
+            # Bodies come from the chosen system's list, so degree is already in that zodiac
+            pos1 = body1.degree
+            pos2 = body2.degree
             
             composite_pos = calculate_midpoint(pos1, pos2)
             
             # Determine if composite planet is retrograde (if both are retrograde)
-            is_retro = body1.is_retrograde and body2.is_retrograde
+            is_retro = body1.retrograde and body2.retrograde
             
             composite_planets.append({
                 "name": planet_name,
@@ -134,34 +139,22 @@ def calculate_composite_aspects(
     all_points = composite_planets + [{"name": "Ascendant", "position": composite_asc}]
     
     # Calculate aspects between all points
-    for i, p1 in enumerate(all_points):
-        for p2 in all_points[i+1:]:
-            if p1["name"] == p2["name"]:
-                continue
-            
-            pos1 = p1["position"]
-            pos2 = p2["position"]
-            
-            # Calculate angular distance
-            angular_distance = abs(pos1 - pos2)
-            if angular_distance > 180:
-                angular_distance = 360 - angular_distance
-            
-            # Check for aspects
-            for aspect_name, aspect_angle, orb in ASPECTS_CONFIG:
-                if abs(angular_distance - aspect_angle) <= orb:
-                    exact_orb = abs(angular_distance - aspect_angle)
-                    strength = 1.0 - (exact_orb / orb)
-                    
-                    aspects.append({
-                        "planet1": p1["name"],
-                        "planet2": p2["name"],
-                        "aspect": aspect_name,
-                        "angle": aspect_angle,
-                        "orb": round(exact_orb, 2),
-                        "strength": round(strength, 3),
-                        "score": ASPECT_SCORES.get(aspect_name, 1.0)
-                    })
+    names = [p["name"] for p in all_points]
+    distinct = np.array([[n1 != n2 for n2 in names] for n1 in names], dtype=bool)
+    hits = find_aspects([p["position"] for p in all_points], pair_mask=distinct)
+    
+    for i, j, k, name, orb, strength in zip(
+        hits.first.tolist(), hits.second.tolist(), hits.aspect.tolist(), hits.names, hits.orb, hits.strength
+    ):
+        aspects.append({
+            "planet1": names[i],
+            "planet2": names[j],
+            "aspect": name,
+            "angle": ASPECTS_CONFIG[k][1],
+            "orb": round(abs(float(orb)), 2),
+            "strength": round(float(strength), 3),
+            "score": ASPECT_SCORES.get(name, 1.0)
+        })
     
     # Sort by score
     aspects.sort(key=lambda x: x["score"], reverse=True)
@@ -0,0 +1,265 @@
+"""
+Batch Ephemeris Service
+
+Computes raw ephemeris data for many births in one call and returns it as
+structured NumPy arrays. Rows can be fed back into NatalChart.calculate_chart
+so the full chart (aspects, patterns, dominance) is built without calling
+Swiss Ephemeris again.
+"""
+
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import swisseph as swe
+
+from natal_chart import (
+    ADDITIONAL_BODIES_CONFIG,
+    PLANETS_CONFIG,
+    TRUE_SIDEREAL_SIGNS,
+    get_ayanamsa,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bodies in the same order NatalChart._calculate_all_points visits them
+BODIES: List[Tuple[str, int]] = PLANETS_CONFIG + ADDITIONAL_BODIES_CONFIG
+BODY_NAMES: Tuple[str, ...] = tuple(name for name, _ in BODIES)
+BODY_INDEX = {name: i for i, name in enumerate(BODY_NAMES)}
+NUM_BODIES = len(BODIES)
+
+SIDEREAL_SIGN_NAMES: Tuple[str, ...] = tuple(sign for sign, _, _ in TRUE_SIDEREAL_SIGNS)
+SIDEREAL_SIGN_STARTS = np.array([start for _, start, _ in TRUE_SIDEREAL_SIGNS], dtype=np.float64)
+SIDEREAL_SIGN_END = TRUE_SIDEREAL_SIGNS[-1][2]
+TROPICAL_SIGN_NAMES: Tuple[str, ...] = (
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces",
+)
+SIGN_UNKNOWN = -1
+
+DEFAULT_CHUNK_SIZE = 256
+
+BIRTH_DTYPE = np.dtype([
+    ("jd", np.float64),
+    ("year", np.int32),
+    ("latitude", np.float64),
+    ("longitude", np.float64),
+])
+
+CHART_DTYPE = np.dtype([
+    ("jd", np.float64),
+    ("year", np.int32),
+    ("valid", np.bool_),
+    ("ayanamsa", np.float64),
+    ("tropical_asc", np.float64),
+    ("mc", np.float64),
+    ("sidereal_asc", np.float64),
+    ("tropical_lon", np.float64, (NUM_BODIES,)),
+    ("sidereal_lon", np.float64, (NUM_BODIES,)),
+    ("speed", np.float64, (NUM_BODIES,)),
+    ("retrograde", np.bool_, (NUM_BODIES,)),
+    ("sidereal_sign", np.int8, (NUM_BODIES,)),
+    ("tropical_sign", np.int8, (NUM_BODIES,)),
+    ("sidereal_cusps", np.float64, (12,)),
+    ("tropical_cusps", np.float64, (12,)),
+])
+
+BirthRecord = Tuple[int, int, int, int, int, float, float]
+
+
+def make_births(records: Iterable[BirthRecord]) -> np.ndarray:
+    """
+    Build a births array from UTC date/time and coordinates.
+
+    Julian days are computed exactly as NatalChart does, so results line up
+    with charts built from the same values.
+
+    Args:
+        records: Iterable of (year, month, day, hour, minute, latitude, longitude) in UTC
+
+    Returns:
+        Structured array with BIRTH_DTYPE
+    """
+    records = list(records)
+    births = np.zeros(len(records), dtype=BIRTH_DTYPE)
+    for i, (year, month, day, hour, minute, latitude, longitude) in enumerate(records):
+        births[i] = (swe.julday(year, month, day, hour + minute / 60.0), year, latitude, longitude)
+    return births
+
+
+def _as_births(births: Union[np.ndarray, Sequence[Sequence[float]]]) -> np.ndarray:
+    """Normalize input to BIRTH_DTYPE, deriving the year from jd when it is missing."""
+    if isinstance(births, np.ndarray) and births.dtype.names:
+        if births.dtype == BIRTH_DTYPE:
+            return births
+        out = np.zeros(len(births), dtype=BIRTH_DTYPE)
+        for field in ("jd", "latitude", "longitude"):
+            out[field] = births[field]
+        if "year" in births.dtype.names:
+            out["year"] = births["year"]
+        else:
+            out["year"] = [swe.revjul(float(jd))[0] for jd in out["jd"]]
+        return out
+
+    values = np.asarray(births, dtype=np.float64).reshape(-1, 3)
+    out = np.zeros(len(values), dtype=BIRTH_DTYPE)
+    out["jd"], out["latitude"], out["longitude"] = values[:, 0], values[:, 1], values[:, 2]
+    out["year"] = [swe.revjul(float(jd))[0] for jd in out["jd"]]
+    return out
+
+
+def sidereal_sign_index(degrees: np.ndarray) -> np.ndarray:
+    """
+    Map sidereal longitudes to indexes into TRUE_SIDEREAL_SIGNS.
+
+    Uses a binary search over the sign start degrees. Values outside
+    [0, 360) or NaN map to SIGN_UNKNOWN, like get_sign_from_degrees.
+
+    Args:
+        degrees: Array of sidereal longitudes
+
+    Returns:
+        int8 array of sign indexes
+    """
+    degrees = np.asarray(degrees, dtype=np.float64)
+    index = np.searchsorted(SIDEREAL_SIGN_STARTS, degrees, side="right") - 1
+    in_range = (degrees >= SIDEREAL_SIGN_STARTS[0]) & (degrees < SIDEREAL_SIGN_END)
+    return np.where(in_range, index, SIGN_UNKNOWN).astype(np.int8)
+
+
+def tropical_sign_index(degrees: np.ndarray) -> np.ndarray:
+    """
+    Map tropical longitudes to indexes into TROPICAL_SIGN_NAMES.
+
+    Args:
+        degrees: Array of tropical longitudes
+
+    Returns:
+        int8 array of sign indexes (SIGN_UNKNOWN for NaN)
+    """
+    degrees = np.asarray(degrees, dtype=np.float64)
+    finite = np.isfinite(degrees)
+    index = np.floor_divide(np.where(finite, degrees, 0.0), 30).astype(np.int64) % 12
+    return np.where(finite, index, SIGN_UNKNOWN).astype(np.int8)
+
+
+def sign_names(codes: np.ndarray, system: str = "sidereal") -> List[str]:
+    """
+    Decode sign indexes back to names.
+
+    Args:
+        codes: Sign indexes from a batch result
+        system: "sidereal" or "tropical"
+
+    Returns:
+        List of sign names ("Unknown" for SIGN_UNKNOWN)
+    """
+    names = SIDEREAL_SIGN_NAMES if system == "sidereal" else TROPICAL_SIGN_NAMES
+    return [names[c] if c != SIGN_UNKNOWN else "Unknown" for c in np.asarray(codes).ravel().tolist()]
+
+
+def _compute_chunk(births: np.ndarray) -> np.ndarray:
+    """Compute one shard of births. Module level so worker processes can pickle it."""
+    n = len(births)
+    charts = np.zeros(n, dtype=CHART_DTYPE)
+    charts["jd"] = births["jd"]
+    charts["year"] = births["year"]
+
+    asc = np.full(n, np.nan)
+    mc = np.full(n, np.nan)
+    raw_lon = np.full((n, NUM_BODIES), np.nan)
+    speed = np.full((n, NUM_BODIES), np.nan)
+    valid = np.zeros(n, dtype=np.bool_)
+
+    for i in range(n):
+        jd = float(births["jd"][i])
+        try:
+            res = swe.houses(jd, float(births["latitude"][i]), float(births["longitude"][i]), b'P')
+        except Exception as e:
+            logger.warning(f"Batch ephemeris: houses failed for jd {jd}: {e}")
+            continue
+        asc[i], mc[i] = res[1][0], res[1][1]
+        valid[i] = True
+        for b, (name, code) in enumerate(BODIES):
+            try:
+                pos = swe.calc_ut(jd, code)[0]
+            except Exception as e:
+                logger.debug(f"Batch ephemeris: {name} failed for jd {jd}: {e}")
+                continue
+            raw_lon[i, b] = pos[0]
+            speed[i, b] = pos[3]
+
+    # Same arithmetic as NatalChart, applied to whole columns
+    ayanamsa = get_ayanamsa(births["year"].astype(np.float64))
+    tropical_lon = raw_lon % 360
+    sidereal_lon = (raw_lon - ayanamsa[:, None] + 360) % 360
+    sidereal_asc = (asc - ayanamsa + 360) % 360
+    offsets = np.arange(12) * 30
+
+    charts["valid"] = valid
+    charts["ayanamsa"] = ayanamsa
+    charts["tropical_asc"] = asc
+    charts["mc"] = mc
+    charts["sidereal_asc"] = sidereal_asc
+    charts["tropical_lon"] = tropical_lon
+    charts["sidereal_lon"] = sidereal_lon
+    charts["speed"] = speed
+    charts["retrograde"] = speed < 0
+    charts["sidereal_sign"] = sidereal_sign_index(sidereal_lon)
+    charts["tropical_sign"] = tropical_sign_index(tropical_lon)
+    charts["sidereal_cusps"] = (sidereal_asc[:, None] + offsets) % 360
+    charts["tropical_cusps"] = (asc[:, None] + offsets) % 360
+    return charts
+
+
+def compute_charts_batch(
+    births: Union[np.ndarray, Sequence[Sequence[float]]],
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> np.ndarray:
+    """
+    Compute ephemeris data for many births at once.
+
+    Args:
+        births: BIRTH_DTYPE array (see make_births) or an (N, 3) array of
+            (jd, latitude, longitude); the year used for the ayanamsa is
+            derived from jd when not supplied
+        processes: Number of worker processes; None or 1 computes in-process
+        chunk_size: Births per shard sent to each worker
+
+    Returns:
+        Structured array with CHART_DTYPE, one row per birth in input order.
+        Rows whose houses could not be computed have valid=False; bodies that
+        failed have NaN longitudes and SIGN_UNKNOWN signs.
+    """
+    births = _as_births(births)
+    if len(births) == 0:
+        return np.zeros(0, dtype=CHART_DTYPE)
+
+    if not processes or processes <= 1 or len(births) <= chunk_size:
+        return _compute_chunk(births)
+
+    chunks = [births[start:start + chunk_size] for start in range(0, len(births), chunk_size)]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(executor.map(_compute_chunk, chunks))
+
+    logger.info(f"Batch ephemeris: {len(births)} charts in {len(chunks)} shards across {processes} processes")
+    return np.concatenate(results)
+
+
+def body_position(chart: np.void, name: str, system: str = "sidereal") -> Optional[float]:
+    """
+    Get one body's longitude from a batch row.
+
+    Args:
+        chart: A single CHART_DTYPE row
+        name: Body name as used by NatalChart (e.g. "Sun", "True Node")
+        system: "sidereal" or "tropical"
+
+    Returns:
+        Longitude in degrees, or None if it could not be computed
+    """
+    value = float(chart[f"{system}_lon"][BODY_INDEX[name]])
+    return None if math.isnan(value) else value
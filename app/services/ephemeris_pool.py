@@ -0,0 +1,318 @@
+"""
+Swiss Ephemeris Worker Pool
+
+pyswisseph keeps its state (ephemeris path, sidereal mode, open file
+handles) per thread, so every thread that computes positions has to be
+configured first (configure_ephemeris), and it holds the GIL for every call,
+so threads do not parallelize it. This pool runs ephemeris work in
+EPHEMERIS_POOL_WORKERS processes, each configured once with the ephemeris
+path and warmed up (ephemeris files opened) by its initializer. Chart cache
+misses in the API and batch chart jobs both go through it.
+
+Work is sent as typed requests, each answered by a typed response:
+
+- PositionsRequest -> PositionsResponse: bodies, angles and house cusps for
+  many births (ephemeris_batch CHART_DTYPE rows)
+- HousesRequest -> HousesResponse: house cusps and angles for one moment and place
+- ReturnRequest -> ReturnResponse: moments a planet returns to a longitude
+
+With EPHEMERIS_POOL_WORKERS=0 requests run in the calling process. The pool
+is a BoundedExecutor, so it has the same admission control and timeouts as
+the other executors and its statistics appear at /performance/executors.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import swisseph as swe
+
+from natal_chart import DEFAULT_SWISS_EPHEMERIS_PATH as NATAL_CHART_EPHEMERIS_PATH
+from app.config import (
+    BASE_DIR, DEFAULT_SWISS_EPHEMERIS_PATH, EPHEMERIS_POOL_MAX_QUEUE, EPHEMERIS_POOL_WORKERS,
+    EPHEMERIS_TASK_TIMEOUT_SECONDS, SWEP_PATH
+)
+from app.core.executors import BoundedExecutor, run_chart_task, set_executor
+from app.services.ephemeris_batch import (
+    BODIES, CHART_DTYPE, DEFAULT_CHUNK_SIZE, _as_births, _compute_chunk
+)
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_JD = 2451545.0  # J2000; opens the ephemeris files covering 1800-2400
+
+# pyswisseph keeps its state per thread (a new thread starts without an
+# ephemeris path and silently falls back to the Moshier ephemeris), so the
+# configured path is tracked per thread too
+_local = threading.local()
+
+
+def resolve_ephemeris_path() -> str:
+    """
+    Directory holding the Swiss Ephemeris data files.
+
+    SWEP_PATH when it exists, then the configured swiss_ephemeris directory,
+    then the one next to natal_chart.py (the path natal_chart itself uses),
+    then the project root (ephemeris files might be in root).
+    """
+    if SWEP_PATH and os.path.exists(SWEP_PATH):
+        return SWEP_PATH
+    for candidate in (DEFAULT_SWISS_EPHEMERIS_PATH, NATAL_CHART_EPHEMERIS_PATH):
+        if os.path.exists(candidate):
+            return str(candidate)
+    return str(BASE_DIR)
+
+
+def configure_ephemeris(path: Optional[str] = None) -> str:
+    """
+    Point the calling thread's Swiss Ephemeris at the data files.
+
+    Setting the path closes any open ephemeris files, so it is only done when
+    the path changes rather than per request. Threads that call Swiss
+    Ephemeris directly (the chart executor's) run this in their initializer.
+
+    Args:
+        path: Ephemeris directory (default: resolve_ephemeris_path())
+
+    Returns:
+        The configured path
+    """
+    path = path or resolve_ephemeris_path()
+    if getattr(_local, "path", None) != path:
+        swe.set_ephe_path(path)
+        _local.path = path
+        logger.debug(f"Swiss Ephemeris path set to: {path}")
+    return path
+
+
+def _init_worker(path: str) -> None:
+    """Worker process initializer: configure the path and open the ephemeris files."""
+    # A forked worker inherits the parent's open ephemeris files, whose file
+    # offsets the processes would share; setting the path again reopens them
+    _local.path = None
+    configure_ephemeris(path)
+    for _, code in BODIES:
+        try:
+            swe.calc_ut(WARM_UP_JD, code)
+        except Exception as e:
+            logger.debug(f"Ephemeris warm-up failed for body {code}: {e}")
+    swe.houses(WARM_UP_JD, 0.0, 0.0, b'P')
+
+
+# --- Protocol ---
+
+@dataclass(frozen=True)
+class PositionsResponse:
+    """Ephemeris rows (CHART_DTYPE), one per birth in request order."""
+    charts: np.ndarray
+
+
+@dataclass(frozen=True)
+class PositionsRequest:
+    """Body positions, angles and house cusps for births (a BIRTH_DTYPE array)."""
+    births: np.ndarray
+
+    def run(self) -> PositionsResponse:
+        return PositionsResponse(_compute_chunk(self.births))
+
+
+@dataclass(frozen=True)
+class HousesResponse:
+    """Tropical house cusps (12) with the ascendant and midheaven."""
+    cusps: Tuple[float, ...]
+    ascendant: float
+    mc: float
+
+
+@dataclass(frozen=True)
+class HousesRequest:
+    """Houses for one moment (Julian day UT) and place."""
+    jd: float
+    latitude: float
+    longitude: float
+    house_system: bytes = b'P'
+
+    def run(self) -> HousesResponse:
+        cusps, ascmc = swe.houses(self.jd, self.latitude, self.longitude, self.house_system)
+        return HousesResponse(tuple(cusps[:12]), ascmc[0], ascmc[1])
+
+
+@dataclass(frozen=True)
+class ReturnResponse:
+    """Julian days (UT) of the returns, in order."""
+    times: Tuple[float, ...]
+
+    def moments(self) -> List[datetime]:
+        """The return times as UTC datetimes."""
+        from app.services.transit_service import datetime_from_jd
+        return [datetime_from_jd(jd) for jd in self.times]
+
+
+@dataclass(frozen=True)
+class ReturnRequest:
+    """Moments in [start_jd, end_jd] when a planet crosses a target longitude."""
+    body: str
+    target_longitude: float
+    start_jd: float
+    end_jd: float
+    system: str = "sidereal"
+    use_ephemeris_table: bool = False
+
+    @classmethod
+    def for_chart(cls, natal_chart, body: str, start_date: datetime, end_date: datetime,
+                  system: str = "sidereal", use_ephemeris_table: bool = False) -> "ReturnRequest":
+        """
+        Request the returns of a planet to its position in a natal chart.
+
+        Raises:
+            ValueError: If the body is unknown or missing from the chart
+        """
+        from app.services.solar_return_service import RETURN_BODIES, _natal_longitude
+        from app.services.transit_service import julian_day
+        if body not in RETURN_BODIES:
+            raise ValueError(f"Unknown return body: {body}")
+        return cls(body, _natal_longitude(natal_chart, body, system), julian_day(start_date),
+                   julian_day(end_date), system, use_ephemeris_table)
+
+    def run(self) -> ReturnResponse:
+        from app.services.solar_return_service import solve_return_times
+        return ReturnResponse(tuple(solve_return_times(
+            self.body, self.target_longitude, self.start_jd, self.end_jd, self.system, self.use_ephemeris_table
+        )))
+
+
+EphemerisRequest = Union[PositionsRequest, HousesRequest, ReturnRequest]
+EphemerisResponse = Union[PositionsResponse, HousesResponse, ReturnResponse]
+
+
+def _execute(request: EphemerisRequest) -> EphemerisResponse:
+    """Answer one request. Module level so worker processes can pickle it."""
+    configure_ephemeris()
+    return request.run()
+
+
+# --- Pool ---
+
+_executor: Optional[BoundedExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_ephemeris_executor() -> Optional[BoundedExecutor]:
+    """
+    Get the process-wide ephemeris pool, or None when EPHEMERIS_POOL_WORKERS is 0.
+
+    Returns:
+        BoundedExecutor of worker processes (created on first use)
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None and EPHEMERIS_POOL_WORKERS > 0:
+            _executor = BoundedExecutor(
+                "ephemeris", "process",
+                max_workers=EPHEMERIS_POOL_WORKERS,
+                max_queue=EPHEMERIS_POOL_MAX_QUEUE,
+                timeout=EPHEMERIS_TASK_TIMEOUT_SECONDS,
+                initializer=_init_worker,
+                initargs=(resolve_ephemeris_path(),)
+            )
+            set_executor("ephemeris", _executor)
+        return _executor
+
+
+def set_ephemeris_executor(executor: Optional[BoundedExecutor]) -> None:
+    """Replace the ephemeris pool (None: recreate from configuration on next use), e.g. in tests."""
+    global _executor
+    with _executor_lock:
+        _executor = executor
+        set_executor("ephemeris", executor)
+
+
+def compute(request: EphemerisRequest) -> EphemerisResponse:
+    """
+    Answer a request in the pool, blocking until it is done.
+
+    For callers that are not coroutines, such as chart code already running on
+    the chart executor.
+
+    Raises:
+        ServiceOverloadedError: If the pool is full or the request times out
+    """
+    executor = get_ephemeris_executor()
+    if executor is None:
+        return _execute(request)
+    return executor.call(_execute, request)
+
+
+async def compute_async(request: EphemerisRequest) -> EphemerisResponse:
+    """
+    Answer a request in the pool without blocking the event loop.
+
+    Raises:
+        ServiceOverloadedError: If the pool is full or the request times out
+    """
+    executor = get_ephemeris_executor()
+    if executor is None:
+        return await run_chart_task(_execute, request)
+    return await executor.run(_execute, request)
+
+
+def _shards(births: np.ndarray, workers: int, chunk_size: Optional[int]) -> List[np.ndarray]:
+    """Split births so every worker gets a share, with at most chunk_size births per shard."""
+    size = chunk_size or max(1, min(DEFAULT_CHUNK_SIZE, math.ceil(len(births) / workers)))
+    return [births[start:start + size] for start in range(0, len(births), size)]
+
+
+def compute_charts(
+    births: Union[np.ndarray, Sequence[Sequence[float]]],
+    chunk_size: Optional[int] = None
+) -> np.ndarray:
+    """
+    Ephemeris rows for many births, sharded across the pool (blocking).
+
+    Args:
+        births: BIRTH_DTYPE array (see ephemeris_batch.make_births) or (N, 3) (jd, latitude, longitude)
+        chunk_size: Births per shard (default: an equal share per worker, at most DEFAULT_CHUNK_SIZE)
+
+    Returns:
+        CHART_DTYPE array, identical to ephemeris_batch.compute_charts_batch
+
+    Raises:
+        ServiceOverloadedError: If the pool cannot take every shard or they time out
+    """
+    births = _as_births(births)
+    if len(births) == 0:
+        return np.zeros(0, dtype=CHART_DTYPE)
+    executor = get_ephemeris_executor()
+    if executor is None:
+        return _execute(PositionsRequest(births)).charts
+    shards = _shards(births, executor.max_workers, chunk_size)
+    if len(shards) == 1:
+        return executor.call(_execute, PositionsRequest(births)).charts
+    responses = executor.map(_execute, [PositionsRequest(shard) for shard in shards])
+    return np.concatenate([response.charts for response in responses])
+
+
+async def compute_charts_async(
+    births: Union[np.ndarray, Sequence[Sequence[float]]],
+    chunk_size: Optional[int] = None
+) -> np.ndarray:
+    """
+    Ephemeris rows for many births, sharded across the pool, without blocking the event loop.
+
+    See compute_charts.
+    """
+    births = _as_births(births)
+    if len(births) == 0:
+        return np.zeros(0, dtype=CHART_DTYPE)
+    executor = get_ephemeris_executor()
+    if executor is None:
+        return (await run_chart_task(_execute, PositionsRequest(births))).charts
+    shards = _shards(births, executor.max_workers, chunk_size)
+    responses = await asyncio.gather(*(executor.run(_execute, PositionsRequest(shard)) for shard in shards))
+    return np.concatenate([response.charts for response in responses])
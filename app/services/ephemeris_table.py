@@ -0,0 +1,333 @@
+"""
+Ephemeris Table
+
+Precomputed geocentric tropical longitudes and speeds of the Sun through Pluto,
+stored as one .npy array per body and opened memory-mapped. Every worker process
+maps the same files, so the operating system shares the pages between them and
+nothing is copied or parsed at startup.
+
+Positions between grid points are cubic Hermite interpolated from the stored
+longitude and speed at both ends of the step; speeds are the derivative of the
+same interpolant, so a station in the table is exactly where the interpolated
+longitude turns. The grid is adaptive: a per-body base step keeps the error of
+the smooth motion far below ERROR_BOUND_DEGREES, but while a planet passes behind
+the Sun, Swiss Ephemeris applies gravitational light deflection that bends the
+apparent longitude over a few hours. Base steps within CONJUNCTION_DEGREES of the
+Sun are therefore split into CONJUNCTION_STEP_DAYS, and any step whose midpoint
+still misses swe.calc_ut by more than REFINE_TOLERANCE_DEGREES is halved until it
+does. The measured maximum error against swe.calc_ut is recorded in meta.json
+when the table is built.
+
+The table is built by scripts/build_ephemeris_table.py. Transit timelines and
+return scans can opt into it and fall back to Swiss Ephemeris when the table is
+missing or does not cover the requested range.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from app.config import EPHEMERIS_TABLE_ENABLED, EPHEMERIS_TABLE_PATH
+
+logger = logging.getLogger(__name__)
+
+TABLE_BODIES: Dict[str, int] = {
+    "Sun": swe.SUN, "Moon": swe.MOON, "Mercury": swe.MERCURY, "Venus": swe.VENUS,
+    "Mars": swe.MARS, "Jupiter": swe.JUPITER, "Saturn": swe.SATURN, "Uranus": swe.URANUS,
+    "Neptune": swe.NEPTUNE, "Pluto": swe.PLUTO,
+}
+# Base grid step in days per body, before refinement near the Sun
+TABLE_STEP_DAYS = {
+    "Sun": 2.0, "Moon": 0.5, "Mercury": 1.0, "Venus": 1.0, "Mars": 2.0,
+    "Jupiter": 4.0, "Saturn": 4.0, "Uranus": 4.0, "Neptune": 4.0, "Pluto": 4.0,
+}
+# The bundled sepl_18/semo_18 files start a few hours into 1800-01-01; Swiss
+# Ephemeris falls back to the Moshier ephemeris before that
+DEFAULT_START_YEAR = 1801
+DEFAULT_END_YEAR = 2200
+ERROR_BOUND_DEGREES = 1e-3  # 3.6 arcseconds
+# Midpoint error that splits a step; a quarter of the bound since the midpoint
+# is not always where the interpolation error peaks
+REFINE_TOLERANCE_DEGREES = ERROR_BOUND_DEGREES / 4
+MIN_STEP_DAYS = 1.0 / 1440
+CONJUNCTION_DEGREES = 1.0
+CONJUNCTION_STEP_DAYS = 1.0 / 24
+VALIDATION_SAMPLES = 20000
+META_FILE = "meta.json"
+FORMAT_VERSION = 2
+
+
+def _wrap180(degrees):
+    return (degrees + 180.0) % 360.0 - 180.0
+
+
+class EphemerisTable:
+    """
+    Read-only view of a built table directory.
+
+    Attributes:
+        path: Table directory
+        start_jd: First grid time (Julian day, UT)
+        end_jd: Last time every body covers
+        steps: Base grid step in days per body
+        max_error: Measured maximum longitude error in degrees per body
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported ephemeris table version: {meta.get('version')}")
+        self.path = path
+        self.start_jd = float(meta["start_jd"])
+        self.end_jd = float(meta["end_jd"])
+        self.steps: Dict[str, float] = {name: float(step) for name, step in meta["steps"].items()}
+        self.max_error: Dict[str, float] = meta.get("max_error", {})
+        # Columns: Julian day, longitude (0-360), speed (degrees/day). Plain ndarray
+        # views of the mappings skip np.memmap's per-index overhead
+        self._data = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r").view(np.ndarray)
+            for name in self.steps
+        }
+
+    def has_body(self, body: str) -> bool:
+        return body in self._data
+
+    def covers(self, start_jd: float, end_jd: float) -> bool:
+        """Whether every body is tabulated over [start_jd, end_jd]."""
+        return self.start_jd <= start_jd and end_jd <= self.end_jd
+
+    def positions(self, body: str, times: Iterable[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolated longitudes and speeds of a body.
+
+        Args:
+            body: Body name from TABLE_BODIES
+            times: Julian days (UT) inside the table range
+
+        Returns:
+            Tuple of (longitudes 0-360, speeds in degrees/day) arrays
+
+        Raises:
+            KeyError: If the body is not in the table
+            ValueError: If a time is outside the table range
+        """
+        data = self._data[body]
+        times = np.asarray(times, dtype=np.float64)
+        if times.size and (times.min() < self.start_jd or times.max() > self.end_jd):
+            raise ValueError("Time outside the ephemeris table range")
+        return _interpolate(data, times)
+
+
+def _interpolate(rows: np.ndarray, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Hermite longitude and its derivative from (Julian day, longitude, speed) rows."""
+    index = np.clip(np.searchsorted(rows[:, 0], times, side="right") - 1, 0, len(rows) - 2)
+    # Fancy indexing copies only the rows touched, never the whole mapping
+    row0, row1 = rows[index], rows[index + 1]
+    t0, y0, v0, v1 = row0[..., 0], row0[..., 1], row0[..., 2], row1[..., 2]
+    y1 = y0 + _wrap180(row1[..., 1] - y0)
+    step = row1[..., 0] - t0
+    s = (times - t0) / step
+    s2 = s * s
+    s3 = s2 * s
+    longitude = (2 * s3 - 3 * s2 + 1) * y0 + (s3 - 2 * s2 + s) * step * v0 + (-2 * s3 + 3 * s2) * y1 + (s3 - s2) * step * v1
+    speed = ((6 * s2 - 6 * s) * (y0 - y1)) / step + (3 * s2 - 4 * s + 1) * v0 + (3 * s2 - 2 * s) * v1
+    return longitude % 360.0, speed
+
+
+def _calc(code: int, times: np.ndarray) -> np.ndarray:
+    """Rows of (Julian day, longitude, speed) from the Swiss Ephemeris files."""
+    out = np.empty((len(times), 3))
+    for i, jd in enumerate(times):
+        position, flags = swe.calc_ut(float(jd), code)
+        if not flags & swe.FLG_SWIEPH:
+            raise ValueError(f"Swiss Ephemeris files do not cover Julian day {jd}")
+        out[i] = (jd, position[0], position[3])
+    return out
+
+
+def _midpoint_error(code: int, rows0: np.ndarray, rows1: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Hermite interpolation error at the middle of each step, and the ephemeris rows there."""
+    step = rows1[:, 0] - rows0[:, 0]
+    y0 = rows0[:, 1]
+    y1 = y0 + _wrap180(rows1[:, 1] - y0)
+    middle = (y0 + y1) / 2.0 + step * (rows0[:, 2] - rows1[:, 2]) / 8.0
+    actual = _calc(code, (rows0[:, 0] + rows1[:, 0]) / 2.0)
+    return np.abs(_wrap180(middle - actual[:, 1])), actual
+
+
+def _tabulate(code: int, start: float, end: float, step: float, sun: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Adaptive grid rows for one body.
+
+    Starts from the base grid, splits steps near the Sun (given the Sun's rows)
+    into CONJUNCTION_STEP_DAYS, then halves failing steps until they pass.
+    """
+    count = int(np.ceil((end - start) / step)) + 1
+    rows = _calc(code, start + step * np.arange(count))
+    if sun is not None:
+        elongation = _wrap180(rows[:, 1] - _interpolate(sun, rows[:, 0])[0])
+        e0, e1 = elongation[:-1], elongation[1:]
+        # Close to the Sun at either end, or passing it within the step
+        near = (np.minimum(np.abs(e0), np.abs(e1)) < CONJUNCTION_DEGREES) | (
+            ((e0 < 0) != (e1 < 0)) & (np.abs(e0) + np.abs(e1) < 180.0)
+        )
+        pieces = int(np.ceil(step / CONJUNCTION_STEP_DAYS))
+        fine = (rows[:-1, 0][near, None] + np.arange(1, pieces) * (step / pieces)).reshape(-1)
+        if len(fine):
+            rows = np.concatenate([rows, _calc(code, fine)])
+            rows = rows[np.argsort(rows[:, 0], kind="stable")]
+    left = np.arange(len(rows) - 1)
+    while len(left):
+        error, middle = _midpoint_error(code, rows[left], rows[left + 1])
+        split = (error > REFINE_TOLERANCE_DEGREES) & (rows[left + 1, 0] - rows[left, 0] > MIN_STEP_DAYS)
+        if not split.any():
+            break
+        rows = np.insert(rows, left[split] + 1, middle[split], axis=0)
+        # Both halves of every split step are checked again
+        inserted = left[split] + 1 + np.arange(split.sum())
+        left = np.sort(np.concatenate([inserted - 1, inserted]))
+    return rows
+
+
+def validate_ephemeris_table(table: EphemerisTable, samples: int = VALIDATION_SAMPLES,
+                             seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """
+    Measure the table against swe.calc_ut at random times.
+
+    Args:
+        table: Table to check
+        samples: Random times per body
+        seed: Random seed
+
+    Returns:
+        Per body {"longitude": max degrees, "speed": max degrees/day} absolute error
+    """
+    rng = np.random.default_rng(seed)
+    errors = {}
+    for body in table.steps:
+        # Half the samples anywhere, half inside the refined steps near the Sun
+        # where the ephemeris bends fastest
+        rows = table._data[body]
+        refined = np.flatnonzero(np.diff(rows[:, 0]) < table.steps[body] * 0.999)
+        times = rng.uniform(table.start_jd, table.end_jd, samples - samples // 2 if len(refined) else samples)
+        if len(refined):
+            left = rows[rng.choice(refined, samples // 2), 0]
+            right = rows[np.searchsorted(rows[:, 0], left) + 1, 0]
+            times = np.concatenate([times, rng.uniform(left, right)])
+        longitude, speed = table.positions(body, times)
+        expected = _calc(TABLE_BODIES[body], times)
+        errors[body] = {
+            "longitude": float(np.abs(_wrap180(longitude - expected[:, 1])).max()),
+            "speed": float(np.abs(speed - expected[:, 2]).max()),
+        }
+    return errors
+
+
+def build_ephemeris_table(
+    path: str,
+    start_year: int = DEFAULT_START_YEAR,
+    end_year: int = DEFAULT_END_YEAR,
+    bodies: Optional[Iterable[str]] = None,
+    samples: int = VALIDATION_SAMPLES,
+) -> Dict[str, float]:
+    """
+    Write a table covering January 1 of start_year to January 1 of end_year and validate it.
+
+    Args:
+        path: Directory to write (created if missing; existing files are replaced)
+        start_year: First year
+        end_year: Year the table ends at
+        bodies: Body names (defaults to all of TABLE_BODIES)
+        samples: Validation samples per body
+
+    Returns:
+        Measured maximum longitude error in degrees per body
+
+    Raises:
+        ValueError: If the range is empty, a body is unknown, or a body's measured
+            error exceeds ERROR_BOUND_DEGREES (nothing usable is left behind)
+    """
+    names = list(TABLE_BODIES) if bodies is None else list(bodies)
+    unknown = [name for name in names if name not in TABLE_BODIES]
+    if unknown:
+        raise ValueError(f"Unknown body: {', '.join(unknown)}")
+    start, end = swe.julday(start_year, 1, 1, 0.0), swe.julday(end_year, 1, 1, 0.0)
+    if end <= start:
+        raise ValueError("end_year must be after start_year")
+
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    steps = {}
+    # The Sun goes first: the other bodies are refined around their conjunctions with it
+    sun = _tabulate(swe.SUN, start, end, TABLE_STEP_DAYS["Sun"])
+    for name in names:
+        step = TABLE_STEP_DAYS[name]
+        if name == "Sun":
+            rows = sun
+        else:
+            # The Moon's half-day base step already meets the bound through its conjunctions
+            rows = _tabulate(TABLE_BODIES[name], start, end, step, None if name == "Moon" else sun)
+        np.save(os.path.join(path, f"{name}.npy"), rows)
+        steps[name] = step
+        logger.info(f"Ephemeris table: {name} {len(rows)} rows")
+
+    meta = {"version": FORMAT_VERSION, "start_jd": start, "end_jd": end, "steps": steps}
+    # meta.json is written last: a directory without it is never opened as a table
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+    errors = validate_ephemeris_table(EphemerisTable(path), samples)
+    max_error = {name: errors[name]["longitude"] for name in names}
+    too_large = {name: error for name, error in max_error.items() if error > ERROR_BOUND_DEGREES}
+    if too_large:
+        os.remove(meta_path)
+        raise ValueError(f"Ephemeris table error above {ERROR_BOUND_DEGREES} degrees: {too_large}")
+    meta["max_error"] = max_error
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+    return max_error
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_ephemeris_table() -> Optional[EphemerisTable]:
+    """
+    Get the process-wide ephemeris table.
+
+    Returns:
+        EphemerisTable, or None when the table is disabled, not built or unreadable
+    """
+    global _table
+    if not EPHEMERIS_TABLE_ENABLED:
+        return None
+    with _table_lock:
+        if _table is None:
+            if not os.path.exists(os.path.join(EPHEMERIS_TABLE_PATH, META_FILE)):
+                return None
+            try:
+                _table = EphemerisTable(EPHEMERIS_TABLE_PATH)
+                logger.info(f"Ephemeris table mapped from {EPHEMERIS_TABLE_PATH}")
+            except Exception as e:
+                logger.warning(f"Ephemeris table unavailable: {e}")
+                return None
+        return _table
+
+
+def set_ephemeris_table(table: Optional[EphemerisTable]) -> None:
+    """Replace the process-wide table (None re-opens the configured one on next use)."""
+    global _table
+    with _table_lock:
+        _table = table
@@ -0,0 +1,400 @@
+"""
+Geocoding Service
+
+Non-blocking location -> (latitude, longitude, timezone) lookups for every
+chart path.
+
+- One pooled httpx.AsyncClient shared by all requests
+- Concurrent lookups for the same normalized location share one in-flight call
+- Persistent SQLite cache with TTL; "not found" answers are cached too
+- Pluggable providers (OpenCage, Nominatim, or a stub for offline tests)
+- Timezones the provider does not supply are resolved offline
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.config import (
+    GEOCODE_CACHE_PATH, GEOCODE_CACHE_TTL_SECONDS, GEOCODE_NEGATIVE_TTL_SECONDS,
+    GEOCODING_PROVIDER, NOMINATIM_USER_AGENT, OPENCAGE_KEY
+)
+from app.core.exceptions import GeocodingError
+from app.services.timezone_resolver import resolve_timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = 10.0
+MAX_CONNECTIONS = 20
+
+
+@dataclass(frozen=True)
+class GeocodeResult:
+    """A resolved location."""
+    latitude: float
+    longitude: float
+    timezone: Optional[str]
+    provider: str
+
+
+class GeocodingProviderError(Exception):
+    """A provider could not answer (network error, quota, bad response)."""
+
+
+def normalize_location(location: str) -> str:
+    """
+    Normalize a location string for caching and coalescing.
+
+    Args:
+        location: Raw location text
+
+    Returns:
+        Case-folded location with whitespace collapsed and stray commas removed
+    """
+    parts = [" ".join(part.split()) for part in (location or "").casefold().split(",")]
+    return ", ".join(part for part in parts if part)
+
+
+# ============================================================
+# Providers
+# ============================================================
+
+class GeocodingProvider:
+    """
+    Base class for geocoding providers.
+
+    lookup() returns a GeocodeResult, None when the provider is sure the
+    location does not exist, or raises GeocodingProviderError when it
+    could not answer.
+    """
+    name = "base"
+
+    async def lookup(self, client: httpx.AsyncClient, location: str) -> Optional[GeocodeResult]:
+        raise NotImplementedError
+
+
+class OpenCageProvider(GeocodingProvider):
+    """OpenCage forward geocoding (includes timezone annotations)."""
+    name = "opencage"
+    url = "https://api.opencagedata.com/geocode/v1/json"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    async def lookup(self, client: httpx.AsyncClient, location: str) -> Optional[GeocodeResult]:
+        try:
+            response = await client.get(self.url, params={"q": location, "key": self.api_key, "limit": 1})
+            if response.status_code == 402:
+                raise GeocodingProviderError("OpenCage API returned 402 Payment Required")
+            response.raise_for_status()
+            results = response.json().get("results", [])
+        except (httpx.HTTPError, ValueError) as e:
+            raise GeocodingProviderError(f"OpenCage geocoding failed: {e}") from e
+
+        if not results:
+            return None
+        geometry = results[0].get("geometry", {})
+        lat, lng = geometry.get("lat"), geometry.get("lng")
+        if lat is None or lng is None:
+            return None
+        timezone_name = results[0].get("annotations", {}).get("timezone", {}).get("name")
+        return GeocodeResult(float(lat), float(lng), timezone_name, self.name)
+
+
+class NominatimProvider(GeocodingProvider):
+    """OpenStreetMap Nominatim (no timezone data; resolved offline by the service)."""
+    name = "nominatim"
+    url = "https://nominatim.openstreetmap.org/search"
+
+    def __init__(self, user_agent: str = NOMINATIM_USER_AGENT):
+        self.user_agent = user_agent
+
+    async def lookup(self, client: httpx.AsyncClient, location: str) -> Optional[GeocodeResult]:
+        try:
+            response = await client.get(
+                self.url,
+                params={"q": location, "format": "json", "limit": 1},
+                headers={"User-Agent": self.user_agent}  # Required by Nominatim
+            )
+            response.raise_for_status()
+            results = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise GeocodingProviderError(f"Nominatim geocoding failed: {e}") from e
+
+        if not results:
+            return None
+        lat = float(results[0].get("lat", 0))
+        lng = float(results[0].get("lon", 0))
+        return GeocodeResult(lat, lng, None, self.name)
+
+
+class StubProvider(GeocodingProvider):
+    """
+    Offline provider backed by a dictionary, for tests and local development.
+
+    Unknown locations are reported as not found.
+    """
+    name = "stub"
+
+    def __init__(self, locations: Optional[Dict[str, Tuple[float, float, Optional[str]]]] = None, delay: float = 0.0):
+        self.locations = {normalize_location(k): v for k, v in (locations or {}).items()}
+        self.delay = delay
+        self.calls: List[str] = []
+
+    async def lookup(self, client: httpx.AsyncClient, location: str) -> Optional[GeocodeResult]:
+        self.calls.append(location)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        entry = self.locations.get(normalize_location(location))
+        if entry is None:
+            return None
+        lat, lng, timezone_name = entry
+        return GeocodeResult(lat, lng, timezone_name, self.name)
+
+
+def default_providers() -> List[GeocodingProvider]:
+    """Providers from configuration: OpenCage (if keyed) then Nominatim, or the stub."""
+    if GEOCODING_PROVIDER == "stub":
+        return [StubProvider()]
+    providers: List[GeocodingProvider] = []
+    if OPENCAGE_KEY:
+        providers.append(OpenCageProvider(OPENCAGE_KEY))
+    providers.append(NominatimProvider())
+    return providers
+
+
+# ============================================================
+# Persistent cache
+# ============================================================
+
+class GeocodeCache:
+    """SQLite-backed location cache with separate TTLs for hits and misses."""
+
+    def __init__(
+        self,
+        path: str = GEOCODE_CACHE_PATH,
+        ttl_seconds: int = GEOCODE_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: int = GEOCODE_NEGATIVE_TTL_SECONDS
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                "location TEXT PRIMARY KEY, latitude REAL, longitude REAL, "
+                "timezone TEXT, provider TEXT, found INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Tuple[bool, Optional[GeocodeResult]]:
+        """
+        Look up a normalized location.
+
+        Returns:
+            (hit, result); result is None on a cached "not found"
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latitude, longitude, timezone, provider, found, expires_at "
+                "FROM geocode_cache WHERE location = ?", (key,)
+            ).fetchone()
+        if row is None or row[5] < time.time():
+            return False, None
+        if not row[4]:
+            return True, None
+        return True, GeocodeResult(row[0], row[1], row[2], row[3])
+
+    def set(self, key: str, result: Optional[GeocodeResult]) -> None:
+        """Store a result, or a negative entry when result is None."""
+        ttl = self.ttl_seconds if result else self.negative_ttl_seconds
+        values = (result.latitude, result.longitude, result.timezone, result.provider, 1) if result else (None, None, None, None, 0)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache "
+                "(location, latitude, longitude, timezone, provider, found, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, *values, time.time() + ttl)
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries. Returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM geocode_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ============================================================
+# Service
+# ============================================================
+
+class GeocodingService:
+    """Cached, coalescing geocoder over a chain of providers."""
+
+    def __init__(
+        self,
+        providers: Optional[Sequence[GeocodingProvider]] = None,
+        cache: Optional[GeocodeCache] = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS
+    ):
+        self.providers = list(providers) if providers is not None else default_providers()
+        self.cache = cache if cache is not None else GeocodeCache()
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"cache_hits": 0, "cache_misses": 0, "coalesced": 0, "provider_calls": 0, "provider_errors": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client, recreated if the event loop changed (e.g. between tests)."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def geocode(self, location: str) -> Optional[GeocodeResult]:
+        """
+        Resolve a location.
+
+        Args:
+            location: Location text (e.g., "New York, NY, USA")
+
+        Returns:
+            GeocodeResult, or None if no provider knows the location
+
+        Raises:
+            GeocodingError: If every provider failed to answer
+        """
+        key = normalize_location(location)
+        if not key:
+            return None
+
+        hit, result = self.cache.get(key)
+        if hit:
+            self._stats["cache_hits"] += 1
+            return result
+        self._stats["cache_misses"] += 1
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._resolve(key, location))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._stats["coalesced"] += 1
+        # Shield so one cancelled caller does not cancel the shared lookup
+        return await asyncio.shield(future)
+
+    async def _resolve(self, key: str, location: str) -> Optional[GeocodeResult]:
+        """Try each provider in order; cache definitive answers only."""
+        client = self._get_client()
+        errors = []
+        for provider in self.providers:
+            self._stats["provider_calls"] += 1
+            try:
+                result = await provider.lookup(client, location)
+            except GeocodingProviderError as e:
+                self._stats["provider_errors"] += 1
+                logger.warning(f"{e}. Trying next provider.")
+                errors.append(str(e))
+                continue
+            if result is not None:
+                if not result.timezone:
+                    result = replace(result, timezone=resolve_timezone(result.latitude, result.longitude))
+                logger.info(f"Geocoded '{location}' via {provider.name}: lat={result.latitude}, lng={result.longitude}, timezone={result.timezone}")
+                self.cache.set(key, result)
+                return result
+
+        if errors:
+            # At least one provider could not answer; don't remember this as "not found"
+            raise GeocodingError(
+                f"Could not connect to the geocoding service for '{location}'",
+                context={"errors": errors}
+            )
+        logger.warning(f"No geocoding results for location: {location}")
+        self.cache.set(key, None)
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Lookup counters since startup."""
+        return dict(self._stats, inflight=len(self._inflight))
+
+    async def close(self) -> None:
+        """Close the HTTP client and the cache connection."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.cache.close()
+
+
+_service: Optional[GeocodingService] = None
+_service_lock = threading.Lock()
+_shutdown_registered = False
+
+
+def get_geocoding_service() -> GeocodingService:
+    """Get the process-wide geocoding service, creating it on first use."""
+    global _service, _shutdown_registered
+    service = _service
+    if service is None:
+        with _service_lock:
+            if _service is None:
+                _service = GeocodingService()
+                if not _shutdown_registered:
+                    try:
+                        from app.core.shutdown import register_shutdown_handler
+                        register_shutdown_handler(_close_geocoding_service)
+                        _shutdown_registered = True
+                    except ImportError:
+                        pass
+            service = _service
+    return service
+
+
+def set_geocoding_service(service: Optional[GeocodingService]) -> None:
+    """Replace the process-wide service (e.g. with a StubProvider-backed one in tests)."""
+    global _service
+    _service = service
+
+
+async def _close_geocoding_service() -> None:
+    # Drop the closed service so a later app lifespan in this process builds a fresh one
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        await service.close()
+
+
+async def geocode_location(location: str) -> Optional[GeocodeResult]:
+    """
+    Resolve a location with the process-wide service.
+
+    Args:
+        location: Location text
+
+    Returns:
+        GeocodeResult, or None if the location could not be found
+
+    Raises:
+        GeocodingError: If the geocoding providers are unreachable
+    """
+    return await get_geocoding_service().geocode(location)
@@ -1,19 +1,43 @@
 """
 Background Job Queue Service
 
-Simple in-memory job queue for background task processing.
-For production, consider using Celery, RQ, or similar.
+Durable job queue stored in the background_jobs table (SQLite or
+PostgreSQL), so jobs survive restarts and can be shared by several
+uvicorn workers or standalone worker processes.
+
+- Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED (PostgreSQL)
+  plus a conditional UPDATE, so a job is only ever claimed once
+- A claimed job carries a lease that the worker renews while it runs;
+  jobs whose worker died are re-queued when the lease expires
+- Failed attempts are retried with exponential backoff
+  (app.core.retry.RetryConfig) up to max_attempts
+- Each worker runs a bounded number of jobs per job type
+- Start, progress, completion and failure are broadcast through
+  app.core.events (batch.job.* events)
+
+Run a standalone worker with scripts/run_job_worker.py; by default the
+web process also runs one (JOB_WORKER_EMBEDDED).
 """
 
-import logging
-import uuid
 import asyncio
-from typing import Dict, Any, Optional, Callable, List
-from datetime import datetime
-from enum import Enum
+import inspect
+import json
+import os
+import socket
+import uuid
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, or_
 
+from app.config import (
+    JOB_CONCURRENCY, JOB_DEFAULT_CONCURRENCY, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_POLL_INTERVAL_SECONDS
+)
+from app.core.events import EventType, event_broadcaster
 from app.core.logging_config import setup_logger
+from app.core.retry import RetryConfig
 
 logger = setup_logger(__name__)
 
@@ -29,7 +53,7 @@ class JobStatus(str, Enum):
 
 @dataclass
 class Job:
-    """Job data structure."""
+    """Job data structure (a snapshot of a background_jobs row)."""
     id: str
     job_type: str
     payload: Dict[str, Any]
@@ -40,143 +64,702 @@ class Job:
     result: Optional[Any] = None
     error: Optional[str] = None
     progress: float = 0.0
+    user_id: Optional[int] = None
+    attempts: int = 0
+    max_attempts: int = JOB_MAX_ATTEMPTS
+    run_after: Optional[datetime] = None
+
+
+class LeaseLostError(Exception):
+    """The job was cancelled or re-assigned while this worker was running it."""
+
+
+def parse_concurrency(spec: str) -> Dict[str, int]:
+    """
+    Parse a per-type concurrency spec.
+
+    Args:
+        spec: e.g. "batch.charts=4,batch.readings=2"
+
+    Returns:
+        Dictionary of job type -> max concurrent jobs
+    """
+    limits = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        job_type, _, value = part.partition("=")
+        try:
+            limits[job_type.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"Ignoring invalid job concurrency entry: {part!r}")
+    return limits
+
+
+def _default_session_factory():
+    from database import SessionLocal
+    return SessionLocal()
 
 
 class JobQueue:
-    """Simple in-memory job queue."""
-    
-    def __init__(self):
-        self._jobs: Dict[str, Job] = {}
+    """Durable job queue backed by the background_jobs table."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        retry_config: Optional[RetryConfig] = None,
+        lease_seconds: int = JOB_LEASE_SECONDS
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            session_factory: Returns a new SQLAlchemy session (defaults to database.SessionLocal)
+            retry_config: Backoff between attempts; max_attempts is the default per job
+            lease_seconds: How long a claim stays valid without a heartbeat
+        """
+        self._session_factory = session_factory or _default_session_factory
+        self.retry_config = retry_config or RetryConfig(max_attempts=JOB_MAX_ATTEMPTS, initial_delay=5.0, max_delay=300.0)
+        self.lease_seconds = lease_seconds
         self._handlers: Dict[str, Callable] = {}
-        self._running_tasks: Dict[str, asyncio.Task] = {}
-    
-    def register_handler(self, job_type: str, handler: Callable):
-        """Register a handler for a job type."""
+        self._concurrency: Dict[str, int] = {}
+        self._listeners: List[Callable[[], None]] = []
+
+    def register_handler(self, job_type: str, handler: Callable, concurrency: Optional[int] = None):
+        """
+        Register a handler for a job type.
+
+        Args:
+            job_type: Job type name
+            handler: Callable(payload, context) (async or sync) returning a JSON-serializable result;
+                context is a JobContext for progress reporting
+            concurrency: Default max concurrent jobs of this type per worker (JOB_CONCURRENCY overrides)
+        """
         self._handlers[job_type] = handler
+        if concurrency:
+            self._concurrency[job_type] = concurrency
         logger.info(f"Registered handler for job type: {job_type}")
-    
+
+    def get_handler(self, job_type: str) -> Optional[Callable]:
+        return self._handlers.get(job_type)
+
+    def concurrency_limits(self) -> Dict[str, int]:
+        """Per-type concurrency for registered handlers (JOB_CONCURRENCY overrides handler defaults)."""
+        configured = parse_concurrency(JOB_CONCURRENCY)
+        return {
+            job_type: configured.get(job_type, self._concurrency.get(job_type, JOB_DEFAULT_CONCURRENCY))
+            for job_type in self._handlers
+        }
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Register a callback invoked when a job is enqueued in this process (wakes local workers)."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    # ------------------------------------------------------------
+    # Producer / admin API
+    # ------------------------------------------------------------
+
     def create_job(
         self,
         job_type: str,
-        payload: Dict[str, Any]
+        payload: Dict[str, Any],
+        user_id: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        delay_seconds: float = 0.0
     ) -> Job:
-        """Create a new job."""
-        job_id = str(uuid.uuid4())
-        job = Job(
-            id=job_id,
+        """
+        Enqueue a new job.
+
+        Args:
+            job_type: Job type (a handler must be registered in some worker)
+            payload: JSON-serializable job input
+            user_id: Optional owner; progress events are delivered to this user
+            max_attempts: Attempts before the job is marked failed (default from retry config)
+            delay_seconds: Do not run before this many seconds from now
+
+        Returns:
+            The created Job
+        """
+        from database import BackgroundJob
+
+        now = datetime.utcnow()
+        row = BackgroundJob(
+            id=str(uuid.uuid4()),
             job_type=job_type,
-            payload=payload
+            status=JobStatus.PENDING.value,
+            user_id=user_id,
+            payload_json=json.dumps(payload),
+            attempts=0,
+            max_attempts=max_attempts or self.retry_config.max_attempts,
+            run_after=now + timedelta(seconds=delay_seconds),
+            progress=0.0,
+            created_at=now
         )
-        self._jobs[job_id] = job
-        
-        # Start processing if handler exists
-        if job_type in self._handlers:
-            self._start_job(job)
-        
-        logger.info(f"Created job {job_id} of type {job_type}")
-        return job
-    
-    def _start_job(self, job: Job):
-        """Start processing a job."""
-        if job.status != JobStatus.PENDING:
-            return
-        
-        job.status = JobStatus.RUNNING
-        job.started_at = datetime.utcnow()
-        
-        handler = self._handlers.get(job.job_type)
-        if not handler:
-            job.status = JobStatus.FAILED
-            job.error = f"No handler registered for job type: {job.job_type}"
-            return
-        
-        # Create async task
-        task = asyncio.create_task(self._process_job(job, handler))
-        self._running_tasks[job.id] = task
-    
-    async def _process_job(self, job: Job, handler: Callable):
-        """Process a job with the given handler."""
+        db = self._session_factory()
         try:
-            if asyncio.iscoroutinefunction(handler):
-                result = await handler(job.payload)
-            else:
-                result = handler(job.payload)
-            
-            job.status = JobStatus.COMPLETED
-            job.completed_at = datetime.utcnow()
-            job.result = result
-            job.progress = 100.0
-            
-            logger.info(f"Job {job.id} completed successfully")
-        except Exception as e:
-            job.status = JobStatus.FAILED
-            job.completed_at = datetime.utcnow()
-            job.error = str(e)
-            logger.error(f"Job {job.id} failed: {str(e)}")
+            db.add(row)
+            db.commit()
+            job = self._to_job(row)
         finally:
-            if job.id in self._running_tasks:
-                del self._running_tasks[job.id]
-    
+            db.close()
+
+        logger.info(f"Created job {job.id} of type {job_type}")
+        for listener in list(self._listeners):
+            try:
+                listener()
+            except Exception as e:
+                logger.warning(f"Job queue listener failed: {e}")
+        return job
+
     def get_job(self, job_id: str) -> Optional[Job]:
         """Get a job by ID."""
-        return self._jobs.get(job_id)
-    
+        from database import BackgroundJob
+
+        db = self._session_factory()
+        try:
+            row = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+            return self._to_job(row) if row else None
+        finally:
+            db.close()
+
     def list_jobs(
         self,
         status: Optional[JobStatus] = None,
         job_type: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        job_types: Optional[Sequence[str]] = None
     ) -> List[Job]:
-        """List jobs with optional filtering."""
-        jobs = list(self._jobs.values())
-        
-        if status:
-            jobs = [j for j in jobs if j.status == status]
-        
-        if job_type:
-            jobs = [j for j in jobs if j.job_type == job_type]
-        
-        # Sort by created_at descending
-        jobs.sort(key=lambda j: j.created_at, reverse=True)
-        
-        return jobs[:limit]
-    
+        """List jobs with optional filtering, newest first."""
+        from database import BackgroundJob
+
+        db = self._session_factory()
+        try:
+            query = db.query(BackgroundJob)
+            if status:
+                query = query.filter(BackgroundJob.status == JobStatus(status).value)
+            if job_type:
+                query = query.filter(BackgroundJob.job_type == job_type)
+            if job_types:
+                query = query.filter(BackgroundJob.job_type.in_(list(job_types)))
+            if user_id is not None:
+                query = query.filter(BackgroundJob.user_id == user_id)
+            rows = query.order_by(BackgroundJob.created_at.desc()).limit(limit).all()
+            return [self._to_job(row) for row in rows]
+        finally:
+            db.close()
+
     def cancel_job(self, job_id: str) -> bool:
-        """Cancel a pending or running job."""
-        job = self._jobs.get(job_id)
-        if not job:
-            return False
-        
-        if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
-            return False
-        
-        job.status = JobStatus.CANCELLED
-        job.completed_at = datetime.utcnow()
-        
-        # Cancel running task
-        if job_id in self._running_tasks:
-            task = self._running_tasks[job_id]
-            task.cancel()
-            del self._running_tasks[job_id]
-        
-        logger.info(f"Job {job_id} cancelled")
-        return True
-    
+        """
+        Cancel a pending or running job.
+
+        A running job is stopped by its worker at the next heartbeat.
+        """
+        from database import BackgroundJob
+
+        db = self._session_factory()
+        try:
+            updated = db.query(BackgroundJob).filter(
+                BackgroundJob.id == job_id,
+                BackgroundJob.status.in_([JobStatus.PENDING.value, JobStatus.RUNNING.value])
+            ).update({
+                BackgroundJob.status: JobStatus.CANCELLED.value,
+                BackgroundJob.completed_at: datetime.utcnow(),
+                BackgroundJob.lease_owner: None,
+                BackgroundJob.lease_expires_at: None
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+        if updated:
+            logger.info(f"Job {job_id} cancelled")
+        return bool(updated)
+
     def get_queue_stats(self) -> Dict[str, Any]:
         """Get queue statistics."""
-        jobs = list(self._jobs.values())
-        
+        from sqlalchemy import func
+        from database import BackgroundJob
+
+        db = self._session_factory()
+        try:
+            counts = dict(
+                db.query(BackgroundJob.status, func.count(BackgroundJob.id)).group_by(BackgroundJob.status).all()
+            )
+        finally:
+            db.close()
+
+        return {
+            "total_jobs": sum(counts.values()),
+            "pending": counts.get(JobStatus.PENDING.value, 0),
+            "running": counts.get(JobStatus.RUNNING.value, 0),
+            "completed": counts.get(JobStatus.COMPLETED.value, 0),
+            "failed": counts.get(JobStatus.FAILED.value, 0),
+            "cancelled": counts.get(JobStatus.CANCELLED.value, 0),
+            "registered_handlers": list(self._handlers.keys()),
+            "concurrency": self.concurrency_limits()
+        }
+
+    # ------------------------------------------------------------
+    # Worker API
+    # ------------------------------------------------------------
+
+    def claim(self, worker_id: str, slots: Dict[str, int]) -> List[Job]:
+        """
+        Claim runnable jobs for a worker.
+
+        A job is runnable when it is pending and past run_after, or running
+        under an expired lease (its worker died). Rows are locked with
+        FOR UPDATE SKIP LOCKED where supported, and each claim is a
+        conditional UPDATE, so concurrent workers never claim the same job.
+
+        Args:
+            worker_id: Claiming worker
+            slots: Job type -> number of jobs the worker can start now
+
+        Returns:
+            Claimed jobs (status running, attempts incremented)
+        """
+        from database import BackgroundJob
+
+        now = datetime.utcnow()
+        lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+        runnable = or_(
+            and_(BackgroundJob.status == JobStatus.PENDING.value, BackgroundJob.run_after <= now),
+            and_(BackgroundJob.status == JobStatus.RUNNING.value, BackgroundJob.lease_expires_at < now)
+        )
+
+        db = self._session_factory()
+        try:
+            self._fail_exhausted_leases(db, now)
+            claimed_ids = []
+            for job_type, count in slots.items():
+                if count <= 0:
+                    continue
+                candidate_ids = [
+                    row[0] for row in db.query(BackgroundJob.id)
+                    .filter(BackgroundJob.job_type == job_type, runnable)
+                    .order_by(BackgroundJob.run_after, BackgroundJob.created_at)
+                    .limit(count)
+                    .with_for_update(skip_locked=True)
+                    .all()
+                ]
+                for job_id in candidate_ids:
+                    won = db.query(BackgroundJob).filter(BackgroundJob.id == job_id, runnable).update({
+                        BackgroundJob.status: JobStatus.RUNNING.value,
+                        BackgroundJob.lease_owner: worker_id,
+                        BackgroundJob.lease_expires_at: lease_expires_at,
+                        BackgroundJob.attempts: BackgroundJob.attempts + 1,
+                        BackgroundJob.started_at: now
+                    }, synchronize_session=False)
+                    if won:
+                        claimed_ids.append(job_id)
+            db.commit()
+
+            if not claimed_ids:
+                return []
+            rows = db.query(BackgroundJob).filter(BackgroundJob.id.in_(claimed_ids)).all()
+            return [self._to_job(row) for row in rows]
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _fail_exhausted_leases(self, db, now: datetime):
+        """Expired leases on their last attempt are failed instead of re-run."""
+        from database import BackgroundJob
+
+        db.query(BackgroundJob).filter(
+            BackgroundJob.status == JobStatus.RUNNING.value,
+            BackgroundJob.lease_expires_at < now,
+            BackgroundJob.attempts >= BackgroundJob.max_attempts
+        ).update({
+            BackgroundJob.status: JobStatus.FAILED.value,
+            BackgroundJob.error: "Worker lease expired on the final attempt",
+            BackgroundJob.completed_at: now,
+            BackgroundJob.lease_owner: None,
+            BackgroundJob.lease_expires_at: None
+        }, synchronize_session=False)
+
+    def _update_leased(self, job_id: str, worker_id: str, values: Dict[Any, Any]) -> bool:
+        """Apply values to a running job only while worker_id holds its lease."""
+        from database import BackgroundJob
+
+        db = self._session_factory()
+        try:
+            updated = db.query(BackgroundJob).filter(
+                BackgroundJob.id == job_id,
+                BackgroundJob.status == JobStatus.RUNNING.value,
+                BackgroundJob.lease_owner == worker_id
+            ).update(values, synchronize_session=False)
+            db.commit()
+            return bool(updated)
+        finally:
+            db.close()
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Renew a lease.
+
+        Returns:
+            False if the job was cancelled or re-claimed by another worker
+        """
+        from database import BackgroundJob
+
+        return self._update_leased(job_id, worker_id, {
+            BackgroundJob.lease_expires_at: datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+        })
+
+    def update_progress(self, job_id: str, worker_id: str, progress: float, partial_result: Optional[Any] = None) -> bool:
+        """Record progress (0-100) and optionally a partial result."""
+        from database import BackgroundJob
+
+        values = {BackgroundJob.progress: progress}
+        if partial_result is not None:
+            values[BackgroundJob.result_json] = json.dumps(partial_result, default=str)
+        return self._update_leased(job_id, worker_id, values)
+
+    def complete(self, job_id: str, worker_id: str, result: Any) -> bool:
+        """Mark a job completed with its result."""
+        from database import BackgroundJob
+
+        return self._update_leased(job_id, worker_id, {
+            BackgroundJob.status: JobStatus.COMPLETED.value,
+            BackgroundJob.result_json: json.dumps(result, default=str),
+            BackgroundJob.error: None,
+            BackgroundJob.progress: 100.0,
+            BackgroundJob.completed_at: datetime.utcnow(),
+            BackgroundJob.lease_owner: None,
+            BackgroundJob.lease_expires_at: None
+        })
+
+    def fail(self, job_id: str, worker_id: str, error: str, attempts: int, max_attempts: int, retryable: bool = True) -> bool:
+        """
+        Record a failed attempt.
+
+        Args:
+            job_id: Job ID
+            worker_id: Worker holding the lease
+            error: Error message
+            attempts: Attempts made so far (including this one)
+            max_attempts: Attempt limit of the job
+            retryable: False to fail the job without further attempts
+
+        Returns:
+            True if the job was re-queued for another attempt
+        """
+        from database import BackgroundJob
+
+        now = datetime.utcnow()
+        if retryable and attempts < max_attempts:
+            delay = self.retry_config.calculate_delay(attempts)
+            self._update_leased(job_id, worker_id, {
+                BackgroundJob.status: JobStatus.PENDING.value,
+                BackgroundJob.error: error,
+                BackgroundJob.run_after: now + timedelta(seconds=delay),
+                BackgroundJob.lease_owner: None,
+                BackgroundJob.lease_expires_at: None
+            })
+            logger.warning(f"Job {job_id} attempt {attempts}/{max_attempts} failed, retrying in {delay:.1f}s: {error}")
+            return True
+
+        self._update_leased(job_id, worker_id, {
+            BackgroundJob.status: JobStatus.FAILED.value,
+            BackgroundJob.error: error,
+            BackgroundJob.completed_at: now,
+            BackgroundJob.lease_owner: None,
+            BackgroundJob.lease_expires_at: None
+        })
+        logger.error(f"Job {job_id} failed after {attempts} attempt(s): {error}")
+        return False
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Hand an interrupted job back to the queue without counting the attempt (worker shutdown)."""
+        from database import BackgroundJob
+
+        return self._update_leased(job_id, worker_id, {
+            BackgroundJob.status: JobStatus.PENDING.value,
+            BackgroundJob.attempts: BackgroundJob.attempts - 1,
+            BackgroundJob.run_after: datetime.utcnow(),
+            BackgroundJob.lease_owner: None,
+            BackgroundJob.lease_expires_at: None
+        })
+
+    @staticmethod
+    def _to_job(row) -> Job:
+        return Job(
+            id=row.id,
+            job_type=row.job_type,
+            payload=json.loads(row.payload_json) if row.payload_json else {},
+            status=JobStatus(row.status),
+            created_at=row.created_at,
+            started_at=row.started_at,
+            completed_at=row.completed_at,
+            result=json.loads(row.result_json) if row.result_json else None,
+            error=row.error,
+            progress=row.progress or 0.0,
+            user_id=row.user_id,
+            attempts=row.attempts,
+            max_attempts=row.max_attempts,
+            run_after=row.run_after
+        )
+
+
+class JobContext:
+    """Passed to job handlers for progress reporting."""
+
+    def __init__(self, queue: JobQueue, job: Job, worker_id: str):
+        self.queue = queue
+        self.job = job
+        self.worker_id = worker_id
+
+    @property
+    def job_id(self) -> str:
+        return self.job.id
+
+    async def report_progress(self, progress: float, partial_result: Optional[Any] = None, **event_data):
+        """
+        Persist progress and broadcast a batch.job.progress event.
+
+        Args:
+            progress: Percent complete (0-100)
+            partial_result: Optional partial result, readable through get_job() while running
+            **event_data: Extra fields for the event
+
+        Raises:
+            LeaseLostError: If the job was cancelled or re-assigned meanwhile
+        """
+        still_owned = await asyncio.to_thread(
+            self.queue.update_progress, self.job.id, self.worker_id, progress, partial_result
+        )
+        if not still_owned:
+            raise LeaseLostError(f"Job {self.job.id} is no longer leased to {self.worker_id}")
+        await _broadcast_job_event(EventType.BATCH_JOB_PROGRESS, self.job, progress=round(progress, 2), **event_data)
+
+
+async def _broadcast_job_event(event_type: EventType, job: Job, **data):
+    try:
+        await event_broadcaster.broadcast(
+            event_type,
+            {"job_id": job.id, "job_type": job.job_type, **data},
+            user_id=job.user_id
+        )
+    except Exception as e:
+        logger.warning(f"Failed to broadcast {event_type.value} for job {job.id}: {e}")
+
+
+class JobWorker:
+    """
+    Claims and runs jobs from a JobQueue.
+
+    Runs at most concurrency[job_type] jobs of each type at once and
+    renews each job's lease while its handler runs.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            queue: Job queue (defaults to the global one)
+            concurrency: Job type -> max concurrent jobs (defaults to queue.concurrency_limits())
+            poll_interval: Seconds between claim attempts when idle
+            worker_id: Lease owner name (defaults to host:pid:random)
+        """
+        self.queue = queue or job_queue
+        self._concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: Dict[str, asyncio.Task] = {}
+        self._running_by_type: Dict[str, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self.processed = 0
+
+    @property
+    def concurrency(self) -> Dict[str, int]:
+        return self._concurrency if self._concurrency is not None else self.queue.concurrency_limits()
+
+    def _free_slots(self) -> Dict[str, int]:
         return {
-            "total_jobs": len(jobs),
-            "pending": len([j for j in jobs if j.status == JobStatus.PENDING]),
-            "running": len([j for j in jobs if j.status == JobStatus.RUNNING]),
-            "completed": len([j for j in jobs if j.status == JobStatus.COMPLETED]),
-            "failed": len([j for j in jobs if j.status == JobStatus.FAILED]),
-            "cancelled": len([j for j in jobs if j.status == JobStatus.CANCELLED]),
-            "registered_handlers": list(self._handlers.keys())
+            job_type: limit - self._running_by_type.get(job_type, 0)
+            for job_type, limit in self.concurrency.items()
+            if self.queue.get_handler(job_type) is not None
         }
 
+    def _notify(self):
+        """Wake the claim loop (safe to call from any thread)."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def poll_once(self) -> int:
+        """
+        Claim jobs for every free slot and start them.
+
+        Returns:
+            Number of jobs started
+        """
+        slots = {job_type: free for job_type, free in self._free_slots().items() if free > 0}
+        if not slots:
+            return 0
+        jobs = await asyncio.to_thread(self.queue.claim, self.worker_id, slots)
+        for job in jobs:
+            self._running_by_type[job.job_type] = self._running_by_type.get(job.job_type, 0) + 1
+            task = asyncio.create_task(self._execute(job), name=f"job:{job.id}")
+            self._running[job.id] = task
+        return len(jobs)
+
+    async def run(self):
+        """Claim and run jobs until stop() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.queue.add_listener(self._notify)
+        logger.info(f"Job worker {self.worker_id} started (concurrency: {self.concurrency})")
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+                try:
+                    await self.poll_once()
+                except Exception as e:
+                    logger.error(f"Job worker {self.worker_id} failed to claim jobs: {e}", exc_info=True)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.queue.remove_listener(self._notify)
+
+    async def run_until_idle(self, idle_polls: int = 1) -> int:
+        """
+        Run until no job is running and nothing can be claimed (tests, benchmarks, --once).
+
+        Returns:
+            Number of jobs processed
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        start = self.processed
+        idle = 0
+        while idle < idle_polls:
+            started = await self.poll_once()
+            if self._running:
+                self._wakeup.clear()
+                await asyncio.wait(list(self._running.values()), return_when=asyncio.FIRST_COMPLETED)
+                idle = 0
+            elif not started:
+                idle += 1
+        return self.processed - start
+
+    def start(self) -> asyncio.Task:
+        """Run the worker as a background task on the current event loop."""
+        self._stopping = False
+        self._task = asyncio.create_task(self.run(), name=f"job-worker:{self.worker_id}")
+        return self._task
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Stop claiming, wait up to timeout for running jobs, then release the rest.
+
+        Args:
+            timeout: Seconds to let running jobs finish
+        """
+        self._stopping = True
+        self._notify()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._running:
+            await asyncio.wait(list(self._running.values()), timeout=timeout)
+        for job_id, task in list(self._running.items()):
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.to_thread(self.queue.release, job_id, self.worker_id)
+            logger.info(f"Released job {job_id} back to the queue")
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    async def _heartbeat(self, job: Job, handler_task: asyncio.Task):
+        interval = max(self.queue.lease_seconds / 3, 0.05)
+        while not handler_task.done():
+            await asyncio.sleep(interval)
+            if not await asyncio.to_thread(self.queue.heartbeat, job.id, self.worker_id):
+                logger.info(f"Job {job.id} lease lost (cancelled or re-assigned), stopping it")
+                handler_task.cancel()
+                return
+
+    async def _execute(self, job: Job):
+        handler = self.queue.get_handler(job.job_type)
+        context = JobContext(self.queue, job, self.worker_id)
+        try:
+            await _broadcast_job_event(EventType.BATCH_JOB_STARTED, job, attempt=job.attempts)
+            if inspect.iscoroutinefunction(handler):
+                handler_task = asyncio.create_task(handler(job.payload, context))
+            else:
+                handler_task = asyncio.create_task(asyncio.to_thread(handler, job.payload, context))
+            heartbeat = asyncio.create_task(self._heartbeat(job, handler_task))
+            try:
+                result = await handler_task
+            except asyncio.CancelledError:
+                if heartbeat.done():
+                    return  # Cancelled or re-assigned elsewhere; nothing to record
+                raise
+            finally:
+                heartbeat.cancel()
+
+            if await asyncio.to_thread(self.queue.complete, job.id, self.worker_id, result):
+                await _broadcast_job_event(EventType.BATCH_JOB_COMPLETED, job, progress=100.0)
+                logger.info(f"Job {job.id} completed successfully")
+        except LeaseLostError as e:
+            logger.info(str(e))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retryable = any(isinstance(e, exc_type) for exc_type in self.queue.retry_config.retryable_exceptions)
+            will_retry = await asyncio.to_thread(
+                self.queue.fail, job.id, self.worker_id, str(e), job.attempts, job.max_attempts, retryable
+            )
+            if not will_retry:
+                await _broadcast_job_event(EventType.BATCH_JOB_FAILED, job, error=str(e), attempts=job.attempts)
+        finally:
+            self.processed += 1
+            self._running.pop(job.id, None)
+            self._running_by_type[job.job_type] -= 1
+            if self._wakeup is not None:
+                self._wakeup.set()
+
 
 # Global job queue instance
 job_queue = JobQueue()
 
+_embedded_worker: Optional[JobWorker] = None
+
+
+def start_embedded_worker() -> JobWorker:
+    """Start a worker inside the web process (JOB_WORKER_EMBEDDED)."""
+    global _embedded_worker
+    if _embedded_worker is None:
+        # Importing registers the batch handlers
+        import app.services.batch_service  # noqa: F401
+        _embedded_worker = JobWorker()
+        _embedded_worker.start()
+    return _embedded_worker
+
+
+async def stop_embedded_worker():
+    """Stop the embedded worker, releasing unfinished jobs back to the queue."""
+    global _embedded_worker
+    if _embedded_worker is not None:
+        await _embedded_worker.stop()
+        _embedded_worker = None
@@ -0,0 +1,283 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for Gemini3Client/ClaudeClient.generate():
+
+- Key: SHA-256 of (provider, model, system prompt, user prompt, temperature,
+  max tokens), so any prompt or parameter change is a miss
+- Values (response text + the token usage of the original call) are
+  zlib-compressed
+- Disk (SQLite) backend with least-recently-used eviction once the stored
+  bytes exceed LLM_CACHE_MAX_BYTES, or Redis with the same byte bound
+- Entries also expire after LLM_CACHE_TTL_SECONDS
+
+Hits skip the API call entirely; the clients report cached tokens
+separately from billed tokens in get_summary().
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from app.config import (
+    LLM_CACHE_BACKEND, LLM_CACHE_ENABLED, LLM_CACHE_MAX_BYTES, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored entry format changes
+LLM_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A stored LLM response and the usage of the call that produced it."""
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    model: str
+    created_at: float
+
+
+def llm_cache_key(provider: str, model: str, system: str, user: str, temperature: float, max_tokens: int) -> str:
+    """
+    Build the content address of an LLM call.
+
+    Args:
+        provider: "gemini" or "claude"
+        model: Model name
+        system: System prompt
+        user: User prompt
+        temperature: Sampling temperature
+        max_tokens: Output token limit
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        [LLM_CACHE_VERSION, provider, model, system, user, round(float(temperature), 4), int(max_tokens)],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _compress(entry: CachedResponse) -> bytes:
+    return zlib.compress(json.dumps(asdict(entry)).encode("utf-8"), 6)
+
+
+def _decompress(blob: bytes) -> CachedResponse:
+    return CachedResponse(**json.loads(zlib.decompress(blob).decode("utf-8")))
+
+
+class DiskLLMCache:
+    """SQLite store of compressed responses with a total-size bound (LRU eviction)."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Look up a response, refreshing its LRU position."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return _decompress(row[0])
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        """Store a response, evicting least recently used entries beyond max_bytes."""
+        blob = _compress(entry)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(blob), len(blob), now + self.ttl_seconds, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        to_free = total - self.max_bytes
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            doomed.append((key,))
+            to_free -= size
+            if to_free <= 0:
+                break
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+        logger.info(f"LLM cache evicted {len(doomed)} entries to stay under {self.max_bytes} bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {"backend": "disk", "entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisLLMCache:
+    """
+    Redis store of compressed responses with a total-size bound.
+
+    Values live under llm:resp:<key> with a TTL; a sorted set scored by
+    last access and a hash of entry sizes drive LRU eviction.
+    """
+    _prefix = "llm:resp:"
+    _lru_key = "llm:lru"
+    _sizes_key = "llm:sizes"
+
+    def __init__(self, client, max_bytes: int = LLM_CACHE_MAX_BYTES, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.client = client
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        blob = self.client.get(self._prefix + key)
+        if blob is None:
+            # Expired by TTL: drop its bookkeeping too
+            self.client.zrem(self._lru_key, key)
+            self.client.hdel(self._sizes_key, key)
+            return None
+        self.client.zadd(self._lru_key, {key: time.time()})
+        if isinstance(blob, str):
+            blob = blob.encode("latin-1")
+        return _decompress(blob)
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        blob = _compress(entry)
+        if len(blob) > self.max_bytes:
+            return
+        pipe = self.client.pipeline()
+        # latin-1 round-trips arbitrary bytes through decode_responses=True clients
+        pipe.setex(self._prefix + key, self.ttl_seconds, blob.decode("latin-1"))
+        pipe.zadd(self._lru_key, {key: time.time()})
+        pipe.hset(self._sizes_key, key, len(blob))
+        pipe.execute()
+        self._evict()
+
+    def _evict(self) -> None:
+        sizes = {k if isinstance(k, str) else k.decode(): int(v) for k, v in self.client.hgetall(self._sizes_key).items()}
+        total = sum(sizes.values())
+        evicted = 0
+        while total > self.max_bytes:
+            oldest = self.client.zpopmin(self._lru_key)
+            if not oldest:
+                break
+            key = oldest[0][0] if isinstance(oldest[0][0], str) else oldest[0][0].decode()
+            total -= sizes.pop(key, 0)
+            self.client.delete(self._prefix + key)
+            self.client.hdel(self._sizes_key, key)
+            evicted += 1
+        if evicted:
+            logger.info(f"LLM cache evicted {evicted} entries to stay under {self.max_bytes} bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = self.client.hgetall(self._sizes_key)
+        return {"backend": "redis", "entries": len(sizes), "bytes": sum(int(v) for v in sizes.values()), "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        keys = list(self.client.hkeys(self._sizes_key))
+        if keys:
+            self.client.delete(*[self._prefix + (k if isinstance(k, str) else k.decode()) for k in keys])
+        self.client.delete(self._lru_key, self._sizes_key)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Get the process-wide LLM response cache.
+
+    Returns:
+        DiskLLMCache or RedisLLMCache, or None when caching is disabled or
+        the store cannot be opened
+    """
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                if LLM_CACHE_BACKEND == "redis":
+                    from app.core.cache import _redis_client
+                    if _redis_client is None:
+                        logger.warning("LLM_CACHE_BACKEND=redis but Redis is unavailable, using the disk cache")
+                    else:
+                        _cache = RedisLLMCache(_redis_client)
+                if _cache is None:
+                    _cache = DiskLLMCache()
+            except Exception as e:
+                logger.warning(f"LLM response cache unavailable: {e}")
+                return None
+        return _cache
+
+
+def set_llm_cache(cache) -> None:
+    """Replace the process-wide cache (None re-opens the configured one on next use)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def lookup_response(key: str) -> Optional[CachedResponse]:
+    """Cache lookup that never fails the LLM call."""
+    cache = get_llm_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"LLM cache read failed: {e}")
+        return None
+
+
+def store_response(key: str, text: str, prompt_tokens: int, completion_tokens: int, model: str) -> None:
+    """Cache store that never fails the LLM call."""
+    cache = get_llm_cache()
+    if cache is None:
+        return
+    try:
+        cache.set(key, CachedResponse(text, int(prompt_tokens), int(completion_tokens), model, time.time()))
+    except Exception as e:
+        logger.warning(f"LLM cache write failed: {e}")
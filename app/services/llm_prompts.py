@@ -13,9 +13,10 @@ Last verified: 2025-01-21
 
 import os
 import json
+import asyncio
 import logging
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -41,9 +42,11 @@ from .llm_service import (
 )
 
 # Import for famous people matching
-from services.similarity_service import find_similar_famous_people_internal
+from services.similarity_service import match_famous_people
 
 from app.core.logging_config import get_logger
+from app.services.reading_stream import ReadingStreamer
+from app.services.pipeline_executor import PipelineExecutor, PipelineResult, PipelineStage
 
 logger = get_logger(__name__)
 
@@ -51,6 +54,7 @@ logger = get_logger(__name__)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 AI_MODE = os.getenv("AI_MODE", "real").lower()  # "real" or "stub" for local testing
+LLM_PROVIDER_CONCURRENCY = int(os.getenv("LLM_PROVIDER_CONCURRENCY", "2"))  # Concurrent LLM calls per reading
 
 
 # ⚠️ PRESERVATION ZONE START - PROMPT FUNCTION: g0_global_blueprint
@@ -1228,9 +1232,111 @@ Provide 4-6 paragraphs of insightful, specific analysis that gives readers a mea
 # ⚠️ PRESERVATION ZONE END - PROMPT FUNCTION: generate_snapshot_reading
 
 
+# --- Full reading stage graph (orchestration only; prompts live in g0-g4) ---
+async def _run_full_reading_pipeline(
+    llm,
+    famous_llm,
+    chart_data: dict,
+    serialized_chart: dict,
+    chart_summary: str,
+    unknown_time: bool,
+    db: Optional[Session],
+    streamer: ReadingStreamer
+) -> Tuple[str, PipelineResult]:
+    """
+    Run G0-G4 and famous-people matching as a DAG.
+
+    Famous-people matching needs only chart_data and G4 needs only the
+    matches, so that branch starts at t=0 alongside G0 -> G1 -> G2 -> G3.
+    It uses its own client (famous_llm) so per-step cost logs stay exact.
+    G2 stays a single call: its chapters are one preserved prompt.
+
+    Returns:
+        (polished reading with the famous people section appended, pipeline result)
+    """
+    async def blueprint():
+        return await g0_global_blueprint(llm, serialized_chart, chart_summary, unknown_time)
+
+    async def natal_foundation(blueprint):
+        natal_sections = await g1_natal_foundation(llm, serialized_chart, chart_summary, blueprint, unknown_time)
+        streamer.end_call("G1_natal_foundation")
+        return natal_sections
+
+    async def deep_dive(blueprint, natal_foundation):
+        deep_sections = await g2_deep_dive_chapters(llm, serialized_chart, chart_summary, blueprint, natal_foundation, unknown_time)
+        streamer.end_call("G2_deep_dive_chapters")
+        return deep_sections
+
+    async def polished(natal_foundation, deep_dive):
+        full_draft = f"{natal_foundation}\n\n{deep_dive}"
+        logger.info(f"Combined draft length: {len(full_draft)} characters")
+        polished_reading = await g3_polish_full_reading(llm, full_draft, chart_summary)
+        streamer.end_call("G3_polish_full_reading")
+        return polished_reading
+
+    async def famous_matches():
+        logger.info("FAMOUS PEOPLE MATCHING - STARTING (concurrent with G0-G3)")
+        famous_start = time.time()
+        # Scoring and its queries are synchronous; keep them off the event loop
+        matches = await asyncio.to_thread(match_famous_people, chart_data, limit=8, db=db)
+        logger.info(f"Famous people matching completed in {time.time() - famous_start:.2f} seconds")
+        logger.info(f"match_famous_people returned: {matches.get('matches_found', 0)} matches out of {matches.get('total_compared', 0)} compared")
+        return matches
+
+    async def famous_people(famous_matches):
+        if not famous_matches or not famous_matches.get('matches'):
+            logger.info("No famous people matches found or empty result")
+            return ""
+        logger.info(f"Found {len(famous_matches['matches'])} famous people matches, generating section...")
+        section = await g4_famous_people_section(
+            famous_llm, serialized_chart, chart_summary, famous_matches['matches'], unknown_time
+        )
+        streamer.end_call("G4_famous_people_section")
+        return section
+
+    stages = [
+        PipelineStage("blueprint", blueprint, provider="llm"),
+        PipelineStage("natal_foundation", natal_foundation, ("blueprint",), provider="llm"),
+        PipelineStage("deep_dive", deep_dive, ("blueprint", "natal_foundation"), provider="llm"),
+        PipelineStage("polished", polished, ("natal_foundation", "deep_dive"), provider="llm"),
+    ]
+    if db:
+        # Optional: a failure here leaves the reading without the famous people section
+        stages += [
+            PipelineStage("famous_matches", famous_matches, optional=True),
+            PipelineStage("famous_people", famous_people, ("famous_matches",), provider="llm", optional=True),
+        ]
+
+    executor = PipelineExecutor(
+        stages,
+        provider_limits={"llm": LLM_PROVIDER_CONCURRENCY},
+        on_stage_start=streamer.progress
+    )
+    result = await executor.run()
+    result.log_breakdown(logger)
+
+    final_reading = result.results["polished"]
+    famous_people_section = result.results.get("famous_people")
+    if famous_people_section:
+        final_reading = f"{final_reading}\n\n{famous_people_section}"
+        logger.info(f"Famous people section added - Final reading length: {len(final_reading)} characters")
+    return final_reading, result
+
+
+def _merge_llm_summaries(*clients) -> dict:
+    """Combine get_summary() of several LLM clients used for one reading."""
+    summaries = [client.get_summary() for client in clients]
+    return {key: sum(summary[key] for summary in summaries) for key in summaries[0]}
+
+
 # ⚠️ PRESERVATION ZONE START - PROMPT FUNCTION: get_gemini3_reading
-async def get_gemini3_reading(chart_data: dict, unknown_time: bool, db: Session = None) -> str:
-    """Four-call Gemini 3 pipeline with optional famous people section."""
+async def get_gemini3_reading(chart_data: dict, unknown_time: bool, db: Session = None, stream_topic: Optional[str] = None, bypass_llm_cache: bool = False) -> str:
+    """Four-call Gemini 3 pipeline with optional famous people section.
+    
+    With stream_topic (the chart hash), LLM deltas and each completed section
+    are published through app.core.events as they are generated.
+    bypass_llm_cache forces fresh LLM calls instead of reusing cached responses.
+    """
     reading_start_time = time.time()
     
     if not GEMINI_API_KEY and AI_MODE != "stub":
@@ -1249,6 +1355,12 @@ async def get_gemini3_reading(chart_data: dict, unknown_time: bool, db: Session
     
     llm = Gemini3Client()
     
+    # Live deltas and completed sections for /ws/reading and /stream_reading (no-op without a topic)
+    streamer = ReadingStreamer(stream_topic)
+    if streamer.enabled:
+        llm.delta_handler = streamer.on_delta
+        streamer.start()
+    
     try:
         # Step 0: Serialize chart data
         logger.info("Preparing chart data for LLM...")
@@ -1257,54 +1369,20 @@ async def get_gemini3_reading(chart_data: dict, unknown_time: bool, db: Session
         logger.info(f"Chart serialized - Summary length: {len(chart_summary)} characters")
         logger.info("="*80)
         
-        # Step 1: Global Blueprint
-        blueprint = await g0_global_blueprint(llm, serialized_chart, chart_summary, unknown_time)
-        
-        # Step 2: Natal Foundation
-        natal_sections = await g1_natal_foundation(llm, serialized_chart, chart_summary, blueprint, unknown_time)
-        
-        # Step 3: Deep Dive Chapters
-        deep_sections = await g2_deep_dive_chapters(llm, serialized_chart, chart_summary, blueprint, natal_sections, unknown_time)
-        
-        # Step 4: Combine and Polish
-        full_draft = f"{natal_sections}\n\n{deep_sections}"
-        logger.info(f"Combined draft length: {len(full_draft)} characters")
-        final_reading = await g3_polish_full_reading(llm, full_draft, chart_summary)
-        
-        # Step 5: Generate famous people section if database session is available
-        famous_people_section = ""
-        if db:
-            try:
-                logger.info("="*80)
-                logger.info("FAMOUS PEOPLE MATCHING - STARTING")
-                logger.info("="*80)
-                logger.info("Calling find_similar_famous_people_internal to find matches...")
-                famous_start = time.time()
-                famous_people_matches = await find_similar_famous_people_internal(chart_data, limit=8, db=db)
-                famous_duration = time.time() - famous_start
-                logger.info(f"Famous people matching completed in {famous_duration:.2f} seconds")
-                logger.info(f"find_similar_famous_people_internal returned: {famous_people_matches.get('matches_found', 0)} matches out of {famous_people_matches.get('total_compared', 0)} compared")
-                
-                if famous_people_matches and len(famous_people_matches.get('matches', [])) > 0:
-                    logger.info(f"Found {len(famous_people_matches['matches'])} famous people matches, generating section...")
-                    famous_people_section = await g4_famous_people_section(
-                        llm, serialized_chart, chart_summary, famous_people_matches['matches'], unknown_time
-                    )
-                    final_reading = f"{final_reading}\n\n{famous_people_section}"
-                    logger.info(f"Famous people section added - Final reading length: {len(final_reading)} characters")
-                else:
-                    logger.info("No famous people matches found or empty result")
-                logger.info("="*80)
-            except Exception as e:
-                logger.error(f"Error generating famous people section: {e}", exc_info=True)
-                # Continue without famous people section
+        # Steps 1-5: G0 -> G1 -> G2 -> G3, with famous-people matching and G4 running alongside
+        famous_llm = Gemini3Client()
+        famous_llm.delta_handler = llm.delta_handler
+        llm.bypass_cache = famous_llm.bypass_cache = bypass_llm_cache
+        final_reading, pipeline_result = await _run_full_reading_pipeline(
+            llm, famous_llm, chart_data, serialized_chart, chart_summary, unknown_time, db, streamer
+        )
         
         # Finalize reading
         final_reading = sanitize_reading_text(final_reading).strip()
         reading_duration = time.time() - reading_start_time
         
         # Calculate final costs
-        summary = llm.get_summary()
+        summary = _merge_llm_summaries(llm, famous_llm)
         cost_info = calculate_gemini3_cost(summary['total_prompt_tokens'], summary['total_completion_tokens'])
         
         # Comprehensive cost summary
@@ -1321,6 +1399,7 @@ async def get_gemini3_reading(chart_data: dict, unknown_time: bool, db: Session
         logger.info(f"Total Input Tokens: {summary['total_prompt_tokens']:,}")
         logger.info(f"Total Output Tokens: {summary['total_completion_tokens']:,}")
         logger.info(f"Total Tokens: {summary['total_tokens']:,}")
+        logger.info(f"Cached Calls: {summary['cache_hits']} ({summary['cached_prompt_tokens'] + summary['cached_completion_tokens']:,} tokens not billed, ${summary['cached_cost_usd']:.6f} saved)")
         logger.info("")
         logger.info("=== GEMINI 3 API COST BREAKDOWN ===")
         logger.info(f"Input Cost:  ${cost_info['input_cost_usd']:.6f} USD")
@@ -1357,17 +1436,26 @@ async def get_gemini3_reading(chart_data: dict, unknown_time: bool, db: Session
             print(f"TOTAL COST: ${cost_info['total_cost_usd']:.6f} USD")
             print(f"{'='*80}\n")
         
+        streamer.complete(final_reading, pipeline_result.latency_breakdown())
         return final_reading
     except Exception as e:
+        streamer.fail(str(e))
         reading_duration = time.time() - reading_start_time
         logger.error(f"Error during Gemini 3 reading generation after {reading_duration:.2f} seconds: {e}", exc_info=True)
         raise Exception(f"An error occurred while generating the detailed AI reading: {e}")
+    finally:
+        await streamer.close()
 # ⚠️ PRESERVATION ZONE END - PROMPT FUNCTION: get_gemini3_reading
 
 
 # ⚠️ PRESERVATION ZONE START - PROMPT FUNCTION: get_claude_reading
-async def get_claude_reading(chart_data: dict, unknown_time: bool, db: Session = None) -> str:
-    """Four-call Claude 3.5 Sonnet pipeline with optional famous people section."""
+async def get_claude_reading(chart_data: dict, unknown_time: bool, db: Session = None, stream_topic: Optional[str] = None, bypass_llm_cache: bool = False) -> str:
+    """Four-call Claude 3.5 Sonnet pipeline with optional famous people section.
+    
+    With stream_topic (the chart hash), LLM deltas and each completed section
+    are published through app.core.events as they are generated.
+    bypass_llm_cache forces fresh LLM calls instead of reusing cached responses.
+    """
     reading_start_time = time.time()
     
     if not ANTHROPIC_API_KEY and AI_MODE != "stub":
@@ -1386,6 +1474,12 @@ async def get_claude_reading(chart_data: dict, unknown_time: bool, db: Session =
     
     llm = ClaudeClient()
     
+    # Live deltas and completed sections for /ws/reading and /stream_reading (no-op without a topic)
+    streamer = ReadingStreamer(stream_topic)
+    if streamer.enabled:
+        llm.delta_handler = streamer.on_delta
+        streamer.start()
+    
     try:
         # Step 0: Serialize chart data
         logger.info("Preparing chart data for LLM...")
@@ -1394,54 +1488,20 @@ async def get_claude_reading(chart_data: dict, unknown_time: bool, db: Session =
         logger.info(f"Chart serialized - Summary length: {len(chart_summary)} characters")
         logger.info("="*80)
         
-        # Step 1: Global Blueprint
-        blueprint = await g0_global_blueprint(llm, serialized_chart, chart_summary, unknown_time)
-        
-        # Step 2: Natal Foundation
-        natal_sections = await g1_natal_foundation(llm, serialized_chart, chart_summary, blueprint, unknown_time)
-        
-        # Step 3: Deep Dive Chapters
-        deep_sections = await g2_deep_dive_chapters(llm, serialized_chart, chart_summary, blueprint, natal_sections, unknown_time)
-        
-        # Step 4: Combine and Polish
-        full_draft = f"{natal_sections}\n\n{deep_sections}"
-        logger.info(f"Combined draft length: {len(full_draft)} characters")
-        final_reading = await g3_polish_full_reading(llm, full_draft, chart_summary)
-        
-        # Step 5: Generate famous people section if database session is available
-        famous_people_section = ""
-        if db:
-            try:
-                logger.info("="*80)
-                logger.info("FAMOUS PEOPLE MATCHING - STARTING")
-                logger.info("="*80)
-                logger.info("Calling find_similar_famous_people_internal to find matches...")
-                famous_start = time.time()
-                famous_people_matches = await find_similar_famous_people_internal(chart_data, limit=8, db=db)
-                famous_duration = time.time() - famous_start
-                logger.info(f"Famous people matching completed in {famous_duration:.2f} seconds")
-                logger.info(f"find_similar_famous_people_internal returned: {famous_people_matches.get('matches_found', 0)} matches out of {famous_people_matches.get('total_compared', 0)} compared")
-                
-                if famous_people_matches and len(famous_people_matches.get('matches', [])) > 0:
-                    logger.info(f"Found {len(famous_people_matches['matches'])} famous people matches, generating section...")
-                    famous_people_section = await g4_famous_people_section(
-                        llm, serialized_chart, chart_summary, famous_people_matches['matches'], unknown_time
-                    )
-                    final_reading = f"{final_reading}\n\n{famous_people_section}"
-                    logger.info(f"Famous people section added - Final reading length: {len(final_reading)} characters")
-                else:
-                    logger.info("No famous people matches found or empty result")
-                logger.info("="*80)
-            except Exception as e:
-                logger.error(f"Error generating famous people section: {e}", exc_info=True)
-                # Continue without famous people section
+        # Steps 1-5: G0 -> G1 -> G2 -> G3, with famous-people matching and G4 running alongside
+        famous_llm = ClaudeClient()
+        famous_llm.delta_handler = llm.delta_handler
+        llm.bypass_cache = famous_llm.bypass_cache = bypass_llm_cache
+        final_reading, pipeline_result = await _run_full_reading_pipeline(
+            llm, famous_llm, chart_data, serialized_chart, chart_summary, unknown_time, db, streamer
+        )
         
         # Finalize reading
         final_reading = sanitize_reading_text(final_reading).strip()
         reading_duration = time.time() - reading_start_time
         
         # Calculate final costs
-        summary = llm.get_summary()
+        summary = _merge_llm_summaries(llm, famous_llm)
         cost_info = calculate_claude_cost(summary['total_prompt_tokens'], summary['total_completion_tokens'])
         
         # Comprehensive cost summary
@@ -1458,6 +1518,7 @@ async def get_claude_reading(chart_data: dict, unknown_time: bool, db: Session =
         logger.info(f"Total Input Tokens: {summary['total_prompt_tokens']:,}")
         logger.info(f"Total Output Tokens: {summary['total_completion_tokens']:,}")
         logger.info(f"Total Tokens: {summary['total_tokens']:,}")
+        logger.info(f"Cached Calls: {summary['cache_hits']} ({summary['cached_prompt_tokens'] + summary['cached_completion_tokens']:,} tokens not billed, ${summary['cached_cost_usd']:.6f} saved)")
         logger.info("")
         logger.info("=== CLAUDE 3.5 SONNET API COST BREAKDOWN ===")
         logger.info(f"Input Cost:  ${cost_info['input_cost_usd']:.6f} USD")
@@ -1494,11 +1555,15 @@ async def get_claude_reading(chart_data: dict, unknown_time: bool, db: Session =
             print(f"TOTAL COST: ${cost_info['total_cost_usd']:.6f} USD")
             print(f"{'='*80}\n")
         
+        streamer.complete(final_reading, pipeline_result.latency_breakdown())
         return final_reading
     except Exception as e:
+        streamer.fail(str(e))
         reading_duration = time.time() - reading_start_time
         logger.error(f"Error during Claude reading generation after {reading_duration:.2f} seconds: {e}", exc_info=True)
         raise Exception(f"An error occurred while generating the detailed AI reading: {e}")
+    finally:
+        await streamer.close()
 # ⚠️ PRESERVATION ZONE END - PROMPT FUNCTION: get_claude_reading
 
 
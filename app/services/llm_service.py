@@ -16,10 +16,13 @@ Last verified: 2025-01-21
 
 import os
 import json
+import asyncio
+import hashlib
 import logging
 import re
+import threading
 import time
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 
 # Try to import the correct genai package
 try:
@@ -33,6 +36,8 @@ except ImportError:
         genai = None
         GEMINI_PACKAGE_TYPE = None
 
+from app.config import LLM_PROVIDER_CACHE_TTL_SECONDS
+from app.services.llm_cache import llm_cache_key, lookup_response, store_response
 from llm_schemas import (
     serialize_chart_for_llm,
     format_serialized_chart_for_prompt,
@@ -97,6 +102,130 @@ def calculate_gemini3_cost(prompt_tokens: int, completion_tokens: int,
         }
 
 
+def _emit_delta(delta_handler: Optional[Callable[[str, str], None]], call_label: str, text: str):
+    """Pass a streamed text delta to the client's delta_handler, never failing the LLM call."""
+    if delta_handler is None or not text:
+        return
+    try:
+        delta_handler(call_label, text)
+    except Exception as e:
+        logger.warning(f"[{call_label}] Delta handler failed: {e}")
+
+
+def _emit_stub_deltas(delta_handler: Optional[Callable[[str, str], None]], call_label: str, text: str):
+    """Stream a stub response word by word so streaming can be exercised with AI_MODE=stub."""
+    if delta_handler is None:
+        return
+    for word in re.findall(r"\S+\s*", text):
+        _emit_delta(delta_handler, call_label, word)
+
+
+async def _consume_stream_in_thread(open_stream: Callable[[], Any], on_chunk: Callable[[Any], Optional[str]],
+                                    delta_handler: Optional[Callable[[str, str], None]], call_label: str) -> Tuple[Any, str]:
+    """
+    Consume a blocking SDK stream in a worker thread, forwarding deltas on the event loop.
+
+    Args:
+        open_stream: Returns an iterable of stream chunks (called in the worker thread)
+        on_chunk: Extracts the text delta from a chunk (or None)
+        delta_handler: Optional handler for text deltas
+        call_label: Pipeline call label passed to the handler
+
+    Returns:
+        (last chunk, concatenated text)
+    """
+    loop = asyncio.get_running_loop()
+
+    def consume():
+        last_chunk = None
+        text_parts = []
+        for chunk in open_stream():
+            last_chunk = chunk
+            text = on_chunk(chunk)
+            if text:
+                text_parts.append(text)
+                loop.call_soon_threadsafe(_emit_delta, delta_handler, call_label, text)
+        return last_chunk, "".join(text_parts)
+
+    return await asyncio.to_thread(consume)
+
+
+def _serve_cached(client, cached, call_label: str, cost_function: Callable[[int, int], dict]) -> str:
+    """Account for a response cache hit on client and return its text."""
+    saved_cost = cost_function(cached.prompt_tokens, cached.completion_tokens)
+    client.cache_hits += 1
+    client.cached_prompt_tokens += cached.prompt_tokens
+    client.cached_completion_tokens += cached.completion_tokens
+    client.cached_cost_usd += saved_cost['total_cost_usd']
+    logger.info(f"[{call_label}] Response cache hit - {cached.prompt_tokens + cached.completion_tokens} tokens not billed (${saved_cost['total_cost_usd']:.6f} saved)")
+    _emit_delta(client.delta_handler, call_label, cached.text)
+    return cached.text
+
+
+# Provider-side prompt caches: key -> (cache name or None if unavailable, local expiry)
+_provider_caches: Dict[str, Tuple[Optional[str], float]] = {}
+_provider_caches_lock = threading.Lock()
+# Stop using a provider cache this long before the provider expires it
+PROVIDER_CACHE_MARGIN_SECONDS = 60
+
+
+def _gemini_provider_cache(client, model_name: str, system: str, prefix: str, call_label: str) -> Optional[str]:
+    """
+    Name of a Gemini explicit cache holding system + prefix, created on first use.
+
+    Blocking (SDK call); run it in a worker thread. Creation fails for
+    prefixes below the model's minimum cacheable size; that is remembered
+    for the TTL too, and the prefix is then sent inline (where the model's
+    implicit prefix caching can still apply, since it leads the prompt).
+    """
+    key = hashlib.sha256("\0".join([model_name, system, prefix]).encode("utf-8")).hexdigest()
+    now = time.time()
+    with _provider_caches_lock:
+        entry = _provider_caches.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+    try:
+        from google.genai import types
+        cached = client.caches.create(
+            model=model_name,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system or None,
+                contents=[f"[USER INPUT]\n{prefix}"],
+                ttl=f"{LLM_PROVIDER_CACHE_TTL_SECONDS}s",
+                display_name=call_label
+            )
+        )
+        name = cached.name
+        logger.info(f"[{call_label}] Created provider prompt cache {name} ({len(prefix)} chars)")
+    except Exception as e:
+        logger.info(f"[{call_label}] Provider prompt cache unavailable, sending the prefix inline: {e}")
+        name = None
+
+    with _provider_caches_lock:
+        for expired in [k for k, (_, expires) in _provider_caches.items() if expires <= now]:
+            del _provider_caches[expired]
+        _provider_caches[key] = (name, now + LLM_PROVIDER_CACHE_TTL_SECONDS - PROVIDER_CACHE_MARGIN_SECONDS)
+    return name
+
+
+def _forget_gemini_provider_cache(name: str):
+    """Stop using a provider cache the API rejected (e.g. expired early)."""
+    with _provider_caches_lock:
+        for key in [k for k, (cached, _) in _provider_caches.items() if cached == name]:
+            del _provider_caches[key]
+
+
+def _claude_user_content(prefix: Optional[str], user: str):
+    """User message content with the prefix as a separately cached block (Anthropic prompt caching)."""
+    if not prefix or LLM_PROVIDER_CACHE_TTL_SECONDS <= 0:
+        return (prefix or "") + user
+    blocks = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+    if user.strip():
+        blocks.append({"type": "text", "text": user})
+    return blocks
+
+
 # --- Gemini3Client (exact copy) ---
 class Gemini3Client:
     """Gemini 3 client with token + cost tracking."""
@@ -110,6 +239,14 @@ class Gemini3Client:
         self.default_max_tokens = int(os.getenv("GEMINI3_MAX_OUTPUT_TOKENS", "81920"))
         self.client = None
         self.model = None
+        # Optional callable(call_label, text); when set, responses are streamed and deltas forwarded
+        self.delta_handler: Optional[Callable[[str, str], None]] = None
+        # Content-addressed response cache (app.services.llm_cache); set bypass_cache to always call the API
+        self.bypass_cache = False
+        self.cache_hits = 0
+        self.cached_prompt_tokens = 0
+        self.cached_completion_tokens = 0
+        self.cached_cost_usd = 0.0
         if GEMINI_API_KEY and AI_MODE != "stub" and genai:
             try:
                 if GEMINI_PACKAGE_TYPE == "generativeai":
@@ -131,8 +268,19 @@ class Gemini3Client:
                 self.model = None
                 self.client = None
     
-    async def generate(self, system: str, user: str, max_output_tokens: int, temperature: float, call_label: str) -> str:
+    async def generate(self, system: str, user: str, max_output_tokens: int, temperature: float, call_label: str,
+                       prefix: Optional[str] = None) -> str:
+        """
+        Generate a response.
+
+        prefix, if given, is the start of the user content that repeats
+        across calls (e.g. a chat's chart context). The prompt is the same as
+        for user=prefix + user, but the prefix is sent through a Gemini
+        explicit cache when possible, so it is not re-processed every call.
+        """
         self.call_count += 1
+        prompt_suffix = user
+        user = (prefix or "") + user
         logger.info(f"[{call_label}] Starting Gemini call #{self.call_count}")
         logger.info(f"[{call_label}] System prompt length: {len(system)} chars")
         logger.info(f"[{call_label}] User content length: {len(user)} chars")
@@ -144,8 +292,16 @@ class Gemini3Client:
             stub_response = f"[STUB GEMINI RESPONSE for {call_label}] System: {system[:120]}... User: {user[:120]}..."
             self.total_prompt_tokens += len(system.split()) + len(user.split())
             self.total_completion_tokens += len(stub_response.split())
+            _emit_stub_deltas(self.delta_handler, call_label, stub_response)
             return stub_response
         
+        cache_key = None
+        if not self.bypass_cache:
+            cache_key = llm_cache_key("gemini", self.model_name, system, user, temperature, max_tokens)
+            cached = lookup_response(cache_key)
+            if cached is not None:
+                return _serve_cached(self, cached, call_label, calculate_gemini3_cost)
+        
         if not GEMINI_API_KEY:
             logger.error(f"[{call_label}] GEMINI_API_KEY not configured - cannot call Gemini 3")
             raise Exception("Gemini API key not configured")
@@ -171,6 +327,7 @@ class Gemini3Client:
         prompt_sections.append(f"[USER INPUT]\n{user.strip()}")
         combined_prompt = "\n\n".join(prompt_sections)
         
+        streamed_text = None
         try:
             logger.info(f"[{call_label}] Calling Gemini model '{self.model_name}'...")
             generation_config = {
@@ -183,34 +340,63 @@ class Gemini3Client:
             # Use appropriate API based on which package is available
             if GEMINI_PACKAGE_TYPE == "genai" and self.client is not None:
                 # New google.genai Client API - use client.models.generate_content() (synchronous, not async)
+                provider_cache = None
                 try:
                     from google.genai import types
                     logger.info(f"[{call_label}] Using google.genai Client API with GenerateContentConfig")
+                    if prefix and LLM_PROVIDER_CACHE_TTL_SECONDS > 0:
+                        provider_cache = await asyncio.to_thread(
+                            _gemini_provider_cache, self.client, self.model_name, system, prefix, call_label
+                        )
                     # Create config object using types.GenerateContentConfig
                     config = types.GenerateContentConfig(
                         temperature=generation_config["temperature"],
                         top_p=generation_config["top_p"],
                         top_k=generation_config["top_k"],
-                        max_output_tokens=generation_config["max_output_tokens"]
-                    )
-                    # Note: generate_content is synchronous, not async
-                    response = self.client.models.generate_content(
-                        model=self.model_name,
-                        contents=combined_prompt,
-                        config=config
+                        max_output_tokens=generation_config["max_output_tokens"],
+                        cached_content=provider_cache
                     )
+                    if provider_cache:
+                        # System instructions and prefix live in the cache; send only the rest
+                        combined_prompt = prompt_suffix.strip() or "."
+                    if self.delta_handler is not None:
+                        # Streamed: the blocking iterator runs in a worker thread
+                        logger.info(f"[{call_label}] Streaming response deltas")
+                        response, streamed_text = await _consume_stream_in_thread(
+                            lambda: self.client.models.generate_content_stream(
+                                model=self.model_name,
+                                contents=combined_prompt,
+                                config=config
+                            ),
+                            lambda chunk: getattr(chunk, "text", None),
+                            self.delta_handler,
+                            call_label
+                        )
+                    else:
+                        # Note: generate_content is synchronous, not async; run it off the event loop
+                        response = await asyncio.to_thread(
+                            self.client.models.generate_content,
+                            model=self.model_name,
+                            contents=combined_prompt,
+                            config=config
+                        )
                 except ImportError:
                     # Fallback if types module not available
                     logger.warning(f"[{call_label}] types module not available, trying without config")
-                    response = self.client.models.generate_content(
+                    response = await asyncio.to_thread(
+                        self.client.models.generate_content,
                         model=self.model_name,
                         contents=combined_prompt
                     )
                 except Exception as e:
                     logger.error(f"[{call_label}] Error calling google.genai API: {e}", exc_info=True)
+                    if provider_cache:
+                        _forget_gemini_provider_cache(provider_cache)
+                        combined_prompt = "\n\n".join(prompt_sections)
                     # Last resort: try simple call without config
                     try:
-                        response = self.client.models.generate_content(
+                        response = await asyncio.to_thread(
+                            self.client.models.generate_content,
                             model=self.model_name,
                             contents=combined_prompt
                         )
@@ -219,10 +405,24 @@ class Gemini3Client:
                         raise
             elif GEMINI_PACKAGE_TYPE == "generativeai" and self.model is not None:
                 # Old google-generativeai API
-                response = await self.model.generate_content_async(
-                    combined_prompt,
-                    generation_config=generation_config
-                )
+                if self.delta_handler is not None:
+                    logger.info(f"[{call_label}] Streaming response deltas")
+                    response = await self.model.generate_content_async(
+                        combined_prompt,
+                        generation_config=generation_config,
+                        stream=True
+                    )
+                    async for chunk in response:
+                        try:
+                            _emit_delta(self.delta_handler, call_label, chunk.text)
+                        except ValueError:
+                            # Chunk without text (e.g. safety metadata only)
+                            pass
+                else:
+                    response = await self.model.generate_content_async(
+                        combined_prompt,
+                        generation_config=generation_config
+                    )
             else:
                 raise Exception(f"Cannot generate content - not properly initialized (package_type={GEMINI_PACKAGE_TYPE}, model={self.model is not None}, client={self.client is not None})")
             logger.info(f"[{call_label}] Gemini API call completed successfully")
@@ -244,6 +444,9 @@ class Gemini3Client:
                     'total_tokens': int(getattr(response.usage_metadata, 'total_token_count', 0) or 0)
                 }
                 logger.info(f"[{call_label}] Token usage - Input: {usage_metadata['prompt_tokens']}, Output: {usage_metadata['completion_tokens']}, Total: {usage_metadata['total_tokens']}")
+                cached_tokens = int(getattr(response.usage_metadata, 'cached_content_token_count', 0) or 0)
+                if cached_tokens:
+                    logger.info(f"[{call_label}] {cached_tokens} input tokens served from the provider prompt cache")
             except Exception as meta_error:
                 logger.warning(f"[{call_label}] Failed to parse Gemini usage metadata: {meta_error}")
                 usage_metadata = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
@@ -255,7 +458,9 @@ class Gemini3Client:
         logger.info(f"[{call_label}] Call cost: ${call_cost['total_cost_usd']:.6f} (Input: ${call_cost['input_cost_usd']:.6f}, Output: ${call_cost['output_cost_usd']:.6f})")
         
         response_text = ""
-        if hasattr(response, 'text') and response.text:
+        if streamed_text:
+            response_text = streamed_text.strip()
+        elif hasattr(response, 'text') and response.text:
             response_text = response.text.strip()
         elif hasattr(response, 'candidates') and response.candidates:
             for candidate in response.candidates:
@@ -268,6 +473,9 @@ class Gemini3Client:
             logger.error(f"[{call_label}] Gemini response empty or blocked")
             raise Exception("Gemini response was empty or blocked")
         
+        if cache_key:
+            store_response(cache_key, response_text, usage_metadata['prompt_tokens'], usage_metadata['completion_tokens'], self.model_name)
+        
         logger.info(f"[{call_label}] Response length: {len(response_text)} characters")
         return response_text
     
@@ -277,7 +485,12 @@ class Gemini3Client:
             'total_completion_tokens': self.total_completion_tokens,
             'total_tokens': self.total_prompt_tokens + self.total_completion_tokens,
             'total_cost_usd': self.total_cost_usd,
-            'call_count': self.call_count
+            'call_count': self.call_count,
+            # Served from the response cache; not included in the billed totals above
+            'cache_hits': self.cache_hits,
+            'cached_prompt_tokens': self.cached_prompt_tokens,
+            'cached_completion_tokens': self.cached_completion_tokens,
+            'cached_cost_usd': self.cached_cost_usd
         }
 
 
@@ -294,6 +507,14 @@ class ClaudeClient:
         # Claude Opus 4.5 has max 64,000 output tokens
         self.default_max_tokens = int(os.getenv("CLAUDE_MAX_OUTPUT_TOKENS", "64000"))
         self.client = None
+        # Optional callable(call_label, text); when set, responses are streamed and deltas forwarded
+        self.delta_handler: Optional[Callable[[str, str], None]] = None
+        # Content-addressed response cache (app.services.llm_cache); set bypass_cache to always call the API
+        self.bypass_cache = False
+        self.cache_hits = 0
+        self.cached_prompt_tokens = 0
+        self.cached_completion_tokens = 0
+        self.cached_cost_usd = 0.0
         
         if ANTHROPIC_API_KEY and AI_MODE != "stub":
             try:
@@ -307,8 +528,18 @@ class ClaudeClient:
                 logger.error(f"Error initializing Claude client: {e}")
                 self.client = None
     
-    async def generate(self, system: str, user: str, max_output_tokens: int, temperature: float, call_label: str) -> str:
+    async def generate(self, system: str, user: str, max_output_tokens: int, temperature: float, call_label: str,
+                       prefix: Optional[str] = None) -> str:
+        """
+        Generate a response.
+
+        prefix, if given, is the start of the user content that repeats
+        across calls. The prompt is the same as for user=prefix + user, but
+        the prefix is marked for Anthropic prompt caching.
+        """
         self.call_count += 1
+        user_content = _claude_user_content(prefix, user)
+        user = (prefix or "") + user
         logger.info(f"[{call_label}] Starting Claude call #{self.call_count}")
         logger.info(f"[{call_label}] System prompt length: {len(system)} chars")
         logger.info(f"[{call_label}] User content length: {len(user)} chars")
@@ -320,8 +551,16 @@ class ClaudeClient:
             stub_response = f"[STUB CLAUDE RESPONSE for {call_label}] System: {system[:120]}... User: {user[:120]}..."
             self.total_prompt_tokens += len(system.split()) + len(user.split())
             self.total_completion_tokens += len(stub_response.split())
+            _emit_stub_deltas(self.delta_handler, call_label, stub_response)
             return stub_response
         
+        cache_key = None
+        if not self.bypass_cache:
+            cache_key = llm_cache_key("claude", self.model_name, system, user, temperature, max_tokens)
+            cached = lookup_response(cache_key)
+            if cached is not None:
+                return _serve_cached(self, cached, call_label, calculate_claude_cost)
+        
         if not ANTHROPIC_API_KEY:
             logger.error(f"[{call_label}] ANTHROPIC_API_KEY not configured - cannot call Claude")
             raise Exception("Anthropic API key not configured")
@@ -342,49 +581,58 @@ class ClaudeClient:
             # For large max_tokens, we need to use streaming
             # Also cap max_tokens at 64,000 (Claude Opus 4.5 limit)
             max_tokens = min(max_tokens, 64000)
-            use_streaming = max_tokens > 20000  # Stream if expecting large output
+            use_streaming = max_tokens > 20000 or self.delta_handler is not None  # Stream if expecting large output or forwarding deltas
             
             if use_streaming:
                 logger.info(f"[{call_label}] Using streaming mode for large output (max_tokens={max_tokens})")
-                text_parts = []
-                usage_metadata = {
-                    'prompt_tokens': 0,
-                    'completion_tokens': 0,
-                    'total_tokens': 0
-                }
+                loop = asyncio.get_running_loop()
                 
-                with self.client.messages.stream(
-                    model=self.model_name,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system,
-                    messages=[
-                        {"role": "user", "content": user}
-                    ]
-                ) as stream:
-                    chunk_count = 0
-                    for event in stream:
-                        if event.type == "content_block_delta" and event.delta.type == "text_delta":
-                            text_parts.append(event.delta.text)
-                            chunk_count += 1
-                            if chunk_count % 100 == 0:  # Log progress every 100 chunks
-                                logger.info(f"[{call_label}] Received {chunk_count} text chunks, {len(''.join(text_parts))} chars so far...")
-                        elif event.type == "message_delta" and event.usage:
-                            # Capture usage when available
-                            usage_metadata = {
-                                'prompt_tokens': event.usage.input_tokens or 0,
-                                'completion_tokens': event.usage.output_tokens or 0,
-                                'total_tokens': (event.usage.input_tokens or 0) + (event.usage.output_tokens or 0)
-                            }
-                        elif event.type == "message_stop":
-                            # Final event - try to get usage if not already captured
-                            if usage_metadata['total_tokens'] == 0:
-                                # Estimate tokens if we can't get usage
+                def consume_stream():
+                    # Blocking SDK stream; runs in a worker thread so the event loop stays free
+                    text_parts = []
+                    usage_metadata = {
+                        'prompt_tokens': 0,
+                        'completion_tokens': 0,
+                        'total_tokens': 0
+                    }
+                    
+                    with self.client.messages.stream(
+                        model=self.model_name,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        system=system,
+                        messages=[
+                            {"role": "user", "content": user_content}
+                        ]
+                    ) as stream:
+                        chunk_count = 0
+                        for event in stream:
+                            if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                                text_parts.append(event.delta.text)
+                                if self.delta_handler is not None:
+                                    loop.call_soon_threadsafe(_emit_delta, self.delta_handler, call_label, event.delta.text)
+                                chunk_count += 1
+                                if chunk_count % 100 == 0:  # Log progress every 100 chunks
+                                    logger.info(f"[{call_label}] Received {chunk_count} text chunks, {len(''.join(text_parts))} chars so far...")
+                            elif event.type == "message_delta" and event.usage:
+                                # Capture usage when available
                                 usage_metadata = {
-                                    'prompt_tokens': len(system.split()) + len(user.split()),
-                                    'completion_tokens': len(''.join(text_parts).split()),
-                                    'total_tokens': len(system.split()) + len(user.split()) + len(''.join(text_parts).split())
+                                    'prompt_tokens': event.usage.input_tokens or 0,
+                                    'completion_tokens': event.usage.output_tokens or 0,
+                                    'total_tokens': (event.usage.input_tokens or 0) + (event.usage.output_tokens or 0)
                                 }
+                            elif event.type == "message_stop":
+                                # Final event - try to get usage if not already captured
+                                if usage_metadata['total_tokens'] == 0:
+                                    # Estimate tokens if we can't get usage
+                                    usage_metadata = {
+                                        'prompt_tokens': len(system.split()) + len(user.split()),
+                                        'completion_tokens': len(''.join(text_parts).split()),
+                                        'total_tokens': len(system.split()) + len(user.split()) + len(''.join(text_parts).split())
+                                    }
+                    return text_parts, usage_metadata
+                
+                text_parts, usage_metadata = await asyncio.to_thread(consume_stream)
                 
                 response_text = "".join(text_parts).strip()
                 
@@ -392,14 +640,15 @@ class ClaudeClient:
                     logger.error(f"[{call_label}] Claude streaming response empty")
                     raise Exception("Claude streaming response was empty")
             else:
-                # Non-streaming for smaller requests
-                message = self.client.messages.create(
+                # Non-streaming for smaller requests (blocking SDK call, run off the event loop)
+                message = await asyncio.to_thread(
+                    self.client.messages.create,
                     model=self.model_name,
                     max_tokens=max_tokens,
                     temperature=temperature,
                     system=system,
                     messages=[
-                        {"role": "user", "content": user}
+                        {"role": "user", "content": user_content}
                     ]
                 )
                 
@@ -442,6 +691,9 @@ class ClaudeClient:
         self.total_cost_usd += call_cost['total_cost_usd']
         logger.info(f"[{call_label}] Call cost: ${call_cost['total_cost_usd']:.6f} (Input: ${call_cost['input_cost_usd']:.6f}, Output: ${call_cost['output_cost_usd']:.6f})")
         
+        if cache_key:
+            store_response(cache_key, response_text, usage_metadata['prompt_tokens'], usage_metadata['completion_tokens'], self.model_name)
+        
         logger.info(f"[{call_label}] Response length: {len(response_text)} characters")
         return response_text
     
@@ -451,7 +703,12 @@ class ClaudeClient:
             'total_completion_tokens': self.total_completion_tokens,
             'total_tokens': self.total_prompt_tokens + self.total_completion_tokens,
             'total_cost_usd': self.total_cost_usd,
-            'call_count': self.call_count
+            'call_count': self.call_count,
+            # Served from the response cache; not included in the billed totals above
+            'cache_hits': self.cache_hits,
+            'cached_prompt_tokens': self.cached_prompt_tokens,
+            'cached_completion_tokens': self.cached_completion_tokens,
+            'cached_cost_usd': self.cached_cost_usd
         }
 
 
@@ -0,0 +1,281 @@
+"""
+PDF Report Service
+
+Renders reading PDFs in the "cpu" worker processes and caches both the
+rasterized chart wheels and the finished PDFs, so re-downloads and email
+attachments of the same reading skip rendering entirely and a new reading
+for a known chart skips the wheels.
+
+Cache layout under PDF_CACHE_DIR:
+    wheels/<wheel hash>-<chart type>.png   keyed by the data the wheel is drawn from
+    reports/<chart hash>-<reading hash>.pdf
+    uncached/<random>.pdf                  reports with a placeholder wheel, never looked up
+
+The cache lives on disk rather than in memory so the worker processes and
+the web process share it, and a finished PDF is streamed from its file
+instead of being passed back from the worker and held as bytes. Files are
+written atomically; the least recently used are evicted beyond
+PDF_CACHE_MAX_BYTES.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from functools import partial
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Tuple
+
+from app.config import PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES
+from app.core.executors import run_cpu_task
+
+logger = logging.getLogger(__name__)
+
+# Bump when the report or wheel layout changes so cached files are not reused
+PDF_TEMPLATE_VERSION = 1
+WHEEL_SIZE = 800
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# chart_data keys each wheel is drawn from (see pdf_generator.generate_chart_wheel_svg)
+WHEEL_SECTIONS = ("{}_major_positions", "{}_aspects", "{}_house_cusps", "true_sidereal_signs")
+# user_inputs keys printed in the report
+REPORT_USER_FIELDS = ("full_name", "birth_date", "birth_time", "location")
+
+_pending: Dict[str, asyncio.Future] = {}
+
+
+def _digest(value: Any) -> str:
+    """Stable short hash of JSON-serializable data."""
+    key_string = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(key_string.encode()).hexdigest()[:16]
+
+
+def wheel_cache_key(chart_data: Dict[str, Any], chart_type: str) -> str:
+    """
+    Cache key for a chart wheel image.
+
+    Args:
+        chart_data: Chart data as returned by /calculate_chart
+        chart_type: "sidereal" or "tropical"
+
+    Returns:
+        Key made of a hash of the wheel's input data and the chart type
+    """
+    sections = {key.format(chart_type): chart_data.get(key.format(chart_type)) for key in WHEEL_SECTIONS}
+    return f"{_digest([PDF_TEMPLATE_VERSION, WHEEL_SIZE, sections])}-{chart_type}"
+
+
+def report_cache_key(chart_data: Dict[str, Any], reading: str, user_inputs: Dict[str, Any]) -> str:
+    """
+    Cache key for a finished PDF report.
+
+    Args:
+        chart_data: Chart data
+        reading: Reading text
+        user_inputs: Request user inputs (only the fields printed in the report count)
+
+    Returns:
+        "<chart hash>-<reading hash>"
+    """
+    printed_inputs = {field: user_inputs.get(field) for field in REPORT_USER_FIELDS}
+    chart_hash = _digest([PDF_TEMPLATE_VERSION, chart_data, printed_inputs])
+    return f"{chart_hash}-{_digest(reading)}"
+
+
+def _cache_path(kind: str, name: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, kind, name)
+
+
+def _cached_file(path: str, produce: Callable[[BinaryIO], None]) -> str:
+    """
+    Return path, producing the file first if it is not cached.
+
+    produce writes the content to an open binary file; it is written to a
+    temporary file and renamed into place, so concurrent producers (other
+    workers) never expose a partial file.
+    """
+    try:
+        os.utime(path)  # Mark as recently used
+        return path
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            produce(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    _evict(PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES)
+    return path
+
+
+def _uncached_file(produce: Callable[[BinaryIO], None]) -> str:
+    """
+    Produce a one-off file under the cache directory and return its path.
+
+    The file is never looked up again; it only lives until LRU eviction, so
+    it can still be streamed after the worker returns.
+    """
+    directory = os.path.join(PDF_CACHE_DIR, "uncached")
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            produce(f)
+    except BaseException:
+        os.unlink(path)
+        raise
+    _evict(PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES)
+    return path
+
+
+def _evict(root: str, max_bytes: int) -> None:
+    """Delete the least recently used cache files until the cache fits in max_bytes."""
+    files = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+class WheelRenderingError(Exception):
+    """A chart wheel could not be rasterized (raised by cached_wheel_png in strict mode)."""
+
+
+def cached_wheel_png(chart_data: Dict[str, Any], chart_type: str, strict: bool = False) -> bytes:
+    """
+    Chart wheel PNG from the cache, rendering and caching it on a miss.
+
+    A wheel that fails to rasterize gets pdf_generator's placeholder image,
+    which is not cached, or raises WheelRenderingError if strict.
+    """
+    from pdf_generator import render_chart_wheel_png
+
+    path = _cache_path("wheels", f"{wheel_cache_key(chart_data, chart_type)}.png")
+    try:
+        path = _cached_file(path, lambda f: f.write(render_chart_wheel_png(chart_data, chart_type, WHEEL_SIZE, strict=True)))
+    except Exception as e:
+        logger.error(f"Chart wheel rendering failed ({chart_type}): {e}")
+        if strict:
+            raise WheelRenderingError(str(e)) from e
+        return render_chart_wheel_png(chart_data, chart_type, WHEEL_SIZE)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def render_pdf_report(chart_data: Dict[str, Any], reading: str, user_inputs: Dict[str, Any]) -> str:
+    """
+    Render a PDF report into the cache (runs in a worker process).
+
+    A report whose wheels fall back to the placeholder image is written
+    outside the report cache, so the next request renders it again.
+
+    Args:
+        chart_data: Chart data
+        reading: Reading text
+        user_inputs: Request user inputs
+
+    Returns:
+        Path of the PDF
+    """
+    from pdf_generator import write_pdf_report
+
+    path = _cache_path("reports", f"{report_cache_key(chart_data, reading, user_inputs)}.pdf")
+    try:
+        return _cached_file(path, lambda f: write_pdf_report(
+            f, chart_data, reading, user_inputs, wheel_png=partial(cached_wheel_png, strict=True)
+        ))
+    except WheelRenderingError:
+        return _uncached_file(lambda f: write_pdf_report(f, chart_data, reading, user_inputs, wheel_png=cached_wheel_png))
+
+
+async def get_pdf_report(chart_data: Dict[str, Any], reading: str, user_inputs: Dict[str, Any]) -> str:
+    """
+    Get the path of a report PDF, rendering it in the process pool if it is not cached.
+
+    Concurrent requests for the same report share one rendering.
+
+    Args:
+        chart_data: Chart data
+        reading: Reading text
+        user_inputs: Request user inputs
+
+    Returns:
+        Path of the cached PDF (stream it with iter_pdf_report or FileResponse)
+
+    Raises:
+        ServiceOverloadedError: If the process pool is full or rendering times out
+    """
+    key = report_cache_key(chart_data, reading, user_inputs)
+    path = _cache_path("reports", f"{key}.pdf")
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass  # Evicted meanwhile
+    pending = _pending.get(key)
+    if pending is None:
+        pending = _pending[key] = asyncio.ensure_future(run_cpu_task(render_pdf_report, chart_data, reading, user_inputs))
+        pending.add_done_callback(lambda _: _pending.pop(key, None))
+    return await asyncio.shield(pending)
+
+
+async def get_pdf_report_bytes(chart_data: Dict[str, Any], reading: str, user_inputs: Dict[str, Any]) -> bytes:
+    """The report PDF as bytes, for email attachments (see get_pdf_report)."""
+    path = await get_pdf_report(chart_data, reading, user_inputs)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def open_pdf_report(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Tuple[Iterator[bytes], int]:
+    """
+    Open a cached PDF for a StreamingResponse.
+
+    The file is opened (and its size taken from the open file) before the
+    first chunk is produced, so a later eviction does not interrupt the
+    download or invalidate the Content-Length.
+
+    Returns:
+        (chunk iterator, size in bytes)
+    """
+    f = open(path, "rb")
+    size = os.fstat(f.fileno()).st_size
+
+    def chunks() -> Iterator[bytes]:
+        with f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    return chunks(), size
+
+
+def iter_pdf_report(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a cached PDF in chunks for a StreamingResponse (see open_pdf_report)."""
+    return open_pdf_report(path, chunk_size)[0]
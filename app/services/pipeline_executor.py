@@ -0,0 +1,235 @@
+"""
+Pipeline Executor
+
+Runs a DAG of async stages with maximal concurrency:
+
+- every stage starts as soon as all of its dependencies have finished
+- stages that share a provider (e.g. one LLM API) are limited to a fixed
+  number of concurrent calls per run
+- optional stages may fail without failing the run (their result is None)
+- per-stage latency (queue wait, run time, start/end offsets) is recorded
+  so the critical path is visible in logs
+
+Used by the full reading pipeline (app.services.llm_prompts) so that
+famous-people matching starts at t=0 instead of after the G0-G3 chain.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineError(Exception):
+    """Raised for an invalid pipeline definition."""
+
+
+@dataclass
+class PipelineStage:
+    """
+    One node of the pipeline DAG.
+
+    func is awaited with the results of its dependencies as keyword
+    arguments (named after the dependency stages).
+    """
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+    provider: Optional[str] = None
+    optional: bool = False
+
+
+@dataclass
+class StageTiming:
+    """Latency breakdown for one stage (seconds, offsets relative to run start)."""
+    name: str
+    provider: Optional[str]
+    ready_at: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    status: str = "pending"
+
+    @property
+    def queued(self) -> float:
+        return self.started_at - self.ready_at
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "provider": self.provider,
+            "status": self.status,
+            "start_offset_seconds": round(self.started_at, 3),
+            "queued_seconds": round(self.queued, 3),
+            "duration_seconds": round(self.duration, 3),
+            "end_offset_seconds": round(self.finished_at, 3),
+        }
+
+
+@dataclass
+class PipelineResult:
+    """Stage results and timings of a completed run."""
+    results: Dict[str, Any]
+    timings: List[StageTiming]
+    wall_clock_seconds: float
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def latency_breakdown(self) -> Dict[str, Any]:
+        """
+        Get the per-stage latency breakdown.
+
+        Returns:
+            Dictionary with wall clock, summed stage time and per-stage timings
+        """
+        stage_seconds = sum(t.duration for t in self.timings)
+        return {
+            "wall_clock_seconds": round(self.wall_clock_seconds, 3),
+            "sum_of_stages_seconds": round(stage_seconds, 3),
+            "parallel_speedup": round(stage_seconds / self.wall_clock_seconds, 2) if self.wall_clock_seconds > 0 else 1.0,
+            "stages": [t.to_dict() for t in sorted(self.timings, key=lambda t: t.started_at)]
+        }
+
+    def log_breakdown(self, log: logging.Logger = logger):
+        """Log the latency breakdown, one line per stage."""
+        breakdown = self.latency_breakdown()
+        log.info(
+            f"Pipeline wall clock {breakdown['wall_clock_seconds']:.2f}s, "
+            f"stage total {breakdown['sum_of_stages_seconds']:.2f}s "
+            f"(x{breakdown['parallel_speedup']} parallelism)"
+        )
+        for stage in breakdown["stages"]:
+            log.info(
+                f"  {stage['stage']:<24} {stage['status']:<8} "
+                f"start +{stage['start_offset_seconds']:.2f}s  "
+                f"queued {stage['queued_seconds']:.2f}s  "
+                f"ran {stage['duration_seconds']:.2f}s"
+            )
+
+
+class PipelineExecutor:
+    """Executes PipelineStage DAGs."""
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        provider_limits: Optional[Dict[str, int]] = None,
+        on_stage_start: Optional[Callable[[str, int, int], None]] = None
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            stages: Pipeline stages (any order)
+            provider_limits: Max concurrent stages per provider (unlisted providers are unlimited)
+            on_stage_start: Optional callback(stage_name, step, total_steps) when a stage starts running
+
+        Raises:
+            PipelineError: On duplicate names, unknown dependencies or cycles
+        """
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise PipelineError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self.provider_limits = provider_limits or {}
+        self.on_stage_start = on_stage_start
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise PipelineError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise PipelineError(f"Pipeline has a cycle through '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def run(self) -> PipelineResult:
+        """
+        Run all stages.
+
+        Returns:
+            PipelineResult
+
+        Raises:
+            Exception: The first failure of a non-optional stage (other stages are cancelled)
+        """
+        run_start = time.perf_counter()
+        semaphores = {p: asyncio.Semaphore(n) for p, n in self.provider_limits.items() if n and n > 0}
+        timings = {name: StageTiming(name, stage.provider) for name, stage in self.stages.items()}
+        errors: Dict[str, str] = {}
+        started = 0
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: PipelineStage):
+            nonlocal started
+            kwargs = {dep: await tasks[dep] for dep in stage.deps}
+            timing = timings[stage.name]
+            timing.ready_at = time.perf_counter() - run_start
+            semaphore = semaphores.get(stage.provider)
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                timing.started_at = time.perf_counter() - run_start
+                started += 1
+                if self.on_stage_start:
+                    self.on_stage_start(stage.name, started, len(self.stages))
+                try:
+                    result = await stage.func(**kwargs)
+                    timing.status = "ok"
+                    return result
+                except asyncio.CancelledError:
+                    timing.status = "cancelled"
+                    raise
+                except Exception as e:
+                    timing.status = "failed"
+                    errors[stage.name] = str(e)
+                    if stage.optional:
+                        logger.warning(f"Optional pipeline stage '{stage.name}' failed: {e}", exc_info=True)
+                        return None
+                    raise
+                finally:
+                    timing.finished_at = time.perf_counter() - run_start
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+        # Dependencies come first in topological order, so every awaited task exists
+        for name in self.order:
+            tasks[name] = asyncio.create_task(run_stage(self.stages[name]), name=f"pipeline:{name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return PipelineResult(
+            results={name: task.result() for name, task in tasks.items()},
+            timings=list(timings.values()),
+            wall_clock_seconds=time.perf_counter() - run_start,
+            errors=errors
+        )
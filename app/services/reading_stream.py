@@ -0,0 +1,251 @@
+"""
+Reading Stream
+
+Publishes a full reading through app.core.events while it is generated:
+
+- reading.delta: LLM text deltas from the reader-facing pipeline calls
+- reading.section: each heading-delimited section as soon as the next
+  heading (or the end of the call) shows it is complete
+- reading.started / reading.progress / reading.completed / reading.failed
+  around the pipeline stages
+
+Events are broadcast with the chart hash as topic so /ws/reading/{chart_hash}
+and /stream_reading/{chart_hash} only receive their own reading.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.events import EventBroadcaster, EventType, event_broadcaster
+
+logger = logging.getLogger(__name__)
+
+# Pipeline calls whose output is reader-facing prose (G0 is the JSON blueprint)
+STREAMED_CALLS = {
+    "G1_natal_foundation": "natal_foundation",
+    "G2_deep_dive_chapters": "deep_dive",
+    "G3_polish_full_reading": "polished",
+    "G4_famous_people_section": "famous_people",
+}
+
+# "1st HOUSE: SELF" style headings carry a lowercase ordinal suffix
+_HOUSE_HEADING_RE = re.compile(r"^\d{1,2}(st|nd|rd|th)\s+HOUSE\b")
+_BULLET_PREFIXES = ("-", "*", "•", "–")
+
+
+def is_section_heading(line: str) -> bool:
+    """
+    Whether a line is a section heading in the reading prompts' format.
+
+    The prompts ask for plain uppercase headings on their own line (no
+    markdown), e.g. "CHART OVERVIEW & CORE THEMES" or "1st HOUSE: SELF".
+
+    Args:
+        line: A single line of reading text
+
+    Returns:
+        True if the line starts a new section
+    """
+    text = line.strip()
+    if len(text) < 3 or len(text) > 120 or text.startswith(_BULLET_PREFIXES):
+        return False
+    if _HOUSE_HEADING_RE.match(text):
+        return True
+    letters = [c for c in text if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters)
+
+
+class SectionSplitter:
+    """Incrementally splits streamed text into heading-delimited sections."""
+
+    def __init__(self):
+        self._partial_line = ""
+        self._heading: Optional[str] = None
+        self._lines: List[str] = []
+
+    def feed(self, text: str) -> List[Tuple[Optional[str], str]]:
+        """
+        Add streamed text.
+
+        Args:
+            text: Next text delta
+
+        Returns:
+            Sections completed by this delta, as (heading, text) tuples
+        """
+        completed = []
+        lines = (self._partial_line + text).split("\n")
+        self._partial_line = lines.pop()
+        for line in lines:
+            if is_section_heading(line):
+                section = self._take_section()
+                if section:
+                    completed.append(section)
+                self._heading = line.strip()
+            else:
+                self._lines.append(line)
+        return completed
+
+    def flush(self) -> Optional[Tuple[Optional[str], str]]:
+        """
+        End of stream: return the last section, if any.
+
+        Returns:
+            (heading, text) tuple or None
+        """
+        if self._partial_line:
+            self.feed("\n")
+        return self._take_section()
+
+    def _take_section(self) -> Optional[Tuple[Optional[str], str]]:
+        body = "\n".join(self._lines).strip()
+        heading = self._heading
+        self._heading, self._lines = None, []
+        if not heading and not body:
+            return None
+        text = f"{heading}\n{body}".strip() if heading else body
+        return heading, text
+
+
+class ReadingStreamer:
+    """
+    Publishes one reading's progress, deltas and sections in order.
+
+    Events are queued synchronously (so LLM delta callbacks never block)
+    and broadcast by a single pump task, which preserves ordering. With
+    topic=None every method is a no-op, so the pipeline can call it
+    unconditionally.
+    """
+
+    def __init__(self, topic: Optional[str], broadcaster: EventBroadcaster = None, user_id: Optional[int] = None):
+        """
+        Initialize the streamer.
+
+        Args:
+            topic: Topic to broadcast under (the chart hash); None disables streaming
+            broadcaster: Event broadcaster (defaults to the global one)
+            user_id: Optional user ID to also deliver user-scoped events to
+        """
+        self.topic = topic
+        self.broadcaster = broadcaster or event_broadcaster
+        self.user_id = user_id
+        self._queue: Optional[asyncio.Queue] = None
+        self._pump: Optional[asyncio.Task] = None
+        # Per-call state; pipeline calls may run concurrently
+        self._splitters: Dict[str, SectionSplitter] = {}
+        self._stage_sections: Dict[str, int] = {}
+        self.section_count = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.topic is not None
+
+    def start(self):
+        """Start the pump task and announce the reading."""
+        if not self.enabled:
+            return
+        self._queue = asyncio.Queue()
+        self._pump = asyncio.create_task(self._run())
+        self._publish(EventType.READING_STARTED, {})
+
+    def progress(self, stage: str, step: int, total_steps: int):
+        """
+        Announce the start of a pipeline stage.
+
+        Args:
+            stage: Stage name
+            step: 1-based stage number
+            total_steps: Number of stages
+        """
+        self._publish(EventType.READING_PROGRESS, {"stage": stage, "step": step, "total_steps": total_steps})
+
+    def on_delta(self, call_label: str, text: str):
+        """
+        LLM client delta handler (see Gemini3Client/ClaudeClient.delta_handler).
+
+        Args:
+            call_label: Pipeline call the delta belongs to
+            text: Text delta
+        """
+        if not self.enabled or call_label not in STREAMED_CALLS or not text:
+            return
+        splitter = self._splitters.get(call_label)
+        if splitter is None:
+            splitter = self._splitters[call_label] = SectionSplitter()
+
+        stage = STREAMED_CALLS[call_label]
+        self._publish(EventType.READING_DELTA, {"stage": stage, "text": text})
+        for heading, section_text in splitter.feed(text):
+            self._publish_section(stage, heading, section_text)
+
+    def end_call(self, call_label: str):
+        """
+        Mark a pipeline call as finished, publishing its last section.
+
+        Args:
+            call_label: Pipeline call label
+        """
+        splitter = self._splitters.pop(call_label, None)
+        if splitter is not None:
+            section = splitter.flush()
+            if section:
+                self._publish_section(STREAMED_CALLS[call_label], *section)
+
+    def complete(self, reading: str, latency: Optional[Dict[str, Any]] = None):
+        """
+        Publish the finished reading.
+
+        Args:
+            reading: Final reading text
+            latency: Optional per-stage latency breakdown
+        """
+        self._finish_calls()
+        data = {"reading": reading, "sections": self.section_count}
+        if latency is not None:
+            data["latency"] = latency
+        self._publish(EventType.READING_COMPLETED, data)
+
+    def fail(self, error: str):
+        """Publish a generation failure."""
+        self._finish_calls()
+        self._publish(EventType.READING_FAILED, {"error": error})
+
+    async def close(self):
+        """Wait until every queued event has been broadcast."""
+        if self._pump is None:
+            return
+        self._queue.put_nowait(None)
+        await self._pump
+        self._pump = None
+
+    def _finish_calls(self):
+        for call_label in list(self._splitters):
+            self.end_call(call_label)
+
+    def _publish_section(self, stage: str, heading: Optional[str], text: str):
+        self._publish(EventType.READING_SECTION, {
+            "stage": stage,
+            "index": self.section_count,
+            "stage_index": self._stage_sections.get(stage, 0),
+            "heading": heading,
+            "text": text
+        })
+        self.section_count += 1
+        self._stage_sections[stage] = self._stage_sections.get(stage, 0) + 1
+
+    def _publish(self, event_type: EventType, data: Dict[str, Any]):
+        if self._queue is not None:
+            self._queue.put_nowait((event_type, data))
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            event_type, data = item
+            try:
+                await self.broadcaster.broadcast(event_type, data, user_id=self.user_id, topic=self.topic)
+            except Exception as e:
+                logger.warning(f"Failed to publish {event_type.value} for reading {self.topic}: {e}")
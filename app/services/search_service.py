@@ -12,6 +12,7 @@ from sqlalchemy import func, and_, or_
 
 from database import User, SavedChart, ChatConversation, ChatMessage
 from app.core.logging_config import setup_logger
+from app.services.chat_history import after_cursor, encode_cursor
 
 logger = setup_logger(__name__)
 
@@ -189,9 +190,15 @@ class SearchService:
         query: str,
         conversation_id: Optional[int] = None,
         role: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Search messages by content."""
+        """
+        Search messages by content, newest first.
+        
+        Each result carries its cursor; pass the last one as cursor to
+        continue after it (keyset on created_at, id).
+        """
         search_query = db.query(ChatMessage)
         
         # Text search
@@ -209,7 +216,10 @@ class SearchService:
         if role:
             search_query = search_query.filter(ChatMessage.role == role)
         
-        messages = search_query.order_by(ChatMessage.created_at.desc()).limit(limit).all()
+        if cursor:
+            search_query = search_query.filter(after_cursor(ChatMessage.created_at, ChatMessage.id, cursor))
+        
+        messages = search_query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit).all()
         
         return [
             {
@@ -218,6 +228,7 @@ class SearchService:
                 "role": msg.role,
                 "content": msg.content[:200] + "..." if len(msg.content) > 200 else msg.content,  # Truncate for preview
                 "created_at": msg.created_at.isoformat() if msg.created_at else None,
+                "cursor": encode_cursor(msg.created_at, msg.id) if msg.created_at else None,
             }
             for msg in messages
         ]
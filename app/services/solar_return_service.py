@@ -1,17 +1,241 @@
 """
 Solar Return Service
 
-Calculates solar return charts - charts for when the Sun returns to its natal position.
+Calculates solar return charts - charts for when the Sun returns to its natal position -
+and, more generally, the exact moments any planet returns to its natal longitude
+(lunar, Jupiter, Saturn returns, ...).
+
+Return times are solved rather than sampled: the crossing is bracketed and then
+refined with Newton steps on the Swiss Ephemeris longitude and speed, falling back
+to bisection inside the bracket. A solar return converges to well under a second
+in about five ephemeris calls. Long return scans can bracket crossings from the
+precomputed ephemeris table instead of calling Swiss Ephemeris at every step.
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from natal_chart import NatalChart
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from natal_chart import NatalChart, get_ayanamsa
+from app.services.ephemeris_table import ERROR_BOUND_DEGREES, get_ephemeris_table
+from app.services.transit_service import TRANSIT_PLANETS, datetime_from_jd, julian_day
+import numpy as np
 import swisseph as swe
 
 logger = logging.getLogger(__name__)
 
+RETURN_BODIES: Dict[str, int] = dict(TRANSIT_PLANETS)
+# Scan step in days when bracketing returns. Must be well below the time between
+# two crossings of a retrograde loop, and small enough that the body moves less
+# than 180 degrees per step.
+RETURN_SCAN_STEP_DAYS = {"Sun": 60.0, "Moon": 7.0, "Mercury": 2.0, "Venus": 4.0, "Mars": 5.0}
+DEFAULT_RETURN_SCAN_STEP_DAYS = 10.0
+RETURN_TOLERANCE_DAYS = 1e-6  # ~0.09 seconds
+MAX_RETURN_ITERATIONS = 60
+MAX_RETURN_RANGE_DAYS = 366 * 100
+MEAN_SOLAR_YEAR_DAYS = 365.2422
+TABLE_NEWTON_STEPS = 6
+
+
+def _wrap180(degrees: float) -> float:
+    return (degrees + 180.0) % 360.0 - 180.0
+
+
+def _distance_function(code: int, target: float, system: str) -> Callable[[float], Tuple[float, float]]:
+    """
+    Signed distance of a body from a target longitude, and its speed, at a Julian day.
+    
+    Sidereal longitudes use the ayanamsa of the calendar year at that moment, the
+    same frame NatalChart uses for a chart cast at that time.
+    """
+    def distance(jd: float) -> Tuple[float, float]:
+        position = swe.calc_ut(jd, code)[0]
+        longitude = position[0]
+        if system == "sidereal":
+            longitude -= get_ayanamsa(swe.revjul(jd)[0])
+        return _wrap180(longitude - target), position[3]
+    return distance
+
+
+def _refine_crossing(distance: Callable[[float], Tuple[float, float]], low: float, high: float,
+                     f_low: float, guess: Optional[float] = None) -> float:
+    """
+    Root of distance inside a bracket [low, high] (distance changes sign across it).
+    
+    Newton steps use the ephemeris speed; a step that leaves the bracket or does
+    not shrink it fast enough is replaced by bisection (safeguarded Newton).
+    """
+    t = (low + high) / 2.0 if guess is None else min(max(guess, low), high)
+    for _ in range(MAX_RETURN_ITERATIONS):
+        f, speed = distance(t)
+        if f == 0.0:
+            return t
+        if (f < 0) == (f_low < 0):
+            low, f_low = t, f
+        else:
+            high = t
+        step = f / speed if speed else float("inf")
+        if abs(step) < RETURN_TOLERANCE_DAYS:
+            return t - step
+        candidate = t - step
+        if not (low < candidate < high) or abs(step) > (high - low) / 2.0:
+            candidate = (low + high) / 2.0
+        if high - low < RETURN_TOLERANCE_DAYS:
+            return candidate
+        t = candidate
+    return t
+
+
+def _natal_longitude(natal_chart: NatalChart, body: str, system: str) -> float:
+    bodies = natal_chart.celestial_bodies if system == "sidereal" else natal_chart.tropical_bodies
+    natal_body = next((b for b in bodies if b.name == body and b.degree is not None), None)
+    if not natal_body:
+        raise ValueError(f"Natal {body} position not found")
+    return natal_body.degree
+
+
+def find_return_times(
+    natal_chart: NatalChart,
+    body: str,
+    start_date: datetime,
+    end_date: datetime,
+    system: str = "sidereal",
+    use_ephemeris_table: bool = False
+) -> List[datetime]:
+    """
+    Find every moment in a date range when a planet returns to its natal longitude.
+    
+    The range is scanned at a body-specific step to bracket each crossing (a
+    retrograde planet can cross its natal position up to three times per return),
+    then each bracket is solved with safeguarded Newton iteration.
+    
+    With use_ephemeris_table the scan reads the precomputed ephemeris table in
+    one vectorized lookup and only the flagged brackets are checked and solved
+    with Swiss Ephemeris, so results are identical; without a table covering the
+    range it has no effect.
+    
+    Args:
+        natal_chart: The natal birth chart
+        body: Planet name, Sun through Pluto
+        start_date: Start of the range (naive datetimes are UTC)
+        end_date: End of the range
+        system: "sidereal" or "tropical"
+        use_ephemeris_table: Scan the precomputed ephemeris table instead of Swiss Ephemeris
+    
+    Returns:
+        UTC datetimes of the returns, in order
+    
+    Raises:
+        ValueError: If the body is unknown or the range is invalid
+    """
+    if body not in RETURN_BODIES:
+        raise ValueError(f"Unknown return body: {body}")
+    target = _natal_longitude(natal_chart, body, system)
+    times = solve_return_times(body, target, julian_day(start_date), julian_day(end_date), system, use_ephemeris_table)
+    return [datetime_from_jd(jd) for jd in times]
+
+
+def solve_return_times(
+    body: str,
+    target: float,
+    start: float,
+    end: float,
+    system: str = "sidereal",
+    use_ephemeris_table: bool = False
+) -> List[float]:
+    """
+    Find every Julian day (UT) in [start, end] when a planet crosses a target longitude.
+    
+    The core of find_return_times, on plain numbers so it can run in an
+    ephemeris worker process (see app.services.ephemeris_pool.ReturnRequest).
+    
+    Args:
+        body: Planet name, Sun through Pluto
+        target: Longitude to return to, in the given system
+        start: Start of the range (Julian day UT)
+        end: End of the range (Julian day UT)
+        system: "sidereal" or "tropical"
+        use_ephemeris_table: Scan the precomputed ephemeris table instead of Swiss Ephemeris
+    
+    Returns:
+        Julian days of the crossings, in order
+    
+    Raises:
+        ValueError: If the body is unknown or the range is invalid
+    """
+    if body not in RETURN_BODIES:
+        raise ValueError(f"Unknown return body: {body}")
+    if end <= start:
+        raise ValueError("end_date must be after start_date")
+    if end - start > MAX_RETURN_RANGE_DAYS:
+        raise ValueError(f"Date range cannot exceed {MAX_RETURN_RANGE_DAYS} days")
+    
+    distance = _distance_function(RETURN_BODIES[body], target, system)
+    step = RETURN_SCAN_STEP_DAYS.get(body, DEFAULT_RETURN_SCAN_STEP_DAYS)
+    times = np.append(np.arange(start, end, step), end)
+    
+    table = get_ephemeris_table() if use_ephemeris_table else None
+    if table is not None and table.covers(start, end):
+        return [float(jd) for jd in _table_return_times(table, body, target, times, distance, system)]
+    
+    scan = np.array([distance(t)[0] for t in times])
+    return [float(_refine_crossing(distance, times[j], times[j + 1], scan[j])) for j in np.flatnonzero(_crossings(scan))]
+
+
+def _table_return_times(table, body: str, target: float, times: np.ndarray,
+                        distance: Callable[[float], Tuple[float, float]], system: str) -> List[float]:
+    """
+    Return times from a scan of the ephemeris table, solved exactly with Swiss Ephemeris.
+    
+    Every bracket is first solved on the table (vectorized Newton), so the Swiss
+    Ephemeris refinement starts within the table error of the root and converges
+    in a call or two. Where a scan value is within the table error of the target
+    its sign is uncertain, and that bracket and its neighbours are checked with
+    Swiss Ephemeris before solving.
+    """
+    years = _calendar_years(times)
+    
+    def table_distance(jd: np.ndarray, year: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        longitudes, speeds = table.positions(body, jd)
+        if system == "sidereal":
+            longitudes = longitudes - get_ayanamsa(year)
+        return _wrap180(longitudes - target), speeds
+    
+    scan, _ = table_distance(times, years)
+    uncertain = np.abs(scan) <= 2 * ERROR_BOUND_DEGREES
+    flagged = np.flatnonzero(_crossings(scan))
+    certain = flagged[~(uncertain[flagged] | uncertain[flagged + 1])]
+    brackets = [(j, scan[j]) for j in certain.tolist()]
+    
+    # A crossing within the table error of a grid point can fall in the neighbouring step
+    near = np.flatnonzero(uncertain).tolist()
+    checked = sorted({j for i in near for j in (i - 1, i) if 0 <= j < len(times) - 1} - set(certain.tolist()))
+    values = {k: distance(times[k])[0] for j in checked for k in (j, j + 1)}
+    brackets += [(j, values[j]) for j in checked if _crossings(np.array([values[j], values[j + 1]]))[0]]
+    if not brackets:
+        return []
+    brackets.sort()
+    
+    index = np.array([j for j, _ in brackets])
+    low, high = times[index], times[index + 1]
+    guess = (low + high) / 2.0
+    for _ in range(TABLE_NEWTON_STEPS):
+        f, speed = table_distance(guess, years[index])
+        guess = np.clip(guess - f / np.where(speed == 0, np.inf, speed), low, high)
+    return [
+        _refine_crossing(distance, lo, hi, f_low, g)
+        for lo, hi, (_, f_low), g in zip(low.tolist(), high.tolist(), brackets, guess.tolist())
+    ]
+
+
+def _crossings(values: np.ndarray) -> np.ndarray:
+    """Steps where the signed distance changes sign near the target (near +/-180 it is the wrap)."""
+    return ((values[:-1] < 0) != (values[1:] < 0)) & (np.abs(values[:-1]) + np.abs(values[1:]) < 180.0)
+
+
+def _calendar_years(times: np.ndarray) -> np.ndarray:
+    """Calendar year of each Julian day, as _distance_function takes it for the ayanamsa."""
+    return np.array([swe.revjul(float(jd))[0] for jd in times])
+
 
 def find_solar_return_date(
     natal_chart: NatalChart,
@@ -19,7 +243,11 @@ def find_solar_return_date(
     system: str = "sidereal"
 ) -> datetime:
     """
-    Find the date when the Sun returns to its natal position.
+    Find the moment the Sun returns to its natal position around the birthday in a year.
+    
+    The mean-year anniversary of the birth is within a day or so of the return,
+    so the search starts from a few-day bracket around it and only widens if
+    that does not contain the crossing.
     
     Args:
         natal_chart: The natal birth chart
@@ -27,58 +255,63 @@ def find_solar_return_date(
         system: "sidereal" or "tropical"
     
     Returns:
-        Datetime of solar return
+        UTC datetime of solar return (to the second)
     """
-    # Get natal Sun position
-    natal_sun = next(
-        (b for b in (natal_chart.celestial_bodies if system == "sidereal" else natal_chart.tropical_bodies)
-         if b.name == "Sun"),
-        None
-    )
-    
-    if not natal_sun:
-        raise ValueError("Natal Sun position not found")
-    
-    natal_sun_pos = natal_sun.sidereal_longitude if system == "sidereal" else natal_sun.tropical_longitude
+    distance = _distance_function(swe.SUN, _natal_longitude(natal_chart, "Sun", system), system)
+    guess = natal_chart.jd + (target_year - natal_chart.birth_year) * MEAN_SOLAR_YEAR_DAYS
     
-    # Start searching from birthday in target year
-    start_date = datetime(target_year, natal_chart.birth_month, natal_chart.birth_day, 12, 0)
-    
-    # Search within ±30 days of birthday
-    search_range = 30
-    best_date = start_date
-    min_diff = 360.0
-    
-    ayanamsa = natal_chart.ascendant_data.get("ayanamsa", 0)
+    for half_width in (3.0, 30.0):
+        low, high = guess - half_width, guess + half_width
+        f_low, _ = distance(low)
+        f_high, _ = distance(high)
+        if (f_low < 0) != (f_high < 0) and abs(f_low) + abs(f_high) < 180.0:
+            return datetime_from_jd(_refine_crossing(distance, low, high, f_low, guess))
+    raise ValueError(f"No solar return found near the birthday in {target_year}")
+
+
+def find_solar_returns(
+    natal_chart: NatalChart,
+    start_year: int,
+    end_year: int,
+    system: str = "sidereal"
+) -> List[Dict[str, Any]]:
+    """
+    Solar return moments for every year in a range (inclusive).
     
-    for day_offset in range(-search_range, search_range + 1):
-        test_date = start_date + timedelta(days=day_offset)
-        jd = swe.julday(
-            test_date.year,
-            test_date.month,
-            test_date.day,
-            test_date.hour + test_date.minute / 60.0
-        )
-        
-        try:
-            res = swe.calc_ut(jd, swe.SUN)
-            if system == "sidereal":
-                sun_pos = (res[0][0] - ayanamsa + 360) % 360
-            else:
-                sun_pos = res[0][0] % 360
-            
-            # Calculate difference (handle wrap-around)
-            diff = abs(sun_pos - natal_sun_pos)
-            if diff > 180:
-                diff = 360 - diff
-            
-            if diff < min_diff:
-                min_diff = diff
-                best_date = test_date
-        except Exception:
-            continue
+    Args:
+        natal_chart: The natal birth chart
+        start_year: First year
+        end_year: Last year
+        system: "sidereal" or "tropical"
     
-    return best_date
+    Returns:
+        List of {"year", "date"} dictionaries
+    """
+    if end_year < start_year:
+        raise ValueError("end_year must not be before start_year")
+    if end_year - start_year >= 100:
+        raise ValueError("At most 100 years of solar returns per request")
+    return [
+        {"year": year, "date": find_solar_return_date(natal_chart, year, system).isoformat()}
+        for year in range(start_year, end_year + 1)
+    ]
+
+
+def _chart_at(name: str, moment: datetime, latitude: float, longitude: float) -> NatalChart:
+    """NatalChart cast at an exact UTC moment (NatalChart itself takes whole minutes)."""
+    chart = NatalChart(
+        name=name,
+        year=moment.year,
+        month=moment.month,
+        day=moment.day,
+        hour=moment.hour,
+        minute=moment.minute,
+        latitude=latitude,
+        longitude=longitude
+    )
+    chart.ut_decimal_hour = moment.hour + moment.minute / 60.0 + moment.second / 3600.0
+    chart.jd = julian_day(moment)
+    return chart
 
 
 def calculate_solar_return_chart(
@@ -103,15 +336,11 @@ def calculate_solar_return_chart(
         
         # Calculate chart for solar return date
         # Use natal location for solar return
-        solar_return_chart = NatalChart(
-            name=f"{natal_chart.name} Solar Return {target_year}",
-            year=solar_return_date.year,
-            month=solar_return_date.month,
-            day=solar_return_date.day,
-            hour=solar_return_date.hour,
-            minute=solar_return_date.minute,
-            latitude=natal_chart.latitude,
-            longitude=natal_chart.longitude
+        solar_return_chart = _chart_at(
+            f"{natal_chart.name} Solar Return {target_year}",
+            solar_return_date,
+            natal_chart.latitude,
+            natal_chart.longitude
         )
         solar_return_chart.calculate_chart(unknown_time=False)
         
@@ -130,8 +359,10 @@ def calculate_solar_return_chart(
             if not natal_body:
                 continue
             
-            sr_pos = sr_body.sidereal_longitude if system == "sidereal" else sr_body.tropical_longitude
-            natal_pos = natal_body.sidereal_longitude if system == "sidereal" else natal_body.tropical_longitude
+            if sr_body.degree is None or natal_body.degree is None:
+                continue
+            sr_pos = sr_body.degree
+            natal_pos = natal_body.degree
             
             # Calculate movement
             movement = (sr_pos - natal_pos) % 360
@@ -143,7 +374,7 @@ def calculate_solar_return_chart(
                 "solar_return_position": round(sr_pos, 4),
                 "natal_position": round(natal_pos, 4),
                 "movement": round(movement, 4),
-                "is_retrograde": sr_body.is_retrograde
+                "is_retrograde": sr_body.retrograde
             })
         
         # Get ascendant comparison
@@ -10,6 +10,10 @@ from typing import Dict, List, Any, Optional, Tuple
 from natal_chart import NatalChart, CelestialBody, Aspect, ASPECTS_CONFIG, ASPECT_SCORES
 import math
 
+import numpy as np
+
+from app.services.aspect_kernel import find_aspects
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,56 +33,32 @@ def calculate_synastry_aspects(
     Returns:
         List of aspect dictionaries
     """
-    aspects = []
+    major = {"Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"}
+    # The caller passes the body list for the chosen system, so degree is already in that zodiac
+    bodies1 = [body for body in chart1_bodies if body.name in major and body.degree is not None]
+    bodies2 = [body for body in chart2_bodies if body.name in major and body.degree is not None]
+    positions1 = [body.degree for body in bodies1]
+    positions2 = [body.degree for body in bodies2]
     
-    # Create lookup dictionaries for faster access
-    chart1_lookup = {body.name: body for body in chart1_bodies}
-    chart2_lookup = {body.name: body for body in chart2_bodies}
+    # Skip same planet comparisons (e.g., Sun-Sun)
+    different = np.array([[b1.name != b2.name for b2 in bodies2] for b1 in bodies1], dtype=bool).reshape(len(bodies1), len(bodies2))
+    hits = find_aspects(positions1, positions2, pair_mask=different)
     
-    # Compare each planet in chart1 with each planet in chart2
-    for body1 in chart1_bodies:
-        if body1.name not in ["Sun", "Moon", "Mercury", "Venus", "Mars", 
-                              "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]:
-            continue  # Only compare major planets
-        
-        for body2 in chart2_bodies:
-            if body2.name not in ["Sun", "Moon", "Mercury", "Venus", "Mars",
-                                  "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]:
-                continue
-            
-            # Skip same planet comparisons (e.g., Sun-Sun)
-            if body1.name == body2.name:
-                continue
-            
-            # Calculate angular distance
-            pos1 = body1.sidereal_longitude if system == "sidereal" else body1.tropical_longitude
-            pos2 = body2.sidereal_longitude if system == "sidereal" else body2.tropical_longitude
-            
-            angular_distance = abs(pos1 - pos2)
-            if angular_distance > 180:
-                angular_distance = 360 - angular_distance
-            
-            # Check for aspects
-            for aspect_name, aspect_angle, orb in ASPECTS_CONFIG:
-                # Check if within orb
-                if abs(angular_distance - aspect_angle) <= orb:
-                    # Calculate exact orb
-                    exact_orb = abs(angular_distance - aspect_angle)
-                    
-                    # Calculate strength (closer to exact = stronger)
-                    strength = 1.0 - (exact_orb / orb)
-                    
-                    aspect_data = {
-                        "planet1": body1.name,
-                        "planet2": body2.name,
-                        "aspect": aspect_name,
-                        "angle": aspect_angle,
-                        "orb": round(exact_orb, 2),
-                        "strength": round(strength, 3),
-                        "score": ASPECT_SCORES.get(aspect_name, 1.0),
-                        "system": system
-                    }
-                    aspects.append(aspect_data)
+    aspects = [
+        {
+            "planet1": bodies1[i].name,
+            "planet2": bodies2[j].name,
+            "aspect": name,
+            "angle": ASPECTS_CONFIG[k][1],
+            "orb": round(abs(float(orb)), 2),
+            "strength": round(float(strength), 3),
+            "score": ASPECT_SCORES.get(name, 1.0),
+            "system": system
+        }
+        for i, j, k, name, orb, strength in zip(
+            hits.first.tolist(), hits.second.tolist(), hits.aspect.tolist(), hits.names, hits.orb, hits.strength
+        )
+    ]
     
     # Sort by score (highest first)
     aspects.sort(key=lambda x: x["score"], reverse=True)
@@ -105,17 +85,17 @@ def calculate_house_overlays(
     overlays = {}
     
     # Get chart1's ascendant for house calculations
-    asc1 = chart1.ascendant_data.get("sidereal_ascendant" if system == "sidereal" else "tropical_ascendant", 0)
+    asc1 = chart1.ascendant_data.get("sidereal_asc" if system == "sidereal" else "tropical_asc") or 0
     
     # Get chart2's planets
     chart2_bodies = chart2.celestial_bodies if system == "sidereal" else chart2.tropical_bodies
     
     for body in chart2_bodies:
         if body.name not in ["Sun", "Moon", "Mercury", "Venus", "Mars",
-                            "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]:
+                            "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"] or body.degree is None:
             continue
         
-        pos = body.sidereal_longitude if system == "sidereal" else body.tropical_longitude
+        pos = body.degree
         
         # Calculate which house in chart1
         house_num, degrees_in_house = find_house_equal(pos, asc1)
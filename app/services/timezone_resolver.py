@@ -0,0 +1,109 @@
+"""
+Timezone Resolver
+
+Offline coordinate -> IANA timezone lookup.
+
+Uses the timezonefinder boundary index (timezone polygons behind a
+hexagonal grid of shortcuts), loaded into memory once per process, so a
+lookup takes a few microseconds and never leaves the machine. Results are
+memoized on coordinates quantized to ~11 m.
+"""
+
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from timezonefinder import TimezoneFinder
+    TIMEZONEFINDER_AVAILABLE = True
+except ImportError:
+    TimezoneFinder = None
+    TIMEZONEFINDER_AVAILABLE = False
+    logger.warning("timezonefinder not installed. Timezones will be approximated from longitude.")
+
+# 4 decimal places ~ 11 m; far below any timezone boundary precision
+COORDINATE_PRECISION = 4
+LOOKUP_CACHE_SIZE = 65536
+
+_finder = None
+_finder_lock = threading.Lock()
+
+
+def get_timezone_finder():
+    """
+    Load the boundary index once per process.
+
+    Returns:
+        TimezoneFinder instance, or None if timezonefinder is not installed
+    """
+    global _finder
+    if _finder is None and TIMEZONEFINDER_AVAILABLE:
+        with _finder_lock:
+            if _finder is None:
+                _finder = TimezoneFinder(in_memory=True)
+                logger.info("Timezone boundary index loaded")
+    return _finder
+
+
+def nautical_timezone(longitude: float) -> str:
+    """
+    Approximate timezone from longitude alone (15° nautical zones).
+
+    Note the inverted sign of the Etc/GMT zone names: UTC+3 is "Etc/GMT-3".
+
+    Args:
+        longitude: Longitude in degrees
+
+    Returns:
+        Etc/GMT zone name
+    """
+    offset = int(round(longitude / 15.0))
+    offset = max(-12, min(14, offset))
+    if offset == 0:
+        return "Etc/GMT"
+    return f"Etc/GMT{'-' if offset > 0 else '+'}{abs(offset)}"
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _resolve_quantized(latitude: float, longitude: float) -> str:
+    finder = get_timezone_finder()
+    if finder is not None:
+        try:
+            timezone_name = finder.timezone_at(lng=longitude, lat=latitude)
+            if timezone_name:
+                return timezone_name
+        except ValueError as e:
+            logger.warning(f"Timezone lookup failed for ({latitude}, {longitude}): {e}")
+    return nautical_timezone(longitude)
+
+
+def resolve_timezone(latitude: float, longitude: float) -> Optional[str]:
+    """
+    Resolve an IANA timezone name for a coordinate.
+
+    Args:
+        latitude: Latitude in degrees (-90..90)
+        longitude: Longitude in degrees (-180..180)
+
+    Returns:
+        IANA timezone name (ocean areas give Etc/GMT±N), or None for
+        invalid coordinates
+    """
+    if latitude is None or longitude is None:
+        return None
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        return None
+    return _resolve_quantized(round(latitude, COORDINATE_PRECISION), round(longitude, COORDINATE_PRECISION))
+
+
+def warm_timezone_resolver() -> bool:
+    """
+    Load the boundary index ahead of the first request.
+
+    Returns:
+        True if the full boundary index is available
+    """
+    return get_timezone_finder() is not None
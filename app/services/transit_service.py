@@ -1,17 +1,34 @@
 """
 Transit Service
 
-Calculates current planetary transits to a natal chart.
+Calculates current planetary transits to a natal chart, and transit
+timelines (exact hits, sign ingresses and stations) over a date range.
 """
 
 import logging
-from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
-from natal_chart import NatalChart, CelestialBody, ASPECTS_CONFIG, ASPECT_SCORES
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from natal_chart import (
+    NatalChart, CelestialBody, ASPECTS_CONFIG, ASPECT_SCORES, TRUE_SIDEREAL_SIGNS,
+    get_sign_from_degrees, get_tropical_sign_from_degrees
+)
+import numpy as np
 import swisseph as swe
 
+from app.services.aspect_kernel import find_aspects
+from app.services.ephemeris_table import get_ephemeris_table
+
 logger = logging.getLogger(__name__)
 
+TRANSIT_PLANETS = [
+    ("Sun", swe.SUN), ("Moon", swe.MOON), ("Mercury", swe.MERCURY),
+    ("Venus", swe.VENUS), ("Mars", swe.MARS), ("Jupiter", swe.JUPITER),
+    ("Saturn", swe.SATURN), ("Uranus", swe.URANUS), ("Neptune", swe.NEPTUNE),
+    ("Pluto", swe.PLUTO)
+]
+MAJOR_PLANETS = [name for name, _ in TRANSIT_PLANETS]
+
 
 def calculate_current_transits(
     natal_chart: NatalChart,
@@ -44,19 +61,12 @@ def calculate_current_transits(
         # Get ayanamsa for sidereal calculations
         ayanamsa = natal_chart.ascendant_data.get("ayanamsa", 0)
         
-        # Get natal planets
+        # Get natal planets (the body list already holds positions in the requested system)
         natal_bodies = natal_chart.celestial_bodies if system == "sidereal" else natal_chart.tropical_bodies
         
         # Calculate current positions of transiting planets
         transiting_planets = []
-        planet_config = [
-            ("Sun", swe.SUN), ("Moon", swe.MOON), ("Mercury", swe.MERCURY),
-            ("Venus", swe.VENUS), ("Mars", swe.MARS), ("Jupiter", swe.JUPITER),
-            ("Saturn", swe.SATURN), ("Uranus", swe.URANUS), ("Neptune", swe.NEPTUNE),
-            ("Pluto", swe.PLUTO)
-        ]
-        
-        for name, code in planet_config:
+        for name, code in TRANSIT_PLANETS:
             try:
                 res = swe.calc_ut(jd, code)
                 is_retro = res[0][3] < 0
@@ -76,40 +86,25 @@ def calculate_current_transits(
                 continue
         
         # Calculate aspects between transiting planets and natal planets
-        transit_aspects = []
+        natal_major = [body for body in natal_bodies if body.name in MAJOR_PLANETS and body.degree is not None]
+        natal_positions = [body.degree for body in natal_major]
+        hits = find_aspects([t["position"] for t in transiting_planets], natal_positions)
         
-        for transit_planet in transiting_planets:
-            transit_pos = transit_planet["position"]
-            
-            for natal_body in natal_bodies:
-                if natal_body.name not in ["Sun", "Moon", "Mercury", "Venus", "Mars",
-                                          "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]:
-                    continue
-                
-                natal_pos = natal_body.sidereal_longitude if system == "sidereal" else natal_body.tropical_longitude
-                
-                # Calculate angular distance
-                angular_distance = abs(transit_pos - natal_pos)
-                if angular_distance > 180:
-                    angular_distance = 360 - angular_distance
-                
-                # Check for aspects
-                for aspect_name, aspect_angle, orb in ASPECTS_CONFIG:
-                    if abs(angular_distance - aspect_angle) <= orb:
-                        exact_orb = abs(angular_distance - aspect_angle)
-                        strength = 1.0 - (exact_orb / orb)
-                        
-                        transit_aspects.append({
-                            "transiting_planet": transit_planet["name"],
-                            "natal_planet": natal_body.name,
-                            "aspect": aspect_name,
-                            "angle": aspect_angle,
-                            "orb": round(exact_orb, 2),
-                            "strength": round(strength, 3),
-                            "score": ASPECT_SCORES.get(aspect_name, 1.0),
-                            "transit_position": round(transit_pos, 4),
-                            "natal_position": round(natal_pos, 4)
-                        })
+        transit_aspects = []
+        for i, j, k, name, orb, strength in zip(
+            hits.first.tolist(), hits.second.tolist(), hits.aspect.tolist(), hits.names, hits.orb, hits.strength
+        ):
+            transit_aspects.append({
+                "transiting_planet": transiting_planets[i]["name"],
+                "natal_planet": natal_major[j].name,
+                "aspect": name,
+                "angle": ASPECTS_CONFIG[k][1],
+                "orb": round(abs(float(orb)), 2),
+                "strength": round(float(strength), 3),
+                "score": ASPECT_SCORES.get(name, 1.0),
+                "transit_position": round(transiting_planets[i]["position"], 4),
+                "natal_position": round(natal_positions[j], 4)
+            })
         
         # Sort by score (most significant first)
         transit_aspects.sort(key=lambda x: x["score"], reverse=True)
@@ -148,3 +143,299 @@ def calculate_current_transits(
         logger.error(f"Error calculating transits: {e}", exc_info=True)
         raise
 
+
+
+# --- Transit timeline ---
+#
+# Longitudes are sampled on a coarse grid per planet, the grid is split at
+# retrograde stations (found by root-finding on the ephemeris speed), and
+# every crossing of an aspect, orb or sign boundary is solved on the cubic
+# Hermite interpolant of the samples. Within a station-free segment the
+# longitude is monotonic, so each level is crossed at most once per segment
+# and no event can fall between samples.
+
+# Sampling step in days per transiting planet (others use the default)
+TIMELINE_STEP_DAYS = {"Moon": 1.0, "Mercury": 2.0, "Venus": 2.0}
+DEFAULT_TIMELINE_STEP_DAYS = 5.0
+MAX_TIMELINE_DAYS = 731
+STATION_TOLERANCE_DAYS = 1e-5
+_BISECTION_STEPS = 32  # 5-day segment to well under a second
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_UNIX_EPOCH_JD = 2440587.5
+
+
+def julian_day(value: datetime) -> float:
+    """Julian day (UT) for a datetime; naive datetimes are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    hours = value.hour + value.minute / 60.0 + (value.second + value.microsecond / 1e6) / 3600.0
+    return swe.julday(value.year, value.month, value.day, hours)
+
+
+def datetime_from_jd(jd: float) -> datetime:
+    """UTC datetime (to the second) for a Julian day."""
+    return _UNIX_EPOCH + timedelta(seconds=round((jd - _UNIX_EPOCH_JD) * 86400.0))
+
+
+def _wrap180(degrees):
+    return (degrees + 180.0) % 360.0 - 180.0
+
+
+Positions = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+
+def _swiss_ephemeris_positions(code: int) -> Positions:
+    """Tropical longitudes and speeds of a body from swe.calc_ut, one call per time."""
+    def positions(times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        longitudes = np.empty(len(times))
+        speeds = np.empty(len(times))
+        for i, jd in enumerate(times):
+            position = swe.calc_ut(float(jd), code)[0]
+            longitudes[i] = position[0]
+            speeds[i] = position[3]
+        return longitudes, speeds
+    return positions
+
+
+def _sample(positions: Positions, times: np.ndarray, offset: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitudes (shifted by -offset, 0-360) and speeds in degrees/day at the given times."""
+    longitudes, speeds = positions(times)
+    return (longitudes - offset) % 360.0, speeds
+
+
+def _find_stations(positions: Positions, start: np.ndarray, end: np.ndarray, start_speed: np.ndarray) -> np.ndarray:
+    """Times between start and end where the ephemeris speed changes sign (bisection, all brackets at once)."""
+    while (end - start).max() > STATION_TOLERANCE_DAYS:
+        middle = (start + end) / 2.0
+        same_sign = (positions(middle)[1] < 0) == (start_speed < 0)
+        start = np.where(same_sign, middle, start)
+        end = np.where(same_sign, end, middle)
+    return (start + end) / 2.0
+
+
+def _hermite(s: np.ndarray, h: np.ndarray, y0: np.ndarray, y1: np.ndarray, v0: np.ndarray, v1: np.ndarray) -> np.ndarray:
+    s2 = s * s
+    s3 = s2 * s
+    return (2 * s3 - 3 * s2 + 1) * y0 + (s3 - 2 * s2 + s) * h * v0 + (-2 * s3 + 3 * s2) * y1 + (s3 - s2) * h * v1
+
+
+class _PlanetTrack:
+    """Unwrapped longitude samples of one transiting planet, split at its stations."""
+
+    def __init__(self, name: str, positions: Positions, start: float, end: float, offset: float):
+        self.name = name
+        step = TIMELINE_STEP_DAYS.get(name, DEFAULT_TIMELINE_STEP_DAYS)
+        times = np.append(np.arange(start, end, step), end)
+        longitudes, speeds = _sample(positions, times, offset)
+
+        # Retrograde stations: speed changes sign between two samples
+        self.stations = []
+        flips = np.flatnonzero((speeds[:-1] < 0) != (speeds[1:] < 0))
+        if len(flips):
+            station_times = _find_stations(positions, times[flips], times[flips + 1], speeds[flips])
+            station_longitudes, station_speeds = _sample(positions, station_times, offset)
+            for i, jd, longitude in zip(flips, station_times, station_longitudes):
+                self.stations.append((float(jd), "retrograde" if speeds[i] >= 0 else "direct", float(longitude)))
+            order = np.argsort(np.concatenate([times, station_times]), kind="stable")
+            times = np.concatenate([times, station_times])[order]
+            longitudes = np.concatenate([longitudes, station_longitudes])[order]
+            speeds = np.concatenate([speeds, station_speeds])[order]
+
+        self.times = times
+        self.speeds = speeds
+        self.longitudes = longitudes[0] + np.concatenate([[0.0], np.cumsum(_wrap180(np.diff(longitudes)))])
+
+    def crossings(self, levels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every time the longitude crosses one of the levels (mod 360).
+
+        Args:
+            levels: Longitudes in degrees
+
+        Returns:
+            Tuple of (level index, Julian day, direction) arrays; direction is
+            +1 when the planet crosses the level moving direct, -1 when retrograde
+        """
+        y0, y1 = self.longitudes[:-1, None], self.longitudes[1:, None]
+        # Highest copy of each level (level + 360k) not above the segment's upper end;
+        # segments span far less than 360 degrees so no other copy can be crossed
+        top = np.maximum(y0, y1)
+        target = levels[None, :] + 360.0 * np.floor((top - levels[None, :]) / 360.0)
+        segment, level = np.nonzero((y0 >= target) != (y1 >= target))
+        target = target[segment, level]
+
+        t0, t1 = self.times[segment], self.times[segment + 1]
+        h = t1 - t0
+        a, b = self.longitudes[segment], self.longitudes[segment + 1]
+        v0, v1 = self.speeds[segment], self.speeds[segment + 1]
+        rising = b > a
+        low, high = np.zeros(len(segment)), np.ones(len(segment))
+        for _ in range(_BISECTION_STEPS):
+            middle = (low + high) / 2.0
+            above = _hermite(middle, h, a, b, v0, v1) >= target
+            move_high = above == rising
+            high = np.where(move_high, middle, high)
+            low = np.where(move_high, low, middle)
+        return level, t0 + h * (low + high) / 2.0, np.where(rising, 1, -1)
+
+    def longitude_at_start(self) -> float:
+        return float(self.longitudes[0] % 360.0)
+
+
+def _sign_boundaries(system: str) -> Tuple[np.ndarray, Any]:
+    if system == "sidereal":
+        return np.array([start for _, start, _ in TRUE_SIDEREAL_SIGNS]), get_sign_from_degrees
+    return np.arange(0.0, 360.0, 30.0), get_tropical_sign_from_degrees
+
+
+def calculate_transit_timeline(
+    natal_chart: NatalChart,
+    start_date: datetime,
+    end_date: datetime,
+    system: str = "sidereal",
+    planets: Optional[List[str]] = None,
+    use_ephemeris_table: bool = False
+) -> Dict[str, Any]:
+    """
+    Calculate when transits to a natal chart begin, perfect and end over a date range.
+    
+    Transiting planets are aspected to the natal major planets with the same
+    aspects and orbs as calculate_current_transits. A transit period begins
+    when the planet enters orb and ends when it leaves; a retrograde planet can
+    perfect the same aspect up to three times within one period.
+    
+    With use_ephemeris_table the samples are interpolated from the precomputed
+    ephemeris table (accurate to its ERROR_BOUND_DEGREES) instead of calling
+    Swiss Ephemeris; without a table covering the range it has no effect.
+    
+    Args:
+        natal_chart: The natal birth chart
+        start_date: Start of the range (naive datetimes are UTC)
+        end_date: End of the range
+        system: "sidereal" or "tropical"
+        planets: Transiting planets to include (defaults to all ten)
+        use_ephemeris_table: Sample positions from the precomputed ephemeris table
+    
+    Returns:
+        Dictionary with transit periods, sign ingresses and retrograde stations,
+        each in chronological order. A period whose begin or end falls outside
+        the range has None there.
+    
+    Raises:
+        ValueError: If the range is empty or longer than MAX_TIMELINE_DAYS,
+            or a planet name is unknown
+    """
+    start, end = julian_day(start_date), julian_day(end_date)
+    if end <= start:
+        raise ValueError("end_date must be after start_date")
+    if end - start > MAX_TIMELINE_DAYS:
+        raise ValueError(f"Date range cannot exceed {MAX_TIMELINE_DAYS} days")
+    selected = MAJOR_PLANETS if planets is None else planets
+    unknown = [name for name in selected if name not in MAJOR_PLANETS]
+    if unknown:
+        raise ValueError(f"Unknown transiting planet(s): {', '.join(unknown)}")
+    
+    # Same frame as calculate_current_transits: sidereal positions use the natal ayanamsa
+    offset = natal_chart.ascendant_data.get("ayanamsa", 0) if system == "sidereal" else 0.0
+    natal_bodies = natal_chart.celestial_bodies if system == "sidereal" else natal_chart.tropical_bodies
+    natal = [(body.name, body.degree) for body in natal_bodies if body.name in MAJOR_PLANETS and body.degree is not None]
+    
+    # One row per (natal planet, aspect, side): aspects other than conjunction and
+    # opposition can be formed on either side of the natal position
+    windows = []
+    for natal_name, natal_pos in natal:
+        for aspect_name, aspect_angle, orb in ASPECTS_CONFIG:
+            for side in ((1,) if aspect_angle in (0, 180) else (1, -1)):
+                windows.append((natal_name, natal_pos, aspect_name, aspect_angle, orb, (natal_pos + side * aspect_angle) % 360.0))
+    exact_levels = np.array([w[5] for w in windows])
+    orbs = np.array([w[4] for w in windows], dtype=np.float64)
+    # Levels per window: [lower orb edge, exact, upper orb edge]
+    levels = np.stack([exact_levels - orbs, exact_levels, exact_levels + orbs], axis=1).reshape(-1) % 360.0
+    boundaries, sign_of = _sign_boundaries(system)
+    table = get_ephemeris_table() if use_ephemeris_table else None
+    if table is not None and not table.covers(start, end):
+        table = None
+    
+    periods: List[Dict[str, Any]] = []
+    ingresses: List[Dict[str, Any]] = []
+    stations: List[Dict[str, Any]] = []
+    codes = dict(TRANSIT_PLANETS)
+    for planet in selected:
+        positions = partial(table.positions, planet) if table is not None else _swiss_ephemeris_positions(codes[planet])
+        track = _PlanetTrack(planet, positions, start, end, offset)
+        
+        for jd, station, longitude in track.stations:
+            stations.append({
+                "planet": planet,
+                "station": station,
+                "time": datetime_from_jd(jd).isoformat(),
+                "position": round(longitude, 4),
+                "sign": sign_of(longitude)
+            })
+        
+        level, times, direction = track.crossings(boundaries)
+        for b, jd, moving in zip(level.tolist(), times.tolist(), direction.tolist()):
+            sign = sign_of((boundaries[b] + moving * 1e-9) % 360.0)
+            ingresses.append({
+                "planet": planet,
+                "sign": sign,
+                "time": datetime_from_jd(jd).isoformat(),
+                "retrograde": moving < 0
+            })
+        
+        # Walk each window's crossings in time order: edges toggle in-orb, the middle level is exact
+        start_pos = track.longitude_at_start()
+        in_orb = np.abs(_wrap180(start_pos - exact_levels)) <= orbs
+        level, times, _ = track.crossings(levels)
+        order = np.lexsort((times, level // 3))
+        open_periods: Dict[int, Dict[str, Any]] = {}
+        for index in np.flatnonzero(in_orb).tolist():
+            open_periods[index] = {"begin": None, "exact": []}
+        for lvl, jd in zip(level[order].tolist(), times[order].tolist()):
+            window, kind = divmod(lvl, 3)
+            if kind == 1:
+                if window in open_periods:
+                    open_periods[window]["exact"].append(jd)
+            elif window in open_periods:
+                periods.append(_transit_period(planet, windows[window], open_periods.pop(window), jd))
+            else:
+                open_periods[window] = {"begin": jd, "exact": []}
+        for window, period in open_periods.items():
+            periods.append(_transit_period(planet, windows[window], period, None))
+    
+    periods.sort(key=lambda p: (p["begin"] or "", p["exact"][0] if p["exact"] else "", p["transiting_planet"], p["natal_planet"]))
+    ingresses.sort(key=lambda i: i["time"])
+    stations.sort(key=lambda s: s["time"])
+    
+    return {
+        "natal_chart_name": natal_chart.name,
+        "system": system,
+        "start_date": datetime_from_jd(start).isoformat(),
+        "end_date": datetime_from_jd(end).isoformat(),
+        "transiting_planets": list(selected),
+        "transit_periods": periods,
+        "ingresses": ingresses,
+        "stations": stations,
+        "summary": {
+            "total_periods": len(periods),
+            "total_exact_hits": sum(len(p["exact"]) for p in periods),
+            "total_ingresses": len(ingresses),
+            "total_stations": len(stations)
+        }
+    }
+
+
+def _transit_period(planet: str, window: Tuple, period: Dict[str, Any], end: Optional[float]) -> Dict[str, Any]:
+    natal_name, natal_pos, aspect_name, aspect_angle, orb, _ = window
+    return {
+        "transiting_planet": planet,
+        "natal_planet": natal_name,
+        "aspect": aspect_name,
+        "angle": aspect_angle,
+        "orb": orb,
+        "score": ASPECT_SCORES.get(aspect_name, 1.0),
+        "natal_position": round(natal_pos, 4),
+        "begin": datetime_from_jd(period["begin"]).isoformat() if period["begin"] is not None else None,
+        "exact": [datetime_from_jd(jd).isoformat() for jd in period["exact"]],
+        "end": datetime_from_jd(end).isoformat() if end is not None else None
+    }
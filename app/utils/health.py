@@ -116,20 +116,20 @@ def check_ephemeris_health() -> Dict[str, Any]:
     """
     try:
         import swisseph as swe
-        from app.config import SWEP_PATH, DEFAULT_SWISS_EPHEMERIS_PATH
+        from app.services.ephemeris_pool import configure_ephemeris, resolve_ephemeris_path
         import os
         
-        ephe_path = SWEP_PATH or DEFAULT_SWISS_EPHEMERIS_PATH
+        ephe_path = resolve_ephemeris_path()
         
-        if isinstance(ephe_path, str) and os.path.exists(ephe_path):
+        if os.path.exists(ephe_path):
             # Check if we can access ephemeris
             try:
                 # Try to calculate a simple position
-                swe.set_ephe_path(ephe_path)
+                configure_ephemeris(ephe_path)
                 jd = swe.julday(2025, 1, 1, 0.0)
                 result = swe.calc_ut(jd, 0)  # Sun position
                 
-                if result[0] == 0:  # Success
+                if result[1] >= 0:  # Success (negative return flag is an error)
                     return {
                         "status": "healthy",
                         "path": ephe_path,
@@ -139,7 +139,7 @@ def check_ephemeris_health() -> Dict[str, Any]:
                     return {
                         "status": "unhealthy",
                         "path": ephe_path,
-                        "error": f"Ephemeris calculation failed with code {result[0]}"
+                        "error": f"Ephemeris calculation failed with code {result[1]}"
                     }
             except Exception as e:
                 return {
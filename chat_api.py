@@ -12,7 +12,7 @@ import os
 import logging
 from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
@@ -20,6 +20,9 @@ from sqlalchemy import desc
 from database import get_db, User, SavedChart, ChatConversation, ChatMessage, CreditTransaction, AdminBypassLog
 from auth import get_current_user, get_current_user_optional
 from subscription import check_subscription_access
+from app.services.chat_history import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, message_counts, page_conversations, page_messages
+)
 from fastapi import Request
 
 logger = logging.getLogger(__name__)
@@ -84,6 +87,8 @@ class ConversationDetailResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     messages: List[MessageResponse]
+    next_cursor: Optional[str] = None  # Pass as before to load older messages
+    has_more: bool = False
 
     class Config:
         from_attributes = True
@@ -139,6 +144,18 @@ def check_credits(user: User, required: int = CHAT_CREDIT_COST) -> bool:
     return True
 
 
+def message_response(msg: ChatMessage) -> MessageResponse:
+    """Serialize a stored message."""
+    return MessageResponse(
+        id=msg.id,
+        role=msg.role,
+        content=msg.content,
+        created_at=msg.created_at,
+        tokens_used=msg.tokens_used,
+        credits_charged=msg.credits_charged
+    )
+
+
 def deduct_credits(db: Session, user: User, amount: int, description: str) -> int:
     """
     Deduct credits from user and log transaction.
@@ -157,27 +174,41 @@ def deduct_credits(db: Session, user: User, amount: int, description: str) -> in
 
 @router.get("/conversations", response_model=List[ConversationResponse])
 async def get_user_conversations(
+    response: Response,
     chart_id: Optional[int] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all conversations for the current user, optionally filtered by chart."""
+    """
+    Get the current user's conversations, most recently updated first, optionally filtered by chart.
+    
+    Paginated: when more conversations exist, the X-Next-Cursor header holds
+    the cursor to pass for the next page.
+    """
     query = db.query(ChatConversation).filter(ChatConversation.user_id == current_user.id)
     
     if chart_id:
         query = query.filter(ChatConversation.chart_id == chart_id)
     
-    conversations = query.order_by(desc(ChatConversation.updated_at)).all()
+    try:
+        page = page_conversations(query, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
     
+    counts = message_counts(db, [conv.id for conv in page.items])
     result = []
-    for conv in conversations:
+    for conv in page.items:
         result.append(ConversationResponse(
             id=conv.id,
             chart_id=conv.chart_id,
             title=conv.title,
             created_at=conv.created_at,
             updated_at=conv.updated_at,
-            message_count=len(conv.messages)
+            message_count=counts.get(conv.id, 0)
         ))
     
     return result
@@ -221,10 +252,19 @@ async def create_conversation(
 @router.get("/conversations/{conversation_id}", response_model=ConversationDetailResponse)
 async def get_conversation(
     conversation_id: int,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get a conversation with all its messages."""
+    """
+    Get a conversation with its messages, oldest first.
+    
+    Returns every message unless paging is requested: limit returns the
+    newest page, next_cursor as before loads older ones, and a message
+    cursor as after loads newer ones.
+    """
     conversation = db.query(ChatConversation).filter(
         ChatConversation.id == conversation_id,
         ChatConversation.user_id == current_user.id
@@ -233,14 +273,10 @@ async def get_conversation(
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    messages = [MessageResponse(
-        id=msg.id,
-        role=msg.role,
-        content=msg.content,
-        created_at=msg.created_at,
-        tokens_used=msg.tokens_used,
-        credits_charged=msg.credits_charged
-    ) for msg in sorted(conversation.messages, key=lambda m: m.created_at)]
+    try:
+        page = page_messages(db, conversation_id, limit=limit, before=before, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return ConversationDetailResponse(
         id=conversation.id,
@@ -249,7 +285,9 @@ async def get_conversation(
         title=conversation.title,
         created_at=conversation.created_at,
         updated_at=conversation.updated_at,
-        messages=messages
+        messages=[message_response(msg) for msg in page.items],
+        next_cursor=page.next_cursor,
+        has_more=page.has_more
     )
 
 
@@ -442,19 +480,13 @@ async def admin_get_all_conversations(
     
     total = query.count()
     conversations = query.order_by(desc(ChatConversation.updated_at)).offset(offset).limit(limit).all()
+    counts = message_counts(db, [conv.id for conv in conversations])
     
     result = []
     for conv in conversations:
         messages = None
         if include_messages:
-            messages = [MessageResponse(
-                id=msg.id,
-                role=msg.role,
-                content=msg.content,
-                created_at=msg.created_at,
-                tokens_used=msg.tokens_used,
-                credits_charged=msg.credits_charged
-            ) for msg in sorted(conv.messages, key=lambda m: m.created_at)]
+            messages = [message_response(msg) for msg in sorted(conv.messages, key=lambda m: m.created_at)]
         
         result.append(AdminConversationResponse(
             id=conv.id,
@@ -466,7 +498,7 @@ async def admin_get_all_conversations(
             title=conv.title,
             created_at=conv.created_at,
             updated_at=conv.updated_at,
-            message_count=len(conv.messages),
+            message_count=counts.get(conv.id, 0),
             messages=messages
         ))
     
@@ -492,14 +524,7 @@ async def admin_get_conversation(
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    messages = [MessageResponse(
-        id=msg.id,
-        role=msg.role,
-        content=msg.content,
-        created_at=msg.created_at,
-        tokens_used=msg.tokens_used,
-        credits_charged=msg.credits_charged
-    ) for msg in sorted(conversation.messages, key=lambda m: m.created_at)]
+    messages = [message_response(msg) for msg in sorted(conversation.messages, key=lambda m: m.created_at)]
     
     logger.info(f"Admin {current_user.email} viewed conversation {conversation_id}")
     
@@ -513,7 +538,7 @@ async def admin_get_conversation(
         title=conversation.title,
         created_at=conversation.created_at,
         updated_at=conversation.updated_at,
-        message_count=len(conversation.messages),
+        message_count=len(messages),
         messages=messages
     )
 
@@ -568,13 +593,10 @@ async def generate_chat_response(
     chart = conversation.chart
     chart_name = chart.chart_name
     
-    # Get conversation history (last 10 messages for context)
-    recent_messages = sorted(conversation.messages, key=lambda m: m.created_at)[-10:]
-    
     # TODO: Build prompt with:
     # 1. Chart data (from chart.chart_data_json)
     # 2. AI reading (from chart.ai_reading)
-    # 3. Conversation history
+    # 3. Conversation history (recent_messages(db, conversation.id), one bounded query)
     # 4. User's new question
     
     # Placeholder response
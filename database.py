@@ -2,7 +2,7 @@
 Database models and connection setup for user accounts and saved charts.
 Uses SQLite with SQLAlchemy for simplicity and portability.
 """
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import create_engine, event, inspect, Column, Integer, Float, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -91,6 +91,7 @@ class SavedChart(Base):
     
     # Calculated chart data (stored as JSON string)
     chart_data_json = Column(Text, nullable=True)
+    chart_hash = Column(String(64), nullable=True, index=True)  # Derived from chart_data_json on save
     
     # AI reading (if generated)
     ai_reading = Column(Text, nullable=True)
@@ -106,6 +107,22 @@ class SavedChart(Base):
     conversations = relationship("ChatConversation", back_populates="chart", cascade="all, delete-orphan")
 
 
+@event.listens_for(SavedChart, "before_insert")
+def _set_chart_hash_on_insert(mapper, connection, target):
+    """Fill the indexed chart_hash column from chart_data_json."""
+    from app.services.chart_service import saved_chart_hash
+    target.chart_hash = saved_chart_hash(target.chart_data_json, bool(target.unknown_time))
+
+
+@event.listens_for(SavedChart, "before_update")
+def _set_chart_hash_on_update(mapper, connection, target):
+    """Recompute chart_hash when the chart data or unknown_time flag changes."""
+    state = inspect(target)
+    if state.attrs.chart_data_json.history.has_changes() or state.attrs.unknown_time.history.has_changes():
+        from app.services.chart_service import saved_chart_hash
+        target.chart_hash = saved_chart_hash(target.chart_data_json, bool(target.unknown_time))
+
+
 class ChatConversation(Base):
     """Chat conversation about a specific chart."""
     __tablename__ = "chat_conversations"
@@ -126,6 +143,11 @@ class ChatConversation(Base):
     # Messages in this conversation
     messages = relationship("ChatMessage", back_populates="conversation", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Conversation lists: a user's conversations, most recently updated first (keyset on updated_at, id)
+        Index("ix_chat_conversations_user_updated", "user_id", "updated_at", "id"),
+    )
+
 
 class ChatMessage(Base):
     """Individual message in a chat conversation."""
@@ -146,6 +168,11 @@ class ChatMessage(Base):
     # Relationship
     conversation = relationship("ChatConversation", back_populates="messages")
 
+    __table_args__ = (
+        # Message history pages and the last N messages of a conversation (keyset on created_at, id)
+        Index("ix_chat_messages_conversation_created", "conversation_id", "created_at", "id"),
+    )
+
 
 class CreditTransaction(Base):
     """Credit purchase and usage tracking."""
@@ -252,6 +279,118 @@ class FamousPerson(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class FamousPersonPlacement(Base):
+    """One body's sign in one zodiac system for a famous person (see services.famous_people_placements)."""
+    __tablename__ = "famous_person_placements"
+
+    person_id = Column(Integer, ForeignKey("famous_people.id", ondelete="CASCADE"), primary_key=True)
+    system = Column(String(10), primary_key=True)  # sidereal, tropical
+    body = Column(String(50), primary_key=True)
+    sign_code = Column(Integer, nullable=False)  # Index into SIGNS, -1 if unrecognized
+    degree = Column(Float, nullable=True)
+    retro = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        # Prefilter: people sharing a sign for a body, resolved from the index alone
+        Index("ix_famous_person_placements_match", "system", "body", "sign_code", "person_id"),
+    )
+
+
+class FamousPersonAspect(Base):
+    """One of a famous person's top aspects in one zodiac system, body pair sorted."""
+    __tablename__ = "famous_person_aspects"
+
+    person_id = Column(Integer, ForeignKey("famous_people.id", ondelete="CASCADE"), primary_key=True)
+    system = Column(String(10), primary_key=True)
+    body1 = Column(String(50), primary_key=True)
+    body2 = Column(String(50), primary_key=True)
+    aspect_type = Column(String(50), primary_key=True)
+
+    __table_args__ = (
+        # Prefilter: people sharing an aspect, resolved from the index alone
+        Index("ix_famous_person_aspects_match", "system", "body1", "body2", "aspect_type", "person_id"),
+    )
+
+
+# Fields the placement and aspect rows are derived from
+_FAMOUS_PERSON_MATCH_FIELDS = (
+    "chart_data_json", "planetary_placements_json", "top_aspects_json",
+    "sun_sign_sidereal", "sun_sign_tropical", "moon_sign_sidereal", "moon_sign_tropical",
+)
+
+
+@event.listens_for(FamousPerson, "after_insert")
+def _insert_famous_person_rows(mapper, connection, target):
+    """Write the placement and aspect rows for a new famous person."""
+    from services.famous_people_placements import sync_famous_person_rows
+    sync_famous_person_rows(connection, target)
+
+
+@event.listens_for(FamousPerson, "after_update")
+def _update_famous_person_rows(mapper, connection, target):
+    """Rewrite the placement and aspect rows when the chart fields they come from change."""
+    state = inspect(target)
+    if any(getattr(state.attrs, field).history.has_changes() for field in _FAMOUS_PERSON_MATCH_FIELDS):
+        from services.famous_people_placements import sync_famous_person_rows
+        sync_famous_person_rows(connection, target)
+
+
+@event.listens_for(FamousPerson, "after_delete")
+def _delete_famous_person_rows(mapper, connection, target):
+    """Delete the placement and aspect rows of a removed famous person (SQLite does not cascade)."""
+    from services.famous_people_placements import delete_famous_person_rows
+    delete_famous_person_rows(connection, target.id)
+
+
+class FamousPersonNeighbor(Base):
+    """One entry of a famous person's precomputed nearest-neighbor list (see services.similarity_neighbors)."""
+    __tablename__ = "famous_person_neighbors"
+
+    person_id = Column(Integer, ForeignKey("famous_people.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 0 = most similar
+    # No foreign key: entries pointing at removed people are found and replaced by the next refresh
+    neighbor_id = Column(Integer, nullable=False, index=True)
+    score = Column(Float, nullable=False)
+
+
+class FamousPersonNeighborSource(Base):
+    """FamousPerson.updated_at each neighbor list was last built from."""
+    __tablename__ = "famous_person_neighbor_sources"
+
+    person_id = Column(Integer, primary_key=True)  # No foreign key: outlives the person so removals are detected
+    updated_at = Column(DateTime, nullable=True)
+
+
+class BackgroundJob(Base):
+    """Durable background job, claimed by workers under a lease (see app.services.job_queue)."""
+    __tablename__ = "background_jobs"
+
+    id = Column(String(36), primary_key=True)  # UUID
+    job_type = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed, cancelled
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    payload_json = Column(Text, nullable=False)
+    result_json = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    progress = Column(Float, default=0.0)
+    
+    # Retry and lease bookkeeping
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # Not claimable before this (retry backoff)
+    lease_owner = Column(String(100), nullable=True)  # Worker currently running the job
+    lease_expires_at = Column(DateTime, nullable=True)  # Re-queued if the worker stops heartbeating
+    
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Claim query: claimable jobs of one type, oldest first
+        Index("ix_background_jobs_claim", "job_type", "status", "run_after"),
+    )
+
+
 def init_db():
     """Initialize the database tables."""
     Base.metadata.create_all(bind=engine)
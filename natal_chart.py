@@ -1,10 +1,11 @@
 # natal_chart.py
 
+from bisect import bisect_right
 from datetime import datetime, timezone
+from functools import cached_property
 import math
 import os
-from itertools import combinations
-from typing import List, Tuple, Dict, Any, Union, Optional
+from typing import List, Tuple, Dict, Any, Iterable, Union, Optional
 import swisseph as swe
 
 # Set Swiss Ephemeris path for asteroid calculations
@@ -26,6 +27,10 @@ ASPECT_LUMINARY_ORBS: Dict[str, float] = {"Conjunction":10,"Opposition":10,"Trin
 ASPECT_SCORES: Dict[str, float] = {"Conjunction":5,"Opposition":4,"Trine":3.5,"Square":3,"Sextile":2.5,"Quincunx":2,"Semisextile":1.5,"Semisquare":1.5,"Sesquiquadrate":1.5,"Quintile":1.8,"Biquintile":1.8}
 
 # --- Helper Functions ---
+def get_ayanamsa(year):
+    """True Sidereal ayanamsa for a calendar year (also accepts NumPy arrays of years)."""
+    return 31.38 + ((year - 2000) / 72.0)
+
 def format_true_sidereal_placement(degrees: float) -> str:
     for sign, start, end in TRUE_SIDEREAL_SIGNS:
         if start <= degrees < end:
@@ -36,10 +41,11 @@ def get_sign_and_ruler(degrees: float) -> Tuple[str, str]:
     for sign, start, end in TRUE_SIDEREAL_SIGNS:
         if start <= degrees < end: return sign, SIGN_RULERS.get(sign, "Unknown")
     return "Unknown", "Unknown"
+_SIDEREAL_SIGN_STARTS = [start for _, start, _ in TRUE_SIDEREAL_SIGNS]; _SIDEREAL_SIGN_INDEX = {sign: i for i, (sign, _, _) in enumerate(TRUE_SIDEREAL_SIGNS)}
 def get_sign_from_degrees(degrees: float) -> str:
-    for sign, start, end in TRUE_SIDEREAL_SIGNS:
-        if start <= degrees < end: return sign
-    return "Unknown"
+    # Signs are contiguous and sorted, so the last start at or below degrees is the only candidate
+    i = bisect_right(_SIDEREAL_SIGN_STARTS, degrees) - 1
+    return TRUE_SIDEREAL_SIGNS[i][0] if i >= 0 and degrees < TRUE_SIDEREAL_SIGNS[i][2] else "Unknown"
 
 def get_tropical_sign_from_degrees(degrees: float) -> str:
     """Get tropical sign from degrees (equal 30-degree divisions)."""
@@ -186,57 +192,166 @@ def _calculate_approximate_sunrise_sunset_math(jd_ut: float, latitude: float, lo
     except Exception as e: print(f"DEBUG: Sunrise/Sunset math error: {e}"); return None, None
 
 # --- Core Classes ---
+# Bodies and aspects use __slots__ (no per-instance __dict__); formatted strings are built on access
+def _format_house_degrees(d_in_h: float) -> str: return f"{int(d_in_h)}°{int(round((d_in_h % 1) * 60)):02d}′"
 class CelestialBody:
+    __slots__ = ("name", "degree", "retrograde", "is_main_planet", "sign", "house_num", "house_offset", "is_luminary")
     def __init__(self, name: str, degree: Optional[float], retrograde: bool, sidereal_asc: Optional[float], is_main_planet: bool = True):
         self.name = name; self.degree = degree; self.retrograde = retrograde; self.is_main_planet = is_main_planet
         self.sign = get_sign_from_degrees(degree) if degree is not None else "N/A"
-        self.formatted_position = format_true_sidereal_placement(degree) if degree is not None else "N/A"
-        self.sign_percentage = 0
-        if degree is not None and self.sign != "Unknown":
-            for s, start, end in TRUE_SIDEREAL_SIGNS:
-                if s == self.sign: self.sign_percentage = int(round(((degree - start) / (end - start)) * 100)); break
-        self.house_num, self.house_degrees = -1, "N/A"
-        if degree is not None and sidereal_asc is not None:
-            h_num, d_in_h = find_house_equal(degree, sidereal_asc)
-            self.house_num = h_num; self.house_degrees = f"{int(d_in_h)}°{int(round((d_in_h % 1) * 60)):02d}′"
-        self.is_luminary = name in ["Sun", "Moon"]
+        self.house_num, self.house_offset = -1, None
+        if degree is not None and sidereal_asc is not None: self.house_num, self.house_offset = find_house_equal(degree, sidereal_asc)
+        self.is_luminary = name in ("Sun", "Moon")
+    @property
+    def formatted_position(self) -> str: return format_true_sidereal_placement(self.degree) if self.degree is not None else "N/A"
+    @property
+    def sign_percentage(self) -> int:
+        if self.degree is None or self.sign == "Unknown": return 0
+        _, start, end = TRUE_SIDEREAL_SIGNS[_SIDEREAL_SIGN_INDEX[self.sign]]; return int(round(((self.degree - start) / (end - start)) * 100))
+    @property
+    def house_degrees(self) -> str: return _format_house_degrees(self.house_offset) if self.house_offset is not None else "N/A"
 
 class TropicalCelestialBody:
     """Celestial body with tropical zodiac calculations."""
+    __slots__ = ("name", "degree", "retrograde", "is_main_planet", "sign", "house_num", "house_offset", "is_luminary")
     def __init__(self, name: str, degree: Optional[float], retrograde: bool, tropical_asc: Optional[float], is_main_planet: bool = True):
         self.name = name
         self.degree = degree
         self.retrograde = retrograde
         self.is_main_planet = is_main_planet
         self.sign = get_tropical_sign_from_degrees(degree) if degree is not None else "N/A"
-        self.formatted_position = format_tropical_placement(degree) if degree is not None else "N/A"
-        self.sign_percentage = int(round((degree % 30) / 30 * 100)) if degree is not None else 0
-        self.house_num, self.house_degrees = -1, "N/A"
+        self.house_num, self.house_offset = -1, None
         if degree is not None and tropical_asc is not None:
-            h_num, d_in_h = find_house_equal(degree, tropical_asc)
-            self.house_num = h_num
-            self.house_degrees = f"{int(d_in_h)}°{int(round((d_in_h % 1) * 60)):02d}′"
-        self.is_luminary = name in ["Sun", "Moon"]
+            self.house_num, self.house_offset = find_house_equal(degree, tropical_asc)
+        self.is_luminary = name in ("Sun", "Moon")
+    @property
+    def formatted_position(self) -> str:
+        return format_tropical_placement(self.degree) if self.degree is not None else "N/A"
+    @property
+    def sign_percentage(self) -> int:
+        return int(round((self.degree % 30) / 30 * 100)) if self.degree is not None else 0
+    @property
+    def house_degrees(self) -> str:
+        return _format_house_degrees(self.house_offset) if self.house_offset is not None else "N/A"
 class Aspect:
+    __slots__ = ("p1", "p2", "type", "orb", "strength")
     def __init__(self, p1: Union[CelestialBody, TropicalCelestialBody], p2: Union[CelestialBody, TropicalCelestialBody], aspect_type: str, orb: float, strength: float):
         self.p1, self.p2, self.type, self.orb, self.strength = p1, p2, aspect_type, orb, strength
+def _find_chart_aspects(bodies: List[Union[CelestialBody, TropicalCelestialBody]]) -> List[Aspect]:
+    """Aspects between every pair of bodies, in pair order; luminary pairs get the wider orbs."""
+    from app.services.aspect_kernel import find_aspects  # the kernel imports this module's aspect tables
+    hits = find_aspects([b.degree for b in bodies], luminaries1=[b.is_luminary for b in bodies])
+    return [Aspect(bodies[i], bodies[j], name, round(float(orb), 2), round(float(score) / (1 + abs(float(orb))), 2))
+            for i, j, name, orb, score in zip(hits.first.tolist(), hits.second.tolist(), hits.names, hits.orb, hits.score)]
+def _aspect_adjacency(names: List[str], aspects: List[Aspect]) -> Dict[str, List[int]]:
+    """Boolean adjacency matrix per aspect type, each row packed into an int bitmask over names."""
+    index = {name: i for i, name in enumerate(names)}; rows: Dict[str, List[int]] = {}
+    for a in aspects:
+        i, j = index.get(a.p1.name), index.get(a.p2.name)
+        if i is None or j is None: continue
+        row = rows.setdefault(a.type, [0] * len(names)); row[i] |= 1 << j; row[j] |= 1 << i
+    return rows
+def _bits(mask: int):
+    """Indices of the set bits of mask, lowest first."""
+    while mask:
+        low = mask & -mask; yield low.bit_length() - 1; mask ^= low
+def _triangles(edge: List[int], left: List[int], right: List[int]):
+    """(i, j, k) with i < j < k, edge i-j, left i-k and right j-k, in combinations() order."""
+    for i, row in enumerate(edge):
+        for j in _bits(row >> (i + 1) << (i + 1)):
+            for k in _bits(left[i] & right[j] & ~((2 << j) - 1)): yield i, j, k
+def _detect_patterns(planets: Dict[str, Union[CelestialBody, TropicalCelestialBody]], aspects: List[Aspect], house_known: bool) -> List[Dict[str, Any]]:
+    """T-squares, stelliums, grand trines, grand crosses and yods among planets, from adjacency rows instead of combination scans."""
+    patterns: List[Dict[str, Any]] = []; names = list(planets.keys())
+    adjacency = _aspect_adjacency(names, aspects); empty = [0] * len(names)
+    opp, sq, tri = adjacency.get('Opposition', empty), adjacency.get('Square', empty), adjacency.get('Trine', empty)
+    sext, quin = adjacency.get('Sextile', empty), adjacency.get('Quincunx', empty)
+    def single(mapping, members): values = {mapping.get(planets[names[m]].sign) for m in members}; return values.pop() if len(values) == 1 else "Mixed"
+    
+    # T-Square detection
+    for i, j, k in _triangles(opp, sq, sq):
+        patterns.append({"description": f"{names[i]} opp {names[j]}, focal {names[k]} ({single(MODALITY_MAPPING, (i, j, k))} T-Square)"})
+    
+    # Sign stellium detection
+    sign_groups = {}
+    for name, p in planets.items(): sign_groups.setdefault(p.sign, []).append(name)
+    for sign, members in sign_groups.items():
+        if len(members) >= 3:
+            el = ELEMENT_MAPPING.get(sign, ''); mod = MODALITY_MAPPING.get(sign, '')
+            patterns.append({"description": f"{len(members)} bodies in {sign} ({el}, {mod} Sign Stellium)"})
+    
+    # House stellium detection (only if birth time is known)
+    if house_known:
+        house_groups = {}
+        for name, p in planets.items():
+            if p.house_num > 0:  # Only count planets with valid house numbers
+                house_groups.setdefault(p.house_num, []).append(name)
+        for house_num, members in house_groups.items():
+            if len(members) >= 3:
+                patterns.append({"description": f"{len(members)} bodies in House {house_num} (House Stellium)"})
+    
+    # Grand Trine detection (3-cliques of the trine matrix)
+    for i, j, k in _triangles(tri, tri, tri):
+        patterns.append({"description": f"{names[i]}, {names[j]}, {names[k]} ({single(ELEMENT_MAPPING, (i, j, k))} Grand Trine)"})
+    
+    # Grand Cross detection (oppositions i-j and k-l, i < j < k < l, squared to each other)
+    for i, j in ((i, j) for i, row in enumerate(opp) for j in _bits(row >> (i + 1) << (i + 1))):
+        squared = sq[i] & sq[j]
+        for k in _bits(squared & ~((2 << j) - 1)):
+            for l in _bits(opp[k] & squared & ~((2 << k) - 1)):
+                patterns.append({"description": f"{names[i]}, {names[j]}, {names[k]}, {names[l]} ({single(MODALITY_MAPPING, (i, j, k, l))} Grand Cross)"})
+    
+    # Yod detection (2 planets in sextile, both quincunx a third)
+    for i, j, k in _triangles(sext, quin, quin):
+        patterns.append({"description": f"{names[i]} sextile {names[j]}, both quincunx {names[k]} (Yod)"})
+    return patterns
+def _analyze_dominance(bodies: List[Union[CelestialBody, TropicalCelestialBody]], aspects: List[Aspect], unknown_sign: str) -> Dict[str, Any]:
+    """Dominant sign, element, modality and planet from placements and aspect strength."""
+    counts = {'sign': {}, 'element': {}, 'modality': {}}; strength = {}
+    for b in bodies:
+        if not b.is_main_planet or b.degree is None or b.name == "True Node" or b.sign == unknown_sign: continue
+        counts['sign'][b.sign] = counts['sign'].get(b.sign, 0) + 1
+        el = ELEMENT_MAPPING.get(b.sign); counts['element'][el] = counts['element'].get(el, 0) + 1
+        mod = MODALITY_MAPPING.get(b.sign); counts['modality'][mod] = counts['modality'].get(mod, 0) + 1
+    for a in aspects: strength[a.p1.name] = strength.get(a.p1.name, 0) + a.strength; strength[a.p2.name] = strength.get(a.p2.name, 0) + a.strength
+    dominance = {f"dominant_{k}": max(v, key=v.get) if v else "N/A" for k, v in counts.items()}
+    dominance['dominant_planet'] = max(strength, key=strength.get) if strength else "N/A"
+    dominance['counts'] = counts; dominance['strength'] = {k: round(v, 2) for k, v in strength.items()}
+    return dominance
+# Keys of get_full_chart_data, in output order; `sections` selects a subset of these
+CHART_DATA_SECTIONS = (
+    "name", "utc_datetime", "location", "day_night_status", "chinese_zodiac", "numerology_analysis", "unknown_time",
+    "true_sidereal_signs", "sidereal_house_cusps", "tropical_house_cusps", "house_rulers", "house_sign_distributions",
+    "sidereal_chart_analysis", "sidereal_major_positions", "sidereal_retrogrades", "sidereal_aspects", "sidereal_aspect_patterns",
+    "sidereal_additional_points", "tropical_chart_analysis", "tropical_major_positions", "tropical_retrogrades", "tropical_aspects",
+    "tropical_aspect_patterns", "tropical_additional_points",
+)
+_MAIN_PLANET_NAMES = frozenset(name for name, _ in PLANETS_CONFIG)
 class NatalChart:
+    """
+    A calculated chart. Sidereal positions (celestial_bodies, all_points) are computed by
+    calculate_chart; the tropical chart, aspects, patterns, house distributions and dominance
+    are computed on first access, so callers that only read positions never pay for them.
+    """
+    # Derived sections, cached on first access and reset by calculate_chart
+    _LAZY_SECTIONS = ("aspects", "aspect_patterns", "house_sign_distributions", "dominance_analysis", "tropical_bodies", "tropical_points",
+                      "tropical_aspects", "tropical_aspect_patterns", "tropical_dominance")
     def __init__(self, name: str, year: int, month: int, day: int, hour: int, minute: int, latitude: float, longitude: float):
         self.name = name; self.latitude, self.longitude = latitude, longitude
         self.birth_year, self.birth_hour, self.birth_minute = year, hour, minute
         self.jd = swe.julday(year, month, day, hour + minute / 60.0); self.ut_decimal_hour = hour + minute / 60.0
         self.utc_datetime_str = datetime(year, month, day, hour, minute, tzinfo=timezone.utc).strftime("%Y-%m-%d %H:%M")
         self.location_str = f"{abs(latitude):.4f}° {'N' if latitude >= 0 else 'S'}, {abs(longitude):.4f}° {'E' if longitude >= 0 else 'W'}"
-        # Sidereal data
         self.celestial_bodies: List[CelestialBody] = []; self.all_points: List[CelestialBody] = []
-        self.aspects: List[Aspect] = []; self.aspect_patterns: List[Dict[str, Any]] = []
-        self.house_sign_distributions: Dict[str, List[str]] = {}; self.dominance_analysis: Dict[str, Any] = {}
-        # Tropical data
-        self.tropical_bodies: List[TropicalCelestialBody] = []; self.tropical_points: List[TropicalCelestialBody] = []
-        self.tropical_aspects: List[Aspect] = []; self.tropical_aspect_patterns: List[Dict[str, Any]] = []
-        self.tropical_dominance: Dict[str, Any] = {}
+        # (name, tropical longitude, retrograde, is_main_planet) per body, expanded into tropical_bodies on demand
+        self._tropical_rows: List[Tuple[str, float, bool, bool]] = []
         self.ascendant_data: Dict[str, Any] = {}; self.day_night_info: Dict[str, Any] = {}
-    def calculate_chart(self, unknown_time: bool = False) -> None:
+        self._ephemeris: Optional[Any] = None; self._unknown_time = False
+    def calculate_chart(self, unknown_time: bool = False, ephemeris: Optional[Any] = None) -> None:
+        """Calculate the chart. `ephemeris` is an optional precomputed row from app.services.ephemeris_batch."""
+        self._ephemeris = ephemeris; self._unknown_time = unknown_time
+        self.celestial_bodies, self.all_points, self._tropical_rows = [], [], []
+        for attr in self._LAZY_SECTIONS: self.__dict__.pop(attr, None)
         self._calculate_ascendant_mc_data();
         if self.ascendant_data.get("sidereal_asc") is None: return
         if not unknown_time:
@@ -245,16 +360,15 @@ class NatalChart:
             # Set day_night_info to Undetermined when birth time is unknown
             self.day_night_info = {"status": "Undetermined"}
         self._calculate_all_points()
-        self._calculate_aspects(); self._detect_aspect_patterns()
-        self._calculate_tropical_aspects(); self._detect_tropical_aspect_patterns()
-        if not unknown_time:
-            self._calculate_house_sign_distributions()
-        self._analyze_chart_dominance()
-        self._analyze_tropical_dominance()
     def _calculate_ascendant_mc_data(self) -> None:
         try:
-            res = swe.houses(self.jd, self.latitude, self.longitude, b'P'); ayanamsa = 31.38 + ((self.birth_year - 2000) / 72.0)
-            self.ascendant_data = {"tropical_asc": res[1][0], "mc": res[1][1], "ayanamsa": ayanamsa, "sidereal_asc": (res[1][0] - ayanamsa + 360) % 360}
+            if self._ephemeris is not None:
+                if not self._ephemeris["valid"]: raise ValueError("houses unavailable in batch ephemeris")
+                angles = (float(self._ephemeris["tropical_asc"]), float(self._ephemeris["mc"]))
+            else:
+                angles = swe.houses(self.jd, self.latitude, self.longitude, b'P')[1]
+            ayanamsa = get_ayanamsa(self.birth_year)
+            self.ascendant_data = {"tropical_asc": angles[0], "mc": angles[1], "ayanamsa": ayanamsa, "sidereal_asc": (angles[0] - ayanamsa + 360) % 360}
         except Exception as e: print(f"CRITICAL ERROR calculating ascendant: {e}"); self.ascendant_data = {"sidereal_asc": None}
     def _determine_day_night(self) -> None:
         sunrise, sunset = _calculate_approximate_sunrise_sunset_math(self.jd, self.latitude, self.longitude)
@@ -263,135 +377,53 @@ class NatalChart:
         self.day_night_info = {"sunrise": sunrise, "sunset": sunset, "status": "Day Birth" if is_day else "Night Birth" if is_day is not None else "Undetermined"}
     def _calculate_all_points(self) -> None:
         sidereal_asc = self.ascendant_data.get("sidereal_asc"); ayanamsa = self.ascendant_data.get("ayanamsa")
-        tropical_asc = self.ascendant_data.get("tropical_asc")
         if sidereal_asc is None or ayanamsa is None: return
         configs = PLANETS_CONFIG + ADDITIONAL_BODIES_CONFIG
-        for name, code in configs:
+        for index, (name, code) in enumerate(configs):
             try:
-                res = swe.calc_ut(self.jd, code)
-                is_retro = res[0][3] < 0
-                # Sidereal: subtract ayanamsa
-                sidereal_lon = (res[0][0] - ayanamsa + 360) % 360
-                # Tropical: use raw longitude
-                tropical_lon = res[0][0] % 360
-                is_main = any(name == p[0] for p in PLANETS_CONFIG)
-                self.celestial_bodies.append(CelestialBody(name, sidereal_lon, is_retro, sidereal_asc, is_main))
-                if tropical_asc is not None:
-                    self.tropical_bodies.append(TropicalCelestialBody(name, tropical_lon, is_retro, tropical_asc, is_main))
+                if self._ephemeris is not None:
+                    lon, speed = float(self._ephemeris["tropical_lon"][index]), float(self._ephemeris["speed"][index])
+                    if math.isnan(lon): raise ValueError("position unavailable in batch ephemeris")
+                else:
+                    res = swe.calc_ut(self.jd, code); lon, speed = res[0][0], res[0][3]
+                is_retro = speed < 0; is_main = name in _MAIN_PLANET_NAMES
+                # Sidereal: subtract ayanamsa; tropical: raw longitude
+                self.celestial_bodies.append(CelestialBody(name, (lon - ayanamsa + 360) % 360, is_retro, sidereal_asc, is_main))
+                self._tropical_rows.append((name, lon % 360, is_retro, is_main))
             except Exception as e: print(f"DEBUG: Failed to calculate {name}: {e}"); continue
         self.all_points.extend(self.celestial_bodies)
-        self.tropical_points.extend(self.tropical_bodies)
-        
-        # Sidereal angles
         asc_obj = CelestialBody("Ascendant", sidereal_asc, False, sidereal_asc, False)
         mc_deg = (self.ascendant_data.get('mc') - ayanamsa + 360) % 360 if self.ascendant_data.get('mc') is not None else None
         mc_obj = CelestialBody("Midheaven (MC)", mc_deg, False, sidereal_asc, False)
         desc_obj = CelestialBody("Descendant", (sidereal_asc + 180) % 360, False, sidereal_asc, False)
         ic_deg = (mc_deg + 180) % 360 if mc_deg is not None else None
         ic_obj = CelestialBody("Imum Coeli (IC)", ic_deg, False, sidereal_asc, False)
-        
-        # Tropical angles
-        if tropical_asc is not None:
-            trop_asc_obj = TropicalCelestialBody("Ascendant", tropical_asc, False, tropical_asc, False)
-            trop_mc_deg = self.ascendant_data.get('mc') % 360 if self.ascendant_data.get('mc') is not None else None
-            trop_mc_obj = TropicalCelestialBody("Midheaven (MC)", trop_mc_deg, False, tropical_asc, False)
-            trop_desc_obj = TropicalCelestialBody("Descendant", (tropical_asc + 180) % 360, False, tropical_asc, False)
-            trop_ic_deg = (trop_mc_deg + 180) % 360 if trop_mc_deg is not None else None
-            trop_ic_obj = TropicalCelestialBody("Imum Coeli (IC)", trop_ic_deg, False, tropical_asc, False)
-            self.tropical_points.extend(filter(lambda p: p and p.degree is not None, [trop_asc_obj, trop_mc_obj, trop_desc_obj, trop_ic_obj]))
-        
         sun = next((p for p in self.celestial_bodies if p.name == 'Sun'), None)
         moon = next((p for p in self.celestial_bodies if p.name == 'Moon'), None)
         pof_obj = None
         # Only calculate Part of Fortune when birth time is known (status exists and is not 'Undetermined')
-        day_night_status = self.day_night_info.get('status')
-        if sun and sun.degree is not None and moon and moon.degree is not None and day_night_status and day_night_status != 'Undetermined':
+        if sun and sun.degree is not None and moon and moon.degree is not None and self._birth_time_known():
             is_day = self.day_night_info.get('status') == 'Day Birth'
             pof_deg = (asc_obj.degree + moon.degree - sun.degree + 360) % 360 if is_day else (asc_obj.degree + sun.degree - moon.degree + 360) % 360
             pof_obj = CelestialBody("Part of Fortune", pof_deg, False, sidereal_asc, False)
-            if tropical_asc is not None:
-                trop_sun = next((p for p in self.tropical_bodies if p.name == 'Sun'), None)
-                trop_moon = next((p for p in self.tropical_bodies if p.name == 'Moon'), None)
-                if trop_sun and trop_sun.degree is not None and trop_moon and trop_moon.degree is not None:
-                    trop_pof_deg = (tropical_asc + trop_moon.degree - trop_sun.degree + 360) % 360 if is_day else (tropical_asc + trop_sun.degree - trop_moon.degree + 360) % 360
-                    trop_pof_obj = TropicalCelestialBody("Part of Fortune", trop_pof_deg, False, tropical_asc, False)
-                    self.tropical_points.append(trop_pof_obj)
         nn = next((p for p in self.celestial_bodies if p.name == 'True Node'), None)
         sn_obj = CelestialBody("South Node", (nn.degree + 180) % 360, False, sidereal_asc, False) if nn and nn.degree is not None else None
-        if nn and nn.degree is not None and tropical_asc is not None:
-            trop_nn = next((p for p in self.tropical_bodies if p.name == 'True Node'), None)
-            if trop_nn and trop_nn.degree is not None:
-                trop_sn_obj = TropicalCelestialBody("South Node", (trop_nn.degree + 180) % 360, False, tropical_asc, False)
-                self.tropical_points.append(trop_sn_obj)
         self.all_points.extend(filter(lambda p: p and p.degree is not None, [pof_obj, sn_obj, asc_obj, mc_obj, desc_obj, ic_obj]))
-    def _calculate_aspects(self) -> None:
+    def _birth_time_known(self) -> bool:
+        status = self.day_night_info.get('status'); return bool(status) and status != 'Undetermined'
+    @cached_property
+    def aspects(self) -> List[Aspect]:
         main_planets = [b for b in self.celestial_bodies if b.is_main_planet and b.degree is not None]
-        for p1, p2 in combinations(main_planets, 2):
-            diff = min(abs(p1.degree - p2.degree), 360 - abs(p1.degree - p2.degree))
-            is_luminary = p1.is_luminary or p2.is_luminary
-            for name, angle, orb in ASPECTS_CONFIG:
-                orb_max = ASPECT_LUMINARY_ORBS.get(name, orb) if is_luminary else orb
-                if abs(diff - angle) <= orb_max: self.aspects.append(Aspect(p1, p2, name, round(diff - angle, 2), round(ASPECT_SCORES.get(name, 1) / (1 + abs(diff - angle)), 2)))
-        self.aspects.sort(key=lambda x: -x.strength)
-    def _detect_aspect_patterns(self) -> None:
-        patterns: List[Dict[str, Any]] = []
-        planets = {b.name: b for b in self.celestial_bodies if b.is_main_planet and b.degree is not None}; names = list(planets.keys())
-        def find_aspect(p1, p2, type): return any(a.type == type and ((a.p1.name == p1 and a.p2.name == p2) or (a.p1.name == p2 and a.p2.name == p1)) for a in self.aspects)
-        
-        # T-Square detection
-        if len(names) >= 3:
-            for p1, p2, p3 in combinations(names, 3):
-                if find_aspect(p1, p2, 'Opposition') and find_aspect(p1, p3, 'Square') and find_aspect(p2, p3, 'Square'):
-                    modalities = {MODALITY_MAPPING.get(planets[p].sign) for p in [p1, p2, p3]}; modality = modalities.pop() if len(modalities) == 1 else "Mixed"
-                    self.aspect_patterns.append({"description": f"{p1} opp {p2}, focal {p3} ({modality} T-Square)"})
-        
-        # Sign stellium detection
-        sign_groups = {};
-        for name, p in planets.items(): sign_groups.setdefault(p.sign, []).append(name)
-        for sign, members in sign_groups.items():
-            if len(members) >= 3:
-                el = ELEMENT_MAPPING.get(sign, ''); mod = MODALITY_MAPPING.get(sign, '')
-                self.aspect_patterns.append({"description": f"{len(members)} bodies in {sign} ({el}, {mod} Sign Stellium)"})
-        
-        # House stellium detection (only if birth time is known)
-        if self.ascendant_data.get("sidereal_asc") is not None:
-            house_groups = {};
-            for name, p in planets.items():
-                if p.house_num > 0:  # Only count planets with valid house numbers
-                    house_groups.setdefault(p.house_num, []).append(name)
-            for house_num, members in house_groups.items():
-                if len(members) >= 3:
-                    self.aspect_patterns.append({"description": f"{len(members)} bodies in House {house_num} (House Stellium)"})
-        
-        # Grand Trine detection (3 planets forming trines to each other)
-        if len(names) >= 3:
-            for p1, p2, p3 in combinations(names, 3):
-                if find_aspect(p1, p2, 'Trine') and find_aspect(p1, p3, 'Trine') and find_aspect(p2, p3, 'Trine'):
-                    elements = {ELEMENT_MAPPING.get(planets[p].sign) for p in [p1, p2, p3]}
-                    element = elements.pop() if len(elements) == 1 else "Mixed"
-                    self.aspect_patterns.append({"description": f"{p1}, {p2}, {p3} ({element} Grand Trine)"})
-        
-        # Grand Cross detection (4 planets forming 2 oppositions and 4 squares)
-        if len(names) >= 4:
-            for p1, p2, p3, p4 in combinations(names, 4):
-                opp_count = sum([find_aspect(p1, p2, 'Opposition'), find_aspect(p3, p4, 'Opposition')])
-                square_count = sum([
-                    find_aspect(p1, p3, 'Square'), find_aspect(p1, p4, 'Square'),
-                    find_aspect(p2, p3, 'Square'), find_aspect(p2, p4, 'Square')
-                ])
-                if opp_count >= 2 and square_count >= 4:
-                    modalities = {MODALITY_MAPPING.get(planets[p].sign) for p in [p1, p2, p3, p4]}
-                    modality = modalities.pop() if len(modalities) == 1 else "Mixed"
-                    self.aspect_patterns.append({"description": f"{p1}, {p2}, {p3}, {p4} ({modality} Grand Cross)"})
-        
-        # Yod detection (2 planets in sextile, both quincunx a third)
-        if len(names) >= 3:
-            for p1, p2, p3 in combinations(names, 3):
-                if find_aspect(p1, p2, 'Sextile') and find_aspect(p1, p3, 'Quincunx') and find_aspect(p2, p3, 'Quincunx'):
-                    self.aspect_patterns.append({"description": f"{p1} sextile {p2}, both quincunx {p3} (Yod)"})
-    def _calculate_house_sign_distributions(self) -> None:
-        asc = self.ascendant_data.get("sidereal_asc")
-        if asc is None: return
+        return sorted(_find_chart_aspects(main_planets), key=lambda x: -x.strength)
+    @cached_property
+    def aspect_patterns(self) -> List[Dict[str, Any]]:
+        if self.ascendant_data.get("sidereal_asc") is None: return []
+        planets = {b.name: b for b in self.celestial_bodies if b.is_main_planet and b.degree is not None}
+        return _detect_patterns(planets, self.aspects, True)
+    @cached_property
+    def house_sign_distributions(self) -> Dict[str, List[str]]:
+        asc = self.ascendant_data.get("sidereal_asc"); distributions = {}
+        if asc is None or self._unknown_time: return distributions
         for i in range(12):
             house_num = i + 1; house_start = (asc + i * 30) % 360; house_end = (house_start + 30) % 360
             segments = []
@@ -402,264 +434,177 @@ class NatalChart:
                     if overlap_start < overlap_end:
                         if abs((overlap_end - overlap_start) - (sign_end - sign_start)) < 0.01: segments.append(f"{sign_name} (complete)")
                         else: segments.append(f"{sign_name} {(overlap_start - sign_start):.1f}°–{(overlap_end - sign_start):.1f}°")
-            self.house_sign_distributions[f"House {house_num}"] = segments
-    def _analyze_chart_dominance(self) -> None:
-        counts = {'sign': {}, 'element': {}, 'modality': {}}; strength = {}
-        main_planets = [b for b in self.celestial_bodies if b.is_main_planet and b.degree is not None and b.name != "True Node"]
-        for b in main_planets:
-            if b.sign != "Unknown":
-                counts['sign'][b.sign] = counts['sign'].get(b.sign, 0) + 1
-                el = ELEMENT_MAPPING.get(b.sign); counts['element'][el] = counts['element'].get(el, 0) + 1
-                mod = MODALITY_MAPPING.get(b.sign); counts['modality'][mod] = counts['modality'].get(mod, 0) + 1
-        for a in self.aspects: strength[a.p1.name] = strength.get(a.p1.name, 0) + a.strength; strength[a.p2.name] = strength.get(a.p2.name, 0) + a.strength
-        self.dominance_analysis = {f"dominant_{k}": max(v, key=v.get) if v else "N/A" for k, v in counts.items()}
-        self.dominance_analysis['dominant_planet'] = max(strength, key=strength.get) if strength else "N/A"
-        self.dominance_analysis['counts'] = counts; self.dominance_analysis['strength'] = {k: round(v, 2) for k, v in strength.items()}
-    
-    def _calculate_tropical_aspects(self) -> None:
-        """Calculate aspects for tropical chart."""
+            distributions[f"House {house_num}"] = segments
+        return distributions
+    @cached_property
+    def dominance_analysis(self) -> Dict[str, Any]:
+        if self.ascendant_data.get("sidereal_asc") is None: return {}
+        return _analyze_dominance(self.celestial_bodies, self.aspects, "Unknown")
+    @cached_property
+    def tropical_bodies(self) -> List[TropicalCelestialBody]:
+        tropical_asc = self.ascendant_data.get("tropical_asc")
+        if self.ascendant_data.get("sidereal_asc") is None or tropical_asc is None: return []
+        return [TropicalCelestialBody(name, lon, retro, tropical_asc, is_main) for name, lon, retro, is_main in self._tropical_rows]
+    @cached_property
+    def tropical_points(self) -> List[TropicalCelestialBody]:
+        """Tropical bodies followed by the angles, Part of Fortune and South Node, as for all_points."""
+        tropical_asc = self.ascendant_data.get("tropical_asc"); points = list(self.tropical_bodies)
+        if not points: return points
+        trop_mc_deg = self.ascendant_data.get('mc') % 360 if self.ascendant_data.get('mc') is not None else None
+        trop_ic_deg = (trop_mc_deg + 180) % 360 if trop_mc_deg is not None else None
+        angles = [TropicalCelestialBody("Ascendant", tropical_asc, False, tropical_asc, False),
+                  TropicalCelestialBody("Midheaven (MC)", trop_mc_deg, False, tropical_asc, False),
+                  TropicalCelestialBody("Descendant", (tropical_asc + 180) % 360, False, tropical_asc, False),
+                  TropicalCelestialBody("Imum Coeli (IC)", trop_ic_deg, False, tropical_asc, False)]
+        points.extend(p for p in angles if p.degree is not None)
+        by_name = {p.name: p for p in self.tropical_bodies}
+        trop_sun, trop_moon, trop_nn = by_name.get('Sun'), by_name.get('Moon'), by_name.get('True Node')
+        if trop_sun and trop_moon and self._birth_time_known():
+            is_day = self.day_night_info.get('status') == 'Day Birth'
+            trop_pof_deg = (tropical_asc + trop_moon.degree - trop_sun.degree + 360) % 360 if is_day else (tropical_asc + trop_sun.degree - trop_moon.degree + 360) % 360
+            points.append(TropicalCelestialBody("Part of Fortune", trop_pof_deg, False, tropical_asc, False))
+        if trop_nn: points.append(TropicalCelestialBody("South Node", (trop_nn.degree + 180) % 360, False, tropical_asc, False))
+        return points
+    @cached_property
+    def tropical_aspects(self) -> List[Aspect]:
+        """Aspects for the tropical chart."""
         main_planets = [b for b in self.tropical_bodies if b.is_main_planet and b.degree is not None]
-        for p1, p2 in combinations(main_planets, 2):
-            diff = min(abs(p1.degree - p2.degree), 360 - abs(p1.degree - p2.degree))
-            is_luminary = p1.is_luminary or p2.is_luminary
-            for name, angle, orb in ASPECTS_CONFIG:
-                orb_max = ASPECT_LUMINARY_ORBS.get(name, orb) if is_luminary else orb
-                if abs(diff - angle) <= orb_max:
-                    self.tropical_aspects.append(Aspect(p1, p2, name, round(diff - angle, 2), round(ASPECT_SCORES.get(name, 1) / (1 + abs(diff - angle)), 2)))
-        self.tropical_aspects.sort(key=lambda x: -x.strength)
-    
-    def _detect_tropical_aspect_patterns(self) -> None:
-        """Detect aspect patterns in tropical chart."""
-        patterns: List[Dict[str, Any]] = []
+        return sorted(_find_chart_aspects(main_planets), key=lambda x: -x.strength)
+    @cached_property
+    def tropical_aspect_patterns(self) -> List[Dict[str, Any]]:
+        """Aspect patterns in the tropical chart."""
+        if self.ascendant_data.get("tropical_asc") is None: return []
         planets = {b.name: b for b in self.tropical_bodies if b.is_main_planet and b.degree is not None}
-        names = list(planets.keys())
-        def find_aspect(p1, p2, type): 
-            return any(a.type == type and ((a.p1.name == p1 and a.p2.name == p2) or (a.p1.name == p2 and a.p2.name == p1)) for a in self.tropical_aspects)
-        
-        # T-Square detection
-        if len(names) >= 3:
-            for p1, p2, p3 in combinations(names, 3):
-                if find_aspect(p1, p2, 'Opposition') and find_aspect(p1, p3, 'Square') and find_aspect(p2, p3, 'Square'):
-                    modalities = {MODALITY_MAPPING.get(planets[p].sign) for p in [p1, p2, p3]}
-                    modality = modalities.pop() if len(modalities) == 1 else "Mixed"
-                    self.tropical_aspect_patterns.append({"description": f"{p1} opp {p2}, focal {p3} ({modality} T-Square)"})
-        
-        # Sign stellium detection
-        sign_groups = {}
-        for name, p in planets.items():
-            sign_groups.setdefault(p.sign, []).append(name)
-        for sign, members in sign_groups.items():
-            if len(members) >= 3:
-                el = ELEMENT_MAPPING.get(sign, '')
-                mod = MODALITY_MAPPING.get(sign, '')
-                self.tropical_aspect_patterns.append({"description": f"{len(members)} bodies in {sign} ({el}, {mod} Sign Stellium)"})
-        
-        # House stellium detection (only if birth time is known)
-        if self.ascendant_data.get("tropical_asc") is not None:
-            house_groups = {};
-            for name, p in planets.items():
-                if p.house_num > 0:  # Only count planets with valid house numbers
-                    house_groups.setdefault(p.house_num, []).append(name)
-            for house_num, members in house_groups.items():
-                if len(members) >= 3:
-                    self.tropical_aspect_patterns.append({"description": f"{len(members)} bodies in House {house_num} (House Stellium)"})
-        
-        # Grand Trine detection (3 planets forming trines to each other)
-        if len(names) >= 3:
-            for p1, p2, p3 in combinations(names, 3):
-                if find_aspect(p1, p2, 'Trine') and find_aspect(p1, p3, 'Trine') and find_aspect(p2, p3, 'Trine'):
-                    elements = {ELEMENT_MAPPING.get(planets[p].sign) for p in [p1, p2, p3]}
-                    element = elements.pop() if len(elements) == 1 else "Mixed"
-                    self.tropical_aspect_patterns.append({"description": f"{p1}, {p2}, {p3} ({element} Grand Trine)"})
-        
-        # Grand Cross detection (4 planets forming 2 oppositions and 4 squares)
-        if len(names) >= 4:
-            for p1, p2, p3, p4 in combinations(names, 4):
-                opp_count = sum([find_aspect(p1, p2, 'Opposition'), find_aspect(p3, p4, 'Opposition')])
-                square_count = sum([
-                    find_aspect(p1, p3, 'Square'), find_aspect(p1, p4, 'Square'),
-                    find_aspect(p2, p3, 'Square'), find_aspect(p2, p4, 'Square')
-                ])
-                if opp_count >= 2 and square_count >= 4:
-                    modalities = {MODALITY_MAPPING.get(planets[p].sign) for p in [p1, p2, p3, p4]}
-                    modality = modalities.pop() if len(modalities) == 1 else "Mixed"
-                    self.tropical_aspect_patterns.append({"description": f"{p1}, {p2}, {p3}, {p4} ({modality} Grand Cross)"})
-        
-        # Yod detection (2 planets in sextile, both quincunx a third)
-        if len(names) >= 3:
-            for p1, p2, p3 in combinations(names, 3):
-                if find_aspect(p1, p2, 'Sextile') and find_aspect(p1, p3, 'Quincunx') and find_aspect(p2, p3, 'Quincunx'):
-                    self.tropical_aspect_patterns.append({"description": f"{p1} sextile {p2}, both quincunx {p3} (Yod)"})
-    
-    def _analyze_tropical_dominance(self) -> None:
-        """Analyze dominance in tropical chart."""
-        counts = {'sign': {}, 'element': {}, 'modality': {}}
-        strength = {}
-        main_planets = [b for b in self.tropical_bodies if b.is_main_planet and b.degree is not None and b.name != "True Node"]
-        for b in main_planets:
-            if b.sign != "N/A":
-                counts['sign'][b.sign] = counts['sign'].get(b.sign, 0) + 1
-                el = ELEMENT_MAPPING.get(b.sign)
-                counts['element'][el] = counts['element'].get(el, 0) + 1
-                mod = MODALITY_MAPPING.get(b.sign)
-                counts['modality'][mod] = counts['modality'].get(mod, 0) + 1
-        for a in self.tropical_aspects:
-            strength[a.p1.name] = strength.get(a.p1.name, 0) + a.strength
-            strength[a.p2.name] = strength.get(a.p2.name, 0) + a.strength
-        self.tropical_dominance = {f"dominant_{k}": max(v, key=v.get) if v else "N/A" for k, v in counts.items()}
-        self.tropical_dominance['dominant_planet'] = max(strength, key=strength.get) if strength else "N/A"
-        self.tropical_dominance['counts'] = counts
-        self.tropical_dominance['strength'] = {k: round(v, 2) for k, v in strength.items()}
+        return _detect_patterns(planets, self.tropical_aspects, True)
+    @cached_property
+    def tropical_dominance(self) -> Dict[str, Any]:
+        """Dominance in the tropical chart."""
+        if self.ascendant_data.get("sidereal_asc") is None: return {}
+        return _analyze_dominance(self.tropical_bodies, self.tropical_aspects, "N/A")
     
-    def get_full_chart_data(self, numerology: dict, name_numerology: Optional[dict], chinese_zodiac: dict, unknown_time: bool) -> dict:
-        """Build the full chart response dictionary."""
+    def get_full_chart_data(self, numerology: dict, name_numerology: Optional[dict], chinese_zodiac: dict, unknown_time: bool,
+                            sections: Optional[Iterable[str]] = None) -> dict:
+        """
+        Build the chart response dictionary.
+
+        Args:
+            numerology: Life path, day and lucky numbers.
+            name_numerology: Name numerology, if computed.
+            chinese_zodiac: Element and animal.
+            unknown_time: Whether the birth time is unknown (omits house details).
+            sections: Keys of CHART_DATA_SECTIONS to include; None for all. Only the
+                requested sections are built, so lazy chart sections they do not need
+                (e.g. the tropical chart) are never computed.
+
+        Returns:
+            The requested sections, in CHART_DATA_SECTIONS order.
+
+        Raises:
+            ValueError: If sections names an unknown section.
+        """
+        if sections is None:
+            keys = CHART_DATA_SECTIONS
+        else:
+            requested = set(sections); unknown = requested.difference(CHART_DATA_SECTIONS)
+            if unknown: raise ValueError(f"Unknown chart sections: {', '.join(sorted(unknown))}")
+            keys = [key for key in CHART_DATA_SECTIONS if key in requested]
         # Major positions order
         MAJOR_POSITIONS_ORDER = ['Ascendant', 'Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto', 'Chiron', 'True Node', 'South Node', 'Descendant', 'Midheaven (MC)', 'Imum Coeli (IC)']
-        
-        # Build sidereal major positions
-        sidereal_major_positions = []
-        for p in sorted(self.all_points, key=lambda x: MAJOR_POSITIONS_ORDER.index(x.name) if x.name in MAJOR_POSITIONS_ORDER else 99):
-            if p.name in MAJOR_POSITIONS_ORDER:
-                sidereal_major_positions.append({
-                    "name": p.name,
-                    "position": p.formatted_position,
-                    "degrees": p.degree,
-                    "percentage": p.sign_percentage,
-                    "retrograde": p.retrograde,
-                    "house_info": f"– House {p.house_num}, {p.house_degrees}" if p.house_num > 0 and not unknown_time else "",
-                    "house_num": p.house_num
-                })
-        
-        # Build sidereal retrogrades
-        sidereal_retrogrades = [{"name": p.name} for p in self.celestial_bodies if p.retrograde and p.is_main_planet]
-        
-        # Build sidereal aspects
-        sidereal_aspects = [{
-            "p1_name": f"{a.p1.name} in {a.p1.sign}{' (Rx)' if a.p1.retrograde else ''}",
-            "p2_name": f"{a.p2.name} in {a.p2.sign}{' (Rx)' if a.p2.retrograde else ''}",
-            "type": a.type,
-            "orb": f"{abs(a.orb):.2f}°",
-            "score": f"{a.strength:.2f}",
-            "p1_degrees": a.p1.degree,
-            "p2_degrees": a.p2.degree
-        } for a in self.aspects]
-        
-        # Build additional points
-        sidereal_additional_points = []
-        for p in sorted(self.all_points, key=lambda x: x.name):
-            if p.name not in MAJOR_POSITIONS_ORDER:
-                sidereal_additional_points.append({
-                    "name": p.name,
-                    "info": f"{p.formatted_position} – House {p.house_num}, {p.house_degrees}" if p.house_num > 0 and not unknown_time else p.formatted_position,
-                    "retrograde": p.retrograde
-                })
-        
-        # Build house rulers
-        house_rulers = {}
-        if not unknown_time and self.ascendant_data.get("sidereal_asc") is not None:
+        sidereal_asc = self.ascendant_data.get("sidereal_asc"); tropical_asc = self.ascendant_data.get("tropical_asc")
+
+        def major_positions(points):
+            return [{
+                "name": p.name,
+                "position": p.formatted_position,
+                "degrees": p.degree,
+                "percentage": p.sign_percentage,
+                "retrograde": p.retrograde,
+                "house_info": f"– House {p.house_num}, {p.house_degrees}" if p.house_num > 0 and not unknown_time else "",
+                "house_num": p.house_num
+            } for p in sorted(points, key=lambda x: MAJOR_POSITIONS_ORDER.index(x.name) if x.name in MAJOR_POSITIONS_ORDER else 99) if p.name in MAJOR_POSITIONS_ORDER]
+
+        def retrogrades(bodies):
+            return [{"name": p.name} for p in bodies if p.retrograde and p.is_main_planet]
+
+        def aspect_rows(aspects):
+            return [{
+                "p1_name": f"{a.p1.name} in {a.p1.sign}{' (Rx)' if a.p1.retrograde else ''}",
+                "p2_name": f"{a.p2.name} in {a.p2.sign}{' (Rx)' if a.p2.retrograde else ''}",
+                "type": a.type,
+                "orb": f"{abs(a.orb):.2f}°",
+                "score": f"{a.strength:.2f}",
+                "p1_degrees": a.p1.degree,
+                "p2_degrees": a.p2.degree
+            } for a in aspects]
+
+        def additional_points(points):
+            return [{
+                "name": p.name,
+                "info": f"{p.formatted_position} – House {p.house_num}, {p.house_degrees}" if p.house_num > 0 and not unknown_time else p.formatted_position,
+                "retrograde": p.retrograde
+            } for p in sorted(points, key=lambda x: x.name) if p.name not in MAJOR_POSITIONS_ORDER]
+
+        def house_cusps(asc):
+            if unknown_time or sidereal_asc is None or asc is None: return []
+            return [(asc + i * 30) % 360 for i in range(12)]
+
+        def house_rulers():
+            rulers = {}
+            if unknown_time or sidereal_asc is None: return rulers
             for i in range(12):
-                cusp_deg = (self.ascendant_data['sidereal_asc'] + i * 30) % 360
-                sign, ruler_name = get_sign_and_ruler(cusp_deg)
+                sign, ruler_name = get_sign_and_ruler((sidereal_asc + i * 30) % 360)
                 ruler_body = next((p for p in self.celestial_bodies if p.name == ruler_name), None)
                 ruler_pos = f"– {ruler_body.formatted_position} – House {ruler_body.house_num}, {ruler_body.house_degrees}" if ruler_body and ruler_body.degree is not None else ""
-                house_rulers[f"House {i+1}"] = f"{sign} (Ruler: {ruler_name} {ruler_pos})"
-        
-        # Build chart analysis
-        chart_ruler = "N/A"
-        if self.ascendant_data.get("sidereal_asc") is not None:
-            _, chart_ruler = get_sign_and_ruler(self.ascendant_data['sidereal_asc'])
-        
-        sidereal_chart_analysis = {
-            "chart_ruler": chart_ruler,
-            "dominant_sign": self.dominance_analysis.get("dominant_sign", "N/A"),
-            "dominant_element": self.dominance_analysis.get("dominant_element", "N/A"),
-            "dominant_modality": self.dominance_analysis.get("dominant_modality", "N/A"),
-            "dominant_planet": self.dominance_analysis.get("dominant_planet", "N/A")
-        }
-        
-        # Build house cusps
-        sidereal_house_cusps = []
-        tropical_house_cusps = []
-        if not unknown_time and self.ascendant_data.get("sidereal_asc") is not None:
-            for i in range(12):
-                sidereal_house_cusps.append((self.ascendant_data['sidereal_asc'] + i * 30) % 360)
-                if self.ascendant_data.get("tropical_asc") is not None:
-                    tropical_house_cusps.append((self.ascendant_data['tropical_asc'] + i * 30) % 360)
-        
-        # Build tropical major positions
-        tropical_major_positions = []
-        for p in sorted(self.tropical_points, key=lambda x: MAJOR_POSITIONS_ORDER.index(x.name) if x.name in MAJOR_POSITIONS_ORDER else 99):
-            if p.name in MAJOR_POSITIONS_ORDER:
-                tropical_major_positions.append({
-                    "name": p.name,
-                    "position": p.formatted_position,
-                    "degrees": p.degree,
-                    "percentage": p.sign_percentage,
-                    "retrograde": p.retrograde,
-                    "house_info": f"– House {p.house_num}, {p.house_degrees}" if p.house_num > 0 and not unknown_time else "",
-                    "house_num": p.house_num
-                })
-        
-        # Build tropical retrogrades
-        tropical_retrogrades = [{"name": p.name} for p in self.tropical_bodies if p.retrograde and p.is_main_planet]
-        
-        # Build tropical aspects
-        tropical_aspects = [{
-            "p1_name": f"{a.p1.name} in {a.p1.sign}{' (Rx)' if a.p1.retrograde else ''}",
-            "p2_name": f"{a.p2.name} in {a.p2.sign}{' (Rx)' if a.p2.retrograde else ''}",
-            "type": a.type,
-            "orb": f"{abs(a.orb):.2f}°",
-            "score": f"{a.strength:.2f}",
-            "p1_degrees": a.p1.degree,
-            "p2_degrees": a.p2.degree
-        } for a in self.tropical_aspects]
-        
-        # Build tropical additional points
-        tropical_additional_points = []
-        for p in sorted(self.tropical_points, key=lambda x: x.name):
-            if p.name not in MAJOR_POSITIONS_ORDER:
-                tropical_additional_points.append({
-                    "name": p.name,
-                    "info": f"{p.formatted_position} – House {p.house_num}, {p.house_degrees}" if p.house_num > 0 and not unknown_time else p.formatted_position,
-                    "retrograde": p.retrograde
-                })
-        
-        # Build tropical chart analysis
-        tropical_chart_analysis = {
-            "dominant_sign": f"{self.tropical_dominance.get('dominant_sign', 'N/A')} ({self.tropical_dominance.get('counts', {}).get('sign', {}).get(self.tropical_dominance.get('dominant_sign'), 0)} placements)" if self.tropical_dominance.get('dominant_sign') != 'N/A' else "N/A",
-            "dominant_element": f"{self.tropical_dominance.get('dominant_element', 'N/A')} ({self.tropical_dominance.get('counts', {}).get('element', {}).get(self.tropical_dominance.get('dominant_element'), 0)})" if self.tropical_dominance.get('dominant_element') != 'N/A' else "N/A",
-            "dominant_modality": f"{self.tropical_dominance.get('dominant_modality', 'N/A')} ({self.tropical_dominance.get('counts', {}).get('modality', {}).get(self.tropical_dominance.get('dominant_modality'), 0)})" if self.tropical_dominance.get('dominant_modality') != 'N/A' else "N/A",
-            "dominant_planet": f"{self.tropical_dominance.get('dominant_planet', 'N/A')} (score {self.tropical_dominance.get('strength', {}).get(self.tropical_dominance.get('dominant_planet'), 0.0):.2f})" if self.tropical_dominance.get('dominant_planet') != 'N/A' else "N/A"
-        }
-        
-        return {
-            "name": self.name,
-            "utc_datetime": self.utc_datetime_str,
-            "location": self.location_str,
-            "day_night_status": self.day_night_info.get("status", "N/A"),
-            "chinese_zodiac": f"{chinese_zodiac.get('element', '')} {chinese_zodiac.get('animal', '')}",
-            "numerology_analysis": {
+                rulers[f"House {i+1}"] = f"{sign} (Ruler: {ruler_name} {ruler_pos})"
+            return rulers
+
+        def sidereal_chart_analysis():
+            return {
+                "chart_ruler": get_sign_and_ruler(sidereal_asc)[1] if sidereal_asc is not None else "N/A",
+                "dominant_sign": self.dominance_analysis.get("dominant_sign", "N/A"),
+                "dominant_element": self.dominance_analysis.get("dominant_element", "N/A"),
+                "dominant_modality": self.dominance_analysis.get("dominant_modality", "N/A"),
+                "dominant_planet": self.dominance_analysis.get("dominant_planet", "N/A")
+            }
+
+        def tropical_chart_analysis():
+            dominance = self.tropical_dominance
+            return {
+                "dominant_sign": f"{dominance.get('dominant_sign', 'N/A')} ({dominance.get('counts', {}).get('sign', {}).get(dominance.get('dominant_sign'), 0)} placements)" if dominance.get('dominant_sign') != 'N/A' else "N/A",
+                "dominant_element": f"{dominance.get('dominant_element', 'N/A')} ({dominance.get('counts', {}).get('element', {}).get(dominance.get('dominant_element'), 0)})" if dominance.get('dominant_element') != 'N/A' else "N/A",
+                "dominant_modality": f"{dominance.get('dominant_modality', 'N/A')} ({dominance.get('counts', {}).get('modality', {}).get(dominance.get('dominant_modality'), 0)})" if dominance.get('dominant_modality') != 'N/A' else "N/A",
+                "dominant_planet": f"{dominance.get('dominant_planet', 'N/A')} (score {dominance.get('strength', {}).get(dominance.get('dominant_planet'), 0.0):.2f})" if dominance.get('dominant_planet') != 'N/A' else "N/A"
+            }
+
+        builders = {
+            "name": lambda: self.name,
+            "utc_datetime": lambda: self.utc_datetime_str,
+            "location": lambda: self.location_str,
+            "day_night_status": lambda: self.day_night_info.get("status", "N/A"),
+            "chinese_zodiac": lambda: f"{chinese_zodiac.get('element', '')} {chinese_zodiac.get('animal', '')}",
+            "numerology_analysis": lambda: {
                 "life_path_number": numerology.get("life_path_number", "N/A"),
                 "day_number": numerology.get("day_number", "N/A"),
                 "lucky_number": numerology.get("lucky_number", "N/A"),
                 "name_numerology": name_numerology
             },
-            "unknown_time": unknown_time,
-            "true_sidereal_signs": TRUE_SIDEREAL_SIGNS,
-            "sidereal_house_cusps": sidereal_house_cusps,
-            "tropical_house_cusps": tropical_house_cusps,
+            "unknown_time": lambda: unknown_time,
+            "true_sidereal_signs": lambda: TRUE_SIDEREAL_SIGNS,
+            "sidereal_house_cusps": lambda: house_cusps(sidereal_asc),
+            "tropical_house_cusps": lambda: house_cusps(tropical_asc),
             "house_rulers": house_rulers,
-            "house_sign_distributions": self.house_sign_distributions,
+            "house_sign_distributions": lambda: self.house_sign_distributions,
             "sidereal_chart_analysis": sidereal_chart_analysis,
-            "sidereal_major_positions": sidereal_major_positions,
-            "sidereal_retrogrades": sidereal_retrogrades,
-            "sidereal_aspects": sidereal_aspects,
-            "sidereal_aspect_patterns": self.aspect_patterns,
-            "sidereal_additional_points": sidereal_additional_points,
+            "sidereal_major_positions": lambda: major_positions(self.all_points),
+            "sidereal_retrogrades": lambda: retrogrades(self.celestial_bodies),
+            "sidereal_aspects": lambda: aspect_rows(self.aspects),
+            "sidereal_aspect_patterns": lambda: self.aspect_patterns,
+            "sidereal_additional_points": lambda: additional_points(self.all_points),
             "tropical_chart_analysis": tropical_chart_analysis,
-            "tropical_major_positions": tropical_major_positions,
-            "tropical_retrogrades": tropical_retrogrades,
-            "tropical_aspects": tropical_aspects,
-            "tropical_aspect_patterns": self.tropical_aspect_patterns,
-            "tropical_additional_points": tropical_additional_points
-        }
\ No newline at end of file
+            "tropical_major_positions": lambda: major_positions(self.tropical_points),
+            "tropical_retrogrades": lambda: retrogrades(self.tropical_bodies),
+            "tropical_aspects": lambda: aspect_rows(self.tropical_aspects),
+            "tropical_aspect_patterns": lambda: self.tropical_aspect_patterns,
+            "tropical_additional_points": lambda: additional_points(self.tropical_points),
+        }
+        return {key: builders[key]() for key in keys}
@@ -8,7 +8,7 @@ from reportlab.pdfgen import canvas
 import io
 import base64
 import cairosvg
-from typing import Dict, Any, Optional
+from typing import BinaryIO, Callable, Dict, Any, Optional
 import math
 import logging
 import re
@@ -181,12 +181,14 @@ def generate_chart_wheel_svg(chart_data: Dict[str, Any], chart_type: str) -> str
     return ''.join(svg_parts)
 
 
-def svg_to_png(svg_string: str, width: int = 800, height: int = 800) -> bytes:
-    """Convert SVG string to PNG bytes."""
+def svg_to_png(svg_string: str, width: int = 800, height: int = 800, strict: bool = False) -> bytes:
+    """Convert SVG string to PNG bytes (a placeholder image on failure unless strict)."""
     try:
         png_data = cairosvg.svg2png(bytestring=svg_string.encode('utf-8'), output_width=width, output_height=height)
         return png_data
     except Exception as e:
+        if strict:
+            raise
         logger.error(f"Error converting SVG to PNG: {e}", exc_info=True)
         # Return a placeholder image
         try:
@@ -205,6 +207,11 @@ def svg_to_png(svg_string: str, width: int = 800, height: int = 800) -> bytes:
             return b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\tpHYs\x00\x00\x0b\x13\x00\x00\x0b\x13\x01\x00\x9a\x9c\x18\x00\x00\x00\nIDATx\x9cc\xf8\x00\x00\x00\x01\x00\x01\x00\x00\x00\x00IEND\xaeB`\x82'
 
 
+def render_chart_wheel_png(chart_data: Dict[str, Any], chart_type: str, size: int = 800, strict: bool = False) -> bytes:
+    """Render a chart wheel ('sidereal' or 'tropical') as a size x size PNG."""
+    return svg_to_png(generate_chart_wheel_svg(chart_data, chart_type), width=size, height=size, strict=strict)
+
+
 # ============================================================================
 # SECTION PARSING UTILITIES
 # ============================================================================
@@ -665,6 +672,25 @@ def generate_pdf_report(chart_data: Dict[str, Any], gemini_reading: str, user_in
     Uses a template-based approach with pre-defined section headers.
     """
     buffer = io.BytesIO()
+    write_pdf_report(buffer, chart_data, gemini_reading, user_inputs)
+    return buffer.getvalue()
+
+
+def write_pdf_report(
+    buffer: BinaryIO,
+    chart_data: Dict[str, Any],
+    gemini_reading: str,
+    user_inputs: Dict[str, Any],
+    wheel_png: Optional[Callable[[Dict[str, Any], str], bytes]] = None
+) -> None:
+    """
+    Write the PDF report (see generate_pdf_report) to a binary file object.
+    
+    wheel_png(chart_data, chart_type) supplies the chart wheel images; the
+    default renders them with render_chart_wheel_png. app.services.pdf_service
+    passes a cached version.
+    """
+    wheel_png = wheel_png or render_chart_wheel_png
     
     # Page dimensions
     page_width, page_height = letter
@@ -868,11 +894,8 @@ def generate_pdf_report(chart_data: Dict[str, Any], gemini_reading: str, user_in
     if not chart_data.get('unknown_time'):
         story.append(Paragraph("Natal Chart Wheels", heading_style))
         
-        sidereal_svg = generate_chart_wheel_svg(chart_data, 'sidereal')
-        tropical_svg = generate_chart_wheel_svg(chart_data, 'tropical')
-        
-        sidereal_png = svg_to_png(sidereal_svg, width=800, height=800)
-        tropical_png = svg_to_png(tropical_svg, width=800, height=800)
+        sidereal_png = wheel_png(chart_data, 'sidereal')
+        tropical_png = wheel_png(chart_data, 'tropical')
         
         sidereal_img = Image(io.BytesIO(sidereal_png), width=2.7*inch, height=2.7*inch)
         tropical_img = Image(io.BytesIO(tropical_png), width=2.7*inch, height=2.7*inch)
@@ -1017,8 +1040,6 @@ def generate_pdf_report(chart_data: Dict[str, Any], gemini_reading: str, user_in
     story.append(Paragraph("Generated by Synthesis Astrology • synthesisastrology.com", footer_style))
     
     doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
 
 
 def format_chart_text(chart_data: Dict[str, Any], chart_type: str) -> str:
@@ -0,0 +1,74 @@
+"""
+Benchmark the vectorized aspect kernel against the nested Python loop it
+replaced, for single charts and for a (charts x bodies) batch.
+
+Longitudes are random, with the first two bodies flagged as luminaries like
+the Sun and Moon of a natal chart.
+
+Usage:
+    python scripts/benchmarks/benchmark_aspect_kernel.py
+    python scripts/benchmarks/benchmark_aspect_kernel.py --charts 5000 --bodies 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from natal_chart import ASPECT_LUMINARY_ORBS, ASPECTS_CONFIG
+from app.services.aspect_kernel import find_aspects
+
+
+def loop_aspects(longitudes, luminaries):
+    found = []
+    n = len(longitudes)
+    for i in range(n):
+        for j in range(i + 1, n):
+            diff = min(abs(longitudes[i] - longitudes[j]), 360 - abs(longitudes[i] - longitudes[j]))
+            is_luminary = luminaries[i] or luminaries[j]
+            for name, angle, orb in ASPECTS_CONFIG:
+                orb_max = ASPECT_LUMINARY_ORBS.get(name, orb) if is_luminary else orb
+                if abs(diff - angle) <= orb_max:
+                    found.append((i, j, name, diff - angle))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the aspect kernel")
+    parser.add_argument("--charts", type=int, default=2000, help="Charts to scan")
+    parser.add_argument("--bodies", type=int, default=10, help="Bodies per chart")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    longitudes = rng.uniform(0, 360, size=(args.charts, args.bodies))
+    luminaries = np.zeros(args.bodies, dtype=bool)
+    luminaries[:2] = True
+    rows = longitudes.tolist()
+    flags = luminaries.tolist()
+
+    start = time.perf_counter()
+    loop_total = sum(len(loop_aspects(row, flags)) for row in rows)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single_total = sum(len(find_aspects(row, luminaries1=luminaries)) for row in longitudes)
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_total = len(find_aspects(longitudes, luminaries1=luminaries))
+    batch_seconds = time.perf_counter() - start
+
+    assert loop_total == single_total == batch_total
+    print(f"Charts: {args.charts}, bodies: {args.bodies}, aspects found: {loop_total}")
+    for label, seconds in (("python loop", loop_seconds), ("kernel per chart", single_seconds), ("kernel batch", batch_seconds)):
+        print(f"{label:<18} {seconds * 1000:>9.1f} ms  {args.charts / seconds:>10.0f} charts/s  x{loop_seconds / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark /calculate_chart compute latency per field profile.
+
+Runs the part of the endpoint that field selection affects (cached chart
+data, quick highlights, chart hash and the final field filter) for distinct
+births, cold (chart cache cleared, as for a new birth) and warm (L1 hit).
+Geocoding, the snapshot reading and the database are not included.
+
+Profiles:
+    full          every field (the /calculate_chart default)
+    lightweight   the mobile default (sidereal wheel, placements, aspects, chart hash)
+    positions     fields=sidereal_major_positions
+
+Usage:
+    python scripts/benchmarks/benchmark_chart_fields.py
+    python scripts/benchmarks/benchmark_chart_fields.py --charts 1000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from app.services.chart_cache import clear_chart_cache, get_cached_chart_data
+from app.services.chart_service import (
+    chart_sections_for_fields, generate_chart_hash, get_quick_highlights, resolve_chart_fields
+)
+from app.utils.field_selection import filter_dict_fields
+
+PROFILES = [
+    ("full", None, None),
+    ("lightweight", None, "lightweight"),
+    ("positions", "sidereal_major_positions", None),
+]
+
+
+def respond(birth, selected_fields):
+    """The field-dependent steps of calculate_chart_endpoint."""
+    response = get_cached_chart_data("Benchmark", *birth, False, {}, None, {}, sections=chart_sections_for_fields(selected_fields))
+    if selected_fields is None or "quick_highlights" in selected_fields:
+        response["quick_highlights"] = get_quick_highlights(response, False)
+    if selected_fields is None or "chart_hash" in selected_fields:
+        response["chart_hash"] = generate_chart_hash(response, False)
+    return response if selected_fields is None else filter_dict_fields(response, selected_fields)
+
+
+def measure(births, selected_fields, cold):
+    latencies = []
+    for birth in births:
+        if cold:
+            clear_chart_cache()
+        start = time.perf_counter()
+        respond(birth, selected_fields)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chart compute latency per field profile")
+    parser.add_argument("--charts", type=int, default=300, help="Births per profile")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    births = [
+        (int(rng.integers(1900, 2030)), int(rng.integers(1, 13)), int(rng.integers(1, 29)),
+         int(rng.integers(0, 24)), int(rng.integers(0, 60)), float(rng.uniform(-60, 60)), float(rng.uniform(-180, 180)))
+        for _ in range(args.charts)
+    ]
+    measure(births[:20], None, cold=True)  # warm up imports and the ephemeris files
+
+    print(f"Births per profile: {args.charts}")
+    print(f"{'profile':<12} {'cold p50 ms':>11} {'cold p95 ms':>11} {'warm p50 ms':>11}")
+    for label, fields, profile in PROFILES:
+        selected_fields = resolve_chart_fields(fields, profile)
+        cold = sorted(measure(births, selected_fields, cold=True))
+        clear_chart_cache()
+        measure(births, None, cold=False)  # fill L1 with full chart data
+        warm = measure(births, selected_fields, cold=False)
+        print(f"{label:<12} {statistics.median(cold) * 1000:>11.2f} {cold[int(len(cold) * 0.95)] * 1000:>11.2f} "
+              f"{statistics.median(warm) * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
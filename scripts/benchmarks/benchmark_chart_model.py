@@ -0,0 +1,95 @@
+"""
+Benchmark per-chart CPU time and allocations of NatalChart for the access
+patterns of the batch, transit and similarity paths.
+
+Ephemeris rows are precomputed with ephemeris_batch so only the chart model
+itself is measured, not Swiss Ephemeris.
+
+Profiles:
+    positions   calculate_chart, then read sidereal positions and signs (transits, similarity)
+    aspects     positions plus sidereal aspects and patterns
+    sidereal    get_full_chart_data restricted to the sidereal sections
+    full        get_full_chart_data with every section (batch charts, /calculate_chart)
+
+Usage:
+    python scripts/benchmarks/benchmark_chart_model.py
+    python scripts/benchmarks/benchmark_chart_model.py --charts 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from natal_chart import CHART_DATA_SECTIONS, NatalChart
+from app.services.ephemeris_batch import compute_charts_batch, make_births
+
+SIDEREAL_SECTIONS = [s for s in CHART_DATA_SECTIONS if not s.startswith("tropical_")]
+
+
+def positions(chart):
+    return [(b.degree, b.sign) for b in chart.celestial_bodies]
+
+
+def aspects(chart):
+    return positions(chart), chart.aspects, chart.aspect_patterns
+
+
+def sidereal(chart):
+    return chart.get_full_chart_data({}, None, {}, False, sections=SIDEREAL_SECTIONS)
+
+
+def full(chart):
+    return chart.get_full_chart_data({}, None, {}, False)
+
+
+PROFILES = [("positions", positions), ("aspects", aspects), ("sidereal", sidereal), ("full", full)]
+
+
+def run(records, rows, use, keep=None):
+    for record, row in zip(records, rows):
+        chart = NatalChart("Benchmark", *record)
+        chart.calculate_chart(ephemeris=row)
+        use(chart)
+        if keep is not None:
+            keep.append(chart)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NatalChart model")
+    parser.add_argument("--charts", type=int, default=2000, help="Charts per profile")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    records = [
+        (int(rng.integers(1900, 2030)), int(rng.integers(1, 13)), int(rng.integers(1, 29)),
+         int(rng.integers(0, 24)), int(rng.integers(0, 60)), float(rng.uniform(-60, 60)), float(rng.uniform(-180, 180)))
+        for _ in range(args.charts)
+    ]
+    rows = compute_charts_batch(make_births(records))
+    print(f"Charts per profile: {args.charts}")
+    print(f"{'profile':<10} {'us/chart':>10} {'KiB retained/chart':>19}")
+    for label, use in PROFILES:
+        start = time.perf_counter()
+        run(records, rows, use)
+        seconds = time.perf_counter() - start
+        # Memory a chart holds after use (what a cache of charts pays), on a
+        # smaller sample since tracemalloc slows everything down
+        sample = min(200, args.charts)
+        charts = []
+        tracemalloc.start()
+        run(records[:sample], rows[:sample], use, keep=charts)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<10} {seconds / args.charts * 1e6:>10.1f} {retained / sample / 1024:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
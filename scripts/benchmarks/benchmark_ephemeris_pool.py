@@ -0,0 +1,99 @@
+"""
+Benchmark ephemeris throughput as workers are added.
+
+Compares the ephemeris worker pool with the same number of threads (which
+the GIL serializes, since pyswisseph holds it for every call) on two loads:
+
+    batch     one compute_charts call for all births, sharded across workers (batch jobs)
+    requests  one PositionsRequest per birth, all in flight at once (API chart cache misses)
+
+Throughput only scales up to the number of physical cores.
+
+Usage:
+    python scripts/benchmarks/benchmark_ephemeris_pool.py
+    python scripts/benchmarks/benchmark_ephemeris_pool.py --charts 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from app.core.executors import BoundedExecutor
+from app.services import ephemeris_pool
+from app.services.ephemeris_batch import _compute_chunk, make_births
+from app.services.ephemeris_pool import (
+    PositionsRequest, compute_async, compute_charts, configure_ephemeris, resolve_ephemeris_path,
+    set_ephemeris_executor
+)
+
+
+def threads_batch(births, workers):
+    shards = np.array_split(births, workers)
+    with ThreadPoolExecutor(max_workers=workers, initializer=configure_ephemeris) as pool:
+        list(pool.map(_compute_chunk, shards))
+
+
+def pool_batch(births, workers):
+    compute_charts(births)
+
+
+def pool_requests(births, workers):
+    async def main():
+        await asyncio.gather(*(compute_async(PositionsRequest(births[i:i + 1])) for i in range(len(births))))
+    asyncio.run(main())
+
+
+def measure(run, births, workers):
+    start = time.perf_counter()
+    run(births, workers)
+    return len(births) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ephemeris worker pool scaling")
+    parser.add_argument("--charts", type=int, default=5000, help="Births per measurement")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Worker counts (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    counts = args.workers or sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i <= cpus], cpus})
+    rng = np.random.default_rng(args.seed)
+    births = make_births(
+        (int(rng.integers(1900, 2030)), int(rng.integers(1, 13)), int(rng.integers(1, 29)),
+         int(rng.integers(0, 24)), int(rng.integers(0, 60)), float(rng.uniform(-60, 60)), float(rng.uniform(-180, 180)))
+        for _ in range(args.charts)
+    )
+    configure_ephemeris()
+
+    print(f"Births: {args.charts}, CPUs: {cpus}")
+    print(f"{'workers':>7} {'threads ch/s':>13} {'pool batch ch/s':>16} {'speedup':>8} {'pool requests ch/s':>19} {'speedup':>8}")
+    base = None
+    for workers in counts:
+        executor = BoundedExecutor(
+            "ephemeris", "process", max_workers=workers, max_queue=args.charts, timeout=600.0,
+            initializer=ephemeris_pool._init_worker, initargs=(resolve_ephemeris_path(),)
+        )
+        set_ephemeris_executor(executor)
+        try:
+            pool_batch(births[:workers * 50], workers)  # start and warm up every worker
+            threads = measure(threads_batch, births, workers)
+            batch = measure(pool_batch, births, workers)
+            requests = measure(pool_requests, births, workers)
+        finally:
+            set_ephemeris_executor(None)
+            executor.shutdown()
+        base = base or (batch, requests)
+        print(f"{workers:>7} {threads:>13.0f} {batch:>16.0f} {batch / base[0]:>7.2f}x {requests:>19.0f} {requests / base[1]:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
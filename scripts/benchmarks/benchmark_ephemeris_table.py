@@ -0,0 +1,82 @@
+"""
+Benchmark transit timelines and return scans with and without the precomputed
+ephemeris table, and the raw lookup rate of the table against swe.calc_ut.
+
+Uses the table at EPHEMERIS_TABLE_PATH, or builds a temporary one covering
+the benchmark years when none exists.
+
+Usage:
+    python scripts/benchmarks/benchmark_ephemeris_table.py
+    python scripts/benchmarks/benchmark_ephemeris_table.py --years 2 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import swisseph as swe
+
+from natal_chart import NatalChart
+from app.services.ephemeris_table import EphemerisTable, build_ephemeris_table, get_ephemeris_table, set_ephemeris_table
+from app.services.solar_return_service import find_return_times
+from app.services.transit_service import calculate_transit_timeline
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the precomputed ephemeris table")
+    parser.add_argument("--start-year", type=int, default=2025)
+    parser.add_argument("--years", type=int, default=2, help="Timeline length in years (at most 2)")
+    parser.add_argument("--return-years", type=int, default=50, help="Lunar return scan length in years")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = datetime(args.start_year, 1, 1)
+    end = datetime(args.start_year + args.years, 1, 1)
+    returns_end = datetime(args.start_year + args.return_years, 1, 1)
+    table = get_ephemeris_table()
+    if table is None or not table.covers(swe.julday(args.start_year, 1, 1, 0.0), swe.julday(returns_end.year, 1, 1, 0.0)):
+        path = tempfile.mkdtemp(prefix="ephemeris_table_")
+        print(f"Building a temporary table for {args.start_year}-{returns_end.year} in {path}")
+        build_ephemeris_table(path, args.start_year, returns_end.year, samples=1000)
+        table = EphemerisTable(path)
+    set_ephemeris_table(table)
+
+    natal = NatalChart("Benchmark", 1990, 6, 15, 14, 30, 40.7128, -74.0060)
+    natal.calculate_chart()
+
+    times = swe.julday(args.start_year, 1, 1, 0.0) + np.random.default_rng(1).uniform(0, 365.0 * args.years, 100000)
+    rows = [
+        ("timeline, swe", lambda: calculate_transit_timeline(natal, start, end)),
+        ("timeline, table", lambda: calculate_transit_timeline(natal, start, end, use_ephemeris_table=True)),
+        ("lunar returns, swe", lambda: find_return_times(natal, "Moon", start, returns_end)),
+        ("lunar returns, table", lambda: find_return_times(natal, "Moon", start, returns_end, use_ephemeris_table=True)),
+        ("100k Moon, swe", lambda: [swe.calc_ut(float(jd), swe.MOON) for jd in times]),
+        ("100k Moon, table", lambda: table.positions("Moon", times)),
+    ]
+    print(f"Timeline {args.years} year(s), lunar returns over {args.return_years} years, best of {args.repeat}")
+    baseline = None
+    for label, fn in rows:
+        seconds = timed(fn, args.repeat)
+        if label.endswith("swe"):
+            baseline = seconds
+        print(f"{label:<22} {seconds * 1000:>9.1f} ms  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
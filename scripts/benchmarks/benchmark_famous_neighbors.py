@@ -0,0 +1,89 @@
+"""
+Benchmark building the famous people nearest-neighbor graph.
+
+Builds a SQLite database of famous people from famous_people_export.csv
+(charts computed locally, as in benchmark_similarity_prefilter.py) and
+times:
+
+    per-chart     FamousPeopleIndex.score_chart for every person, then top k
+    block, N      full refresh_famous_neighbors with N worker processes
+    incremental   refresh after --edits people change and one is removed
+
+Usage:
+    python scripts/benchmarks/benchmark_famous_neighbors.py
+    python scripts/benchmarks/benchmark_famous_neighbors.py --people 5000 --processes 1 2 4
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_similarity_prefilter import CSV_PATH, make_person  # Also puts the repo root on sys.path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, FamousPerson
+from services.similarity_index import FamousPeopleIndex, select_top_k
+from services.similarity_neighbors import NEIGHBORS_PER_PERSON, refresh_famous_neighbors
+from services.similarity_service import MIN_MATCH_SCORE
+
+
+def per_chart(db, k):
+    index = FamousPeopleIndex()
+    index.refresh(db)
+    for person_id, raw in db.query(FamousPerson.id, FamousPerson.chart_data_json):
+        ids, scores = index.score_chart(json.loads(raw))
+        scores[ids == person_id] = -1.0
+        select_top_k(ids, scores, k, MIN_MATCH_SCORE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the famous people neighbor graph build")
+    parser.add_argument("--people", type=int, default=2000, help="Famous people loaded from the CSV export")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to time")
+    parser.add_argument("--edits", type=int, default=5, help="People edited before the incremental refresh")
+    parser.add_argument("--k", type=int, default=NEIGHBORS_PER_PERSON)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    with open(CSV_PATH, encoding="utf-8") as f:
+        rows = [row for row in csv.DictReader(f) if int(row["birth_year"]) >= 1800][:args.people]
+    db.add_all(make_person(row) for row in rows)
+    db.commit()
+    print(f"Loaded {len(rows)} famous people in {time.perf_counter() - start:.1f}s on {os.cpu_count()} CPUs")
+
+    print(f"{'mode':<14} {'seconds':>8} {'lists recomputed':>17}")
+    start = time.perf_counter()
+    per_chart(db, args.k)
+    print(f"{'per-chart':<14} {time.perf_counter() - start:>8.2f} {len(rows):>17}")
+
+    for processes in args.processes:
+        start = time.perf_counter()
+        stats = refresh_famous_neighbors(db, k=args.k, processes=processes, full=True)
+        print(f"{f'block, {processes}':<14} {time.perf_counter() - start:>8.2f} {stats['recomputed']:>17}")
+
+    people = db.query(FamousPerson).order_by(FamousPerson.id).limit(args.edits + 1).all()
+    for fp, donor in zip(people[:args.edits], reversed(people)):
+        fp.chart_data_json = donor.chart_data_json
+        fp.updated_at = datetime.utcnow()
+    db.delete(people[-1])
+    db.commit()
+    start = time.perf_counter()
+    stats = refresh_famous_neighbors(db, k=args.k, processes=args.processes[0])
+    print(f"{'incremental':<14} {time.perf_counter() - start:>8.2f} {stats['recomputed']:>17}")
+
+
+if __name__ == "__main__":
+    main()
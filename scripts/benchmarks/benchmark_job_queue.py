@@ -0,0 +1,97 @@
+"""
+Benchmark the durable job queue: enqueue rate, and end-to-end throughput
+for several workers sharing one database at different per-type
+concurrency limits.
+
+Jobs simulate I/O-bound work (e.g. an LLM or geocoding call) with a
+sleep. Each run uses a fresh SQLite file; pass --database-url to run
+against PostgreSQL instead (the background_jobs table is created if
+missing and emptied before each run).
+
+Usage:
+    python scripts/benchmarks/benchmark_job_queue.py
+    python scripts/benchmarks/benchmark_job_queue.py --jobs 500 --work-ms 20 --workers 1 2 4 --concurrency 1 4 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.retry import RetryConfig
+from database import BackgroundJob
+from app.services.job_queue import JobQueue, JobStatus, JobWorker
+
+JOB_TYPE = "benchmark.sleep"
+
+
+def make_queue(database_url: str, work_seconds: float) -> JobQueue:
+    connect_args = {"check_same_thread": False, "timeout": 30} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    BackgroundJob.__table__.create(bind=engine, checkfirst=True)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.query(BackgroundJob).delete()
+        db.commit()
+
+    queue = JobQueue(session_factory=session_factory, retry_config=RetryConfig(max_attempts=3, initial_delay=0.1))
+
+    async def handler(payload, context):
+        await asyncio.sleep(work_seconds)
+        return {"n": payload["n"]}
+
+    queue.register_handler(JOB_TYPE, handler)
+    return queue
+
+
+async def run_case(database_url: str, jobs: int, work_seconds: float, workers: int, concurrency: int):
+    queue = make_queue(database_url, work_seconds)
+
+    start = time.perf_counter()
+    for n in range(jobs):
+        queue.create_job(JOB_TYPE, {"n": n})
+    enqueue_seconds = time.perf_counter() - start
+
+    pool = [JobWorker(queue, concurrency={JOB_TYPE: concurrency}, poll_interval=0.01, worker_id=f"bench-{i}") for i in range(workers)]
+    start = time.perf_counter()
+    processed = await asyncio.gather(*(worker.run_until_idle(idle_polls=3) for worker in pool))
+    run_seconds = time.perf_counter() - start
+
+    completed = queue.list_jobs(status=JobStatus.COMPLETED, limit=jobs)
+    double_runs = sum(1 for job in completed if job.attempts != 1)
+    print(
+        f"workers={workers:<3} concurrency={concurrency:<4} "
+        f"enqueue={jobs / enqueue_seconds:>8.0f} jobs/s  "
+        f"process={sum(processed) / run_seconds:>8.1f} jobs/s  "
+        f"completed={len(completed)}/{jobs}  re-runs={double_runs}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the durable job queue")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs per run")
+    parser.add_argument("--work-ms", type=float, default=20.0, help="Simulated work per job in milliseconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="Worker counts to try")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Per-worker concurrency limits to try")
+    parser.add_argument("--database-url", default=None, help="Database to benchmark against (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    print(f"Jobs: {args.jobs}, simulated work: {args.work_ms:.0f} ms/job "
+          f"(serial ceiling {1000 / args.work_ms:.0f} jobs/s)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            for concurrency in args.concurrency:
+                database_url = args.database_url or f"sqlite:///{os.path.join(tmp, f'jobs_{workers}_{concurrency}.db')}"
+                asyncio.run(run_case(database_url, args.jobs, args.work_ms / 1000, workers, concurrency))
+
+
+if __name__ == "__main__":
+    main()
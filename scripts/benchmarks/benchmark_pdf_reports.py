@@ -0,0 +1,112 @@
+"""
+Benchmark PDF report generation time and peak memory, cold vs. warm.
+
+Modes (each runs in a fresh process so peak RSS is not shared):
+    direct        generate_pdf_report in the calling process, returning bytes (before pdf_service)
+    cold          pdf_service with an empty cache (renders wheels and PDF in the worker pool)
+    warm-wheels   a new reading for a cached chart (wheels cached, PDF rendered)
+    warm          the same report again (served from the PDF cache, streamed from disk)
+
+Peak RSS is reported for the calling (web) process and for the worker
+processes. Requires CairoSVG's native cairo library.
+
+Usage:
+    python scripts/benchmarks/benchmark_pdf_reports.py
+    python scripts/benchmarks/benchmark_pdf_reports.py --reports 20
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+MODES = ["direct", "cold", "warm-wheels", "warm"]
+USER_INPUTS = {"full_name": "Benchmark", "birth_date": "6/15/1990", "birth_time": "14:30", "location": "New York, NY, USA"}
+
+
+def make_chart(i):
+    from app.services.chart_cache import get_cached_chart_data
+    return get_cached_chart_data("Benchmark", 1950 + i % 60, 1 + i % 12, 1 + i % 28, i % 24, 30, 40.7, -74.0, False, {}, None, {})
+
+
+def make_reading(seed):
+    from pdf_generator import PDF_SECTIONS
+    paragraph = " ".join(f"Sentence {seed}-{j} about the chart and its themes." for j in range(40))
+    return "\n\n".join(f"{section['title']}\n\n{paragraph}\n\n{paragraph}" for section in PDF_SECTIONS)
+
+
+def run_mode(mode, reports):
+    import asyncio
+    from app.core.executors import shutdown_executors
+    from app.services.pdf_service import get_pdf_report, iter_pdf_report
+
+    charts = [make_chart(i) for i in range(reports)]
+    latencies = []
+
+    async def serve(chart, reading):
+        path = await get_pdf_report(chart, reading, USER_INPUTS)
+        return sum(len(chunk) for chunk in iter_pdf_report(path))
+
+    if mode == "direct":
+        from pdf_generator import generate_pdf_report
+        for chart in charts:
+            start = time.perf_counter()
+            generate_pdf_report(chart, make_reading(0), USER_INPUTS)
+            latencies.append(time.perf_counter() - start)
+    else:
+        # Cold renders everything; warm-wheels first caches the wheels with another reading
+        if mode in ("warm-wheels", "warm"):
+            for chart in charts:
+                asyncio.run(serve(chart, make_reading(0)))
+        reading_seed = 1 if mode == "warm-wheels" else 0
+        for chart in charts:
+            reading = make_reading(reading_seed)
+            start = time.perf_counter()
+            asyncio.run(serve(chart, reading))
+            latencies.append(time.perf_counter() - start)
+        shutdown_executors(wait=True)
+
+    latencies.sort()
+    return {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF report generation, cold vs. warm")
+    parser.add_argument("--reports", type=int, default=10, help="Reports per mode")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.reports)))
+        return
+
+    print(f"Reports per mode: {args.reports}")
+    print(f"{'mode':<12} {'p50 ms':>9} {'max ms':>9} {'peak RSS MB':>12} {'worker RSS MB':>14}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {**os.environ, "PDF_CACHE_DIR": cache_dir}
+        for mode in MODES:
+            shutil.rmtree(cache_dir)
+            os.makedirs(cache_dir)
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--reports", str(args.reports)],
+                env=env, check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<12} {result['p50_ms']:>9.1f} {result['max_ms']:>9.1f} {result['rss_mb']:>12.1f} {result['worker_rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
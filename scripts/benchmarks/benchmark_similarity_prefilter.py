@@ -0,0 +1,151 @@
+"""
+Benchmark famous-people matching with and without the SQL prefilter.
+
+Builds a SQLite database of famous people from famous_people_export.csv
+(charts computed locally) and matches random user charts against it:
+
+    full scan   load every famous person with chart data and score each one
+    index       in-memory FamousPeopleIndex, warm (fallback while the tables are empty)
+    prefilter   SQL prefilter on the placement tables, then score the candidates
+    top-k       prefilter plus branch and bound, keeping only the best --limit matches
+
+Every mode builds match details for the people at or above the threshold,
+as rank_famous_people does. Rows fetched counts FamousPerson rows loaded
+per request.
+
+Usage:
+    python scripts/benchmarks/benchmark_similarity_prefilter.py
+    python scripts/benchmarks/benchmark_similarity_prefilter.py --people 5000 --charts 20 --limit 30
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, FamousPerson
+from natal_chart import NatalChart, calculate_numerology, get_chinese_zodiac_and_element
+from services.similarity_index import get_famous_people_index, reset_famous_people_index
+from services.similarity_service import (
+    MIN_MATCH_SCORE, _rank_with_index, build_match_details, calculate_comprehensive_similarity_score,
+    extract_top_aspects_from_chart, load_famous_people, rank_famous_people
+)
+
+CSV_PATH = os.path.join(ROOT, "famous_people_export.csv")
+
+
+def make_chart(name, year, month, day, hour=12, minute=0, lat=0.0, lng=0.0):
+    chart = NatalChart(name, year, month, day, hour, minute, lat, lng)
+    chart.calculate_chart(unknown_time=True)
+    numerology = calculate_numerology(day, month, year)
+    numerology = {"life_path_number": numerology["life_path"], "day_number": numerology["day_number"]}
+    chinese = get_chinese_zodiac_and_element(year, month, day)
+    return chart.get_full_chart_data(numerology, None, chinese, True)
+
+
+def make_person(row):
+    year, month, day = int(row["birth_year"]), int(row["birth_month"]), int(row["birth_day"])
+    chart_data = make_chart(row["name"], year, month, day)
+    placements = {
+        system: {
+            p["name"]: {"sign": p["position"].split()[-1], "degree": p["degrees"], "retrograde": p["retrograde"]}
+            for p in chart_data[f"{system}_major_positions"]
+        }
+        for system in ("sidereal", "tropical")
+    }
+    return FamousPerson(
+        id=int(row["id"]), name=row["name"], wikipedia_url=row["wikipedia_url"],
+        birth_year=year, birth_month=month, birth_day=day, birth_location=row["birth_location"],
+        chart_data_json=json.dumps(chart_data),
+        planetary_placements_json=json.dumps(placements),
+        top_aspects_json=json.dumps(extract_top_aspects_from_chart(chart_data, top_n=3)),
+        sun_sign_sidereal=placements["sidereal"]["Sun"]["sign"], sun_sign_tropical=placements["tropical"]["Sun"]["sign"],
+        moon_sign_sidereal=placements["sidereal"]["Moon"]["sign"], moon_sign_tropical=placements["tropical"]["Moon"]["sign"],
+        life_path_number=str(chart_data["numerology_analysis"]["life_path_number"]),
+        day_number=str(chart_data["numerology_analysis"]["day_number"]),
+        chinese_zodiac_animal=chart_data["chinese_zodiac"].split()[-1],
+    )
+
+
+def full_scan(db, chart_data):
+    people = db.query(FamousPerson).filter(FamousPerson.chart_data_json.isnot(None)).all()
+    scored = [(fp, calculate_comprehensive_similarity_score(chart_data, fp)) for fp in people]
+    return [build_match_details(chart_data, fp, score, {}, None) for fp, score in scored if score >= MIN_MATCH_SCORE]
+
+
+def index_scan(db, chart_data):
+    ranked, _ = _rank_with_index(chart_data, db, MIN_MATCH_SCORE)
+    people = load_famous_people(db, [person_id for person_id, _ in ranked])
+    return [build_match_details(chart_data, people[person_id], score, {}, None) for person_id, score in ranked]
+
+
+def prefilter(db, chart_data):
+    return rank_famous_people(chart_data, db, {}, None)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQL similarity prefilter")
+    parser.add_argument("--people", type=int, default=2000, help="Famous people loaded from the CSV export")
+    parser.add_argument("--charts", type=int, default=10, help="User charts matched per mode")
+    parser.add_argument("--limit", type=int, default=10, help="Matches kept in top-k mode")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    rows_loaded = [0]
+
+    @event.listens_for(db, "loaded_as_persistent")
+    def count_row(session, instance):
+        if isinstance(instance, FamousPerson):
+            rows_loaded[0] += 1
+
+    start = time.perf_counter()
+    with open(CSV_PATH, encoding="utf-8") as f:
+        rows = [row for row in csv.DictReader(f) if int(row["birth_year"]) >= 1800][:args.people]
+    db.add_all(make_person(row) for row in rows)
+    db.commit()
+    db.expunge_all()
+    print(f"Loaded {len(rows)} famous people in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(args.seed)
+    charts = [
+        make_chart("User", rng.randint(1950, 2005), rng.randint(1, 12), rng.randint(1, 28),
+                   rng.randint(0, 23), rng.randint(0, 59), rng.uniform(-50, 60), rng.uniform(-120, 140))
+        for _ in range(args.charts)
+    ]
+
+    reset_famous_people_index()
+    get_famous_people_index(db)  # Warm the index outside the measurement
+
+    modes = [
+        ("full scan", full_scan),
+        ("index", index_scan),
+        ("prefilter", prefilter),
+        ("top-k", lambda db, chart_data: rank_famous_people(chart_data, db, {}, None, limit=args.limit)[0]),
+    ]
+    print(f"{'mode':<10} {'ms/request':>11} {'rows fetched':>13} {'matches':>8}")
+    for name, run in modes:
+        rows_loaded[0] = 0
+        matches = 0
+        start = time.perf_counter()
+        for chart_data in charts:
+            matches += len(run(db, chart_data))
+            db.expunge_all()
+        elapsed = (time.perf_counter() - start) / len(charts)
+        print(f"{name:<10} {elapsed * 1000:>11.1f} {rows_loaded[0] / len(charts):>13.1f} {matches / len(charts):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark the offline timezone resolver against the HTTP timezone lookup
+it replaced (timeapi.io, previously called after every Nominatim geocode).
+
+Uses the famous-people birth locations from tests/fixtures.
+
+Usage:
+    python scripts/benchmarks/benchmark_timezone_resolver.py
+    python scripts/benchmarks/benchmark_timezone_resolver.py --http 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import requests
+
+from app.services import timezone_resolver
+from app.services.timezone_resolver import get_timezone_finder, resolve_timezone
+
+FIXTURE_PATH = os.path.join(ROOT, "tests", "fixtures", "famous_birth_locations.json")
+TIMEZONE_API_URL = "https://timeapi.io/api/TimeZone/coordinate"
+
+
+def _report(label: str, durations: list) -> None:
+    durations_us = sorted(d * 1e6 for d in durations)
+    p95 = durations_us[int(len(durations_us) * 0.95) - 1] if len(durations_us) >= 20 else durations_us[-1]
+    print(f"{label:<28} n={len(durations_us):<7} mean={statistics.mean(durations_us):>12.1f}us  "
+          f"median={statistics.median(durations_us):>12.1f}us  p95={p95:>12.1f}us")
+
+
+def benchmark_offline(points: list, rounds: int) -> None:
+    start = time.perf_counter()
+    get_timezone_finder()
+    print(f"Boundary index load: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    uncached = []
+    for _ in range(rounds):
+        for lat, lng in points:
+            t = time.perf_counter()
+            timezone_resolver._resolve_quantized.__wrapped__(lat, lng)
+            uncached.append(time.perf_counter() - t)
+    _report("offline (index lookup)", uncached)
+
+    cached = []
+    for _ in range(rounds):
+        for lat, lng in points:
+            t = time.perf_counter()
+            resolve_timezone(lat, lng)
+            cached.append(time.perf_counter() - t)
+    _report("offline (memoized)", cached)
+
+
+def benchmark_http(points: list, count: int) -> None:
+    durations, failures = [], 0
+    for lat, lng in points[:count]:
+        t = time.perf_counter()
+        try:
+            response = requests.get(TIMEZONE_API_URL, params={"latitude": lat, "longitude": lng}, timeout=5)
+            response.raise_for_status()
+        except requests.RequestException:
+            failures += 1
+        durations.append(time.perf_counter() - t)
+    _report("http (timeapi.io)", durations)
+    if failures:
+        print(f"  {failures} HTTP lookups failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline timezone resolution")
+    parser.add_argument("--rounds", type=int, default=200, help="Passes over the location set for offline timing")
+    parser.add_argument("--http", type=int, default=0, help="Also time this many live HTTP lookups")
+    args = parser.parse_args()
+
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        points = [(loc["latitude"], loc["longitude"]) for loc in json.load(f)]
+
+    print(f"Locations: {len(points)}")
+    benchmark_offline(points, args.rounds)
+    if args.http:
+        benchmark_http(points, args.http)
+
+
+if __name__ == "__main__":
+    main()
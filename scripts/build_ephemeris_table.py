@@ -0,0 +1,57 @@
+"""
+Build the precomputed ephemeris table used by transit timelines and return scans.
+
+Writes one memory-mapped .npy file per body plus meta.json to EPHEMERIS_TABLE_PATH
+(default: ephemeris_table/ next to swiss_ephemeris/), then checks random times
+against swe.calc_ut and refuses the table if any body's error exceeds the bound.
+Run at build time; the app uses Swiss Ephemeris directly until the table exists.
+
+Usage:
+    python scripts/build_ephemeris_table.py
+    python scripts/build_ephemeris_table.py --start-year 1900 --end-year 2100
+    python scripts/build_ephemeris_table.py --validate-only
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import natal_chart  # noqa: F401  (points Swiss Ephemeris at swiss_ephemeris/)
+from app.config import EPHEMERIS_TABLE_PATH
+from app.services.ephemeris_table import (
+    DEFAULT_END_YEAR, DEFAULT_START_YEAR, ERROR_BOUND_DEGREES, VALIDATION_SAMPLES,
+    EphemerisTable, build_ephemeris_table, validate_ephemeris_table
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed ephemeris table")
+    parser.add_argument("--path", default=EPHEMERIS_TABLE_PATH, help="Output directory")
+    parser.add_argument("--start-year", type=int, default=DEFAULT_START_YEAR)
+    parser.add_argument("--end-year", type=int, default=DEFAULT_END_YEAR)
+    parser.add_argument("--samples", type=int, default=VALIDATION_SAMPLES, help="Validation samples per body")
+    parser.add_argument("--validate-only", action="store_true", help="Check an existing table without rebuilding")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    start = time.perf_counter()
+    if args.validate_only:
+        errors = validate_ephemeris_table(EphemerisTable(args.path), args.samples)
+        max_error = {name: e["longitude"] for name, e in errors.items()}
+    else:
+        max_error = build_ephemeris_table(args.path, args.start_year, args.end_year, samples=args.samples)
+    print(f"{'body':<10} {'max error (deg)':>16} {'arcsec':>8}")
+    for name, error in max_error.items():
+        print(f"{name:<10} {error:>16.2e} {error * 3600:>8.3f}")
+    print(f"Bound {ERROR_BOUND_DEGREES} deg, {time.perf_counter() - start:.1f} s, table at {args.path}")
+    if any(error > ERROR_BOUND_DEGREES for error in max_error.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
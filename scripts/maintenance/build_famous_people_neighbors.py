@@ -0,0 +1,44 @@
+"""
+Build or refresh the famous people nearest-neighbor graph ("celebrity twins").
+
+Incremental by default: only lists affected by famous people added, edited
+or removed since the last run are recomputed, so it is cheap to run after
+every ingestion or on a schedule. --full recomputes every list.
+
+Usage:
+    python scripts/maintenance/build_famous_people_neighbors.py [--processes 4] [--full]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from database import SessionLocal, init_db
+from services.similarity_neighbors import DEFAULT_BLOCK_SIZE, NEIGHBORS_PER_PERSON, refresh_famous_neighbors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the famous people nearest-neighbor graph")
+    parser.add_argument("--k", type=int, default=NEIGHBORS_PER_PERSON, help="Neighbors stored per famous person")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Charts scored per block")
+    parser.add_argument("--full", action="store_true", help="Recompute every list, not only what changed")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        stats = refresh_famous_neighbors(db, k=args.k, processes=args.processes,
+                                         block_size=args.block_size, full=args.full)
+    finally:
+        db.close()
+    print(f"{stats['people']} famous people: {stats['recomputed']} lists recomputed, {stats['merged']} merged, "
+          f"{stats['removed']} removed in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
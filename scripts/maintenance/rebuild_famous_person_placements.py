@@ -0,0 +1,36 @@
+"""
+Rebuild the famous_person_placements and famous_person_aspects tables.
+
+Rows are kept in sync automatically whenever a FamousPerson is written
+through SQLAlchemy. Run this after bulk changes that bypass the ORM (raw SQL,
+CSV or Supabase imports) or to repopulate the tables from scratch.
+
+Usage:
+    python scripts/maintenance/rebuild_famous_person_placements.py [--batch-size 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from database import engine, init_db
+from services.famous_people_placements import BACKFILL_BATCH_SIZE, backfill_famous_person_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild famous person placement and aspect rows")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="People rewritten per round trip")
+    args = parser.parse_args()
+
+    init_db()
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        processed = backfill_famous_person_rows(connection, batch_size=args.batch_size)
+    print(f"Rebuilt placement and aspect rows for {processed} famous people in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
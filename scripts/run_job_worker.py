@@ -0,0 +1,73 @@
+"""
+Run a standalone background job worker.
+
+Claims jobs from the background_jobs table (DATABASE_URL) and runs them
+until interrupted. Any number of workers, plus the worker embedded in each
+web process, can share one database. Set JOB_WORKER_EMBEDDED=false on the
+web service when all jobs should run here instead.
+
+Note: batch.job.* events are broadcast from the process that runs the job,
+so WebSocket subscribers only see them for jobs run by an embedded worker.
+
+Usage:
+    python scripts/run_job_worker.py
+    python scripts/run_job_worker.py --concurrency batch.charts=4,batch.readings=2
+    python scripts/run_job_worker.py --once
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database import init_db
+from app.services.job_queue import JobWorker, job_queue, parse_concurrency
+import app.services.batch_service  # noqa: F401  (registers the batch job handlers)
+
+
+async def run(args):
+    concurrency = job_queue.concurrency_limits()
+    concurrency.update(parse_concurrency(args.concurrency))
+    worker = JobWorker(job_queue, concurrency=concurrency, poll_interval=args.poll_interval)
+
+    if args.once:
+        processed = await worker.run_until_idle()
+        print(f"Processed {processed} job(s)")
+        return
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: fall back to KeyboardInterrupt
+
+    worker.start()
+    await stop.wait()
+    await worker.stop(timeout=args.drain_timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a background job worker")
+    parser.add_argument("--concurrency", default="", help='Per job type limits, e.g. "batch.charts=4,batch.readings=2"')
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between claims when idle")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="Seconds to let running jobs finish on shutdown")
+    parser.add_argument("--once", action="store_true", help="Exit once no job is runnable")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_db()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,7 @@ try:
     import wikipediaapi
     from database import SessionLocal, FamousPerson, init_db
     from natal_chart import NatalChart, calculate_numerology, get_chinese_zodiac_and_element
+    from app.services.ephemeris_batch import compute_charts_batch, make_births
 except ImportError as e:
     print(f"Required packages not installed: {e}")
     print("Run: pip install wikipedia-api requests sqlalchemy aiosqlite pyswisseph")
@@ -536,46 +537,58 @@ def extract_chart_elements(chart_data: Dict) -> Dict:
     
     return elements
 
-def calculate_person_chart(person_data: Dict) -> Optional[Dict]:
-    """Calculate birth chart for a famous person."""
+def resolve_person_birth(person_data: Dict) -> Optional[Dict]:
+    """Validate a person's birth data and geocode their birth location."""
+    birth_date = person_data.get('birth_date', {})
+    if not birth_date:
+        return None
+    
+    # Validate required birth date fields
+    year = birth_date.get('year')
+    month = birth_date.get('month')
+    day = birth_date.get('day')
+    
+    if not year or not month or not day:
+        return None
+    
+    # Validate birth location exists and is not empty
+    location = person_data.get('birth_location', '').strip()
+    if not location:
+        return None
+    
+    # Try to geocode location
+    geo = geocode_location(location)
+    if not geo or not geo.get('lat') or not geo.get('lng'):
+        return None
+    
+    return {
+        'year': year,
+        'month': month,
+        'day': day,
+        'hour': birth_date.get('hour', 12),
+        'minute': birth_date.get('minute', 0),
+        'unknown_time': birth_date.get('hour') is None,
+        'lat': geo['lat'],
+        'lng': geo['lng'],
+    }
+
+def build_person_chart(person_data: Dict, birth: Dict, ephemeris=None) -> Optional[Dict]:
+    """Build a famous person's chart, optionally from a precomputed batch ephemeris row."""
     try:
-        birth_date = person_data.get('birth_date', {})
-        if not birth_date:
-            return None
-        
-        # Validate required birth date fields
-        year = birth_date.get('year')
-        month = birth_date.get('month')
-        day = birth_date.get('day')
-        
-        if not year or not month or not day:
-            return None
-        
-        hour = birth_date.get('hour', 12)
-        minute = birth_date.get('minute', 0)
-        unknown_time = birth_date.get('hour') is None
-        
-        # Validate birth location exists and is not empty
-        location = person_data.get('birth_location', '').strip()
-        if not location:
-            return None
-        
-        # Try to geocode location
-        geo = geocode_location(location)
-        if not geo or not geo.get('lat') or not geo.get('lng'):
-            return None
+        year, month, day = birth['year'], birth['month'], birth['day']
+        unknown_time = birth['unknown_time']
         
         chart = NatalChart(
             name=person_data.get('name', 'Unknown'),
             year=year,
             month=month,
             day=day,
-            hour=hour,
-            minute=minute,
-            latitude=geo['lat'],
-            longitude=geo['lng']
+            hour=birth['hour'],
+            minute=birth['minute'],
+            latitude=birth['lat'],
+            longitude=birth['lng']
         )
-        chart.calculate_chart(unknown_time=unknown_time)
+        chart.calculate_chart(unknown_time=unknown_time, ephemeris=ephemeris)
         
         numerology_raw = calculate_numerology(day, month, year)
         numerology = {
@@ -604,6 +617,49 @@ def calculate_person_chart(person_data: Dict) -> Optional[Dict]:
         logger.error(f"Error calculating chart for {person_data.get('name')}: {e}")
         return None
 
+def calculate_person_chart(person_data: Dict) -> Optional[Dict]:
+    """Calculate birth chart for a famous person."""
+    try:
+        birth = resolve_person_birth(person_data)
+    except Exception as e:
+        logger.error(f"Error calculating chart for {person_data.get('name')}: {e}")
+        return None
+    return build_person_chart(person_data, birth) if birth else None
+
+def calculate_person_charts(people: List[Dict], processes: Optional[int] = None) -> List[Optional[Dict]]:
+    """
+    Calculate birth charts for many famous people at once.
+    
+    Locations are geocoded one by one, then the ephemeris for everyone is
+    computed in a single compute_charts_batch call (sharded across
+    `processes` worker processes when given).
+    
+    Returns a list aligned with `people`; entries are None where the chart
+    could not be calculated.
+    """
+    births = []
+    for person_data in people:
+        try:
+            births.append(resolve_person_birth(person_data))
+        except Exception as e:
+            logger.error(f"Error calculating chart for {person_data.get('name')}: {e}")
+            births.append(None)
+    
+    resolved = [i for i, birth in enumerate(births) if birth]
+    results: List[Optional[Dict]] = [None] * len(people)
+    if not resolved:
+        return results
+    
+    ephemeris = compute_charts_batch(make_births(
+        (births[i]['year'], births[i]['month'], births[i]['day'],
+         births[i]['hour'], births[i]['minute'], births[i]['lat'], births[i]['lng'])
+        for i in resolved
+    ), processes=processes)
+    
+    for row, i in enumerate(resolved):
+        results[i] = build_person_chart(people[i], births[i], ephemeris[row])
+    return results
+
 # ============================================================================
 # MAIN PROCESS
 # ============================================================================
@@ -759,14 +815,10 @@ def main():
         db_skipped = 0
         db_errors = 0
         
-        for idx, person_data in enumerate(scraped_data, 1):
-            # Check if we've reached the target
-            current_db_count = db.query(FamousPerson).count()
-            if current_db_count >= MAX_PEOPLE:
-                log_print(f"\n   ✓ Database now has {current_db_count} people (target: {MAX_PEOPLE})")
-                log_print(f"   Stopping chart calculation early...")
-                break
-            
+        # Pass 1: pick the people who still need charts (validated, not already stored)
+        remaining = MAX_PEOPLE - db.query(FamousPerson).count()
+        candidates = []
+        for person_data in scraped_data:
             name = person_data.get('title', '')
             if not name:
                 db_errors += 1
@@ -775,22 +827,8 @@ def main():
             # Check if already exists (using pre-loaded set for faster lookup)
             if name in existing_names:
                 db_skipped += 1
-                if idx % 50 == 0:
-                    log_print(f"   Progress: {idx}/{len(scraped_data)} (processed: {db_processed}, skipped: {db_skipped}, errors: {db_errors})")
                 continue
             
-            # Double-check database (in case of race condition)
-            existing = db.query(FamousPerson).filter(FamousPerson.name == name).first()
-            if existing:
-                existing_names.add(name)  # Add to set for future iterations
-                db_skipped += 1
-                if idx % 50 == 0:
-                    log_print(f"   Progress: {idx}/{len(scraped_data)} (processed: {db_processed}, skipped: {db_skipped}, errors: {db_errors})")
-                continue
-            
-            if idx % 50 == 0:
-                log_print(f"   Progress: {idx}/{len(scraped_data)} (processed: {db_processed}, skipped: {db_skipped}, errors: {db_errors})")
-            
             # Validate data before calculating
             birth_date = person_data.get('birth_date', {})
             birth_location = person_data.get('birth_location', '')
@@ -803,63 +841,76 @@ def main():
                 db_errors += 1
                 continue
             
-            chart_result = calculate_person_chart(person_data)
-            if not chart_result:
-                db_errors += 1
-                continue
-            
             # Add to existing_names set to prevent duplicates in same run
             existing_names.add(name)
+            candidates.append(person_data)
+        
+        # Pass 2: calculate charts one batch at a time (one ephemeris call per batch)
+        start = 0
+        while start < len(candidates):
+            if db_processed >= remaining:
+                log_print(f"\n   ✓ Database now has {MAX_PEOPLE} people (target: {MAX_PEOPLE})")
+                log_print(f"   Stopping chart calculation early...")
+                break
+            batch = candidates[start:start + min(BATCH_SIZE, remaining - db_processed)]
+            start += len(batch)
+            log_print(f"   Progress: {start}/{len(candidates)} (processed: {db_processed}, skipped: {db_skipped}, errors: {db_errors})")
             
-            # Extract numerology and Chinese zodiac
-            numerology_data = chart_result['chart_data'].get('numerology_analysis', {})
-            chinese_zodiac_str = chart_result['chart_data'].get('chinese_zodiac', '')
-            
-            chinese_animal = None
-            chinese_element = None
-            if chinese_zodiac_str and isinstance(chinese_zodiac_str, str) and chinese_zodiac_str != 'N/A':
-                parts = chinese_zodiac_str.strip().split()
-                if len(parts) >= 2:
-                    chinese_element = parts[0]
-                    chinese_animal = parts[1]
-            
-            birth_date = person_data.get('birth_date', {})
-            famous_person = FamousPerson(
-                name=name,
-                wikipedia_url=person_data.get('url', ''),
-                occupation=None,  # Could extract from infobox if needed
-                birth_year=birth_date.get('year'),
-                birth_month=birth_date.get('month'),
-                birth_day=birth_date.get('day'),
-                birth_hour=birth_date.get('hour'),
-                birth_minute=birth_date.get('minute'),
-                birth_location=person_data.get('birth_location', ''),
-                unknown_time=chart_result['unknown_time'],
-                chart_data_json=json.dumps(chart_result['chart_data']),
-                sun_sign_sidereal=chart_result['elements'].get('sun_sign_sidereal'),
-                sun_sign_tropical=chart_result['elements'].get('sun_sign_tropical'),
-                moon_sign_sidereal=chart_result['elements'].get('moon_sign_sidereal'),
-                moon_sign_tropical=chart_result['elements'].get('moon_sign_tropical'),
-                rising_sign_sidereal=chart_result['elements'].get('rising_sign_sidereal'),
-                rising_sign_tropical=chart_result['elements'].get('rising_sign_tropical'),
-                life_path_number=numerology_data.get('life_path_number'),
-                day_number=numerology_data.get('day_number'),
-                chinese_zodiac_animal=chinese_animal,
-                chinese_zodiac_element=chinese_element,
-            )
-            
-            db.add(famous_person)
-            db_processed += 1
+            for person_data, chart_result in zip(batch, calculate_person_charts(batch, processes=os.cpu_count())):
+                if not chart_result:
+                    db_errors += 1
+                    continue
+                
+                name = person_data.get('title', '')
+                
+                # Extract numerology and Chinese zodiac
+                numerology_data = chart_result['chart_data'].get('numerology_analysis', {})
+                chinese_zodiac_str = chart_result['chart_data'].get('chinese_zodiac', '')
+                
+                chinese_animal = None
+                chinese_element = None
+                if chinese_zodiac_str and isinstance(chinese_zodiac_str, str) and chinese_zodiac_str != 'N/A':
+                    parts = chinese_zodiac_str.strip().split()
+                    if len(parts) >= 2:
+                        chinese_element = parts[0]
+                        chinese_animal = parts[1]
+                
+                birth_date = person_data.get('birth_date', {})
+                famous_person = FamousPerson(
+                    name=name,
+                    wikipedia_url=person_data.get('url', ''),
+                    occupation=None,  # Could extract from infobox if needed
+                    birth_year=birth_date.get('year'),
+                    birth_month=birth_date.get('month'),
+                    birth_day=birth_date.get('day'),
+                    birth_hour=birth_date.get('hour'),
+                    birth_minute=birth_date.get('minute'),
+                    birth_location=person_data.get('birth_location', ''),
+                    unknown_time=chart_result['unknown_time'],
+                    chart_data_json=json.dumps(chart_result['chart_data']),
+                    sun_sign_sidereal=chart_result['elements'].get('sun_sign_sidereal'),
+                    sun_sign_tropical=chart_result['elements'].get('sun_sign_tropical'),
+                    moon_sign_sidereal=chart_result['elements'].get('moon_sign_sidereal'),
+                    moon_sign_tropical=chart_result['elements'].get('moon_sign_tropical'),
+                    rising_sign_sidereal=chart_result['elements'].get('rising_sign_sidereal'),
+                    rising_sign_tropical=chart_result['elements'].get('rising_sign_tropical'),
+                    life_path_number=numerology_data.get('life_path_number'),
+                    day_number=numerology_data.get('day_number'),
+                    chinese_zodiac_animal=chinese_animal,
+                    chinese_zodiac_element=chinese_element,
+                )
+                
+                db.add(famous_person)
+                db_processed += 1
             
-            # Commit in batches (saves progress every 50 people)
-            if db_processed % BATCH_SIZE == 0:
-                try:
-                    db.commit()
-                    log_print(f"   ✓ Committed batch: {db_processed} people saved to database")
-                except Exception as e:
-                    log_print(f"   ✗ Error committing batch: {e}")
-                    db.rollback()
-                    raise
+            # Commit each batch (saves progress every BATCH_SIZE people)
+            try:
+                db.commit()
+                log_print(f"   ✓ Committed batch: {db_processed} people saved to database")
+            except Exception as e:
+                log_print(f"   ✗ Error committing batch: {e}")
+                db.rollback()
+                raise
         
         # Final commit
         try:
@@ -0,0 +1,413 @@
+"""
+Famous Person Placements
+
+Normalized copies of the chart data famous people are matched on, so
+candidates can be found with indexed SQL instead of loading every row:
+
+- famous_person_placements: one row per (person, zodiac system, body) with
+  the sign calculate_comprehensive_similarity_score compares, resolved
+  through the same fallbacks (planetary_placements_json, then the Sun/Moon
+  columns, then chart_data_json)
+- famous_person_aspects: one row per top aspect, with the body pair sorted
+
+The rows are rewritten from FamousPerson's columns whenever those change
+(mapper events in database.py), so the ingestion and maintenance scripts
+keep them current. backfill_famous_person_rows fills them for existing
+databases.
+
+prefilter_candidates computes, in one GROUP BY query, the score each
+famous person could reach from the placements, top aspects, numerology and
+Chinese zodiac they share with a chart. That bound is never below the real
+score (and equals it for well-formed rows), so only people who can reach
+the match threshold are loaded and scored in Python.
+"""
+
+import json
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from database import FamousPerson, FamousPersonAspect, FamousPersonPlacement
+
+logger = logging.getLogger(__name__)
+
+SYSTEMS: Tuple[str, str] = ("sidereal", "tropical")
+SIGNS: Tuple[str, ...] = (
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo", "Libra", "Scorpio",
+    "Sagittarius", "Capricorn", "Aquarius", "Pisces", "Ophiuchus",
+)
+SIGN_CODES: Dict[str, int] = {sign: code for code, sign in enumerate(SIGNS)}
+UNKNOWN_SIGN = -1
+
+# Points awarded by calculate_comprehensive_similarity_score outside the planets
+ASPECT_POINTS = 15.0
+NUMEROLOGY_POINTS = 10.0
+CHINESE_ZODIAC_POINTS = 10.0
+
+BACKFILL_BATCH_SIZE = 500
+
+# FamousPerson columns placement and aspect rows are derived from
+_SOURCE_COLUMNS = (
+    FamousPerson.id, FamousPerson.chart_data_json, FamousPerson.planetary_placements_json,
+    FamousPerson.top_aspects_json, FamousPerson.sun_sign_sidereal, FamousPerson.sun_sign_tropical,
+    FamousPerson.moon_sign_sidereal, FamousPerson.moon_sign_tropical,
+)
+
+
+def _compared_planets() -> List[Tuple[str, float]]:
+    # Imported lazily: similarity_service imports this module on demand
+    from services.similarity_service import PLANETS_TO_COMPARE
+    return PLANETS_TO_COMPARE
+
+
+def _extract_sign(position_str: Optional[str]) -> Optional[str]:
+    """Extract the sign (last word) from a position string like "10°30' Capricorn"."""
+    if not position_str:
+        return None
+    parts = position_str.split()
+    return parts[-1] if parts else None
+
+
+def sign_code(sign: Any) -> int:
+    """Code of a sign name, UNKNOWN_SIGN for anything else."""
+    return SIGN_CODES.get(sign, UNKNOWN_SIGN) if isinstance(sign, str) else UNKNOWN_SIGN
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# ----------------------------------------------------------------------
+# Row extraction
+# ----------------------------------------------------------------------
+
+def placement_rows(fp: Any) -> List[Dict[str, Any]]:
+    """
+    Placement rows for a famous person.
+
+    Compared planets resolve their sign exactly as the similarity scorer
+    does; other bodies in planetary_placements_json (Chiron, Ascendant) are
+    stored as they are. A person the scorer cannot read gets no rows.
+
+    Args:
+        fp: FamousPerson (or a row with the same columns)
+
+    Returns:
+        Dicts with person_id, system, body, sign_code, degree, retro
+    """
+    if not fp.chart_data_json:
+        return []
+    try:
+        fp_chart = json.loads(fp.chart_data_json)
+        fp_placements = {}
+        if fp.planetary_placements_json:
+            try:
+                parsed = json.loads(fp.planetary_placements_json)
+                if isinstance(parsed, dict):
+                    fp_placements = parsed
+            except Exception:
+                pass
+
+        rows = []
+        compared = {name for name, _ in _compared_planets()}
+        for system in SYSTEMS:
+            system_placements = fp_placements.get(system, {})
+            for planet_name in [name for name, _ in _compared_planets()]:
+                sign, degree, retro = None, None, False
+                if system_placements.get(planet_name):
+                    entry = system_placements[planet_name]
+                    sign, degree, retro = entry.get('sign'), entry.get('degree'), entry.get('retrograde')
+                elif planet_name in ('Sun', 'Moon') and getattr(fp, f"{planet_name.lower()}_sign_{system}"):
+                    sign = getattr(fp, f"{planet_name.lower()}_sign_{system}")
+                elif fp_chart.get(f"{system}_major_positions"):
+                    for p in fp_chart[f"{system}_major_positions"]:
+                        if p.get('name') == planet_name:
+                            sign, degree, retro = _extract_sign(p.get('position')), p.get('degrees'), p.get('retrograde')
+                            break
+                if sign:
+                    rows.append({"system": system, "body": planet_name, "sign": sign, "degree": degree, "retro": retro})
+
+            for body, entry in system_placements.items():
+                if body not in compared and isinstance(entry, dict) and entry.get('sign'):
+                    rows.append({"system": system, "body": body, "sign": entry['sign'],
+                                 "degree": entry.get('degree'), "retro": entry.get('retrograde')})
+    except Exception as e:
+        # The scorer gives such a person 0 points from placements
+        logger.warning(f"Could not read placements for famous person {fp.id}: {e}")
+        return []
+
+    return [
+        {
+            "person_id": fp.id,
+            "system": row["system"],
+            "body": str(row["body"]),
+            "sign_code": sign_code(row["sign"]),
+            "degree": _as_float(row["degree"]),
+            "retro": bool(row["retro"]),
+        }
+        for row in rows
+    ]
+
+
+def aspect_rows(fp: Any) -> List[Dict[str, Any]]:
+    """
+    Aspect rows for a famous person's top aspects, one per distinct (system, pair, type).
+
+    Malformed entries are skipped individually, so the rows never miss an
+    aspect the scorer could match.
+    """
+    if not fp.top_aspects_json:
+        return []
+    try:
+        fp_aspects = json.loads(fp.top_aspects_json)
+        if not isinstance(fp_aspects, dict):
+            return []
+    except Exception:
+        return []
+
+    keys = set()
+    for system in SYSTEMS:
+        entries = fp_aspects.get(system)
+        if not isinstance(entries, list):
+            continue
+        for aspect in entries:
+            try:
+                body1, body2 = sorted([aspect['p1'], aspect['p2']])
+                keys.add((system, str(body1), str(body2), str(aspect['type'])))
+            except (KeyError, TypeError):
+                continue
+    return [
+        {"person_id": fp.id, "system": system, "body1": body1, "body2": body2, "aspect_type": aspect_type}
+        for system, body1, body2, aspect_type in sorted(keys)
+    ]
+
+
+# ----------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------
+
+def delete_famous_person_rows(connection, person_ids: Any) -> None:
+    """Delete placement and aspect rows for one person id or a list of ids."""
+    ids = person_ids if isinstance(person_ids, (list, tuple)) else [person_ids]
+    if not ids:
+        return
+    connection.execute(delete(FamousPersonPlacement).where(FamousPersonPlacement.person_id.in_(ids)))
+    connection.execute(delete(FamousPersonAspect).where(FamousPersonAspect.person_id.in_(ids)))
+
+
+def _write_rows(connection, people: Iterable[Any]) -> int:
+    placements, aspects = [], []
+    for fp in people:
+        placements.extend(placement_rows(fp))
+        aspects.extend(aspect_rows(fp))
+    if placements:
+        connection.execute(insert(FamousPersonPlacement), placements)
+    if aspects:
+        connection.execute(insert(FamousPersonAspect), aspects)
+    return len(placements)
+
+
+def sync_famous_person_rows(connection, fp: Any) -> None:
+    """
+    Replace a famous person's placement and aspect rows.
+
+    Called from the FamousPerson mapper events in database.py.
+
+    Args:
+        connection: Connection of the flush (or any connection)
+        fp: FamousPerson with an id
+    """
+    delete_famous_person_rows(connection, fp.id)
+    _write_rows(connection, [fp])
+
+
+def backfill_famous_person_rows(connection, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Rebuild placement and aspect rows for every famous person with chart data.
+
+    Reads famous_people in id-ordered batches so memory stays flat.
+
+    Args:
+        connection: Connection to run against
+        batch_size: People read and rewritten per round trip
+
+    Returns:
+        Number of people processed
+    """
+    last_id = 0
+    processed = 0
+    while True:
+        people = connection.execute(
+            select(*_SOURCE_COLUMNS)
+            .where(FamousPerson.id > last_id, FamousPerson.chart_data_json.isnot(None))
+            .order_by(FamousPerson.id)
+            .limit(batch_size)
+        ).fetchall()
+        if not people:
+            break
+        delete_famous_person_rows(connection, [fp.id for fp in people])
+        _write_rows(connection, people)
+        processed += len(people)
+        last_id = people[-1].id
+    return processed
+
+
+# ----------------------------------------------------------------------
+# Prefiltering
+# ----------------------------------------------------------------------
+
+def _user_keys(chart_data: dict) -> Dict[str, Any]:
+    """What a user chart can match on, as calculate_comprehensive_similarity_score reads it."""
+    from services.similarity_service import extract_top_aspects_from_chart, normalize_master_number
+
+    placements = []
+    slack = 0.0
+    for system in SYSTEMS:
+        positions = {p['name']: p for p in chart_data.get(f"{system}_major_positions", [])}
+        for planet_name, weight in _compared_planets():
+            sign = _extract_sign(positions[planet_name].get('position')) if planet_name in positions else None
+            if not sign:
+                continue
+            code = sign_code(sign)
+            if code == UNKNOWN_SIGN:
+                # Unrecognized signs are not coded; assume they could match
+                slack += weight
+            else:
+                placements.append((system, planet_name, code))
+
+    top_aspects = extract_top_aspects_from_chart(chart_data, top_n=3)
+    aspects = {
+        system: Counter(
+            tuple(sorted([a['p1'], a['p2']])) + (a['type'],) for a in top_aspects.get(system, [])
+        )
+        for system in SYSTEMS
+    }
+
+    raw_numerology = chart_data.get('numerology') or chart_data.get('numerology_analysis') or {}
+    if isinstance(raw_numerology, str):
+        try:
+            raw_numerology = json.loads(raw_numerology)
+        except Exception:
+            raw_numerology = {}
+    if not isinstance(raw_numerology, dict):
+        raw_numerology = {}
+    life_path = raw_numerology.get('life_path_number')
+    day = raw_numerology.get('day_number')
+
+    raw_chinese = chart_data.get('chinese_zodiac', {})
+    animal = None
+    if isinstance(raw_chinese, str):
+        parts = raw_chinese.strip().split()
+        animal = parts[-1] if parts else None
+    elif isinstance(raw_chinese, dict):
+        animal = raw_chinese.get('animal')
+
+    return {
+        "placements": placements,
+        "slack": slack,
+        "aspects": aspects,
+        "life_path": [str(t) for t in normalize_master_number(life_path)] if life_path else [],
+        "day": [str(t) for t in normalize_master_number(day)] if day else [],
+        "animal": animal.lower() if isinstance(animal, str) and animal else None,
+    }
+
+
+def _number_matches(column, tokens: List[str]):
+    """SQL for normalize_master_number(column) sharing a token with tokens ("33/6" holds 33 and 6)."""
+    return or_(*[
+        or_(column == token, column.like(f"{token}/%"), column.like(f"%/{token}"))
+        for token in tokens
+    ])
+
+
+def has_placement_rows(db: Session) -> bool:
+    """Whether the placement table has been populated."""
+    return db.query(FamousPersonPlacement.person_id).first() is not None
+
+
+def prefilter_candidates(db: Session, chart_data: dict, min_score: float) -> Optional[List[Tuple[int, float]]]:
+    """
+    Famous people who can reach min_score against a chart.
+
+    Shared placements are weighted like PLANETS_TO_COMPARE and summed per
+    person with GROUP BY, together with the aspect, numerology and Chinese
+    zodiac points, entirely in SQL.
+
+    Args:
+        db: Database session
+        chart_data: User chart data (from /calculate_chart)
+        min_score: Minimum raw synthesis score
+
+    Returns:
+        (famous_person_id, score bound) pairs, highest bound first and ties
+        in id order, or None if the tables are not populated or the chart
+        cannot be prefiltered (callers then score everyone)
+    """
+    if not has_placement_rows(db):
+        return None
+    user = _user_keys(chart_data)
+    if user["slack"] >= min_score:
+        return None
+
+    placement = FamousPersonPlacement
+    aspect = FamousPersonAspect
+    parts = []
+
+    if user["placements"]:
+        weight = case(*[(placement.body == name, weight) for name, weight in _compared_planets()], else_=0.0)
+        parts.append(
+            select(placement.person_id.label("person_id"), func.sum(weight).label("points"))
+            .where(or_(*[
+                and_(placement.system == system, placement.body == body, placement.sign_code == code)
+                for system, body, code in user["placements"]
+            ]))
+            .group_by(placement.person_id)
+        )
+
+    matches = [
+        (and_(aspect.system == system, aspect.body1 == body1, aspect.body2 == body2, aspect.aspect_type == aspect_type), count)
+        for system, counter in user["aspects"].items()
+        for (body1, body2, aspect_type), count in counter.items()
+    ]
+    if matches:
+        # 2 of the user's top 3 aspects shared in either system
+        systems = (
+            select(aspect.person_id)
+            .where(or_(*[condition for condition, _ in matches]))
+            .group_by(aspect.person_id, aspect.system)
+            .having(func.sum(case(*matches, else_=0)) >= 2)
+            .subquery()
+        )
+        parts.append(select(systems.c.person_id, literal(ASPECT_POINTS).label("points")).distinct())
+
+    scalar_points = []
+    if user["life_path"]:
+        scalar_points.append((_number_matches(FamousPerson.life_path_number, user["life_path"]), NUMEROLOGY_POINTS))
+    if user["day"]:
+        scalar_points.append((_number_matches(FamousPerson.day_number, user["day"]), NUMEROLOGY_POINTS))
+    if user["animal"]:
+        scalar_points.append((func.lower(FamousPerson.chinese_zodiac_animal) == user["animal"], CHINESE_ZODIAC_POINTS))
+    if scalar_points:
+        points = sum(case((condition, value), else_=0.0) for condition, value in scalar_points)
+        parts.append(
+            select(FamousPerson.id.label("person_id"), points.label("points"))
+            .where(FamousPerson.chart_data_json.isnot(None), or_(*[condition for condition, _ in scalar_points]))
+        )
+
+    if not parts:
+        return []
+    shared = union_all(*parts).subquery()
+    total = func.sum(shared.c.points)
+    rows = db.execute(
+        select(shared.c.person_id, total)
+        .group_by(shared.c.person_id)
+        .having(total >= min_score - user["slack"])
+        .order_by(total.desc(), shared.c.person_id)
+    ).all()
+    return [(int(person_id), float(bound) + user["slack"]) for person_id, bound in rows]
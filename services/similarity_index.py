@@ -0,0 +1,675 @@
+"""
+Famous People Similarity Index
+
+In-process, vectorized index over the FamousPerson table. Each person is
+parsed once and encoded into fixed-width NumPy arrays:
+
+- sign codes per planet and zodiac system
+- top-aspect bitsets per zodiac system
+- numerology token bitsets (life path and day number)
+- Chinese zodiac animal codes
+
+Scoring a user chart against the whole corpus is then a handful of
+broadcasted array operations, producing exactly the same raw synthesis
+scores as calculate_comprehensive_similarity_score. The index refreshes
+incrementally: only rows whose FamousPerson.updated_at changed are
+re-encoded.
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import FamousPerson
+
+logger = logging.getLogger(__name__)
+
+SYSTEMS: Tuple[str, str] = ("sidereal", "tropical")
+
+# Sign code sentinels
+SIGN_MISSING = -1       # No usable sign for this planet/system
+SIGN_UNMATCHABLE = -2   # A value is present but can never equal a user sign
+
+# Rows loaded per query when (re-)encoding famous people
+LOAD_CHUNK_SIZE = 500
+
+_WORD_BITS = 64
+
+
+def _extract_sign(position_str: Optional[str]) -> Optional[str]:
+    """Extract the sign (last word) from a position string like "10°30' Capricorn"."""
+    if not position_str:
+        return None
+    parts = position_str.split()
+    return parts[-1] if parts else None
+
+
+def _aspect_key(aspect: Dict[str, Any]) -> Tuple[Tuple[str, ...], str]:
+    """Order-independent key for an aspect dict with p1/p2/type."""
+    return tuple(sorted([aspect['p1'], aspect['p2']])), aspect['type']
+
+
+def _words_for(vocab_size: int) -> int:
+    """Number of 64-bit words needed to hold a bitset over vocab_size codes."""
+    return max(1, (vocab_size + _WORD_BITS - 1) // _WORD_BITS)
+
+
+def _bitset(codes: List[int], words: int) -> np.ndarray:
+    """Build a packed uint64 bitset with the given codes set (codes past the end are ignored)."""
+    row = np.zeros(words, dtype=np.uint64)
+    for code in codes:
+        if code >= words * _WORD_BITS:
+            continue
+        row[code // _WORD_BITS] |= np.uint64(1) << np.uint64(code % _WORD_BITS)
+    return row
+
+
+def _widen(bits: np.ndarray, words: int) -> np.ndarray:
+    """Zero-pad the last axis of a bitset array to the given word count."""
+    missing = words - bits.shape[-1]
+    if missing <= 0:
+        return bits
+    pad = [(0, 0)] * (bits.ndim - 1) + [(0, missing)]
+    return np.pad(bits, pad)
+
+
+def _test_bit(bits: np.ndarray, code: int) -> np.ndarray:
+    """Test one bit across the leading axes of a packed bitset array."""
+    word, offset = divmod(code, _WORD_BITS)
+    if word >= bits.shape[-1]:
+        return np.zeros(bits.shape[:-1], dtype=bool)
+    return ((bits[..., word] >> np.uint64(offset)) & np.uint64(1)).astype(bool)
+
+
+def famous_people_signature(db: Session) -> Tuple[Any, ...]:
+    """
+    Cheap version of the famous people with chart data: one aggregate query.
+
+    Changes whenever a row is added, removed or updated (updated_at moves),
+    so anything derived from the corpus (this index, cached matches) can
+    tell it is stale.
+    """
+    return tuple(db.query(
+        func.count(FamousPerson.id),
+        func.max(FamousPerson.updated_at),
+        func.sum(FamousPerson.id),
+    ).filter(FamousPerson.chart_data_json.isnot(None)).one())
+
+
+class _Vocabulary:
+    """Grow-only mapping from hashable values to dense integer codes."""
+
+    def __init__(self):
+        self._codes: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def add(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._codes)
+            self._codes[value] = code
+        return code
+
+    def get(self, value: Any) -> Optional[int]:
+        try:
+            return self._codes.get(value)
+        except TypeError:
+            return None
+
+
+@dataclass
+class _EncodedPerson:
+    """Intermediate per-person encoding before it is packed into arrays."""
+    person_id: int
+    updated_at: Any
+    valid: bool
+    signs: np.ndarray
+    aspect_codes: Tuple[List[int], List[int]]
+    life_path_present: bool
+    life_path_codes: List[int]
+    day_present: bool
+    day_codes: List[int]
+    animal_code: int
+
+
+@dataclass
+class _IndexArrays:
+    """Immutable snapshot of the packed index; replaced wholesale on refresh."""
+    ids: np.ndarray                # (N,) int64 FamousPerson ids, ascending
+    valid: np.ndarray              # (N,) bool, False if chart JSON was unusable
+    signs: np.ndarray              # (N, 2, P) int16 sign codes
+    aspect_bits: np.ndarray        # (N, 2, Wa) uint64 top-aspect bitsets
+    life_path_present: np.ndarray  # (N,) bool
+    life_path_bits: np.ndarray     # (N, Wn) uint64 numerology token bitsets
+    day_present: np.ndarray        # (N,) bool
+    day_bits: np.ndarray           # (N, Wn) uint64
+    animal_codes: np.ndarray       # (N,) int16 lowercase Chinese animal codes
+
+    @classmethod
+    def empty(cls, planet_count: int) -> "_IndexArrays":
+        return cls(
+            ids=np.zeros(0, dtype=np.int64),
+            valid=np.zeros(0, dtype=bool),
+            signs=np.zeros((0, len(SYSTEMS), planet_count), dtype=np.int16),
+            aspect_bits=np.zeros((0, len(SYSTEMS), 1), dtype=np.uint64),
+            life_path_present=np.zeros(0, dtype=bool),
+            life_path_bits=np.zeros((0, 1), dtype=np.uint64),
+            day_present=np.zeros(0, dtype=bool),
+            day_bits=np.zeros((0, 1), dtype=np.uint64),
+            animal_codes=np.zeros(0, dtype=np.int16),
+        )
+
+
+class FamousPeopleIndex:
+    """
+    Vectorized similarity index over famous people.
+
+    Usage:
+        index = get_famous_people_index(db)
+        ids, scores = index.score_chart(chart_data)
+        ranked = index.top_k(chart_data, k=10)
+    """
+
+    def __init__(self):
+        # Imported lazily: similarity_service imports this module on demand
+        from services.similarity_service import PLANETS_TO_COMPARE
+        self.planets: List[str] = [name for name, _ in PLANETS_TO_COMPARE]
+        self.weights = np.array([weight for _, weight in PLANETS_TO_COMPARE], dtype=np.float64)
+
+        self._signs = _Vocabulary()
+        self._aspects = _Vocabulary()
+        self._numbers = _Vocabulary()
+        self._animals = _Vocabulary()
+
+        self._arrays = _IndexArrays.empty(len(self.planets))
+        self._versions: Dict[int, Any] = {}
+        self._signature: Optional[Tuple[Any, ...]] = None
+        self._block: Optional[Tuple[_IndexArrays, Dict[str, np.ndarray]]] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Picklable for worker processes (see services.similarity_neighbors)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_block"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Number of famous people currently in the index."""
+        return int(self._arrays.ids.shape[0])
+
+    @property
+    def versions(self) -> Dict[int, Any]:
+        """FamousPerson.updated_at of every indexed person, as of the last refresh."""
+        return dict(self._versions)
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Indexed famous person ids, ascending (the column order of scores)."""
+        return self._arrays.ids
+
+    def invalidate(self):
+        """Force the next refresh() to re-encode every row."""
+        with self._lock:
+            self._versions = {}
+            self._signature = None
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def _sign_code(self, value: Any, grow: bool) -> int:
+        if not value:
+            return SIGN_MISSING
+        try:
+            code = self._signs.add(value) if grow else self._signs.get(value)
+        except TypeError:
+            return SIGN_UNMATCHABLE
+        return SIGN_UNMATCHABLE if code is None else code
+
+    def _encode_person(self, fp: FamousPerson) -> _EncodedPerson:
+        """Encode one FamousPerson, mirroring calculate_comprehensive_similarity_score."""
+        encoded = _EncodedPerson(
+            person_id=fp.id,
+            updated_at=fp.updated_at,
+            valid=False,
+            signs=np.full((len(SYSTEMS), len(self.planets)), SIGN_MISSING, dtype=np.int16),
+            aspect_codes=([], []),
+            life_path_present=False,
+            life_path_codes=[],
+            day_present=False,
+            day_codes=[],
+            animal_code=SIGN_MISSING,
+        )
+        if not fp.chart_data_json:
+            return encoded
+
+        try:
+            fp_chart = json.loads(fp.chart_data_json)
+            fp_placements = {}
+            if fp.planetary_placements_json:
+                try:
+                    parsed = json.loads(fp.planetary_placements_json)
+                    if isinstance(parsed, dict):
+                        fp_placements = parsed
+                except Exception:
+                    pass
+
+            for s_idx, system in enumerate(SYSTEMS):
+                for p_idx, planet_name in enumerate(self.planets):
+                    sign = None
+                    if fp_placements.get(system, {}).get(planet_name):
+                        sign = fp_placements[system][planet_name].get('sign')
+                    elif planet_name == 'Sun' and getattr(fp, f"sun_sign_{system}"):
+                        sign = getattr(fp, f"sun_sign_{system}")
+                    elif planet_name == 'Moon' and getattr(fp, f"moon_sign_{system}"):
+                        sign = getattr(fp, f"moon_sign_{system}")
+                    elif fp_chart.get(f"{system}_major_positions"):
+                        for p in fp_chart[f"{system}_major_positions"]:
+                            if p.get('name') == planet_name:
+                                sign = _extract_sign(p.get('position'))
+                                break
+                    encoded.signs[s_idx, p_idx] = self._sign_code(sign, grow=True)
+
+            if fp.chinese_zodiac_animal:
+                encoded.animal_code = self._animals.add(fp.chinese_zodiac_animal.lower())
+        except Exception as e:
+            # The scalar scorer returns 0.0 for any row it cannot read
+            logger.warning(f"Similarity index could not encode {fp.name}: {e}")
+            encoded.signs[:] = SIGN_MISSING
+            return encoded
+
+        encoded.valid = True
+
+        if fp.top_aspects_json:
+            try:
+                fp_aspects = json.loads(fp.top_aspects_json)
+                codes = tuple(
+                    [self._aspects.add(_aspect_key(a)) for a in fp_aspects.get(system, [])]
+                    for system in SYSTEMS
+                )
+                encoded.aspect_codes = codes
+            except Exception:
+                encoded.aspect_codes = ([], [])
+
+        from services.similarity_service import normalize_master_number
+        if fp.life_path_number:
+            encoded.life_path_present = True
+            encoded.life_path_codes = [self._numbers.add(t) for t in normalize_master_number(fp.life_path_number)]
+        if fp.day_number:
+            encoded.day_present = True
+            encoded.day_codes = [self._numbers.add(t) for t in normalize_master_number(fp.day_number)]
+
+        return encoded
+
+    def _pack(self, people: List[_EncodedPerson]) -> _IndexArrays:
+        """Pack encoded people into arrays sized for the current vocabularies."""
+        aspect_words = _words_for(len(self._aspects))
+        number_words = _words_for(len(self._numbers))
+        n = len(people)
+        arrays = _IndexArrays(
+            ids=np.array([p.person_id for p in people], dtype=np.int64),
+            valid=np.array([p.valid for p in people], dtype=bool),
+            signs=(np.stack([p.signs for p in people]) if people
+                   else np.zeros((0, len(SYSTEMS), len(self.planets)), dtype=np.int16)),
+            aspect_bits=np.zeros((n, len(SYSTEMS), aspect_words), dtype=np.uint64),
+            life_path_present=np.array([p.life_path_present for p in people], dtype=bool),
+            life_path_bits=np.zeros((n, number_words), dtype=np.uint64),
+            day_present=np.array([p.day_present for p in people], dtype=bool),
+            day_bits=np.zeros((n, number_words), dtype=np.uint64),
+            animal_codes=np.array([p.animal_code for p in people], dtype=np.int16),
+        )
+        for row, person in enumerate(people):
+            for s_idx in range(len(SYSTEMS)):
+                arrays.aspect_bits[row, s_idx] = _bitset(person.aspect_codes[s_idx], aspect_words)
+            arrays.life_path_bits[row] = _bitset(person.life_path_codes, number_words)
+            arrays.day_bits[row] = _bitset(person.day_codes, number_words)
+        return arrays
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, db: Session) -> bool:
+        """
+        Bring the index up to date with the database.
+
+        A cheap aggregate query detects whether anything changed; if so, only
+        rows that are new or whose updated_at moved are loaded and re-encoded.
+
+        Returns:
+            True if the index was modified
+        """
+        with_chart = FamousPerson.chart_data_json.isnot(None)
+        signature = famous_people_signature(db)
+
+        with self._lock:
+            if signature == self._signature:
+                return False
+
+            current = {
+                row.id: row.updated_at
+                for row in db.query(FamousPerson.id, FamousPerson.updated_at).filter(with_chart)
+            }
+            stale = sorted(pid for pid, ts in current.items()
+                           if pid not in self._versions or self._versions[pid] != ts)
+            kept = sorted(pid for pid in current if pid in self._versions and pid not in stale)
+
+            encoded: List[_EncodedPerson] = []
+            for start in range(0, len(stale), LOAD_CHUNK_SIZE):
+                chunk = stale[start:start + LOAD_CHUNK_SIZE]
+                for fp in db.query(FamousPerson).filter(FamousPerson.id.in_(chunk)).all():
+                    encoded.append(self._encode_person(fp))
+
+            fresh = self._pack(encoded)
+            old = self._arrays
+            old_rows = np.searchsorted(old.ids, np.array(kept, dtype=np.int64))
+            aspect_words = fresh.aspect_bits.shape[-1]
+            number_words = fresh.life_path_bits.shape[-1]
+
+            ids = np.concatenate([old.ids[old_rows], fresh.ids])
+            order = np.argsort(ids, kind="stable")
+            self._arrays = _IndexArrays(
+                ids=ids[order],
+                valid=np.concatenate([old.valid[old_rows], fresh.valid])[order],
+                signs=np.concatenate([old.signs[old_rows], fresh.signs])[order],
+                aspect_bits=np.concatenate([_widen(old.aspect_bits[old_rows], aspect_words), fresh.aspect_bits])[order],
+                life_path_present=np.concatenate([old.life_path_present[old_rows], fresh.life_path_present])[order],
+                life_path_bits=np.concatenate([_widen(old.life_path_bits[old_rows], number_words), fresh.life_path_bits])[order],
+                day_present=np.concatenate([old.day_present[old_rows], fresh.day_present])[order],
+                day_bits=np.concatenate([_widen(old.day_bits[old_rows], number_words), fresh.day_bits])[order],
+                animal_codes=np.concatenate([old.animal_codes[old_rows], fresh.animal_codes])[order],
+            )
+            self._versions = {pid: current[pid] for pid in kept}
+            self._versions.update({p.person_id: p.updated_at for p in encoded})
+            self._signature = signature
+
+        removed = len(old.ids) - len(kept)
+        logger.info(
+            f"Similarity index refreshed: {len(encoded)} encoded, {removed} removed/replaced, "
+            f"{self.size} total"
+        )
+        return True
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _encode_user(self, chart_data: dict) -> Dict[str, Any]:
+        """Encode a user chart into codes comparable with the index arrays."""
+        from services.similarity_service import extract_top_aspects_from_chart, normalize_master_number
+
+        user_signs = np.full((len(SYSTEMS), len(self.planets)), SIGN_MISSING, dtype=np.int16)
+        for s_idx, system in enumerate(SYSTEMS):
+            positions = {p['name']: p for p in chart_data.get(f"{system}_major_positions", [])}
+            for p_idx, planet_name in enumerate(self.planets):
+                if planet_name in positions:
+                    sign = _extract_sign(positions[planet_name].get('position'))
+                    user_signs[s_idx, p_idx] = self._sign_code(sign, grow=False)
+
+        top_aspects = extract_top_aspects_from_chart(chart_data, top_n=3)
+        aspect_codes = [
+            [self._aspects.get(_aspect_key(a)) for a in top_aspects.get(system, [])]
+            for system in SYSTEMS
+        ]
+
+        raw_numerology = chart_data.get('numerology') or chart_data.get('numerology_analysis') or {}
+        if isinstance(raw_numerology, str):
+            try:
+                raw_numerology = json.loads(raw_numerology)
+            except Exception:
+                raw_numerology = {}
+        if not isinstance(raw_numerology, dict):
+            raw_numerology = {}
+        life_path = raw_numerology.get('life_path_number')
+        day = raw_numerology.get('day_number')
+
+        raw_chinese = chart_data.get('chinese_zodiac', {})
+        animal = None
+        if isinstance(raw_chinese, str):
+            parts = raw_chinese.strip().split()
+            animal = parts[-1] if parts else None
+        elif isinstance(raw_chinese, dict):
+            animal = raw_chinese.get('animal')
+
+        def number_codes(value):
+            codes = [self._numbers.get(t) for t in normalize_master_number(value)]
+            return [c for c in codes if c is not None]
+
+        return {
+            "signs": user_signs,
+            "aspect_codes": aspect_codes,
+            "life_path": bool(life_path),
+            "life_path_codes": number_codes(life_path) if life_path else [],
+            "day": bool(day),
+            "day_codes": number_codes(day) if day else [],
+            "animal": bool(animal),
+            "animal_code": self._animals.get(animal.lower()) if animal else None,
+        }
+
+    def score_chart(self, chart_data: dict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a user chart against every indexed famous person.
+
+        Returns:
+            (ids, scores) arrays aligned by row; scores are raw synthesis scores
+        """
+        arrays = self._arrays
+        user = self._encode_user(chart_data)
+        n = arrays.ids.shape[0]
+
+        # Planetary placements: (N, systems, planets) broadcast against the user row
+        user_signs = user["signs"]
+        present = (arrays.signs != SIGN_MISSING) & (user_signs != SIGN_MISSING)[None]
+        matched = present & (arrays.signs == user_signs[None]) & (user_signs >= 0)[None]
+        max_score = (present * self.weights).sum(axis=(1, 2))
+        score = (matched * self.weights).sum(axis=(1, 2))
+
+        # Top aspects: 15 points if 2 of the user's top 3 match in either system
+        aspect_award = np.zeros(n, dtype=bool)
+        for s_idx in range(len(SYSTEMS)):
+            hits = np.zeros(n, dtype=np.int16)
+            for code in user["aspect_codes"][s_idx]:
+                if code is not None:
+                    hits += _test_bit(arrays.aspect_bits[:, s_idx], code)
+            aspect_award |= hits >= 2
+        score += 15.0 * aspect_award
+        max_score += 15.0 * aspect_award
+
+        # Numerology: 10 points each for life path and day number
+        for flag, codes, fp_present, fp_bits in (
+            ("life_path", "life_path_codes", arrays.life_path_present, arrays.life_path_bits),
+            ("day", "day_codes", arrays.day_present, arrays.day_bits),
+        ):
+            if not user[flag]:
+                continue
+            user_bits = _bitset(user[codes], fp_bits.shape[-1])
+            overlap = (fp_bits & user_bits[None]).any(axis=1)
+            max_score += 10.0 * fp_present
+            score += 10.0 * (fp_present & overlap)
+
+        # Chinese zodiac animal: 10 points
+        if user["animal"]:
+            fp_present = arrays.animal_codes != SIGN_MISSING
+            max_score += 10.0 * fp_present
+            if user["animal_code"] is not None:
+                score += 10.0 * (arrays.animal_codes == user["animal_code"])
+
+        scores = np.where(arrays.valid & (max_score > 0), np.minimum(score, max_score), 0.0)
+        return arrays.ids, scores
+
+    def _block_matrices(self) -> Dict[str, np.ndarray]:
+        """One-hot corpus matrices for score_block, built once per index snapshot."""
+        arrays = self._arrays
+        if self._block is not None and self._block[0] is arrays:
+            return self._block[1]
+
+        n, planets = arrays.ids.shape[0], len(self.planets)
+        signs = arrays.signs
+        # Weighted one-hot of each (system, planet, sign); presence weights per (system, planet)
+        sign_onehot = np.zeros((n, len(SYSTEMS), planets, max(1, len(self._signs))), dtype=np.float32)
+        rows, systems, columns = np.nonzero(signs >= 0)
+        sign_onehot[rows, systems, columns, signs[rows, systems, columns]] = self.weights[columns]
+
+        def unpack(bits: np.ndarray) -> np.ndarray:
+            # Little-endian bytes put code c at position c
+            return np.unpackbits(bits.astype("<u8").view(np.uint8), axis=-1, bitorder="little").astype(np.float32)
+
+        matrices = {
+            "presence": ((signs != SIGN_MISSING) * self.weights).reshape(n, -1).astype(np.float32),
+            "signs": sign_onehot.reshape(n, -1),
+            "aspects": unpack(arrays.aspect_bits),
+            "life_path": unpack(arrays.life_path_bits),
+            "day": unpack(arrays.day_bits),
+        }
+        self._block = (arrays, matrices)
+        return matrices
+
+    def score_block(self, charts: List[dict], rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a block of charts against the index at once.
+
+        Same scores as score_chart, computed as matrix products over one-hot
+        encodings, which is much faster per chart when scoring many charts
+        (e.g. the famous people corpus against itself).
+
+        Args:
+            charts: User chart data dicts
+            rows: Index rows to score against (default: all)
+
+        Returns:
+            (ids, scores) with scores shaped (len(charts), len(ids))
+        """
+        arrays = self._arrays
+        matrices = self._block_matrices()
+        if rows is None:
+            rows = np.arange(arrays.ids.shape[0])
+        users = [self._encode_user(chart_data) for chart_data in charts]
+        b, n = len(users), rows.shape[0]
+        vocab = matrices["signs"].shape[1] // (len(SYSTEMS) * len(self.planets))
+
+        # Planetary placements: presence and matched weights as matrix products
+        user_signs = (np.stack([u["signs"] for u in users]) if users
+                      else np.zeros((0, len(SYSTEMS), len(self.planets)), dtype=np.int16))
+        user_onehot = np.zeros((b, len(SYSTEMS), len(self.planets), vocab), dtype=np.float32)
+        users_idx, systems, columns = np.nonzero((user_signs >= 0) & (user_signs < vocab))
+        user_onehot[users_idx, systems, columns, user_signs[users_idx, systems, columns]] = 1.0
+        max_score = ((user_signs != SIGN_MISSING).reshape(b, -1).astype(np.float32) @ matrices["presence"][rows].T).astype(np.float64)
+        score = (user_onehot.reshape(b, -1) @ matrices["signs"][rows].T).astype(np.float64)
+
+        # Top aspects: 15 points if 2 of the user's top 3 match in either system
+        aspect_award = np.zeros((b, n), dtype=bool)
+        aspect_vocab = matrices["aspects"].shape[-1]
+        for s_idx in range(len(SYSTEMS)):
+            counts = np.zeros((b, aspect_vocab), dtype=np.float32)
+            for u_idx, user in enumerate(users):
+                for code in user["aspect_codes"][s_idx]:
+                    if code is not None and code < aspect_vocab:
+                        counts[u_idx, code] += 1
+            aspect_award |= (counts @ matrices["aspects"][rows, s_idx].T) >= 2
+        score += 15.0 * aspect_award
+        max_score += 15.0 * aspect_award
+
+        # Numerology: 10 points each for life path and day number
+        for flag, codes, fp_present, key in (
+            ("life_path", "life_path_codes", arrays.life_path_present[rows], "life_path"),
+            ("day", "day_codes", arrays.day_present[rows], "day"),
+        ):
+            number_vocab = matrices[key].shape[-1]
+            wanted = np.array([user[flag] for user in users], dtype=bool)
+            tokens = np.zeros((b, number_vocab), dtype=np.float32)
+            for u_idx, user in enumerate(users):
+                tokens[u_idx, [c for c in user[codes] if c < number_vocab]] = 1.0
+            overlap = (tokens @ matrices[key][rows].T) > 0
+            max_score += 10.0 * (wanted[:, None] & fp_present[None])
+            score += 10.0 * (wanted[:, None] & fp_present[None] & overlap)
+
+        # Chinese zodiac animal: 10 points
+        animal_codes = arrays.animal_codes[rows]
+        wanted = np.array([user["animal"] for user in users], dtype=bool)
+        user_animals = np.array([
+            user["animal_code"] if user["animal_code"] is not None else SIGN_UNMATCHABLE for user in users
+        ], dtype=np.int16)
+        max_score += 10.0 * (wanted[:, None] & (animal_codes != SIGN_MISSING)[None])
+        score += 10.0 * (wanted[:, None] & (animal_codes[None] == user_animals[:, None]))
+
+        valid = arrays.valid[rows][None] & (max_score > 0)
+        return arrays.ids[rows], np.where(valid, np.minimum(score, max_score), 0.0)
+
+    def top_k(self, chart_data: dict, k: Optional[int] = None, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """
+        Rank famous people for a user chart.
+
+        Args:
+            chart_data: User chart data (from /calculate_chart)
+            k: Maximum number of results (None for all above min_score)
+            min_score: Minimum raw score to include
+
+        Returns:
+            List of (famous_person_id, score), highest score first; ties keep id order
+        """
+        ids, scores = self.score_chart(chart_data)
+        return select_top_k(ids, scores, k, min_score)
+
+
+def select_top_k(ids: np.ndarray, scores: np.ndarray, k: Optional[int], min_score: float) -> List[Tuple[int, float]]:
+    """
+    Select the k best (id, score) pairs at or above min_score.
+
+    Uses argpartition so selection is O(N) regardless of k; ties at the
+    k-th score are broken by row order, matching a stable full sort.
+    """
+    rows = np.flatnonzero(scores >= min_score)
+    if k is not None and 0 < k < rows.shape[0]:
+        candidate_scores = scores[rows]
+        kth = candidate_scores[np.argpartition(-candidate_scores, k - 1)[k - 1]]
+        above = rows[candidate_scores > kth]
+        ties = rows[candidate_scores == kth][:k - above.shape[0]]
+        rows = np.concatenate([above, ties])
+    elif k is not None and k <= 0:
+        rows = rows[:0]
+    order = np.lexsort((rows, -scores[rows]))
+    rows = rows[order]
+    return [(int(ids[r]), float(scores[r])) for r in rows]
+
+
+_index: Optional[FamousPeopleIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_famous_people_index(db: Session) -> FamousPeopleIndex:
+    """
+    Get the process-wide famous people index, refreshed against the database.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Up-to-date FamousPeopleIndex
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FamousPeopleIndex()
+    _index.refresh(db)
+    return _index
+
+
+def reset_famous_people_index():
+    """Drop the process-wide index (used by tests and maintenance scripts)."""
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,286 @@
+"""
+Famous People Nearest Neighbors
+
+Precomputed "celebrity twins": for every famous person, the famous people
+whose charts score highest against theirs, with their chart_data_json taken
+as the user chart (the same scores calculate_comprehensive_similarity_score
+gives, at or above MIN_MATCH_SCORE).
+
+The graph is built offline (scripts/maintenance/build_famous_people_neighbors.py).
+Source people are scored in blocks with FamousPeopleIndex.score_block, the
+blocks spread over worker processes, and each person's best matches are
+stored as an adjacency table, famous_person_neighbors (person_id, rank,
+neighbor_id, score), that the API reads with one indexed query.
+
+Refreshes are incremental. famous_person_neighbor_sources records the
+FamousPerson.updated_at each list was built from, so a refresh only:
+
+- recomputes the lists of people that are new or changed, and of people
+  whose list contains a changed or removed person
+- scores everyone else against the changed people only, merging the results
+  into their stored list (an unchanged list is the top k of the unchanged
+  people, so the merge is exact)
+- drops the lists of removed people
+"""
+
+import json
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from database import FamousPerson, FamousPersonNeighbor, FamousPersonNeighborSource
+from services.similarity_index import FamousPeopleIndex, select_top_k
+from services.similarity_service import MIN_MATCH_SCORE
+
+logger = logging.getLogger(__name__)
+
+# Neighbors stored per famous person (the most the API can return)
+NEIGHBORS_PER_PERSON = 20
+
+# Source charts scored per block (one score_block call in one worker)
+DEFAULT_BLOCK_SIZE = 256
+
+# Rows per IN (...) query
+QUERY_CHUNK_SIZE = 500
+
+Neighbors = List[Tuple[int, float]]
+
+# Index the worker process scores against, set by _init_worker
+_worker_index: Optional[FamousPeopleIndex] = None
+
+
+def _init_worker(index: FamousPeopleIndex):
+    global _worker_index
+    _worker_index = index
+
+
+def _score_sources(
+    sources: List[Tuple[int, Optional[str]]],
+    columns: Optional[List[int]],
+    k: int,
+    min_score: float
+) -> List[Tuple[int, Neighbors]]:
+    """
+    Best matches of a block of famous people (runs in a worker process).
+
+    Args:
+        sources: (person_id, chart_data_json) of the people whose lists are built
+        columns: Famous person ids to score against (default: everyone indexed)
+        k: Neighbors kept per person
+        min_score: Lowest score kept
+
+    Returns:
+        (person_id, [(neighbor_id, score), ...]) per source, best first
+    """
+    index = _worker_index
+    people, charts = [], []
+    results: Dict[int, Neighbors] = {}
+    for person_id, raw in sources:
+        try:
+            chart_data = json.loads(raw) if raw else None
+        except (TypeError, ValueError):
+            chart_data = None
+        results[person_id] = []
+        if isinstance(chart_data, dict):
+            people.append(person_id)
+            charts.append(chart_data)
+
+    rows = None if columns is None else np.searchsorted(index.ids, np.array(columns, dtype=np.int64))
+    if charts:
+        ids, scores = index.score_block(charts, rows)
+        for person_id, row in zip(people, scores):
+            row[ids == person_id] = -1.0  # Nobody is their own twin
+            results[person_id] = select_top_k(ids, row, k, min_score)
+    return [(person_id, results[person_id]) for person_id, _ in sources]
+
+
+def _chunks(values: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _merge(old: Neighbors, new: Neighbors, k: int) -> Neighbors:
+    """Top k of two neighbor lists, ties by ascending id as select_top_k orders them."""
+    merged = dict(old)
+    merged.update(new)
+    return sorted(merged.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def _load_lists(db: Session, person_ids: Sequence[int]) -> Dict[int, Neighbors]:
+    lists: Dict[int, Neighbors] = {person_id: [] for person_id in person_ids}
+    for chunk in _chunks(list(person_ids), QUERY_CHUNK_SIZE):
+        rows = (db.query(FamousPersonNeighbor.person_id, FamousPersonNeighbor.neighbor_id, FamousPersonNeighbor.score)
+                .filter(FamousPersonNeighbor.person_id.in_(chunk))
+                .order_by(FamousPersonNeighbor.person_id, FamousPersonNeighbor.rank))
+        for person_id, neighbor_id, score in rows:
+            lists[person_id].append((neighbor_id, score))
+    return lists
+
+
+def _store_lists(db: Session, lists: Dict[int, Neighbors]):
+    """Replace the stored lists of the given people."""
+    db.execute(delete(FamousPersonNeighbor).where(FamousPersonNeighbor.person_id.in_(list(lists))))
+    rows = [
+        {"person_id": person_id, "rank": rank, "neighbor_id": neighbor_id, "score": score}
+        for person_id, neighbors in lists.items()
+        for rank, (neighbor_id, score) in enumerate(neighbors)
+    ]
+    if rows:
+        db.execute(insert(FamousPersonNeighbor), rows)
+
+
+def _load_sources(db: Session, person_ids: Sequence[int]) -> List[Tuple[int, Optional[str]]]:
+    rows = dict(db.query(FamousPerson.id, FamousPerson.chart_data_json).filter(FamousPerson.id.in_(person_ids)))
+    return [(person_id, rows.get(person_id)) for person_id in person_ids]
+
+
+def _run_blocks(db: Session, index: FamousPeopleIndex, jobs: List[Tuple[List[int], Optional[List[int]]]],
+                k: int, min_score: float, processes: Optional[int]) -> Iterator[Tuple[Optional[List[int]], List[Tuple[int, Neighbors]]]]:
+    """
+    Score (source ids, columns) jobs, in worker processes when processes > 1.
+
+    Yields (columns, results) as blocks finish. Source charts are read here,
+    at most two blocks per worker ahead, so memory stays bounded.
+    """
+    if not processes or processes <= 1:
+        _init_worker(index)
+        for source_ids, columns in jobs:
+            yield columns, _score_sources(_load_sources(db, source_ids), columns, k, min_score)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(index,)) as executor:
+        pending = {}
+        remaining = iter(jobs)
+        while True:
+            for source_ids, columns in remaining:
+                future = executor.submit(_score_sources, _load_sources(db, source_ids), columns, k, min_score)
+                pending[future] = columns
+                if len(pending) >= 2 * processes:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+def refresh_famous_neighbors(
+    db: Session,
+    k: int = NEIGHBORS_PER_PERSON,
+    processes: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    full: bool = False,
+    min_score: float = MIN_MATCH_SCORE
+) -> Dict[str, int]:
+    """
+    Bring the famous people neighbor graph up to date.
+
+    Each block is committed as soon as it is scored; an interrupted refresh
+    is finished by the next one.
+
+    Args:
+        db: Database session
+        k: Neighbors kept per famous person
+        processes: Worker processes; None or 1 scores in-process
+        block_size: Source charts per score_block call
+        full: Recompute every list instead of only what changed
+        min_score: Lowest score kept
+
+    Returns:
+        Counts of people indexed, lists recomputed, lists merged and lists removed
+    """
+    index = FamousPeopleIndex()
+    index.refresh(db)
+    current = index.versions
+
+    built = dict(db.query(FamousPersonNeighborSource.person_id, FamousPersonNeighborSource.updated_at))
+    listed = {person_id for (person_id,) in db.query(FamousPersonNeighbor.person_id).distinct()}
+    removed = sorted((set(built) | listed) - set(current))
+    if full:
+        changed = set(current)
+    else:
+        changed = {person_id for person_id, updated_at in current.items()
+                   if person_id not in built or built[person_id] != updated_at}
+
+    # Lists holding a changed or removed person must be rebuilt from scratch
+    affected = set()
+    for chunk in _chunks(sorted(changed | set(removed)), QUERY_CHUNK_SIZE):
+        affected.update(person_id for (person_id,) in db.query(FamousPersonNeighbor.person_id)
+                        .filter(FamousPersonNeighbor.neighbor_id.in_(chunk)).distinct())
+    recompute = sorted(changed | (affected & set(current)))
+    columns = sorted(changed)
+    merge = sorted(set(current) - set(recompute)) if columns else []
+
+    # Merges first, and versions and removals recorded last: an interrupted
+    # refresh leaves the changes pending, so the next one redoes them
+    jobs = [(list(chunk), columns) for chunk in _chunks(merge, block_size)]
+    jobs += [(list(chunk), None) for chunk in _chunks(recompute, block_size)]
+    merged = 0
+    for block_columns, results in _run_blocks(db, index, jobs, k, min_score, processes):
+        if block_columns is None:
+            _store_lists(db, dict(results))
+        else:
+            found = {person_id: neighbors for person_id, neighbors in results if neighbors}
+            old = _load_lists(db, list(found))
+            updated = {person_id: _merge(old[person_id], neighbors, k) for person_id, neighbors in found.items()}
+            updated = {person_id: neighbors for person_id, neighbors in updated.items() if neighbors != old[person_id]}
+            if updated:
+                _store_lists(db, updated)
+                merged += len(updated)
+        db.commit()
+
+    for chunk in _chunks(recompute, QUERY_CHUNK_SIZE):
+        db.execute(delete(FamousPersonNeighborSource).where(FamousPersonNeighborSource.person_id.in_(chunk)))
+        db.execute(insert(FamousPersonNeighborSource),
+                   [{"person_id": person_id, "updated_at": current[person_id]} for person_id in chunk])
+    for chunk in _chunks(removed, QUERY_CHUNK_SIZE):
+        db.execute(delete(FamousPersonNeighbor).where(FamousPersonNeighbor.person_id.in_(chunk)))
+        db.execute(delete(FamousPersonNeighborSource).where(FamousPersonNeighborSource.person_id.in_(chunk)))
+    db.commit()
+
+    stats = {"people": len(current), "recomputed": len(recompute), "merged": merged, "removed": len(removed)}
+    logger.info(f"Famous people neighbors refreshed: {stats}")
+    return stats
+
+
+def get_famous_neighbors(db: Session, person_id: int, limit: int = NEIGHBORS_PER_PERSON) -> List[Dict[str, Any]]:
+    """
+    Stored nearest neighbors of a famous person, best first.
+
+    One query: the (person_id, rank) primary key range joined to famous_people.
+
+    Args:
+        db: Database session
+        person_id: Famous person id
+        limit: Most neighbors returned
+
+    Returns:
+        List of neighbor dicts shaped like the find-similar-famous-people matches, plus id
+    """
+    rows = (
+        db.query(
+            FamousPersonNeighbor.neighbor_id, FamousPersonNeighbor.score,
+            FamousPerson.name, FamousPerson.wikipedia_url, FamousPerson.occupation,
+            FamousPerson.birth_year, FamousPerson.birth_month, FamousPerson.birth_day, FamousPerson.birth_location,
+        )
+        .join(FamousPerson, FamousPerson.id == FamousPersonNeighbor.neighbor_id)
+        .filter(FamousPersonNeighbor.person_id == person_id, FamousPersonNeighbor.rank < limit)
+        .order_by(FamousPersonNeighbor.rank)
+        .all()
+    )
+    return [
+        {
+            "id": row.neighbor_id,
+            "name": row.name,
+            "wikipedia_url": row.wikipedia_url,
+            "occupation": row.occupation,
+            "birth_date": f"{row.birth_month}/{row.birth_day}/{row.birth_year}",
+            "birth_location": row.birth_location,
+            "similarity_score": round(row.score, 1),
+        }
+        for row in rows
+    ]
@@ -5,15 +5,34 @@ This module contains all the business logic for calculating similarity scores
 and matching users with famous people based on astrological data.
 """
 
+import heapq
 import json
 import logging
 from typing import Dict, List, Tuple, Any, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
 from database import FamousPerson
 
 logger = logging.getLogger(__name__)
 
+# Planets compared in the similarity score, weighted by importance.
+# Each weight is awarded once per zodiac system (sidereal + tropical).
+PLANETS_TO_COMPARE: List[Tuple[str, float]] = [
+    ('Sun', 5.0),      # 5 per system → 10 total (sidereal + tropical)
+    ('Moon', 5.0),     # 5 per system → 10 total
+    ('Mercury', 3.0),  # 3 per system → 6 total
+    ('Venus', 3.0),    # 3 per system → 6 total
+    ('Mars', 2.0),     # 2 per system → 4 total
+    ('Jupiter', 2.0),  # 2 per system → 4 total
+    ('Saturn', 2.0),   # 2 per system → 4 total
+    ('Uranus', 2.0),   # 2 per system → 4 total
+    ('Neptune', 2.0),  # 2 per system → 4 total
+    ('Pluto', 2.0),    # 2 per system → 4 total
+]
+
+# Minimum synthesis score for a famous person to be returned as a match
+MIN_MATCH_SCORE = 20.0
+
 
 def extract_stelliums(chart_data: dict) -> dict:
     """
@@ -348,21 +367,7 @@ def calculate_comprehensive_similarity_score(user_chart_data: dict, famous_perso
         # PLANETARY PLACEMENTS (Sidereal & Tropical) - All planets
         # ========================================================================
         
-        # All planets to compare (weighted by importance)
-        planets_to_compare = [
-            ('Sun', 5.0),      # 5 per system → 10 total (sidereal + tropical)
-            ('Moon', 5.0),     # 5 per system → 10 total
-            ('Mercury', 3.0),  # 3 per system → 6 total
-            ('Venus', 3.0),    # 3 per system → 6 total
-            ('Mars', 2.0),     # 2 per system → 4 total
-            ('Jupiter', 2.0),  # 2 per system → 4 total
-            ('Saturn', 2.0),   # 2 per system → 4 total
-            ('Uranus', 2.0),   # 2 per system → 4 total
-            ('Neptune', 2.0),  # 2 per system → 4 total
-            ('Pluto', 2.0),    # 2 per system → 4 total
-        ]
-        
-        for planet_name, weight in planets_to_compare:
+        for planet_name, weight in PLANETS_TO_COMPARE:
             # Sidereal comparison
             user_planet_s = None
             fp_planet_s = None
@@ -743,6 +748,181 @@ def extract_all_matching_factors(user_chart_data: dict, fp: FamousPerson, fp_pla
     return matches_list
 
 
+def build_match_details(
+    chart_data: dict,
+    fp: FamousPerson,
+    score: float,
+    numerology_data: dict,
+    chinese_zodiac_data: Any
+) -> dict:
+    """
+    Build match reasons, match type and matching factors for one scored famous person.
+
+    Returns:
+        Dict with famous_person, similarity_score, match_reasons, match_type, matching_factors
+    """
+    strict_match, strict_reasons = check_strict_matches(chart_data, fp, numerology_data, chinese_zodiac_data)
+    aspect_match, aspect_reasons = check_aspect_matches(chart_data, fp)
+    stellium_match, stellium_reasons = check_stellium_matches(chart_data, fp)
+
+    all_reasons = strict_reasons + aspect_reasons + stellium_reasons
+
+    # Determine match type
+    match_type = "strict" if strict_match else ("aspect" if aspect_match else ("stellium" if stellium_match else "general"))
+
+    # Get planetary placements and chart data
+    fp_planetary = {}
+    if fp.planetary_placements_json:
+        try:
+            fp_planetary = json.loads(fp.planetary_placements_json)
+        except:
+            pass
+
+    fp_chart = {}
+    if fp.chart_data_json:
+        try:
+            fp_chart = json.loads(fp.chart_data_json)
+        except:
+            pass
+
+    matching_factors = extract_all_matching_factors(chart_data, fp, fp_planetary, fp_chart)
+
+    return {
+        "famous_person": fp,
+        "similarity_score": score,
+        "match_reasons": all_reasons,
+        "match_type": match_type,
+        "matching_factors": matching_factors
+    }
+
+
+def load_famous_people(db: Session, person_ids: List[int], chunk_size: int = 500) -> Dict[int, FamousPerson]:
+    """Load FamousPerson rows by id in chunks (keeps IN lists under driver limits)."""
+    people = {}
+    for start in range(0, len(person_ids), chunk_size):
+        chunk = person_ids[start:start + chunk_size]
+        for fp in db.query(FamousPerson).filter(FamousPerson.id.in_(chunk)).all():
+            people[fp.id] = fp
+    return people
+
+
+def search_top_matches(
+    chart_data: dict,
+    db: Session,
+    candidates: List[Tuple[int, float]],
+    min_score: float = MIN_MATCH_SCORE,
+    limit: Optional[int] = None
+) -> Tuple[List[Tuple[int, float]], Dict[int, FamousPerson]]:
+    """
+    Exact top-k search over prefiltered candidates by branch and bound.
+
+    Candidates come highest score bound first (see prefilter_candidates) and
+    are loaded and scored in small batches. Once limit matches are held, the
+    k-th best score becomes the bar: the search stops at the first candidate
+    whose bound cannot reach it (or min_score), so rows loaded and scored
+    scale with limit rather than with the number of matches.
+
+    Args:
+        chart_data: User chart data
+        db: Database session
+        candidates: (famous_person_id, score upper bound), bound descending
+        min_score: Minimum raw synthesis score
+        limit: Number of matches to keep (None for all at or above min_score)
+
+    Returns:
+        ((famous_person_id, score) sorted by score descending then id, loaded people by id)
+    """
+    batch_size = min(max(2 * limit, 16), 500) if limit else 500
+    best: List[Tuple[float, int]] = []  # Min-heap of (score, -id): the worst kept match on top
+    people: Dict[int, FamousPerson] = {}
+    bar = min_score
+    scored = 0
+
+    for start in range(0, len(candidates), batch_size):
+        # Bounds are descending, so an empty batch ends the search
+        batch = [(person_id, bound) for person_id, bound in candidates[start:start + batch_size] if bound >= bar]
+        if not batch:
+            break
+        loaded = load_famous_people(db, [person_id for person_id, _ in batch])
+        for person_id, bound in batch:
+            if bound < bar:
+                break
+            fp = loaded.get(person_id)
+            if fp is None:
+                continue
+            score = calculate_comprehensive_similarity_score(chart_data, fp)
+            scored += 1
+            if score < min_score:
+                continue
+            people[person_id] = fp
+            heapq.heappush(best, (score, -person_id))
+            if limit and len(best) > limit:
+                people.pop(-heapq.heappop(best)[1], None)
+            if limit and len(best) == limit:
+                # Equal bounds still get scored: ties go to the lower id
+                bar = max(min_score, best[0][0])
+
+    ranked = [(-neg_id, score) for score, neg_id in sorted(best, key=lambda item: (-item[0], -item[1]))]
+    logger.info(f"Scored {scored} of {len(candidates)} prefiltered candidates, returning {len(ranked)}")
+    return ranked, people
+
+
+def rank_famous_people(
+    chart_data: dict,
+    db: Session,
+    numerology_data: dict,
+    chinese_zodiac_data: Any,
+    min_score: float = MIN_MATCH_SCORE,
+    limit: Optional[int] = None
+) -> Tuple[List[dict], int]:
+    """
+    Score famous people against a chart and build details for the best matches.
+
+    Candidates are prefiltered in SQL from the famous_person_placements and
+    famous_person_aspects tables: only people whose shared placements,
+    aspects, numerology and Chinese zodiac can reach min_score are
+    considered, and search_top_matches scores them best bound first until
+    the top limit are settled. Until those tables are populated, everyone is
+    scored with the FamousPeopleIndex. Match details are only built for the
+    returned matches.
+
+    Returns:
+        (matches sorted by score descending, number of famous people compared)
+    """
+    from services.famous_people_placements import prefilter_candidates
+
+    candidates = prefilter_candidates(db, chart_data, min_score)
+    if candidates is None:
+        ranked, total_compared = _rank_with_index(chart_data, db, min_score, limit)
+        people = load_famous_people(db, [person_id for person_id, _ in ranked])
+    else:
+        total_compared = db.query(func.count(FamousPerson.id)).filter(FamousPerson.chart_data_json.isnot(None)).scalar()
+        ranked, people = search_top_matches(chart_data, db, candidates, min_score, limit)
+        logger.info(f"Prefiltered {len(candidates)} of {total_compared} famous people with score >= {min_score:g}")
+
+    matches = [
+        build_match_details(chart_data, people[person_id], score, numerology_data, chinese_zodiac_data)
+        for person_id, score in ranked
+        if person_id in people
+    ]
+    return matches, total_compared
+
+
+def _rank_with_index(
+    chart_data: dict, db: Session, min_score: float, limit: Optional[int] = None
+) -> Tuple[List[Tuple[int, float]], int]:
+    """Score everyone with the in-memory FamousPeopleIndex (placement tables not populated yet)."""
+    from services.similarity_index import get_famous_people_index, select_top_k
+
+    index = get_famous_people_index(db)
+    ids, scores = index.score_chart(chart_data)
+    logger.info(f"Scored {len(ids)} famous people with chart data")
+
+    ranked = select_top_k(ids, scores, limit, min_score)
+    logger.info(f"Found {int((scores > 0).sum())} matches with score > 0, returning {len(ranked)} with score >= {min_score:g}")
+    return ranked, len(ids)
+
+
 async def find_similar_famous_people_internal(
     chart_data: dict,
     limit: int = 10,
@@ -752,6 +932,20 @@ async def find_similar_famous_people_internal(
     Internal function to find similar famous people (for use in reading generation).
     Returns the same format as the endpoint but can be called internally.
     """
+    return match_famous_people(chart_data, limit=limit, db=db)
+
+
+def match_famous_people(
+    chart_data: dict,
+    limit: int = 10,
+    db: Optional[Session] = None
+) -> dict:
+    """
+    Synchronous body of find_similar_famous_people_internal.
+
+    Call it from a worker thread (asyncio.to_thread) to keep the scoring and
+    its queries off the event loop.
+    """
     if not db:
         logger.warning("No database session provided to find_similar_famous_people_internal")
         return {"matches": [], "total_compared": 0, "matches_found": 0}
@@ -759,24 +953,6 @@ async def find_similar_famous_people_internal(
     logger.info("Starting find_similar_famous_people_internal - searching for famous people matches")
     
     try:
-        # Extract user's signs (same as endpoint)
-        sidereal_positions = chart_data.get('sidereal_major_positions', [])
-        tropical_positions = chart_data.get('tropical_major_positions', [])
-        
-        s_positions = {p['name']: p for p in sidereal_positions if isinstance(p, dict) and 'name' in p}
-        t_positions = {p['name']: p for p in tropical_positions if isinstance(p, dict) and 'name' in p}
-        
-        def extract_sign(position_str):
-            if not position_str:
-                return None
-            parts = position_str.split()
-            return parts[-1] if parts else None
-        
-        user_sun_s = extract_sign(s_positions.get('Sun', {}).get('position')) if 'Sun' in s_positions and s_positions['Sun'].get('position') else None
-        user_sun_t = extract_sign(t_positions.get('Sun', {}).get('position')) if 'Sun' in t_positions and t_positions['Sun'].get('position') else None
-        user_moon_s = extract_sign(s_positions.get('Moon', {}).get('position')) if 'Moon' in s_positions and s_positions['Moon'].get('position') else None
-        user_moon_t = extract_sign(t_positions.get('Moon', {}).get('position')) if 'Moon' in t_positions and t_positions['Moon'].get('position') else None
-        
         # Get numerology and Chinese zodiac from chart data
         # Numerology may be under "numerology" or "numerology_analysis"
         numerology_data = (
@@ -792,136 +968,17 @@ async def find_similar_famous_people_internal(
         if not isinstance(numerology_data, dict):
             numerology_data = {}
         
-        # Chinese zodiac - extract only animal (last word), not element
         chinese_zodiac_data = chart_data.get('chinese_zodiac', {})
-        if isinstance(chinese_zodiac_data, str):
-            # Extract animal (last word) from strings like "Earth Tiger" -> "Tiger"
-            parts = chinese_zodiac_data.strip().split()
-            if len(parts) >= 1:
-                user_chinese_animal = parts[-1]  # Take last word (the animal)
-            else:
-                user_chinese_animal = None
-        elif isinstance(chinese_zodiac_data, dict):
-            user_chinese_animal = chinese_zodiac_data.get('animal')
-        else:
-            user_chinese_animal = None
-        
-        user_life_path = numerology_data.get('life_path_number')
-        user_day = numerology_data.get('day_number')
-        
-        # Build query (same logic as endpoint)
-        query = db.query(FamousPerson)
-        conditions = []
         
-        if user_sun_s and user_moon_s:
-            conditions.append(
-                and_(
-                    FamousPerson.sun_sign_sidereal == user_sun_s,
-                    FamousPerson.moon_sign_sidereal == user_moon_s
-                )
-            )
-        
-        if user_sun_t and user_moon_t:
-            conditions.append(
-                and_(
-                    FamousPerson.sun_sign_tropical == user_sun_t,
-                    FamousPerson.moon_sign_tropical == user_moon_t
-                )
-            )
-        
-        if user_day and user_life_path:
-            user_day_norm = normalize_master_number(user_day)
-            user_lp_norm = normalize_master_number(user_life_path)
-            lp_conditions = [FamousPerson.life_path_number == lp for lp in user_lp_norm]
-            day_conditions = [FamousPerson.day_number == day for day in user_day_norm]
-            if lp_conditions and day_conditions:
-                conditions.append(and_(or_(*lp_conditions), or_(*day_conditions)))
-        
-        if user_chinese_animal:
-            chinese_conditions = [FamousPerson.chinese_zodiac_animal.ilike(f"%{user_chinese_animal}%")]
-            numer_conditions = []
-            if user_day:
-                user_day_norm = normalize_master_number(user_day)
-                numer_conditions.extend([FamousPerson.day_number == day for day in user_day_norm])
-            if user_life_path:
-                user_lp_norm = normalize_master_number(user_life_path)
-                numer_conditions.extend([FamousPerson.life_path_number == lp for lp in user_lp_norm])
-            if numer_conditions:
-                conditions.append(and_(chinese_conditions[0], or_(*numer_conditions)))
-        
-        if not conditions:
-            conditions.append(FamousPerson.chart_data_json.isnot(None))
-        else:
-            conditions.extend([
-                FamousPerson.top_aspects_json.isnot(None),
-                FamousPerson.chart_data_json.isnot(None)
-            ])
-        
-        if conditions:
-            query = query.filter(or_(*conditions))
-        
-        # Get ALL famous people with chart data (search entire database)
-        all_famous_people = db.query(FamousPerson).filter(
-            FamousPerson.chart_data_json.isnot(None)
-        ).all()
-        
-        logger.info(f"Found {len(all_famous_people)} famous people with chart data to compare")
+        # Prefilter candidates in SQL, then score them
+        top_matches, total_compared = rank_famous_people(
+            chart_data, db, numerology_data, chinese_zodiac_data, limit=limit
+        )
         
-        if not all_famous_people:
+        if not total_compared:
             logger.warning("No famous people found in database with chart data")
             return {"matches": [], "total_compared": 0, "matches_found": 0}
         
-        # Calculate comprehensive scores for ALL famous people
-        matches = []
-        for fp in all_famous_people:
-            # Calculate comprehensive score for everyone
-            comprehensive_score = calculate_comprehensive_similarity_score(chart_data, fp)
-            
-            # Only include if score > 0 (has actual matches)
-            if comprehensive_score > 0.0:
-                strict_match, strict_reasons = check_strict_matches(chart_data, fp, numerology_data, chinese_zodiac_data)
-                aspect_match, aspect_reasons = check_aspect_matches(chart_data, fp)
-                stellium_match, stellium_reasons = check_stellium_matches(chart_data, fp)
-                
-                all_reasons = strict_reasons + aspect_reasons + stellium_reasons
-                
-                # Determine match type
-                match_type = "strict" if strict_match else ("aspect" if aspect_match else ("stellium" if stellium_match else "general"))
-                
-                # Get planetary placements and chart data
-                fp_planetary = {}
-                if fp.planetary_placements_json:
-                    try:
-                        fp_planetary = json.loads(fp.planetary_placements_json)
-                    except:
-                        pass
-                
-                fp_chart = {}
-                if fp.chart_data_json:
-                    try:
-                        fp_chart = json.loads(fp.chart_data_json)
-                    except:
-                        pass
-                
-                # Use the existing extract_all_matching_factors function
-                matching_factors = extract_all_matching_factors(chart_data, fp, fp_planetary, fp_chart)
-                
-                matches.append({
-                    "famous_person": fp,
-                    "similarity_score": comprehensive_score,
-                    "match_reasons": all_reasons,
-                    "match_type": match_type,
-                    "matching_factors": matching_factors
-                })
-        
-        # Sort by similarity score ONLY (highest first)
-        matches.sort(key=lambda m: m["similarity_score"], reverse=True)
-        
-        # Filter to only include matches with synthesis score >= 20
-        top_matches = [m for m in matches if m["similarity_score"] >= 20.0]
-        
-        logger.info(f"Found {len(matches)} matches with score > 0, returning {len(top_matches)} with score >= 20")
-        
         # Format response
         result = []
         for match in top_matches:
@@ -939,7 +996,7 @@ async def find_similar_famous_people_internal(
         
         return {
             "matches": result,
-            "total_compared": len(all_famous_people),
+            "total_compared": total_compared,
             "matches_found": len(result)
         }
     
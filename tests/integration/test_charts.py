@@ -7,6 +7,33 @@ Tests chart calculation and reading generation workflows.
 import pytest
 from fastapi import status
 
+from app.services.chart_service import CHART_FIELD_PROFILES
+from app.services.geocoding_service import (
+    GeocodeCache, GeocodingService, StubProvider, set_geocoding_service
+)
+
+CHART_REQUEST = {
+    "full_name": "Test User",
+    "year": 2000,
+    "month": 1,
+    "day": 1,
+    "hour": 12,
+    "minute": 0,
+    "location": "New York, NY, USA",
+    "unknown_time": False
+}
+
+
+@pytest.fixture
+def stub_geocoder():
+    """Offline geocoding for New York, NY, USA."""
+    set_geocoding_service(GeocodingService(
+        providers=[StubProvider({"New York, NY, USA": (40.7128, -74.0060, "America/New_York")})],
+        cache=GeocodeCache(":memory:")
+    ))
+    yield
+    set_geocoding_service(None)
+
 
 class TestChartEndpoints:
     """Test chart calculation endpoints."""
@@ -59,6 +86,44 @@ class TestChartEndpoints:
             status.HTTP_422_UNPROCESSABLE_ENTITY
         ]
     
+    def test_calculate_chart_field_selection(self, stub_geocoder, client, db_session, mock_env_vars):
+        """Test fields= returns only the selected fields."""
+        response = client.post("/calculate_chart?fields=sidereal_major_positions", json=CHART_REQUEST)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.json()) == {"sidereal_major_positions"}
+    
+    def test_mobile_calculate_chart_lightweight_default(self, stub_geocoder, client, db_session, mock_env_vars):
+        """Test the mobile endpoint returns the lightweight profile unless told otherwise."""
+        response = client.post("/api/v1/mobile/calculate_chart", json=CHART_REQUEST)
+        
+        assert response.status_code == status.HTTP_200_OK
+        # saved_chart_id is only set for signed-in users
+        assert set(response.json()) == CHART_FIELD_PROFILES["lightweight"] - {"saved_chart_id"}
+        
+        response = client.post("/api/v1/mobile/calculate_chart?fields=chart_hash", json=CHART_REQUEST)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.json()) == {"chart_hash"}
+    
+    def test_calculate_chart_unknown_field(self, client, db_session):
+        """Test unknown fields are rejected before any work is done."""
+        response = client.post(
+            "/calculate_chart?fields=planets",
+            json={
+                "full_name": "Test User",
+                "year": 2000,
+                "month": 1,
+                "day": 1,
+                "hour": 12,
+                "minute": 0,
+                "location": "New York, NY, USA",
+                "unknown_time": False
+            }
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
     def test_get_reading_requires_auth(self, client, db_session):
         """Test getting reading requires authentication."""
         response = client.get("/get_reading/test_hash")
@@ -4,6 +4,8 @@ Integration tests for saved charts endpoints.
 Tests CRUD operations for saved charts.
 """
 
+import os
+
 import pytest
 from fastapi import status
 
@@ -121,6 +123,75 @@ class TestSavedChartsEndpoints:
         get_response = client.get(f"/charts/{chart_id}", headers=auth_headers)
         assert get_response.status_code == status.HTTP_404_NOT_FOUND
     
+    def test_download_pdf_requires_reading(self, client, db_session, test_user, auth_headers):
+        """Test the PDF download is unavailable until the chart has a reading."""
+        save_response = client.post(
+            "/charts/save",
+            json={
+                "chart_name": "Test Chart",
+                "birth_year": 2000,
+                "birth_month": 1,
+                "birth_day": 1,
+                "birth_hour": 12,
+                "birth_minute": 0,
+                "birth_location": "New York, NY, USA",
+                "unknown_time": False,
+                "chart_data_json": '{"test": "data"}',
+                "ai_reading": None
+            },
+            headers=auth_headers
+        )
+        chart_id = save_response.json()["id"]
+        
+        response = client.get(f"/charts/{chart_id}/pdf", headers=auth_headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        
+        response = client.get("/charts/999999/pdf", headers=auth_headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_download_pdf_with_non_latin_name(self, client, db_session, test_user, auth_headers, tmp_path, monkeypatch):
+        """Test any chart name downloads, and an eviction mid-download does not break it."""
+        report = tmp_path / "report.pdf"
+        report.write_bytes(b"%PDF-1.4 report")
+        
+        async def get_pdf_report(chart_data, reading, user_inputs):
+            return str(report)
+        monkeypatch.setattr("app.api.v1.saved_charts.get_pdf_report", get_pdf_report)
+        
+        from app.services import pdf_service
+        
+        def open_and_evict(path):
+            opened = pdf_service.open_pdf_report(path)
+            os.unlink(path)
+            return opened
+        monkeypatch.setattr("app.api.v1.saved_charts.open_pdf_report", open_and_evict)
+        
+        save_response = client.post(
+            "/charts/save",
+            json={
+                "chart_name": '李小龙 "Bruce"',
+                "birth_year": 1940,
+                "birth_month": 11,
+                "birth_day": 27,
+                "birth_hour": 7,
+                "birth_minute": 12,
+                "birth_location": "San Francisco, CA, USA",
+                "unknown_time": False,
+                "chart_data_json": '{"test": "data"}',
+                "ai_reading": "Reading"
+            },
+            headers=auth_headers
+        )
+        chart_id = save_response.json()["id"]
+        
+        response = client.get(f"/charts/{chart_id}/pdf", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"%PDF-1.4 report"
+        assert response.headers["content-length"] == str(len(b"%PDF-1.4 report"))
+        disposition = response.headers["content-disposition"]
+        assert disposition.startswith('attachment; filename="Astrology_Report_')
+        assert disposition.endswith("filename*=UTF-8''Astrology_Report_%E6%9D%8E%E5%B0%8F%E9%BE%99_%22Bruce%22.pdf")
+    
     def test_save_chart_requires_auth(self, client, db_session):
         """Test saving chart requires authentication."""
         response = client.post(
@@ -0,0 +1,197 @@
+"""
+Unit tests for the vectorized aspect kernel.
+
+Every call site that moved to find_aspects must produce exactly what its
+old nested loop produced; the loops are kept here as the golden reference.
+"""
+
+import random
+from datetime import datetime, timezone
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from natal_chart import ASPECT_LUMINARY_ORBS, ASPECT_SCORES, ASPECTS_CONFIG, NatalChart
+from app.services.aspect_kernel import ASPECT_NAMES, find_aspects
+from app.services.composite_service import calculate_composite, calculate_composite_aspects, calculate_midpoint
+from app.services.synastry_service import calculate_synastry, calculate_synastry_aspects
+from app.services.transit_service import calculate_current_transits
+
+MAJOR = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+
+BIRTHS = [
+    (1990, 6, 15, 14, 30, 40.7128, -74.0060),
+    (1985, 2, 3, 12, 0, 51.5074, -0.1278),
+    (2000, 1, 1, 0, 0, -33.8688, 151.2093),
+    (1879, 3, 14, 10, 30, 48.4011, 9.9876),
+]
+
+
+def _legacy_chart_aspects(bodies):
+    found = []
+    main_planets = [b for b in bodies if b.is_main_planet and b.degree is not None]
+    for p1, p2 in combinations(main_planets, 2):
+        diff = min(abs(p1.degree - p2.degree), 360 - abs(p1.degree - p2.degree))
+        is_luminary = p1.is_luminary or p2.is_luminary
+        for name, angle, orb in ASPECTS_CONFIG:
+            orb_max = ASPECT_LUMINARY_ORBS.get(name, orb) if is_luminary else orb
+            if abs(diff - angle) <= orb_max:
+                found.append((p1.name, p2.name, name, round(diff - angle, 2), round(ASPECT_SCORES.get(name, 1) / (1 + abs(diff - angle)), 2)))
+    found.sort(key=lambda x: -x[4])
+    return found
+
+
+def _legacy_pair_aspects(points1, points2, same_chart=False):
+    found = []
+    for i, (name1, pos1) in enumerate(points1):
+        for j, (name2, pos2) in enumerate(points2):
+            if (same_chart and j <= i) or name1 == name2:
+                continue
+            angular_distance = abs(pos1 - pos2)
+            if angular_distance > 180:
+                angular_distance = 360 - angular_distance
+            for aspect_name, aspect_angle, orb in ASPECTS_CONFIG:
+                if abs(angular_distance - aspect_angle) <= orb:
+                    exact_orb = abs(angular_distance - aspect_angle)
+                    found.append({
+                        "planet1": name1,
+                        "planet2": name2,
+                        "aspect": aspect_name,
+                        "angle": aspect_angle,
+                        "orb": round(exact_orb, 2),
+                        "strength": round(1.0 - (exact_orb / orb), 3),
+                        "score": ASPECT_SCORES.get(aspect_name, 1.0),
+                    })
+    found.sort(key=lambda x: x["score"], reverse=True)
+    return found
+
+
+def _chart(birth):
+    chart = NatalChart("Test", *birth)
+    chart.calculate_chart()
+    return chart
+
+
+def _bodies(chart, system="sidereal"):
+    return chart.celestial_bodies if system == "sidereal" else chart.tropical_bodies
+
+
+def _random_longitudes(rng, n):
+    # Include exact aspect boundaries so orb comparisons at the edge are covered
+    return [rng.choice([rng.uniform(0, 360), float(rng.choice([0, 30, 45, 60, 90, 120, 180])) + rng.choice([-8, -2, 0, 2, 8])]) % 360 for _ in range(n)]
+
+
+class TestFindAspects:
+    """Tests for the kernel itself."""
+
+    def test_matches_loop_on_random_longitudes(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            lon1, lon2 = _random_longitudes(rng, 12), _random_longitudes(rng, 9)
+            hits = find_aspects(lon1, lon2)
+            got = [(i, j, ASPECT_NAMES[k], float(o), float(s)) for i, j, k, o, s in zip(hits.first, hits.second, hits.aspect, hits.orb, hits.strength)]
+            expected = []
+            for i, a in enumerate(lon1):
+                for j, b in enumerate(lon2):
+                    d = min(abs(a - b), 360 - abs(a - b))
+                    for name, angle, orb in ASPECTS_CONFIG:
+                        if abs(d - angle) <= orb:
+                            expected.append((i, j, name, d - angle, 1.0 - abs(d - angle) / orb))
+            assert got == expected
+
+    def test_self_comparison_reports_each_pair_once(self):
+        hits = find_aspects([0.0, 0.0, 120.0])
+        assert list(zip(hits.first.tolist(), hits.second.tolist(), hits.names)) == [(0, 1, "Conjunction"), (0, 2, "Trine"), (1, 2, "Trine")]
+
+    def test_luminary_orbs_and_missing_positions(self):
+        assert len(find_aspects([0.0, 9.0])) == 0
+        hits = find_aspects([0.0, 9.0], luminaries1=[True, False])
+        assert hits.names == ("Conjunction",) and hits.orb_limit.tolist() == [10.0]
+        assert len(find_aspects([0.0, float("nan")])) == 0
+
+    def test_batch_matches_single_charts(self):
+        rng = np.random.default_rng(3)
+        batch = rng.uniform(0, 360, size=(20, 10))
+        luminaries = np.zeros(10, dtype=bool)
+        luminaries[:2] = True
+        hits = find_aspects(batch, luminaries1=luminaries)
+        for c in range(len(batch)):
+            single = find_aspects(batch[c], luminaries1=luminaries)
+            rows = hits.chart == c
+            assert hits.first[rows].tolist() == single.first.tolist()
+            assert hits.aspect[rows].tolist() == single.aspect.tolist()
+            assert np.array_equal(hits.orb[rows], single.orb)
+
+    def test_empty_input(self):
+        assert len(find_aspects([])) == 0
+        assert len(find_aspects([], [10.0])) == 0
+
+
+class TestCallSiteParity:
+    """Golden-output parity with the loops the call sites used to run."""
+
+    @pytest.mark.parametrize("birth", BIRTHS)
+    def test_natal_and_tropical_aspects(self, birth):
+        chart = _chart(birth)
+        for aspects, bodies in ((chart.aspects, chart.celestial_bodies), (chart.tropical_aspects, chart.tropical_bodies)):
+            assert [(a.p1.name, a.p2.name, a.type, a.orb, a.strength) for a in aspects] == _legacy_chart_aspects(bodies)
+            assert all(type(a.orb) is float and type(a.strength) is float for a in aspects)
+
+    @pytest.mark.parametrize("system", ["sidereal", "tropical"])
+    def test_synastry_aspects(self, system):
+        chart1, chart2 = _chart(BIRTHS[0]), _chart(BIRTHS[1])
+        bodies1, bodies2 = _bodies(chart1, system), _bodies(chart2, system)
+        expected = _legacy_pair_aspects(
+            [(b.name, b.degree) for b in bodies1 if b.name in MAJOR],
+            [(b.name, b.degree) for b in bodies2 if b.name in MAJOR],
+        )
+        for aspect in expected:
+            aspect["system"] = system
+        assert calculate_synastry_aspects(bodies1, bodies2, system) == expected
+        result = calculate_synastry(chart1, chart2, system)
+        assert result["aspects"]["all"] == expected
+        overlaid = [p["planet"] for planets in result["house_overlays"]["chart2_in_chart1"].values() for p in planets]
+        assert sorted(overlaid) == sorted(MAJOR)
+
+    def test_composite_aspects(self):
+        rng = random.Random(11)
+        planets = [{"name": name, "position": lon} for name, lon in zip(MAJOR, _random_longitudes(rng, len(MAJOR)))]
+        asc = 123.456
+        points = [(p["name"], p["position"]) for p in planets] + [("Ascendant", asc)]
+        assert calculate_composite_aspects(planets, asc) == _legacy_pair_aspects(points, points, same_chart=True)
+
+    @pytest.mark.parametrize("system", ["sidereal", "tropical"])
+    def test_composite_chart(self, system):
+        chart1, chart2 = _chart(BIRTHS[2]), _chart(BIRTHS[3])
+        lookup1 = {b.name: b.degree for b in _bodies(chart1, system)}
+        lookup2 = {b.name: b.degree for b in _bodies(chart2, system)}
+        key = "sidereal_asc" if system == "sidereal" else "tropical_asc"
+        asc = calculate_midpoint(chart1.ascendant_data[key], chart2.ascendant_data[key])
+        points = [(name, calculate_midpoint(lookup1[name], lookup2[name])) for name in MAJOR] + [("Ascendant", asc)]
+        result = calculate_composite(chart1, chart2, system)
+        assert [(p["name"], p["position"]) for p in result["planets"]] == [(n, round(p, 4)) for n, p in points[:-1]]
+        expected = _legacy_pair_aspects(
+            [(p["name"], p["position"]) for p in result["planets"]] + [("Ascendant", asc)],
+            [(p["name"], p["position"]) for p in result["planets"]] + [("Ascendant", asc)],
+            same_chart=True,
+        )
+        assert result["aspects"]["all"] == expected
+
+    def test_transit_aspects(self):
+        natal = _chart(BIRTHS[2])
+        result = calculate_current_transits(natal, datetime(2024, 3, 1, 12, tzinfo=timezone.utc))
+        transiting = [(t["name"], t["position"]) for t in result["transiting_planets"]]
+        natal_points = [(b.name, b.degree) for b in natal.celestial_bodies if b.name in MAJOR]
+        expected = [
+            {
+                "transiting_planet": a["planet1"], "natal_planet": a["planet2"], "aspect": a["aspect"],
+                "angle": a["angle"], "orb": a["orb"], "strength": a["strength"], "score": a["score"],
+            }
+            for a in _legacy_pair_aspects([(f"T:{n}", p) for n, p in transiting], natal_points)
+        ]
+        for a in expected:
+            a["transiting_planet"] = a["transiting_planet"][2:]
+        got = [{k: v for k, v in a.items() if k not in ("transit_position", "natal_position")} for a in result["transit_aspects"]["all"]]
+        assert got == expected
+        assert len(got) > 0
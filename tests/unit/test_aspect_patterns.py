@@ -0,0 +1,94 @@
+"""
+Unit tests for aspect pattern detection.
+
+The adjacency-based detector must return exactly the pattern list of the
+combination scan it replaced, which is kept here as the reference.
+"""
+
+import random
+from itertools import combinations
+
+import pytest
+
+from natal_chart import (
+    CelestialBody, ELEMENT_MAPPING, MODALITY_MAPPING, NatalChart, PLANETS_CONFIG,
+    _detect_patterns, _find_chart_aspects
+)
+
+
+KINDS = ("T-Square", "Sign Stellium", "House Stellium", "Grand Trine", "Grand Cross", "(Yod)")
+
+
+def _legacy_patterns(planets, aspects, house_known):
+    patterns = []
+    names = list(planets.keys())
+    def find_aspect(p1, p2, type): return any(a.type == type and ((a.p1.name == p1 and a.p2.name == p2) or (a.p1.name == p2 and a.p2.name == p1)) for a in aspects)
+    for p1, p2, p3 in combinations(names, 3):
+        if find_aspect(p1, p2, 'Opposition') and find_aspect(p1, p3, 'Square') and find_aspect(p2, p3, 'Square'):
+            modalities = {MODALITY_MAPPING.get(planets[p].sign) for p in [p1, p2, p3]}; modality = modalities.pop() if len(modalities) == 1 else "Mixed"
+            patterns.append({"description": f"{p1} opp {p2}, focal {p3} ({modality} T-Square)"})
+    sign_groups = {}
+    for name, p in planets.items(): sign_groups.setdefault(p.sign, []).append(name)
+    for sign, members in sign_groups.items():
+        if len(members) >= 3:
+            patterns.append({"description": f"{len(members)} bodies in {sign} ({ELEMENT_MAPPING.get(sign, '')}, {MODALITY_MAPPING.get(sign, '')} Sign Stellium)"})
+    if house_known:
+        house_groups = {}
+        for name, p in planets.items():
+            if p.house_num > 0: house_groups.setdefault(p.house_num, []).append(name)
+        for house_num, members in house_groups.items():
+            if len(members) >= 3: patterns.append({"description": f"{len(members)} bodies in House {house_num} (House Stellium)"})
+    for p1, p2, p3 in combinations(names, 3):
+        if find_aspect(p1, p2, 'Trine') and find_aspect(p1, p3, 'Trine') and find_aspect(p2, p3, 'Trine'):
+            elements = {ELEMENT_MAPPING.get(planets[p].sign) for p in [p1, p2, p3]}; element = elements.pop() if len(elements) == 1 else "Mixed"
+            patterns.append({"description": f"{p1}, {p2}, {p3} ({element} Grand Trine)"})
+    for p1, p2, p3, p4 in combinations(names, 4):
+        opp_count = sum([find_aspect(p1, p2, 'Opposition'), find_aspect(p3, p4, 'Opposition')])
+        square_count = sum([find_aspect(p1, p3, 'Square'), find_aspect(p1, p4, 'Square'), find_aspect(p2, p3, 'Square'), find_aspect(p2, p4, 'Square')])
+        if opp_count >= 2 and square_count >= 4:
+            modalities = {MODALITY_MAPPING.get(planets[p].sign) for p in [p1, p2, p3, p4]}; modality = modalities.pop() if len(modalities) == 1 else "Mixed"
+            patterns.append({"description": f"{p1}, {p2}, {p3}, {p4} ({modality} Grand Cross)"})
+    for p1, p2, p3 in combinations(names, 3):
+        if find_aspect(p1, p2, 'Sextile') and find_aspect(p1, p3, 'Quincunx') and find_aspect(p2, p3, 'Quincunx'):
+            patterns.append({"description": f"{p1} sextile {p2}, both quincunx {p3} (Yod)"})
+    return patterns
+
+
+def _clustered_planets(rng):
+    # Positions near a few anchors at multiples of 30 degrees make T-squares, grand trines, crosses and yods common
+    anchors = [rng.uniform(0, 360) + 30 * rng.randrange(12) for _ in range(3)]
+    bodies = []
+    for name, _ in PLANETS_CONFIG:
+        degree = (rng.choice(anchors) + 30 * rng.choice([0, 2, 3, 4, 5, 6, 9]) + rng.uniform(-3, 3)) % 360
+        bodies.append(CelestialBody(name, degree, False, rng.uniform(0, 360)))
+    return bodies
+
+
+class TestPatternDetection:
+    """Golden-output parity with the combination scan."""
+
+    def test_matches_combination_scan(self):
+        rng = random.Random(5)
+        found = set()
+        for _ in range(300):
+            bodies = _clustered_planets(rng)
+            planets = {b.name: b for b in bodies}
+            aspects = _find_chart_aspects(bodies)
+            house_known = rng.random() < 0.5
+            patterns = _detect_patterns(planets, aspects, house_known)
+            assert patterns == _legacy_patterns(planets, aspects, house_known)
+            found.update(kind for p in patterns for kind in KINDS if kind in p["description"])
+        # The generated charts exercise every pattern type
+        assert found == set(KINDS)
+
+    @pytest.mark.parametrize("birth", [
+        (1990, 6, 15, 14, 30, 40.7128, -74.0060),
+        (1969, 7, 20, 20, 17, 64.1466, -21.9426),
+    ])
+    def test_chart_patterns(self, birth):
+        chart = NatalChart("Test", *birth)
+        chart.calculate_chart()
+        sidereal = {b.name: b for b in chart.celestial_bodies if b.is_main_planet and b.degree is not None}
+        tropical = {b.name: b for b in chart.tropical_bodies if b.is_main_planet and b.degree is not None}
+        assert chart.aspect_patterns == _legacy_patterns(sidereal, chart.aspects, True)
+        assert chart.tropical_aspect_patterns == _legacy_patterns(tropical, chart.tropical_aspects, True)
@@ -0,0 +1,120 @@
+"""
+Unit tests for the chart cache.
+
+Cached charts must be indistinguishable from charts computed directly by
+NatalChart, whether served from L1, rehydrated from an L2 payload, or
+computed on a miss.
+"""
+
+import json
+
+import pytest
+
+from natal_chart import NatalChart, calculate_numerology, get_chinese_zodiac_and_element
+from app.core import advanced_cache, cache_analytics
+from app.services import chart_cache
+
+BIRTH = (1990, 6, 15, 14, 30, 40.7128, -74.0060)
+
+
+def _personal(year, month, day):
+    numerology_raw = calculate_numerology(day, month, year)
+    numerology = {
+        "life_path_number": numerology_raw["life_path"],
+        "day_number": numerology_raw["day_number"],
+        "lucky_number": numerology_raw["lucky_number"],
+    }
+    return numerology, get_chinese_zodiac_and_element(year, month, day)
+
+
+def _direct_chart_data(name, birth, unknown_time):
+    year, month, day, hour, minute, lat, lng = birth
+    chart = NatalChart(name, year, month, day, hour, minute, lat, lng)
+    chart.calculate_chart(unknown_time=unknown_time)
+    numerology, chinese = _personal(year, month, day)
+    return chart.get_full_chart_data(numerology, None, chinese, unknown_time)
+
+
+def _cached_chart_data(name, birth, unknown_time):
+    numerology, chinese = _personal(*birth[:3])
+    return chart_cache.get_cached_chart_data(name, *birth, unknown_time, numerology, None, chinese)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    """Start every test with an empty L1, fresh analytics and an in-memory L2."""
+    l2 = {}
+    monkeypatch.setattr(advanced_cache, "get_from_l2_cache", lambda key: l2.get(key))
+    monkeypatch.setattr(advanced_cache, "set_in_l2_cache", lambda key, value, expiry_hours=None: l2.__setitem__(key, json.loads(json.dumps(value))))
+    chart_cache.clear_chart_cache()
+    cache_analytics.reset_cache_statistics()
+    yield l2
+    chart_cache.clear_chart_cache()
+
+
+class TestChartCache:
+    """Tests for the chart cache."""
+
+    @pytest.mark.parametrize("unknown_time", [False, True])
+    def test_matches_direct_computation(self, unknown_time):
+        """Miss, L1 hit and a second person with the same birth all match NatalChart."""
+        assert _cached_chart_data("Ada", BIRTH, unknown_time) == _direct_chart_data("Ada", BIRTH, unknown_time)
+        assert _cached_chart_data("Ada", BIRTH, unknown_time) == _direct_chart_data("Ada", BIRTH, unknown_time)
+        assert _cached_chart_data("Grace", BIRTH, unknown_time) == _direct_chart_data("Grace", BIRTH, unknown_time)
+
+    def test_key_is_canonical(self):
+        """Coordinates are rounded to ~11 m and -0.0 shares a key with 0.0."""
+        base = chart_cache.chart_cache_key(2000, 1, 1, 0, 0, 0.0, 10.0, False)
+        assert chart_cache.chart_cache_key(2000, 1, 1, 0, 0, -0.0, 10.000001, False) == base
+        assert chart_cache.chart_cache_key(2000, 1, 1, 0, 0, 0.0, 10.0, True) != base
+        assert base.startswith(f"chart:v{chart_cache.CHART_ENGINE_VERSION}:2000-01-01T00:00:")
+
+    def test_l2_payload_rehydrates_chart(self, fresh_cache):
+        """A process with an empty L1 rebuilds the NatalChart from the L2 payload."""
+        original = chart_cache.get_cached_chart("Ada", *BIRTH)
+        chart_cache.clear_chart_cache()
+
+        rehydrated = chart_cache.get_cached_chart("Ada", *BIRTH)
+        assert rehydrated is not original
+        assert chart_cache.get_chart_cache_stats()["l2_hits"] == 1
+        assert [(b.name, b.degree, b.retrograde) for b in rehydrated.celestial_bodies] == \
+            [(b.name, b.degree, b.retrograde) for b in original.celestial_bodies]
+        assert rehydrated.get_full_chart_data({}, None, {}, False) == original.get_full_chart_data({}, None, {}, False)
+
+    def test_charts_carry_caller_name(self):
+        """Copies share calculations but not the name."""
+        first = chart_cache.get_cached_chart("Ada", *BIRTH)
+        second = chart_cache.get_cached_chart("Grace", *BIRTH)
+        assert (first.name, second.name) == ("Ada", "Grace")
+        assert first.celestial_bodies is second.celestial_bodies
+
+    def test_reports_to_cache_analytics(self):
+        """Misses, sets and L1/L2 hits are tracked under the chart: pattern."""
+        chart_cache.get_cached_chart("Ada", *BIRTH)
+        chart_cache.get_cached_chart("Ada", *BIRTH)
+        chart_cache.clear_chart_cache()
+        chart_cache.get_cached_chart("Ada", *BIRTH)
+
+        stats = cache_analytics.get_cache_statistics()
+        assert stats["misses"] == 1
+        assert stats["sets"] == 1
+        assert stats["hits"] == 2
+
+    def test_sections_skip_unrequested_work(self, fresh_cache):
+        """A cold subset request leaves the rest of the chart uncomputed; full data is built and stored on first use."""
+        numerology, chinese = _personal(*BIRTH[:3])
+        full = _direct_chart_data("Ada", BIRTH, False)
+        sections = ["sidereal_major_positions", "name"]
+        data = chart_cache.get_cached_chart_data("Ada", *BIRTH, False, numerology, None, chinese, sections=sections)
+        assert data == {"name": "Ada", "sidereal_major_positions": full["sidereal_major_positions"]}
+
+        entry = chart_cache.get_chart_entry(*BIRTH)
+        assert entry.chart_data is None and fresh_cache[entry.key]["chart_data"] is None
+        assert not {"aspects", "tropical_points"} & set(vars(entry.chart))
+
+        assert _cached_chart_data("Ada", BIRTH, False) == full
+        assert fresh_cache[entry.key]["chart_data"] is not None
+        warm = chart_cache.get_cached_chart_data("Ada", *BIRTH, False, numerology, None, chinese, sections=["sidereal_aspects"])
+        assert warm == {"sidereal_aspects": full["sidereal_aspects"]}
+        with pytest.raises(ValueError):
+            chart_cache.get_cached_chart_data("Ada", *BIRTH, False, numerology, None, chinese, sections=["planets"])
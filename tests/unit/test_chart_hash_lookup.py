@@ -0,0 +1,100 @@
+"""
+Unit tests for the indexed SavedChart.chart_hash lookup.
+
+Covers the save-time hook, QueryOptimizer.get_chart_by_hash and the
+batched backfill in the chart_hash migration.
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, SavedChart, User
+from app.core.query_optimizer import QueryOptimizer
+from app.services.chart_service import generate_chart_hash, saved_chart_hash
+
+MIGRATION_PATH = Path(__file__).parents[2] / "app" / "db" / "migrations" / "versions" / "0001_add_saved_chart_hash.py"
+
+CHART_DATA = {
+    "sidereal_major_positions": [{"name": "Sun", "position": "15°00' Gemini", "degrees": 75.0}],
+    "sidereal_aspects": [],
+}
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, email="test@example.com", hashed_password="x"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _saved_chart(chart_data, unknown_time=False, name="Test"):
+    return SavedChart(
+        user_id=1, chart_name=name, birth_year=2000, birth_month=1, birth_day=1,
+        birth_hour=12, birth_minute=0, birth_location="New York, NY, USA",
+        unknown_time=unknown_time, chart_data_json=json.dumps(chart_data) if chart_data is not None else None
+    )
+
+
+class TestChartHashLookup:
+    """Tests for chart_hash storage and lookup."""
+
+    def test_saved_chart_hash(self):
+        """Stored hashes win; otherwise the hash is recomputed; junk gives None."""
+        assert saved_chart_hash(json.dumps({**CHART_DATA, "chart_hash": "abc"}), False) == "abc"
+        assert saved_chart_hash(json.dumps(CHART_DATA), True) == generate_chart_hash(CHART_DATA, True)
+        assert saved_chart_hash('{"test": "data"}', False) is None
+        assert saved_chart_hash("not json", False) is None
+        assert saved_chart_hash(None, False) is None
+
+    def test_hash_filled_on_save_and_update(self, session):
+        """The hook sets chart_hash on insert and recomputes it when the data changes."""
+        chart = _saved_chart({**CHART_DATA, "chart_hash": "first"})
+        session.add(chart)
+        session.commit()
+        assert chart.chart_hash == "first"
+
+        chart.chart_data_json = json.dumps({**CHART_DATA, "chart_hash": "second"})
+        session.commit()
+        assert chart.chart_hash == "second"
+
+    def test_get_chart_by_hash(self, session):
+        """Lookup goes through the indexed column and can be scoped to a user."""
+        session.add_all([_saved_chart({**CHART_DATA, "chart_hash": "abc"}), _saved_chart(CHART_DATA, name="Other")])
+        session.commit()
+
+        assert QueryOptimizer.get_chart_by_hash(session, "abc").chart_name == "Test"
+        assert QueryOptimizer.get_chart_by_hash(session, "abc", user_id=2) is None
+        assert QueryOptimizer.get_chart_by_hash(session, "missing") is None
+        assert QueryOptimizer.get_chart_by_hash(session, "") is None
+
+        plan = " ".join(str(row) for row in session.execute(
+            text("EXPLAIN QUERY PLAN SELECT id FROM saved_charts WHERE chart_hash = 'abc'")
+        ))
+        assert "ix_saved_charts_chart_hash" in plan
+
+    def test_migration_backfill(self, session):
+        """Rows saved before the column existed are backfilled across batches."""
+        session.add_all([_saved_chart({**CHART_DATA, "chart_hash": f"h{i}"}) for i in range(7)])
+        session.add(_saved_chart(None))
+        session.commit()
+        session.execute(text("UPDATE saved_charts SET chart_hash = NULL"))
+        session.commit()
+
+        spec = importlib.util.spec_from_file_location("chart_hash_migration", MIGRATION_PATH)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        assert migration.backfill_chart_hashes(session.connection(), batch_size=3) == 7
+        session.commit()
+
+        hashes = [row[0] for row in session.execute(text("SELECT chart_hash FROM saved_charts ORDER BY id"))]
+        assert hashes == [f"h{i}" for i in range(7)] + [None]
@@ -0,0 +1,81 @@
+"""
+Unit tests for the NatalChart model: slotted bodies, lazily computed chart
+sections and section selection in get_full_chart_data.
+"""
+
+import pytest
+
+from natal_chart import CHART_DATA_SECTIONS, TRUE_SIDEREAL_SIGNS, NatalChart, get_sign_from_degrees
+
+LAZY = NatalChart._LAZY_SECTIONS
+
+
+def _chart(unknown_time=False):
+    chart = NatalChart("Test", 1990, 6, 15, 14, 30, 40.7128, -74.0060)
+    chart.calculate_chart(unknown_time=unknown_time)
+    return chart
+
+
+class TestChartModel:
+    """Bodies are compact and derived sections are computed on first access."""
+
+    def test_bodies_and_aspects_have_no_instance_dict(self):
+        chart = _chart()
+        for obj in (chart.all_points[0], chart.tropical_points[0], chart.aspects[0]):
+            assert not hasattr(obj, "__dict__")
+
+    def test_formatted_fields(self):
+        sun = next(p for p in _chart().celestial_bodies if p.name == "Sun")
+        assert sun.formatted_position.endswith(sun.sign)
+        assert 0 <= sun.sign_percentage <= 100
+        assert sun.house_degrees.endswith("′") and 1 <= sun.house_num <= 12
+
+    def test_sign_lookup_matches_linear_scan(self):
+        for degrees in [0.0, 19.7285, 19.7286, 223.4245, 359.999] + [start for _, start, _ in TRUE_SIDEREAL_SIGNS]:
+            expected = next((sign for sign, start, end in TRUE_SIDEREAL_SIGNS if start <= degrees < end), "Unknown")
+            assert get_sign_from_degrees(degrees) == expected
+        assert get_sign_from_degrees(360.0) == "Unknown"
+        assert get_sign_from_degrees(-1.0) == "Unknown"
+
+    def test_sections_computed_on_access(self):
+        chart = _chart()
+        assert chart.celestial_bodies and chart.all_points
+        assert not set(LAZY) & set(vars(chart))
+        chart.aspect_patterns
+        assert {"aspects", "aspect_patterns"} <= set(vars(chart))
+        assert "tropical_bodies" not in vars(chart)
+
+    def test_recalculation_resets_sections(self):
+        chart = _chart()
+        assert chart.house_sign_distributions
+        chart.calculate_chart(unknown_time=True)
+        assert chart.house_sign_distributions == {}
+        assert len(chart.all_points) == len({p.name for p in chart.all_points})
+
+    def test_uncalculated_chart_is_empty(self):
+        chart = NatalChart("Test", 1990, 6, 15, 14, 30, 40.7128, -74.0060)
+        assert chart.aspects == [] and chart.tropical_points == []
+        assert chart.dominance_analysis == {} and chart.tropical_dominance == {}
+
+
+class TestChartDataSections:
+    """get_full_chart_data builds only the requested sections."""
+
+    def test_all_sections_by_default(self):
+        chart = _chart()
+        data = chart.get_full_chart_data({}, None, {}, False)
+        assert tuple(data) == CHART_DATA_SECTIONS
+        assert data == chart.get_full_chart_data({}, None, {}, False, sections=reversed(CHART_DATA_SECTIONS))
+
+    def test_subset_skips_tropical_chart(self):
+        chart = _chart()
+        full = _chart().get_full_chart_data({}, None, {}, False)
+        sections = ["sidereal_aspects", "name", "sidereal_major_positions"]
+        data = chart.get_full_chart_data({}, None, {}, False, sections=sections)
+        assert list(data) == ["name", "sidereal_major_positions", "sidereal_aspects"]
+        assert all(data[key] == full[key] for key in data)
+        assert not {"tropical_bodies", "tropical_points", "house_sign_distributions"} & set(vars(chart))
+
+    def test_unknown_section_raises(self):
+        with pytest.raises(ValueError, match="planets"):
+            _chart().get_full_chart_data({}, None, {}, False, sections=["name", "planets"])
@@ -0,0 +1,151 @@
+"""
+Unit tests for the chat context cache and provider-side prompt prefix caching.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.services import llm_service
+from app.services.chat_context import ChatContext, ChatContextCache, chart_context_version
+from database import Base, FamousPerson
+from services.similarity_index import famous_people_signature
+
+
+def _context(chart_version="chart-v1", corpus_version=(1, None, 1)):
+    return ChatContext(chart_version, corpus_version, "=== CHART OWNER ===\n", [])
+
+
+def _gemini_client(monkeypatch, calls, creates, fail_create=False):
+    monkeypatch.setattr(llm_service, "AI_MODE", "real")
+    monkeypatch.setattr(llm_service, "GEMINI_API_KEY", "test")
+    monkeypatch.setattr(llm_service, "GEMINI_PACKAGE_TYPE", "genai")
+    monkeypatch.setattr(llm_service, "_provider_caches", {})
+    client = llm_service.Gemini3Client()
+    client.bypass_cache = True
+
+    def create(model, config):
+        creates.append(config)
+        if fail_create:
+            raise ValueError("Cached content is too small")
+        return SimpleNamespace(name=f"cachedContents/{len(creates)}")
+
+    def generate_content(model, contents, config=None):
+        calls.append({"contents": contents, "config": config})
+        usage = SimpleNamespace(prompt_token_count=1200, candidates_token_count=50,
+                                total_token_count=1250, cached_content_token_count=1000)
+        return SimpleNamespace(text="Your Moon is in Cancer.", usage_metadata=usage)
+
+    client.client = SimpleNamespace(caches=SimpleNamespace(create=create),
+                                    models=SimpleNamespace(generate_content=generate_content))
+    return client
+
+
+class TestChatContextCache:
+    """Tests for ChatContextCache and its version keys."""
+
+    def test_hit_until_chart_or_corpus_changes(self):
+        cache = ChatContextCache(max_size=8)
+        context = _context()
+        assert cache.get(1, "chart-v1", (1, None, 1)) is None
+        cache.put(1, context)
+        assert cache.get(1, "chart-v1", (1, None, 1)) is context
+        assert cache.get(2, "chart-v1", (1, None, 1)) is None
+
+        assert cache.get(1, "chart-v1", (2, None, 3)) is None  # Famous people changed
+        cache.put(1, context)
+        assert cache.get(1, "chart-v2", (1, None, 1)) is None  # Chart or reading changed
+        assert cache.get(1, "chart-v1", (1, None, 1)) is None  # Stale entries are dropped
+        assert cache.stats()["stale"] == 2
+
+    def test_lru_eviction_and_invalidate(self):
+        cache = ChatContextCache(max_size=2)
+        for conversation_id in (1, 2):
+            cache.put(conversation_id, _context())
+        cache.get(1, "chart-v1", (1, None, 1))
+        cache.put(3, _context())
+        assert cache.get(2, "chart-v1", (1, None, 1)) is None
+        assert cache.get(1, "chart-v1", (1, None, 1)) is not None
+
+        cache.invalidate(1)
+        assert cache.get(1, "chart-v1", (1, None, 1)) is None
+        cache.invalidate()
+        assert cache.stats()["entries"] == 0
+
+    def test_chart_version_covers_data_and_reading(self):
+        chart = SimpleNamespace(chart_hash="abc", chart_data_json="{}", ai_reading=None)
+        version = chart_context_version(chart)
+        assert chart_context_version(SimpleNamespace(chart_hash="abc", chart_data_json="{\"x\": 1}", ai_reading=None)) == version
+        assert chart_context_version(SimpleNamespace(chart_hash="abd", chart_data_json="{}", ai_reading=None)) != version
+        assert chart_context_version(SimpleNamespace(chart_hash="abc", chart_data_json="{}", ai_reading="Reading")) != version
+        # Rows saved before chart_hash existed fall back to the chart data itself
+        legacy = SimpleNamespace(chart_hash=None, chart_data_json="{}", ai_reading=None)
+        assert chart_context_version(legacy) != chart_context_version(
+            SimpleNamespace(chart_hash=None, chart_data_json="{\"x\": 1}", ai_reading=None))
+
+    def test_corpus_version_moves_with_famous_people(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        person = FamousPerson(id=1, name="A", wikipedia_url="https://example.org/a", birth_year=1900,
+                              birth_month=1, birth_day=1, birth_location="X", chart_data_json="{}",
+                              updated_at=datetime(2025, 1, 1))
+        db.add(person)
+        db.commit()
+        version = famous_people_signature(db)
+
+        person.updated_at = datetime(2025, 1, 2)
+        db.commit()
+        assert famous_people_signature(db) != version
+        db.close()
+
+
+class TestProviderPromptCache:
+    """Tests for the prefix argument of the LLM clients."""
+
+    @pytest.mark.asyncio
+    async def test_gemini_prefix_goes_through_one_explicit_cache(self, monkeypatch):
+        calls, creates = [], []
+        client = _gemini_client(monkeypatch, calls, creates)
+        for question in ("What about my Moon?", "And my Venus?"):
+            assert await client.generate("system", f"\n{question}", 2500, 0.7, "chart_chat", prefix="CHART\n") == "Your Moon is in Cancer."
+
+        assert len(creates) == 1
+        assert creates[0].system_instruction == "system"
+        assert creates[0].contents == ["[USER INPUT]\nCHART\n"]
+        assert [call["config"].cached_content for call in calls] == ["cachedContents/1"] * 2
+        assert [call["contents"] for call in calls] == ["What about my Moon?", "And my Venus?"]
+
+    @pytest.mark.asyncio
+    async def test_gemini_falls_back_to_inline_prefix(self, monkeypatch):
+        calls, creates = [], []
+        client = _gemini_client(monkeypatch, calls, creates, fail_create=True)
+        await client.generate("system", "\nQuestion", 2500, 0.7, "chart_chat", prefix="CHART\n")
+        await client.generate("system", "\nQuestion", 2500, 0.7, "chart_chat", prefix="CHART\n")
+
+        assert len(creates) == 1  # The failure is remembered, not retried every turn
+        assert calls[0]["config"].cached_content is None
+        assert calls[0]["contents"] == "[SYSTEM INSTRUCTIONS]\nsystem\n\n[USER INPUT]\nCHART\n\nQuestion"
+
+    @pytest.mark.asyncio
+    async def test_claude_prefix_is_a_cached_block(self, monkeypatch):
+        monkeypatch.setattr(llm_service, "AI_MODE", "real")
+        monkeypatch.setattr(llm_service, "ANTHROPIC_API_KEY", "test")
+        client = llm_service.ClaudeClient()
+        client.bypass_cache = True
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            return SimpleNamespace(content=[SimpleNamespace(type="text", text="Hello")],
+                                   usage=SimpleNamespace(input_tokens=10, output_tokens=2))
+
+        client.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+        await client.generate("system", "Question", 1000, 0.7, "chart_chat", prefix="CHART\n")
+        assert calls[0]["messages"][0]["content"] == [
+            {"type": "text", "text": "CHART\n", "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": "Question"},
+        ]
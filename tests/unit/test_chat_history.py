@@ -0,0 +1,125 @@
+"""
+Unit tests for keyset-paginated chat history.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.services.chat_history import (
+    decode_cursor, encode_cursor, message_counts, page_conversations, page_messages, recent_messages,
+)
+from app.services.search_service import SearchService
+from database import Base, ChatConversation, ChatMessage, SavedChart, User
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def _conversation(db, messages=0, updated_at=None, user_id=1):
+    if db.get(User, user_id) is None:
+        db.add(User(id=user_id, email=f"user{user_id}@example.com", hashed_password="x"))
+        db.add(SavedChart(id=user_id, user_id=user_id, chart_name="Test", birth_year=1990, birth_month=1,
+                          birth_day=1, birth_hour=12, birth_minute=0, birth_location="X"))
+    conversation = ChatConversation(user_id=user_id, chart_id=user_id, updated_at=updated_at or datetime(2025, 1, 1))
+    db.add(conversation)
+    db.flush()
+    start = datetime(2025, 1, 1)
+    for i in range(messages):
+        # Pairs share a timestamp so the id tie-break is exercised
+        db.add(ChatMessage(conversation_id=conversation.id, role="user" if i % 2 == 0 else "assistant",
+                           content=f"message {i}", created_at=start + timedelta(minutes=i // 2)))
+    db.commit()
+    return conversation
+
+
+def _contents(page):
+    return [msg.content for msg in page.items]
+
+
+class TestChatHistory:
+    """Tests for app.services.chat_history."""
+
+    def test_cursor_round_trip(self):
+        timestamp = datetime(2025, 3, 4, 5, 6, 7, 890)
+        assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_message_pages_walk_back_through_history(self, session):
+        conversation = _conversation(session, messages=7)
+        _conversation(session, messages=3)  # Other conversations never leak in
+
+        page = page_messages(session, conversation.id, limit=3)
+        assert _contents(page) == ["message 4", "message 5", "message 6"]
+        assert page.has_more
+
+        seen = _contents(page)
+        while page.has_more:
+            page = page_messages(session, conversation.id, limit=3, before=page.next_cursor)
+            seen = _contents(page) + seen
+        assert seen == [f"message {i}" for i in range(7)]
+
+    def test_message_pages_forward_from_a_message(self, session):
+        conversation = _conversation(session, messages=6)
+        first = session.query(ChatMessage).order_by(ChatMessage.id).first()
+
+        page = page_messages(session, conversation.id, limit=2, after=encode_cursor(first.created_at, first.id))
+        assert _contents(page) == ["message 1", "message 2"]
+        page = page_messages(session, conversation.id, limit=10, after=page.next_cursor)
+        assert _contents(page) == ["message 3", "message 4", "message 5"]
+        assert not page.has_more
+
+        with pytest.raises(ValueError):
+            page_messages(session, conversation.id, before="2025-01-01T00:00:00,1", after="2025-01-01T00:00:00,1")
+
+    def test_unpaged_request_returns_whole_conversation(self, session):
+        conversation = _conversation(session, messages=60)
+
+        page = page_messages(session, conversation.id, limit=None)
+        assert _contents(page) == [f"message {i}" for i in range(60)]
+        assert not page.has_more
+
+        # A cursor without a limit pages with the default size
+        page = page_messages(session, conversation.id, limit=None, before=page_messages(session, conversation.id, limit=5).next_cursor)
+        assert _contents(page) == [f"message {i}" for i in range(5, 55)]
+
+    def test_recent_messages_is_the_chronological_tail(self, session):
+        conversation = _conversation(session, messages=15)
+        assert [msg.content for msg in recent_messages(session, conversation.id, 4)] == [
+            "message 11", "message 12", "message 13", "message 14"]
+        assert recent_messages(session, _conversation(session).id) == []
+
+    def test_conversation_pages_and_message_counts(self, session):
+        conversations = [_conversation(session, messages=i, updated_at=datetime(2025, 1, 1) + timedelta(days=i % 3))
+                         for i in range(5)]
+        query = session.query(ChatConversation).filter(ChatConversation.user_id == 1)
+
+        ids, cursor = [], None
+        while True:
+            page = page_conversations(query, limit=2, cursor=cursor)
+            ids += [conv.id for conv in page.items]
+            if not page.has_more:
+                break
+            cursor = page.next_cursor
+        expected = sorted(conversations, key=lambda conv: (conv.updated_at, conv.id), reverse=True)
+        assert ids == [conv.id for conv in expected]
+
+        counts = message_counts(session, ids)
+        assert counts == {conv.id: i for i, conv in enumerate(conversations) if i}
+        assert message_counts(session, []) == {}
+
+    def test_search_messages_continues_from_cursor(self, session):
+        _conversation(session, messages=5)
+        first = SearchService.search_messages(session, "message", limit=3)
+        assert [r["content"] for r in first] == ["message 4", "message 3", "message 2"]
+        rest = SearchService.search_messages(session, "message", limit=3, cursor=first[-1]["cursor"])
+        assert [r["content"] for r in rest] == ["message 1", "message 0"]
@@ -0,0 +1,100 @@
+"""
+Unit tests for the batch ephemeris engine.
+
+Charts built from compute_charts_batch rows must be identical to charts
+computed one at a time by NatalChart.
+"""
+
+import numpy as np
+import pytest
+
+from natal_chart import (
+    NatalChart, TRUE_SIDEREAL_SIGNS, calculate_numerology,
+    get_chinese_zodiac_and_element, get_sign_from_degrees, get_tropical_sign_from_degrees
+)
+from app.services.ephemeris_batch import (
+    BODY_NAMES, compute_charts_batch, make_births, sidereal_sign_index,
+    sign_names, tropical_sign_index
+)
+
+BIRTHS = [
+    # (year, month, day, hour, minute, latitude, longitude)
+    (1990, 6, 15, 14, 30, 40.7128, -74.0060),
+    (1985, 2, 3, 12, 0, 51.5074, -0.1278),
+    (2000, 1, 1, 0, 0, -33.8688, 151.2093),
+    (1879, 3, 14, 10, 30, 48.4011, 9.9876),
+    (1955, 10, 28, 21, 15, 47.6062, -122.3321),
+    (1969, 7, 20, 20, 17, 64.1466, -21.9426),
+]
+
+
+def _full_chart_data(birth, unknown_time, ephemeris=None):
+    year, month, day, hour, minute, lat, lng = birth
+    chart = NatalChart("Test", year, month, day, hour, minute, lat, lng)
+    chart.calculate_chart(unknown_time=unknown_time, ephemeris=ephemeris)
+    numerology_raw = calculate_numerology(day, month, year)
+    numerology = {
+        "life_path_number": numerology_raw["life_path"],
+        "day_number": numerology_raw["day_number"],
+        "lucky_number": numerology_raw["lucky_number"],
+    }
+    chinese = get_chinese_zodiac_and_element(year, month, day)
+    return chart.get_full_chart_data(numerology, None, chinese, unknown_time)
+
+
+class TestEphemerisBatch:
+    """Tests for compute_charts_batch."""
+
+    @pytest.mark.parametrize("unknown_time", [False, True])
+    def test_full_chart_data_matches_natal_chart(self, unknown_time):
+        """Charts built from batch rows equal charts computed individually."""
+        batch = compute_charts_batch(make_births(BIRTHS))
+        assert batch["valid"].all()
+        for row, birth in zip(batch, BIRTHS):
+            assert _full_chart_data(birth, unknown_time, row) == _full_chart_data(birth, unknown_time)
+
+    def test_arrays_match_chart_positions(self):
+        """Longitudes, retrograde flags, signs and cusps agree with NatalChart."""
+        batch = compute_charts_batch(make_births(BIRTHS))
+        for row, birth in zip(batch, BIRTHS):
+            data = _full_chart_data(birth, unknown_time=False)
+            sidereal = {p["name"]: p for p in data["sidereal_major_positions"]}
+            tropical = {p["name"]: p for p in data["tropical_major_positions"]}
+            sidereal_signs = sign_names(row["sidereal_sign"], "sidereal")
+            tropical_signs = sign_names(row["tropical_sign"], "tropical")
+            for b, name in enumerate(BODY_NAMES):
+                if name not in sidereal:
+                    continue
+                assert row["sidereal_lon"][b] == sidereal[name]["degrees"]
+                assert row["tropical_lon"][b] == tropical[name]["degrees"]
+                assert bool(row["retrograde"][b]) == sidereal[name]["retrograde"]
+                assert sidereal_signs[b] == sidereal[name]["position"].split()[-1]
+                assert tropical_signs[b] == tropical[name]["position"].split()[-1]
+            assert row["sidereal_cusps"].tolist() == data["sidereal_house_cusps"]
+            assert row["tropical_cusps"].tolist() == data["tropical_house_cusps"]
+
+    def test_process_pool_matches_serial(self):
+        """Sharding across processes returns the same rows in input order."""
+        births = make_births(BIRTHS * 4)
+        serial = compute_charts_batch(births)
+        pooled = compute_charts_batch(births, processes=2, chunk_size=5)
+        np.testing.assert_array_equal(serial, pooled)
+
+    def test_accepts_jd_lat_lon_array(self):
+        """Plain (jd, lat, lon) input derives the year from the Julian day."""
+        births = make_births(BIRTHS)
+        plain = np.column_stack([births["jd"], births["latitude"], births["longitude"]])
+        np.testing.assert_array_equal(compute_charts_batch(plain), compute_charts_batch(births))
+
+    def test_sign_index_matches_scalar_lookup(self):
+        """Binary-search sign lookup agrees with the linear scan, including boundaries."""
+        edges = [edge for _, start, end in TRUE_SIDEREAL_SIGNS for edge in (start, end)]
+        degrees = np.concatenate([
+            np.linspace(0, 359.999, 5000), edges, np.nextafter(edges, -1.0), [-0.5, 360.0, np.nan]
+        ])
+        sidereal = sign_names(sidereal_sign_index(degrees), "sidereal")
+        assert sidereal == [get_sign_from_degrees(d) for d in degrees]
+
+        finite = degrees[np.isfinite(degrees) & (degrees >= 0)]
+        tropical = sign_names(tropical_sign_index(finite), "tropical")
+        assert tropical == [get_tropical_sign_from_degrees(d) for d in finite]
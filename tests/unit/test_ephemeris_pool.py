@@ -0,0 +1,128 @@
+"""
+Unit tests for the Swiss Ephemeris worker pool.
+
+Requests answered by worker processes must match the same computation done
+in-process; the pool is configured once per process and shared by the chart
+cache and batch jobs.
+"""
+
+import asyncio
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+import swisseph as swe
+
+from natal_chart import NatalChart
+from app.core.executors import (
+    BoundedExecutor, get_executor_stats, run_chart_task, set_executor, shutdown_executors
+)
+from app.services import ephemeris_pool
+from app.services.ephemeris_batch import compute_charts_batch, make_births
+from app.services.ephemeris_pool import (
+    HousesRequest, PositionsRequest, ReturnRequest, compute, compute_async, compute_charts,
+    compute_charts_async, configure_ephemeris, resolve_ephemeris_path, set_ephemeris_executor
+)
+from app.services.solar_return_service import find_return_times
+
+BIRTHS = [
+    (1990, 6, 15, 14, 30, 40.7128, -74.0060),
+    (1985, 2, 3, 12, 0, 51.5074, -0.1278),
+    (2000, 1, 1, 0, 0, -33.8688, 151.2093),
+    (1879, 3, 14, 10, 30, 48.4011, 9.9876),
+    (1969, 7, 20, 20, 17, 64.1466, -21.9426),
+]
+
+
+def _assert_same_rows(actual, expected):
+    # Byte comparison so NaN positions (bodies without ephemeris files) compare equal
+    assert actual.dtype == expected.dtype and actual.tobytes() == expected.tobytes()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    executor = BoundedExecutor(
+        "ephemeris", "process", max_workers=2, max_queue=16, timeout=60.0,
+        initializer=ephemeris_pool._init_worker, initargs=(resolve_ephemeris_path(),)
+    )
+    set_ephemeris_executor(executor)
+    yield executor
+    set_ephemeris_executor(None)
+    executor.shutdown()
+
+
+class TestEphemerisPool:
+    """Requests answered by worker processes."""
+
+    def test_positions_match_in_process(self, pool):
+        births = make_births(BIRTHS)
+        response = compute(PositionsRequest(births))
+        _assert_same_rows(response.charts, compute_charts_batch(births))
+        assert get_executor_stats()["ephemeris"]["completed"] >= 1
+
+    def test_sharded_charts_keep_order(self, pool):
+        births = make_births(BIRTHS)
+        expected = compute_charts_batch(births)
+        _assert_same_rows(compute_charts(births, chunk_size=2), expected)
+        _assert_same_rows(asyncio.run(compute_charts_async(births, chunk_size=2)), expected)
+        assert len(compute_charts(np.zeros((0, 3)))) == 0
+
+    def test_houses(self, pool):
+        jd = swe.julday(1990, 6, 15, 14.5)
+        response = asyncio.run(compute_async(HousesRequest(jd, 40.7128, -74.0060)))
+        cusps, ascmc = swe.houses(jd, 40.7128, -74.0060, b'P')
+        assert response.cusps == tuple(cusps[:12])
+        assert (response.ascendant, response.mc) == (ascmc[0], ascmc[1])
+
+    def test_returns_match_find_return_times(self, pool):
+        chart = NatalChart("Test", *BIRTHS[0])
+        chart.calculate_chart()
+        start, end = datetime(2020, 1, 1), datetime(2023, 1, 1)
+        request = ReturnRequest.for_chart(chart, "Mars", start, end)
+        assert compute(request).moments() == find_return_times(chart, "Mars", start, end)
+
+    def test_errors_propagate(self, pool):
+        with pytest.raises(ValueError, match="end_date"):
+            compute(ReturnRequest("Mars", 10.0, 2460000.0, 2459000.0))
+        with pytest.raises(ValueError, match="Unknown return body"):
+            ReturnRequest.for_chart(None, "Eris", datetime(2020, 1, 1), datetime(2021, 1, 1))
+
+    def test_workers_are_separate_processes(self, pool):
+        assert os.getpid() not in set(pool.map(_worker_pid, range(4)))
+
+
+def _worker_pid(_):
+    return os.getpid()
+
+
+class TestInProcess:
+    """EPHEMERIS_POOL_WORKERS=0 computes in the calling process."""
+
+    def test_without_workers(self, monkeypatch):
+        monkeypatch.setattr(ephemeris_pool, "EPHEMERIS_POOL_WORKERS", 0)
+        set_ephemeris_executor(None)
+        births = make_births(BIRTHS[:2])
+        _assert_same_rows(compute_charts(births), compute_charts_batch(births))
+        assert "ephemeris" not in get_executor_stats()
+
+    def test_path_set_only_when_it_changes(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(swe, "set_ephe_path", calls.append)
+        monkeypatch.setattr(ephemeris_pool, "_local", threading.local())
+        path = resolve_ephemeris_path()
+        assert configure_ephemeris() == path
+        configure_ephemeris(path)
+        assert calls == [path]
+
+    def test_chart_threads_use_ephemeris_files(self):
+        # Swiss Ephemeris state is per thread; an unconfigured thread falls back to Moshier
+        async def flags():
+            return await run_chart_task(lambda: swe.calc_ut(2451545.0, swe.SUN)[1])
+        set_executor("chart", None)
+        try:
+            assert not asyncio.run(flags()) & swe.FLG_MOSEPH
+        finally:
+            set_executor("chart", None)
+            shutdown_executors()
@@ -0,0 +1,128 @@
+"""
+Unit tests for the precomputed ephemeris table and the scans that opt into it.
+
+A two-year table is built into a temporary directory; its error is measured
+against swe.calc_ut, and timelines and returns computed from it are compared
+with the Swiss Ephemeris results.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+import swisseph as swe
+
+from natal_chart import NatalChart
+from app.services import ephemeris_table as ephemeris_table_module, solar_return_service
+from app.services.ephemeris_table import (
+    CONJUNCTION_DEGREES, ERROR_BOUND_DEGREES, TABLE_BODIES, TABLE_STEP_DAYS, EphemerisTable,
+    build_ephemeris_table, get_ephemeris_table, set_ephemeris_table, validate_ephemeris_table
+)
+from app.services.solar_return_service import find_return_times
+from app.services.transit_service import calculate_transit_timeline
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("ephemeris_table"))
+    build_ephemeris_table(path, 2024, 2026, samples=2000)
+    return EphemerisTable(path)
+
+
+@pytest.fixture
+def installed(table):
+    set_ephemeris_table(table)
+    yield table
+    set_ephemeris_table(None)
+
+
+@pytest.fixture(scope="module")
+def natal():
+    chart = NatalChart("Test", 1990, 6, 15, 14, 30, 40.7128, -74.0060)
+    chart.calculate_chart()
+    return chart
+
+
+class TestEphemerisTable:
+    """Interpolation accuracy and the table file format."""
+
+    def test_error_within_bound(self, table):
+        assert set(table.max_error) == set(TABLE_BODIES)
+        assert all(error < ERROR_BOUND_DEGREES for error in table.max_error.values())
+        errors = validate_ephemeris_table(table, samples=3000, seed=1)
+        for body, error in errors.items():
+            assert error["longitude"] < ERROR_BOUND_DEGREES, body
+            assert error["speed"] < 0.01, body
+
+    def test_grid_points_are_exact_and_wrap(self, table):
+        # The Sun crosses 0 degrees around March 20; grid points reproduce swe exactly
+        start = swe.julday(2025, 3, 18, 0.0)
+        times = start + np.arange(0, 4.0, TABLE_STEP_DAYS["Sun"])
+        longitudes, speeds = table.positions("Sun", times)
+        for jd, longitude, speed in zip(times, longitudes, speeds):
+            expected = swe.calc_ut(float(jd), swe.SUN)[0]
+            assert longitude == pytest.approx(expected[0], abs=1e-9)
+            assert speed == pytest.approx(expected[3], abs=1e-9)
+        between = table.positions("Sun", start + np.linspace(0, 4.0, 97))[0]
+        assert between.min() >= 0.0 and between.max() < 360.0
+        assert np.abs(np.diff(between) + 360.0 * (np.diff(between) < -180)).max() < 0.05
+
+    def test_refined_around_solar_conjunction(self, table):
+        # Jupiter passes behind the Sun in May 2024 and June 2025; the grid is refined there only
+        rows = table._data["Jupiter"]
+        fine = rows[:-1, 0][np.diff(rows[:, 0]) < TABLE_STEP_DAYS["Jupiter"] * 0.999]
+        assert np.abs(fine - swe.julday(2024, 5, 18, 0.0)).min() < 2.0
+        assert np.abs(fine - swe.julday(2025, 6, 24, 0.0)).min() < 2.0
+        for jd in fine:
+            elongation = swe.calc_ut(float(jd), swe.JUPITER)[0][0] - swe.calc_ut(float(jd), swe.SUN)[0][0]
+            # Whole base steps are split; the Sun gains about a degree a day on Jupiter
+            assert abs((elongation + 180.0) % 360.0 - 180.0) < CONJUNCTION_DEGREES + TABLE_STEP_DAYS["Jupiter"]
+
+    def test_range_checks(self, table):
+        assert table.covers(swe.julday(2024, 6, 1, 0.0), swe.julday(2025, 6, 1, 0.0))
+        assert not table.covers(swe.julday(2023, 6, 1, 0.0), swe.julday(2025, 6, 1, 0.0))
+        with pytest.raises(ValueError):
+            table.positions("Mars", [swe.julday(2030, 1, 1, 0.0)])
+
+    def test_missing_table_is_none(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ephemeris_table_module, "EPHEMERIS_TABLE_PATH", str(tmp_path))
+        set_ephemeris_table(None)
+        assert get_ephemeris_table() is None
+
+
+class TestTableScans:
+    """Scans that opt into the table agree with Swiss Ephemeris."""
+
+    @pytest.mark.parametrize("system", ["sidereal", "tropical"])
+    def test_timeline_matches_swiss_ephemeris(self, natal, installed, system, monkeypatch):
+        start, end = datetime(2024, 3, 1), datetime(2025, 3, 1)
+        expected = calculate_transit_timeline(natal, start, end, system=system)
+        calls = []
+        calc_ut = swe.calc_ut
+        monkeypatch.setattr(swe, "calc_ut", lambda *args: calls.append(args) or calc_ut(*args))
+        result = calculate_transit_timeline(natal, start, end, system=system, use_ephemeris_table=True)
+        assert calls == []
+        assert result["summary"] == expected["summary"]
+
+        def seconds(a, b):
+            return abs((datetime.fromisoformat(a) - datetime.fromisoformat(b)).total_seconds())
+        for got, want in zip(result["ingresses"], expected["ingresses"]):
+            assert (got["planet"], got["sign"]) == (want["planet"], want["sign"])
+            assert seconds(got["time"], want["time"]) < 600
+        for got, want in zip(result["transit_periods"], expected["transit_periods"]):
+            assert (got["transiting_planet"], got["natal_planet"], got["aspect"]) == (want["transiting_planet"], want["natal_planet"], want["aspect"])
+            assert all(seconds(a, b) < 600 for a, b in zip(got["exact"], want["exact"]))
+
+    @pytest.mark.parametrize("body,system", [("Moon", "tropical"), ("Mercury", "sidereal"), ("Jupiter", "sidereal")])
+    def test_returns_identical_with_fewer_calls(self, natal, installed, body, system, monkeypatch):
+        start, end = datetime(2024, 1, 1), datetime(2026, 1, 1)
+        expected = find_return_times(natal, body, start, end, system=system)
+        calls = []
+        calc_ut = swe.calc_ut
+        monkeypatch.setattr(solar_return_service.swe, "calc_ut", lambda *args: calls.append(args) or calc_ut(*args))
+        assert find_return_times(natal, body, start, end, system=system, use_ephemeris_table=True) == expected
+        assert len(calls) < 10 * max(len(expected), 1)
+
+    def test_range_outside_table_falls_back(self, natal, installed):
+        start, end = datetime(2030, 1, 1), datetime(2030, 6, 1)
+        assert find_return_times(natal, "Moon", start, end, use_ephemeris_table=True) == find_return_times(natal, "Moon", start, end)
@@ -0,0 +1,109 @@
+"""
+Unit tests for the bounded compute executors.
+
+Covers admission control (503 with Retry-After when full), per-task
+timeouts, error propagation, the process pool, and queue wait vs. run time
+metrics.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.core import executors
+from app.core.exceptions import ServiceOverloadedError
+from app.core.executors import BoundedExecutor, get_executor, get_executor_stats, set_executor
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _fail():
+    raise ValueError("bad input")
+
+
+def _pid(_):
+    return os.getpid()
+
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor("test", "thread", max_workers=2, max_queue=1, timeout=5.0, retry_after=7)
+    yield executor
+    executor.shutdown()
+
+
+class TestBoundedExecutor:
+    """Admission control, timeouts and metrics."""
+
+    def test_runs_off_the_event_loop(self, executor):
+        async def main():
+            loop_thread = threading.get_ident()
+            return loop_thread, await executor.run(threading.get_ident)
+        loop_thread, worker_thread = asyncio.run(main())
+        assert worker_thread != loop_thread
+
+    def test_rejects_beyond_queue_depth(self, executor):
+        async def main():
+            tasks = [asyncio.create_task(executor.run(_sleep, 0.2)) for _ in range(3)]
+            await asyncio.sleep(0)
+            with pytest.raises(ServiceOverloadedError) as excinfo:
+                await executor.run(_sleep, 0)
+            assert await asyncio.gather(*tasks) == [0.2] * 3
+            return excinfo.value
+        error = asyncio.run(main())
+        assert error.status_code == 503
+        assert error.headers == {"Retry-After": "7"}
+        stats = executor.stats()
+        assert (stats["submitted"], stats["completed"], stats["rejected"], stats["in_flight"]) == (3, 3, 1, 0)
+        # The third task waited for one of the two workers
+        assert stats["queue_wait"]["max_ms"] >= 150
+        assert stats["run_time"]["p50_ms"] >= 150
+
+    def test_timeout_keeps_slot_until_task_ends(self, executor):
+        async def main():
+            with pytest.raises(ServiceOverloadedError):
+                await executor.run(_sleep, 0.3, timeout=0.05)
+            assert executor.stats()["in_flight"] == 1
+            await asyncio.sleep(0.4)
+        asyncio.run(main())
+        stats = executor.stats()
+        assert (stats["timed_out"], stats["in_flight"], stats["completed"]) == (1, 0, 1)
+
+    def test_task_errors_propagate(self, executor):
+        with pytest.raises(ValueError, match="bad input"):
+            asyncio.run(executor.run(_fail))
+        assert executor.stats()["failed"] == 1
+
+    def test_process_pool(self):
+        executor = BoundedExecutor("test-process", "process", max_workers=2, max_queue=0, timeout=60.0)
+        try:
+            async def main():
+                return await asyncio.gather(*(executor.run(_pid, i) for i in range(2)))
+            pids = asyncio.run(main())
+            assert os.getpid() not in pids
+        finally:
+            executor.shutdown()
+
+
+class TestExecutorRegistry:
+    """Process-wide executors."""
+
+    def test_named_executors(self, executor):
+        assert get_executor("chart").kind == "thread"
+        assert get_executor("cpu").kind == "process"
+        with pytest.raises(ValueError):
+            get_executor("gpu")
+
+    def test_stats_and_override(self, executor):
+        set_executor("chart", executor)
+        try:
+            assert asyncio.run(executors.run_chart_task(_sleep, 0)) == 0
+            assert get_executor_stats()["chart"]["completed"] == 1
+        finally:
+            set_executor("chart", None)
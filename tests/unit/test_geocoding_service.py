@@ -0,0 +1,143 @@
+"""
+Unit tests for the geocoding service.
+
+Runs fully offline with StubProvider and a temporary SQLite cache.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import GeocodingError
+from app.services.geocoding_service import (
+    GeocodeCache, GeocodeResult, GeocodingProvider, GeocodingProviderError,
+    GeocodingService, StubProvider, _close_geocoding_service, get_geocoding_service,
+    normalize_location, set_geocoding_service
+)
+
+LOCATIONS = {
+    "New York, NY, USA": (40.7128, -74.0060, "America/New_York"),
+    "London, UK": (51.5074, -0.1278, "Europe/London"),
+}
+
+
+class FailingProvider(GeocodingProvider):
+    """Provider that is always unreachable."""
+    name = "failing"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def lookup(self, client, location):
+        self.calls += 1
+        raise GeocodingProviderError("offline")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geocode.sqlite3"), ttl_seconds=3600, negative_ttl_seconds=60)
+    yield cache
+    cache.close()
+
+
+class TestGeocodingService:
+    """Tests for GeocodingService."""
+
+    def test_normalize_location(self):
+        """Case, spacing and empty comma parts do not change the key."""
+        assert normalize_location("  New   York,NY , USA,") == "new york, ny, usa"
+        assert normalize_location("NEW YORK, NY, USA") == normalize_location("new york, ny, usa")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_are_coalesced(self, cache):
+        """Concurrent requests for one location make a single provider call."""
+        stub = StubProvider(LOCATIONS, delay=0.05)
+        service = GeocodingService([stub], cache)
+        results = await asyncio.gather(*(service.geocode(loc) for loc in ["New York, NY, USA", "new york,  ny, usa"] * 5))
+        assert stub.calls == ["New York, NY, USA"]
+        assert all(r == GeocodeResult(40.7128, -74.0060, "America/New_York", "stub") for r in results)
+        assert service.get_stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_cache_persists_across_instances(self, tmp_path):
+        """A new service over the same cache file does not call the provider again."""
+        path = str(tmp_path / "geocode.sqlite3")
+        first = GeocodingService([StubProvider(LOCATIONS)], GeocodeCache(path))
+        await first.geocode("London, UK")
+        await first.close()
+
+        stub = StubProvider(LOCATIONS)
+        second = GeocodingService([stub], GeocodeCache(path))
+        result = await second.geocode("london, uk")
+        await second.close()
+        assert result.timezone == "Europe/London"
+        assert stub.calls == []
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_negatively_cached(self, cache):
+        """Unknown locations return None and are remembered until the negative TTL expires."""
+        stub = StubProvider(LOCATIONS)
+        service = GeocodingService([stub], cache)
+        assert await service.geocode("Atlantis") is None
+        assert await service.geocode("Atlantis") is None
+        assert stub.calls == ["Atlantis"]
+
+        cache.negative_ttl_seconds = -1
+        cache.set(normalize_location("Atlantis"), None)
+        assert await service.geocode("Atlantis") is None
+        assert len(stub.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_refetched(self, cache):
+        """Positive entries expire after the TTL and can be purged."""
+        stub = StubProvider(LOCATIONS)
+        service = GeocodingService([stub], cache)
+        cache.ttl_seconds = -1
+        await service.geocode("London, UK")
+        assert cache.get(normalize_location("London, UK")) == (False, None)
+        assert cache.purge_expired() == 1
+        await service.geocode("London, UK")
+        assert len(stub.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_next_provider(self, cache):
+        """A failing provider is skipped and the next provider's answer is cached."""
+        failing = FailingProvider()
+        service = GeocodingService([failing, StubProvider(LOCATIONS)], cache)
+        result = await service.geocode("New York, NY, USA")
+        assert result.provider == "stub"
+        await service.geocode("New York, NY, USA")
+        assert failing.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_provider_outage_is_not_cached(self, cache):
+        """When no provider can answer, the error propagates and nothing is cached."""
+        failing = FailingProvider()
+        service = GeocodingService([failing], cache)
+        with pytest.raises(GeocodingError):
+            await service.geocode("London, UK")
+        with pytest.raises(GeocodingError):
+            await service.geocode("London, UK")
+        assert failing.calls == 2
+        assert cache.get(normalize_location("London, UK")) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_missing_timezone_is_resolved_offline(self, cache):
+        """Providers without timezone data (like Nominatim) get one from the offline resolver."""
+        service = GeocodingService([StubProvider({"Vienna": (48.2082, 16.3738, None)})], cache)
+        result = await service.geocode("Vienna")
+        assert result.timezone == "Europe/Vienna"
+
+    @pytest.mark.asyncio
+    async def test_shutdown_drops_the_closed_service(self):
+        """After shutdown the next caller gets a fresh service, not the closed one."""
+        closed = GeocodingService([StubProvider(LOCATIONS)], GeocodeCache(":memory:"))
+        set_geocoding_service(closed)
+        await _close_geocoding_service()
+        try:
+            set_geocoding_service(GeocodingService([StubProvider(LOCATIONS)], GeocodeCache(":memory:")))
+            service = get_geocoding_service()
+            assert service is not closed
+            assert (await service.geocode("London, UK")).timezone == "Europe/London"
+        finally:
+            await _close_geocoding_service()
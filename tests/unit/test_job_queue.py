@@ -0,0 +1,193 @@
+"""
+Unit tests for the durable job queue and the batch jobs built on it.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.events import EventBroadcaster, EventQueue, EventType
+from app.core.retry import RetryConfig
+from app.services import batch_service, job_queue as job_queue_module
+from app.services.job_queue import JobQueue, JobStatus, JobWorker
+from database import Base, BackgroundJob
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # A file database: queue calls run in worker threads, each on its own connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def queue(session_factory):
+    return JobQueue(session_factory, retry_config=RetryConfig(max_attempts=3, initial_delay=0, jitter=False), lease_seconds=30)
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    broadcaster = EventBroadcaster()
+    monkeypatch.setattr(job_queue_module, "event_broadcaster", broadcaster)
+    return broadcaster
+
+
+async def _drain(queue: EventQueue):
+    events = []
+    while (event := await queue.get(timeout=0.01)) is not None:
+        events.append(event)
+    return events
+
+
+class TestJobQueue:
+    """Tests for claiming, leases, retries and concurrency limits."""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_and_persists(self, queue, session_factory, broadcaster):
+        """A job survives in the table, runs once and reports progress events to its owner."""
+        events = EventQueue()
+        await broadcaster.connect(events, user_id=7)
+
+        async def handler(payload, context):
+            await context.report_progress(50.0)
+            return {"doubled": payload["n"] * 2}
+
+        queue.register_handler("double", handler)
+        job = queue.create_job("double", {"n": 21}, user_id=7)
+
+        # A second queue over the same database (another process) sees the job
+        assert JobQueue(session_factory).get_job(job.id).status == JobStatus.PENDING
+
+        assert await JobWorker(queue, poll_interval=0).run_until_idle() == 1
+        done = queue.get_job(job.id)
+        assert (done.status, done.result, done.attempts, done.progress) == (JobStatus.COMPLETED, {"doubled": 42}, 1, 100.0)
+        types = [e["type"] for e in await _drain(events)]
+        assert types == [EventType.BATCH_JOB_STARTED.value, EventType.BATCH_JOB_PROGRESS.value, EventType.BATCH_JOB_COMPLETED.value]
+
+    def test_claims_never_overlap(self, queue):
+        """Two workers claiming at once get disjoint jobs, oldest first."""
+        ids = [queue.create_job("t", {"n": n}).id for n in range(5)]
+        first = queue.claim("w1", {"t": 3})
+        second = queue.claim("w2", {"t": 3})
+        assert sorted(j.id for j in first) == sorted(ids[:3])
+        assert sorted(j.id for j in second) == sorted(ids[3:])
+        assert queue.claim("w3", {"t": 3}) == []
+
+    @pytest.mark.asyncio
+    async def test_retry_with_backoff_then_success(self, queue):
+        """A failed attempt is re-queued with backoff and the next attempt can succeed."""
+        attempts = []
+
+        async def flaky(payload, context):
+            attempts.append(context.job.attempts)
+            if len(attempts) == 1:
+                raise RuntimeError("transient")
+            return "ok"
+
+        queue.register_handler("flaky", flaky)
+        job = queue.create_job("flaky", {})
+        await JobWorker(queue, poll_interval=0).run_until_idle(idle_polls=2)
+        assert attempts == [1, 2]
+        assert queue.get_job(job.id).status == JobStatus.COMPLETED
+
+        queue.retry_config = RetryConfig(max_attempts=3, initial_delay=60, jitter=False)
+        queue.register_handler("broken", lambda payload, context: 1 / 0)
+        job = queue.create_job("broken", {})
+        await JobWorker(queue, poll_interval=0).run_until_idle()
+        retried = queue.get_job(job.id)
+        assert retried.status == JobStatus.PENDING and retried.attempts == 1
+        assert retried.run_after > datetime.utcnow() + timedelta(seconds=50)
+
+    @pytest.mark.asyncio
+    async def test_exhausted_attempts_fail(self, queue, broadcaster):
+        """After max_attempts the job is failed and a failure event is sent."""
+        events = EventQueue()
+        await broadcaster.connect(events, event_types={EventType.BATCH_JOB_FAILED})
+
+        async def broken(payload, context):
+            raise ValueError("bad input")
+
+        queue.register_handler("broken", broken)
+        job = queue.create_job("broken", {}, max_attempts=2)
+        await JobWorker(queue, poll_interval=0).run_until_idle(idle_polls=2)
+        failed = queue.get_job(job.id)
+        assert (failed.status, failed.attempts, failed.error) == (JobStatus.FAILED, 2, "bad input")
+        assert [e["data"]["job_id"] for e in await _drain(events)] == [job.id]
+
+    def test_expired_lease_is_reclaimed(self, queue, session_factory):
+        """A job whose worker died is claimable again once its lease expires."""
+        job = queue.create_job("t", {})
+        assert [j.id for j in queue.claim("dead-worker", {"t": 1})] == [job.id]
+        assert queue.claim("w2", {"t": 1}) == []
+
+        with session_factory() as db:
+            db.query(BackgroundJob).update({BackgroundJob.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+            db.commit()
+        reclaimed = queue.claim("w2", {"t": 1})
+        assert [(j.id, j.attempts) for j in reclaimed] == [(job.id, 2)]
+        assert not queue.heartbeat(job.id, "dead-worker")
+
+    @pytest.mark.asyncio
+    async def test_per_type_concurrency(self, queue):
+        """A worker never runs more jobs of a type than its limit."""
+        running = {"now": 0, "peak": 0}
+
+        async def slow(payload, context):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+
+        queue.register_handler("slow", slow, concurrency=3)
+        for _ in range(10):
+            queue.create_job("slow", {})
+        assert await JobWorker(queue, poll_interval=0).run_until_idle() == 10
+        assert running["peak"] == 3
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_running_job(self, session_factory):
+        """Cancelling a running job stops it at the next heartbeat."""
+        queue = JobQueue(session_factory, lease_seconds=0.15)
+        started = asyncio.Event()
+
+        async def forever(payload, context):
+            started.set()
+            await asyncio.sleep(10)
+
+        queue.register_handler("forever", forever)
+        job = queue.create_job("forever", {})
+        worker = JobWorker(queue, poll_interval=0)
+        run = asyncio.create_task(worker.run_until_idle())
+        await started.wait()
+        assert queue.cancel_job(job.id)
+        await asyncio.wait_for(run, timeout=2)
+        assert queue.get_job(job.id).status == JobStatus.CANCELLED
+
+
+class TestBatchJobs:
+    """Batch jobs are queue jobs presented in the batch API shape."""
+
+    @pytest.mark.asyncio
+    async def test_batch_readings_round_trip(self, queue, monkeypatch, broadcaster):
+        monkeypatch.setattr(batch_service, "job_queue", queue)
+        queue.register_handler("batch.readings", batch_service.process_batch_readings)
+
+        items = [{"chart_hash": f"hash-{i}", "chart_name": f"Chart {i}"} for i in range(6)] + [{"chart_name": "No hash"}]
+        job_id = batch_service.create_batch_job("readings", items, user_id=1)
+        pending = batch_service.get_batch_job(job_id)
+        assert (pending["status"], pending["total_items"], pending["type"]) == ("pending", 7, "readings")
+
+        await JobWorker(queue, poll_interval=0).run_until_idle()
+        job = batch_service.get_batch_job(job_id)
+        assert job["status"] == batch_service.BatchJobStatus.PARTIAL
+        assert (job["successful_items"], job["failed_items"], job["processed_items"]) == (6, 1, 7)
+        assert job["errors"][0]["error"] == "chart_hash is required"
+        assert [j["id"] for j in batch_service.list_batch_jobs(user_id=1, status="partial")] == [job_id]
+        assert batch_service.list_batch_jobs(user_id=2) == []
+
+        with pytest.raises(ValueError):
+            batch_service.create_batch_job("unknown", items)
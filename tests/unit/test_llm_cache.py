@@ -0,0 +1,115 @@
+"""
+Unit tests for the content-addressed LLM response cache.
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_cache, llm_service
+from app.services.llm_cache import CachedResponse, DiskLLMCache, llm_cache_key
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = DiskLLMCache(str(tmp_path / "llm_cache.sqlite3"), max_bytes=1024 * 1024, ttl_seconds=3600)
+    llm_cache.set_llm_cache(cache)
+    yield cache
+    llm_cache.set_llm_cache(None)
+    cache.close()
+
+
+def _entry(text="Hello there", prompt_tokens=100, completion_tokens=20):
+    return CachedResponse(text, prompt_tokens, completion_tokens, "test-model", time.time())
+
+
+def _claude_client(monkeypatch, calls):
+    monkeypatch.setattr(llm_service, "AI_MODE", "real")
+    monkeypatch.setattr(llm_service, "ANTHROPIC_API_KEY", "test")
+    client = llm_service.ClaudeClient()
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="Your Sun is in Gemini.")],
+            usage=SimpleNamespace(input_tokens=1000, output_tokens=200)
+        )
+
+    client.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    return client
+
+
+class TestLLMCache:
+    """Tests for cache keys, the disk store and client integration."""
+
+    def test_key_covers_every_input(self):
+        """Changing any part of the call changes the key."""
+        base = ("claude", "model", "system", "user", 0.7, 4000)
+        key = llm_cache_key(*base)
+        assert key == llm_cache_key(*base)
+        for i, changed in enumerate(["gemini", "other-model", "system!", "user!", 0.2, 8000]):
+            variant = list(base)
+            variant[i] = changed
+            assert llm_cache_key(*variant) != key
+
+    def test_disk_round_trip_is_compressed(self, disk_cache):
+        """Entries come back intact and are stored smaller than the raw text."""
+        text = "CHART OVERVIEW\n" + "Your chart centers on the Sun. " * 200
+        disk_cache.set("k", _entry(text))
+        assert disk_cache.get("k").text == text
+        assert disk_cache.stats()["bytes"] < len(text) / 5
+        assert disk_cache.get("missing") is None
+
+    def test_lru_eviction_and_expiry(self, tmp_path):
+        """The store stays under max_bytes by dropping least recently used entries; expired entries miss."""
+        cache = DiskLLMCache(str(tmp_path / "small.sqlite3"), max_bytes=300, ttl_seconds=3600)
+        for i in range(3):
+            cache.set(f"k{i}", _entry(f"response {i}"))
+            time.sleep(0.01)
+        cache.get("k0")  # k0 is now more recent than k1
+        for i in range(3, 6):
+            cache.set(f"k{i}", _entry(f"response {i}"))
+            time.sleep(0.01)
+        assert cache.stats()["bytes"] <= 300
+        assert cache.get("k5") is not None
+        assert cache.get("k1") is None
+
+        expiring = DiskLLMCache(str(tmp_path / "ttl.sqlite3"), ttl_seconds=-1)
+        expiring.set("k", _entry())
+        assert expiring.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_client_reuses_identical_calls(self, monkeypatch, disk_cache):
+        """A repeated call is served from the cache and reported as cached, not billed."""
+        calls, deltas = [], []
+        client = _claude_client(monkeypatch, calls)
+        first = await client.generate("system", "user", 1000, 0.7, "G1_natal_foundation")
+        client.delta_handler = lambda label, text: deltas.append(text)
+        second = await client.generate("system", "user", 1000, 0.7, "G1_natal_foundation")
+
+        assert first == second == "Your Sun is in Gemini."
+        assert len(calls) == 1
+        assert deltas == [second]
+        summary = client.get_summary()
+        assert summary["call_count"] == 2
+        assert summary["cache_hits"] == 1
+        assert (summary["total_prompt_tokens"], summary["total_completion_tokens"]) == (1000, 200)
+        assert (summary["cached_prompt_tokens"], summary["cached_completion_tokens"]) == (1000, 200)
+        assert summary["cached_cost_usd"] == pytest.approx(summary["total_cost_usd"])
+
+        client.delta_handler = None
+        await client.generate("system", "user", 1000, 0.2, "G1_natal_foundation")
+        assert len(calls) == 2  # different temperature, different key
+
+    @pytest.mark.asyncio
+    async def test_bypass_always_calls_api(self, monkeypatch, disk_cache):
+        """bypass_cache neither reads nor writes the cache."""
+        calls = []
+        client = _claude_client(monkeypatch, calls)
+        client.bypass_cache = True
+        await client.generate("system", "user", 1000, 0.7, "G0_global_blueprint")
+        await client.generate("system", "user", 1000, 0.7, "G0_global_blueprint")
+        assert len(calls) == 2
+        assert disk_cache.stats()["entries"] == 0
+        assert client.get_summary()["cache_hits"] == 0
@@ -0,0 +1,165 @@
+"""
+Unit tests for the PDF report service cache.
+
+Covers cache keys, atomic writes, LRU eviction, uncached placeholder
+reports, cache hits that skip the process pool, coalescing of concurrent
+renders and chunked streaming. Rendering itself (ReportLab, CairoSVG) is
+replaced by fakes here.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import pdf_service
+from app.services.pdf_service import (
+    _cached_file, _evict, get_pdf_report, iter_pdf_report, render_pdf_report, report_cache_key, wheel_cache_key
+)
+
+CHART = {
+    "name": "Test",
+    "sidereal_major_positions": [{"name": "Sun", "degrees": 10.5}],
+    "sidereal_aspects": [],
+    "tropical_major_positions": [{"name": "Sun", "degrees": 34.7}],
+    "tropical_aspects": [],
+}
+USER_INPUTS = {"full_name": "Test", "birth_date": "1/1/2000", "birth_time": "12:00", "location": "Paris"}
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_service, "PDF_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestCacheKeys:
+    """Keys change exactly when the rendered output would."""
+
+    def test_wheel_key_depends_on_wheel_data_only(self):
+        key = wheel_cache_key(CHART, "sidereal")
+        assert key.endswith("-sidereal")
+        assert wheel_cache_key({**CHART, "name": "Other"}, "sidereal") == key
+        assert wheel_cache_key({**CHART, "tropical_aspects": [{"type": "Trine"}]}, "sidereal") == key
+        assert wheel_cache_key({**CHART, "sidereal_aspects": [{"type": "Trine"}]}, "sidereal") != key
+        assert wheel_cache_key(CHART, "tropical") != key
+
+    def test_report_key(self):
+        key = report_cache_key(CHART, "Reading", USER_INPUTS)
+        chart_hash, reading_hash = key.split("-")
+        assert report_cache_key(CHART, "Reading", {**USER_INPUTS, "user_email": "a@b.c"}) == key
+        assert report_cache_key(CHART, "Other reading", USER_INPUTS).startswith(chart_hash + "-")
+        assert not report_cache_key({**CHART, "name": "Other"}, "Reading", USER_INPUTS).startswith(chart_hash)
+        assert report_cache_key(CHART, "Reading", {**USER_INPUTS, "location": "Rome"}) != key
+
+
+class TestCacheFiles:
+    """Atomic writes, hits and LRU eviction."""
+
+    def test_produce_once(self, cache_dir):
+        calls = []
+        path = str(cache_dir / "reports" / "a.pdf")
+
+        def produce(f):
+            calls.append(1)
+            f.write(b"%PDF-1.4 test")
+
+        assert _cached_file(path, produce) == path
+        assert _cached_file(path, produce) == path
+        assert len(calls) == 1
+        assert open(path, "rb").read() == b"%PDF-1.4 test"
+
+    def test_failed_render_leaves_nothing(self, cache_dir):
+        path = str(cache_dir / "reports" / "b.pdf")
+
+        def produce(f):
+            f.write(b"partial")
+            raise RuntimeError("render failed")
+
+        with pytest.raises(RuntimeError):
+            _cached_file(path, produce)
+        assert os.listdir(cache_dir / "reports") == []
+
+    def test_evicts_least_recently_used(self, cache_dir):
+        now = time.time()
+        for i, name in enumerate(["old", "middle", "new"]):
+            path = cache_dir / f"{name}.pdf"
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (now + i, now + i))
+        _evict(str(cache_dir), 200)
+        assert sorted(os.listdir(cache_dir)) == ["middle.pdf", "new.pdf"]
+
+
+class TestRenderPdfReport:
+    """Reports embedding a placeholder wheel are not cached."""
+
+    @pytest.fixture
+    def generator(self, monkeypatch):
+        state = {"wheel_fails": True, "reports": 0}
+
+        def render_chart_wheel_png(chart_data, chart_type, size=800, strict=False):
+            if state["wheel_fails"]:
+                if strict:
+                    raise OSError("no cairo")
+                return b"placeholder"
+            return b"wheel"
+
+        def write_pdf_report(f, chart_data, reading, user_inputs, wheel_png=None):
+            state["reports"] += 1
+            f.write(b"%PDF " + wheel_png(chart_data, "sidereal"))
+
+        monkeypatch.setitem(sys.modules, "pdf_generator", SimpleNamespace(
+            render_chart_wheel_png=render_chart_wheel_png, write_pdf_report=write_pdf_report
+        ))
+        return state
+
+    def test_placeholder_report_is_not_cached(self, cache_dir, generator):
+        path = render_pdf_report(CHART, "Reading", USER_INPUTS)
+        assert open(path, "rb").read() == b"%PDF placeholder"
+        assert os.path.dirname(path) == str(cache_dir / "uncached")
+        assert os.listdir(cache_dir / "reports") == []
+        assert not (cache_dir / "wheels").exists() or os.listdir(cache_dir / "wheels") == []
+
+        generator["wheel_fails"] = False
+        path = render_pdf_report(CHART, "Reading", USER_INPUTS)
+        assert path == str(cache_dir / "reports" / f"{report_cache_key(CHART, 'Reading', USER_INPUTS)}.pdf")
+        assert open(path, "rb").read() == b"%PDF wheel"
+        assert render_pdf_report(CHART, "Reading", USER_INPUTS) == path
+        assert generator["reports"] == 3
+
+
+class TestGetPdfReport:
+    """Cached reports skip the process pool; concurrent misses render once."""
+
+    def test_cache_hit_skips_rendering(self, cache_dir, monkeypatch):
+        async def fail(*args, **kwargs):
+            raise AssertionError("rendered a cached report")
+        monkeypatch.setattr(pdf_service, "run_cpu_task", fail)
+        path = cache_dir / "reports" / f"{report_cache_key(CHART, 'Reading', USER_INPUTS)}.pdf"
+        path.parent.mkdir()
+        path.write_bytes(b"%PDF cached")
+        assert asyncio.run(get_pdf_report(CHART, "Reading", USER_INPUTS)) == str(path)
+
+    def test_concurrent_misses_render_once(self, cache_dir, monkeypatch):
+        calls = []
+
+        async def render(func, *args):
+            calls.append(func)
+            await asyncio.sleep(0.01)
+            return "/tmp/report.pdf"
+        monkeypatch.setattr(pdf_service, "run_cpu_task", render)
+
+        async def main():
+            return await asyncio.gather(*(get_pdf_report(CHART, "Reading", USER_INPUTS) for _ in range(3)))
+        assert asyncio.run(main()) == ["/tmp/report.pdf"] * 3
+        assert calls == [pdf_service.render_pdf_report]
+
+    def test_stream_in_chunks(self, tmp_path):
+        path = tmp_path / "report.pdf"
+        path.write_bytes(b"a" * 10 + b"b" * 5)
+        chunks = iter_pdf_report(str(path), chunk_size=10)
+        path.unlink()  # Evicted after the download started
+        assert list(chunks) == [b"a" * 10, b"b" * 5]
@@ -0,0 +1,102 @@
+"""
+Unit tests for the DAG pipeline executor.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.pipeline_executor import PipelineError, PipelineExecutor, PipelineStage
+
+
+def _sleeper(seconds, value=None, log=None, name=None):
+    async def run(**deps):
+        if log is not None:
+            log.append(("start", name))
+        await asyncio.sleep(seconds)
+        if log is not None:
+            log.append(("end", name))
+        return value if value is not None else deps
+    return run
+
+
+class TestPipelineExecutor:
+    """Tests for dependency ordering, concurrency limits and failure handling."""
+
+    @pytest.mark.asyncio
+    async def test_independent_branches_overlap(self):
+        """A side branch runs alongside the main chain and results reach dependents."""
+        stages = [
+            PipelineStage("a", _sleeper(0.05, "A")),
+            PipelineStage("b", _sleeper(0.05, "B"), ("a",)),
+            PipelineStage("side", _sleeper(0.1, "S")),
+            PipelineStage("join", _sleeper(0), ("b", "side")),
+        ]
+        started = []
+        result = await PipelineExecutor(stages, on_stage_start=lambda *args: started.append(args)).run()
+
+        assert result.results["join"] == {"b": "B", "side": "S"}
+        assert result.wall_clock_seconds < 0.18  # serial would be 0.2s
+        breakdown = result.latency_breakdown()
+        assert [s["stage"] for s in breakdown["stages"]][-1] == "join"
+        assert breakdown["parallel_speedup"] > 1
+        assert [step for _, step, _ in started] == [1, 2, 3, 4]
+        assert {total for _, _, total in started} == {4}
+
+    @pytest.mark.asyncio
+    async def test_provider_limit(self):
+        """No more than provider_limits[provider] stages of one provider run at once."""
+        log = []
+        stages = [PipelineStage(f"s{i}", _sleeper(0.02, i, log, f"s{i}"), provider="llm") for i in range(4)]
+        result = await PipelineExecutor(stages, provider_limits={"llm": 2}).run()
+
+        running = peak = 0
+        for event, _ in log:
+            running += 1 if event == "start" else -1
+            peak = max(peak, running)
+        assert peak == 2
+        assert sum(t.queued > 0.01 for t in result.timings) == 2
+
+    @pytest.mark.asyncio
+    async def test_optional_stage_failure(self):
+        """A failed optional stage yields None and is recorded in errors."""
+        async def boom():
+            raise RuntimeError("no matches")
+
+        stages = [
+            PipelineStage("main", _sleeper(0, "ok")),
+            PipelineStage("extra", boom, optional=True),
+            PipelineStage("after_extra", _sleeper(0), ("extra",), optional=True),
+        ]
+        result = await PipelineExecutor(stages).run()
+        assert result.results == {"main": "ok", "extra": None, "after_extra": {"extra": None}}
+        assert result.errors == {"extra": "no matches"}
+
+    @pytest.mark.asyncio
+    async def test_required_failure_cancels_run(self):
+        """A failed required stage re-raises and cancels the stages still running."""
+        slow_finished = []
+
+        async def boom():
+            raise ValueError("bad blueprint")
+
+        async def slow():
+            await asyncio.sleep(1)
+            slow_finished.append(True)
+
+        start = time.perf_counter()
+        with pytest.raises(ValueError, match="bad blueprint"):
+            await PipelineExecutor([PipelineStage("g0", boom), PipelineStage("famous", slow)]).run()
+        assert time.perf_counter() - start < 0.5
+        assert slow_finished == []
+
+    def test_invalid_graphs(self):
+        """Cycles, unknown dependencies and duplicate names are rejected up front."""
+        noop = _sleeper(0)
+        with pytest.raises(PipelineError, match="cycle"):
+            PipelineExecutor([PipelineStage("a", noop, ("b",)), PipelineStage("b", noop, ("a",))])
+        with pytest.raises(PipelineError, match="unknown"):
+            PipelineExecutor([PipelineStage("a", noop, ("missing",))])
+        with pytest.raises(PipelineError, match="Duplicate"):
+            PipelineExecutor([PipelineStage("a", noop), PipelineStage("a", noop)])
@@ -0,0 +1,84 @@
+"""
+Unit tests for the planetary return solver.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import swisseph as swe
+
+from natal_chart import NatalChart, get_ayanamsa
+from app.services import solar_return_service
+from app.services.solar_return_service import (
+    RETURN_BODIES, calculate_solar_return_chart, find_return_times, find_solar_return_date, find_solar_returns
+)
+from app.services.transit_service import julian_day
+
+
+@pytest.fixture(scope="module")
+def natal():
+    chart = NatalChart("Test", 1990, 6, 15, 14, 30, 40.7128, -74.0060)
+    chart.calculate_chart()
+    return chart
+
+
+def _offset_from_natal(natal, body, moment, system):
+    longitude = swe.calc_ut(julian_day(moment), RETURN_BODIES[body])[0][0]
+    if system == "sidereal":
+        longitude -= get_ayanamsa(moment.year)
+    bodies = natal.celestial_bodies if system == "sidereal" else natal.tropical_bodies
+    natal_longitude = next(b.degree for b in bodies if b.name == body)
+    return (longitude - natal_longitude + 180.0) % 360.0 - 180.0
+
+
+class TestPlanetaryReturns:
+    """Return times are exact crossings of the natal longitude."""
+
+    @pytest.mark.parametrize("system", ["sidereal", "tropical"])
+    def test_solar_return_to_the_second_in_a_few_calls(self, natal, system, monkeypatch):
+        calls = []
+        calc_ut = swe.calc_ut
+        monkeypatch.setattr(solar_return_service.swe, "calc_ut", lambda *args: calls.append(args) or calc_ut(*args))
+        moment = find_solar_return_date(natal, 2025, system)
+        assert len(calls) <= 6
+        # The Sun moves ~0.04 arcseconds per second; the result is rounded to the second
+        assert abs(_offset_from_natal(natal, "Sun", moment, system)) < 1e-5
+        assert moment.tzinfo is not None and abs(moment - datetime(2025, 6, 15, 12, tzinfo=timezone.utc)) < timedelta(days=1)
+
+    def test_batch_solar_returns(self, natal):
+        returns = find_solar_returns(natal, 2020, 2030, system="tropical")
+        assert [r["year"] for r in returns] == list(range(2020, 2031))
+        for r in returns:
+            assert r["date"].startswith(f"{r['year']}-06-")
+        with pytest.raises(ValueError):
+            find_solar_returns(natal, 2000, 2100)
+
+    def test_lunar_returns(self, natal):
+        returns = find_return_times(natal, "Moon", datetime(2025, 1, 1), datetime(2026, 1, 1), system="tropical")
+        assert len(returns) in (13, 14)
+        gaps = [(b - a).total_seconds() / 86400 for a, b in zip(returns, returns[1:])]
+        assert all(27.0 < gap < 27.7 for gap in gaps)
+        assert all(abs(_offset_from_natal(natal, "Moon", moment, "tropical")) < 2e-4 for moment in returns)
+
+    def test_retrograde_loop_crossings(self, natal):
+        # Jupiter's 2013-2014 return crosses the natal position three times (direct, retrograde, direct)
+        start = datetime(2013, 1, 1, tzinfo=timezone.utc)
+        returns = find_return_times(natal, "Jupiter", start, datetime(2015, 1, 1), system="tropical")
+        daily = [_offset_from_natal(natal, "Jupiter", start + timedelta(days=d), "tropical") for d in range(730)]
+        brute_force = sum(1 for a, b in zip(daily, daily[1:]) if (a < 0) != (b < 0) and abs(a) < 90)
+        assert len(returns) == brute_force == 3
+        speeds = [swe.calc_ut(julian_day(moment), swe.JUPITER)[0][3] for moment in returns]
+        assert speeds[0] > 0 > speeds[1] and speeds[2] > 0
+        assert all(abs(_offset_from_natal(natal, "Jupiter", moment, "tropical")) < 1e-5 for moment in returns)
+
+    def test_invalid_requests(self, natal):
+        with pytest.raises(ValueError):
+            find_return_times(natal, "Chiron", datetime(2020, 1, 1), datetime(2021, 1, 1))
+        with pytest.raises(ValueError):
+            find_return_times(natal, "Sun", datetime(2021, 1, 1), datetime(2020, 1, 1))
+
+    def test_solar_return_chart(self, natal):
+        result = calculate_solar_return_chart(natal, 2025)
+        sun = next(p for p in result["solar_return_chart"]["planets"] if p["name"] == "Sun")
+        assert sun["movement"] == 0.0 and sun["is_retrograde"] is False
+        assert len(result["solar_return_chart"]["planets"]) == 10
@@ -0,0 +1,158 @@
+"""
+Unit tests for streaming reading generation.
+
+Runs offline: the pipeline uses AI_MODE=stub and the Claude stream is a
+fake SDK client.
+"""
+
+import asyncio
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from natal_chart import NatalChart
+from app.core.events import EventBroadcaster, EventQueue, EventType
+from app.services import llm_prompts, llm_service
+from app.services.reading_stream import ReadingStreamer, SectionSplitter, is_section_heading
+
+READING = (
+    "SNAPSHOT: WHAT WILL FEEL MOST TRUE ABOUT YOU\n"
+    "- You lead with curiosity.\n"
+    "\n"
+    "CHART OVERVIEW & CORE THEMES\n"
+    "Your chart centers on the Sun.\n"
+    "1st HOUSE: SELF\n"
+    "The Ascendant colors first impressions.\n"
+)
+
+
+async def _drain(queue: EventQueue):
+    events = []
+    while (event := await queue.get(timeout=0.01)) is not None:
+        events.append(event)
+    return events
+
+
+class FakeClaudeStream:
+    """Stand-in for anthropic's messages.stream context manager."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __enter__(self):
+        return iter(
+            [SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=c)) for c in self.chunks]
+            + [SimpleNamespace(type="message_delta", usage=SimpleNamespace(input_tokens=10, output_tokens=len(self.chunks)))]
+        )
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestReadingStream:
+    """Tests for section splitting, event routing and client deltas."""
+
+    def test_heading_detection(self):
+        """Uppercase lines and house headings start sections; prose and bullets do not."""
+        assert is_section_heading("CHART OVERVIEW & CORE THEMES")
+        assert is_section_heading("10th HOUSE: CAREER & PUBLIC LIFE")
+        assert not is_section_heading("Your chart centers on the Sun.")
+        assert not is_section_heading("- AN UPPERCASE BULLET")
+        assert not is_section_heading("")
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+    def test_splitter_is_independent_of_chunking(self, chunk_size):
+        """Sections come out the same however the text is split into deltas."""
+        splitter = SectionSplitter()
+        sections = []
+        for i in range(0, len(READING), chunk_size):
+            sections.extend(splitter.feed(READING[i:i + chunk_size]))
+        assert len(sections) == 2  # the last section is only complete at flush
+        sections.append(splitter.flush())
+        assert [heading for heading, _ in sections] == [
+            "SNAPSHOT: WHAT WILL FEEL MOST TRUE ABOUT YOU", "CHART OVERVIEW & CORE THEMES", "1st HOUSE: SELF"
+        ]
+        assert sections[1][1] == "CHART OVERVIEW & CORE THEMES\nYour chart centers on the Sun."
+
+    @pytest.mark.asyncio
+    async def test_events_are_scoped_to_topic(self):
+        """Subscribers only receive events for their own chart hash, in order."""
+        broadcaster = EventBroadcaster()
+        mine, other = EventQueue(), EventQueue()
+        await broadcaster.connect(mine, topic="abc")
+        await broadcaster.connect(other, topic="xyz")
+
+        streamer = ReadingStreamer("abc", broadcaster=broadcaster)
+        streamer.start()
+        for ch in READING:
+            streamer.on_delta("G1_natal_foundation", ch)
+        streamer.on_delta("G0_global_blueprint", "{}")  # blueprint JSON is not streamed
+        streamer.complete(READING)
+        await streamer.close()
+
+        events = await _drain(mine)
+        assert await _drain(other) == []
+        assert events[0]["type"] == EventType.READING_STARTED.value
+        assert events[-1]["type"] == EventType.READING_COMPLETED.value
+        assert "".join(e["data"]["text"] for e in events if e["type"] == EventType.READING_DELTA.value) == READING
+        sections = [e["data"] for e in events if e["type"] == EventType.READING_SECTION.value]
+        assert [s["index"] for s in sections] == [0, 1, 2]
+        assert all(s["stage"] == "natal_foundation" for s in sections)
+
+    @pytest.mark.asyncio
+    async def test_unscoped_subscribers_get_no_reading_content(self):
+        """The global feed (no topic, anonymous or signed in) never sees another reading's text."""
+        broadcaster = EventBroadcaster()
+        anonymous, signed_in = EventQueue(), EventQueue()
+        await broadcaster.connect(anonymous)
+        await broadcaster.connect(signed_in, user_id=42)
+
+        await broadcaster.broadcast(EventType.READING_DELTA, {"text": "secret reading text"}, user_id=42, topic="hashX")
+        await broadcaster.broadcast(EventType.READING_SECTION, {"text": "secret"}, user_id=42, topic="hashX")
+        await broadcaster.broadcast(EventType.READING_COMPLETED, {"reading": "secret"}, user_id=42)
+        assert await _drain(anonymous) == []
+        assert await _drain(signed_in) == []
+
+        await broadcaster.broadcast(EventType.SYSTEM_WARNING, {"message": "maintenance"})
+        assert [e["type"] for e in await _drain(anonymous)] == [EventType.SYSTEM_WARNING.value]
+
+    @pytest.mark.asyncio
+    async def test_stub_pipeline_streams_sections(self, monkeypatch):
+        """get_gemini3_reading with a stream topic publishes progress, deltas, sections and completion."""
+        monkeypatch.setattr(llm_service, "AI_MODE", "stub")
+        monkeypatch.setattr(llm_prompts, "AI_MODE", "stub")
+        broadcaster = EventBroadcaster()
+        monkeypatch.setattr("app.services.reading_stream.event_broadcaster", broadcaster)
+        queue = EventQueue(maxsize=10000)
+        await broadcaster.connect(queue, topic="abc")
+
+        chart = NatalChart("Test", 1990, 6, 15, 14, 30, 40.7128, -74.0060)
+        chart.calculate_chart()
+        reading = await llm_prompts.get_gemini3_reading(chart.get_full_chart_data({}, None, {}, False), False, stream_topic="abc")
+
+        events = await _drain(queue)
+        counts = Counter(e["type"] for e in events)
+        assert counts[EventType.READING_PROGRESS.value] == 4
+        assert counts[EventType.READING_DELTA.value] > 0
+        assert counts[EventType.READING_SECTION.value] > 0
+        assert events[-1]["type"] == EventType.READING_COMPLETED.value
+        assert events[-1]["data"]["reading"] == reading
+
+    @pytest.mark.asyncio
+    async def test_claude_stream_forwards_deltas(self, monkeypatch):
+        """ClaudeClient consumes the SDK stream off the event loop and forwards each delta."""
+        monkeypatch.setattr(llm_service, "AI_MODE", "real")
+        monkeypatch.setattr(llm_service, "ANTHROPIC_API_KEY", "test")
+        chunks = ["Hello", " there", ", world"]
+        client = llm_service.ClaudeClient()
+        client.client = SimpleNamespace(messages=SimpleNamespace(stream=lambda **kwargs: FakeClaudeStream(chunks)))
+        client.bypass_cache = True
+        received = []
+        client.delta_handler = lambda label, text: received.append((label, text))
+
+        text = await client.generate("system", "user", 1000, 0.5, "G1_natal_foundation")
+        await asyncio.sleep(0)  # let call_soon_threadsafe callbacks run
+        assert text == "Hello there, world"
+        assert received == [("G1_natal_foundation", c) for c in chunks]
+        assert client.total_completion_tokens == 3
@@ -116,6 +116,25 @@ class TestChartService:
         assert len(highlights) > 0
         assert "Quick Highlights" in highlights or "Capricorn" in highlights
     
+    def test_resolve_chart_fields(self):
+        """Fields win over profile; unknown names are rejected."""
+        assert chart_service.resolve_chart_fields(None) is None
+        assert chart_service.resolve_chart_fields(None, "full") is None
+        assert "sidereal_aspects" in chart_service.resolve_chart_fields(None, "lightweight")
+        assert chart_service.resolve_chart_fields("chart_hash, name", "lightweight") == {"chart_hash", "name"}
+        with pytest.raises(ValueError):
+            chart_service.resolve_chart_fields("planets")
+        with pytest.raises(ValueError):
+            chart_service.resolve_chart_fields(None, "tiny")
+    
+    def test_chart_sections_for_fields(self):
+        """Extra response fields pull in the chart sections they are built from."""
+        assert chart_service.chart_sections_for_fields(None) is None
+        assert chart_service.chart_sections_for_fields({"sidereal_major_positions"}) == ["sidereal_major_positions"]
+        assert chart_service.chart_sections_for_fields({"chart_hash", "name"}) == ["name", "sidereal_major_positions", "sidereal_aspects"]
+        lightweight = chart_service.chart_sections_for_fields(chart_service.CHART_FIELD_PROFILES["lightweight"])
+        assert not any(section.startswith("tropical_") and section != "tropical_house_cusps" for section in lightweight)
+    
     def test_parse_pasted_chart_data(self):
         """Test parsing pasted chart data."""
         pasted_text = """
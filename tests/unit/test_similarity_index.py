@@ -0,0 +1,372 @@
+"""
+Unit tests for the vectorized famous people similarity index.
+
+Verifies that index scores match calculate_comprehensive_similarity_score
+exactly, that the index refreshes incrementally, that the SQL prefilter
+over the placement tables never drops a match, and that the precomputed
+neighbor graph equals brute force after incremental refreshes.
+"""
+
+import json
+import csv
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import (
+    FamousPerson, FamousPersonAspect, FamousPersonNeighbor, FamousPersonNeighborSource, FamousPersonPlacement
+)
+from natal_chart import (
+    NatalChart, calculate_numerology, get_chinese_zodiac_and_element
+)
+from services.similarity_service import (
+    calculate_comprehensive_similarity_score,
+    extract_top_aspects_from_chart,
+    rank_famous_people,
+    MIN_MATCH_SCORE,
+)
+from services.similarity_index import FamousPeopleIndex, select_top_k
+from services.famous_people_placements import (
+    SIGN_CODES, backfill_famous_person_rows, prefilter_candidates
+)
+from services.similarity_neighbors import get_famous_neighbors, refresh_famous_neighbors
+
+CSV_PATH = Path(__file__).parent.parent.parent / "famous_people_export.csv"
+
+
+def _chart(name, year, month, day, hour=12, minute=0, lat=0.0, lng=0.0, unknown_time=True):
+    chart = NatalChart(name, year, month, day, hour, minute, lat, lng)
+    chart.calculate_chart(unknown_time=unknown_time)
+    numerology_raw = calculate_numerology(day, month, year)
+    numerology = {
+        "life_path_number": numerology_raw["life_path"],
+        "day_number": numerology_raw["day_number"],
+        "lucky_number": numerology_raw["lucky_number"],
+    }
+    chinese = get_chinese_zodiac_and_element(year, month, day)
+    return chart.get_full_chart_data(numerology, None, chinese, unknown_time)
+
+
+def _placements(chart_data):
+    placements = {"sidereal": {}, "tropical": {}}
+    for system in ("sidereal", "tropical"):
+        for pos in chart_data[f"{system}_major_positions"]:
+            placements[system][pos["name"]] = {
+                "sign": pos["position"].split()[-1],
+                "degree": pos["degrees"],
+                "retrograde": pos["retrograde"],
+            }
+    return placements
+
+
+def _famous_person(person_id, name, year, month, day, chart_data=None, **overrides):
+    chart_data = chart_data or _chart(name, year, month, day)
+    sidereal = {p["name"]: p for p in chart_data["sidereal_major_positions"]}
+    tropical = {p["name"]: p for p in chart_data["tropical_major_positions"]}
+    fields = dict(
+        id=person_id,
+        name=name,
+        wikipedia_url=f"https://example.org/{person_id}",
+        birth_year=year, birth_month=month, birth_day=day,
+        birth_location="Nowhere",
+        unknown_time=True,
+        chart_data_json=json.dumps(chart_data),
+        planetary_placements_json=json.dumps(_placements(chart_data)),
+        top_aspects_json=json.dumps(extract_top_aspects_from_chart(chart_data, top_n=3)),
+        sun_sign_sidereal=sidereal["Sun"]["position"].split()[-1],
+        sun_sign_tropical=tropical["Sun"]["position"].split()[-1],
+        moon_sign_sidereal=sidereal["Moon"]["position"].split()[-1],
+        moon_sign_tropical=tropical["Moon"]["position"].split()[-1],
+        life_path_number=str(chart_data["numerology_analysis"]["life_path_number"]),
+        day_number=str(chart_data["numerology_analysis"]["day_number"]),
+        chinese_zodiac_animal=chart_data["chinese_zodiac"].split()[-1],
+        updated_at=datetime(2025, 1, 1),
+    )
+    fields.update(overrides)
+    return FamousPerson(**fields)
+
+
+def _csv_people(limit):
+    people = []
+    with open(CSV_PATH, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            year, month, day = int(row["birth_year"]), int(row["birth_month"]), int(row["birth_day"])
+            if year < 1800:
+                continue
+            people.append(_famous_person(int(row["id"]), row["name"], year, month, day))
+            if len(people) >= limit:
+                break
+    return people
+
+
+@pytest.fixture
+def index_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (FamousPerson.__table__, FamousPersonPlacement.__table__, FamousPersonAspect.__table__,
+                  FamousPersonNeighbor.__table__, FamousPersonNeighborSource.__table__):
+        table.create(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def corpus(index_session):
+    people = _csv_people(60)
+    # Rows that exercise every fallback path of the scalar scorer
+    edge_chart = _chart("Edge", 1990, 6, 15)
+    people += [
+        _famous_person(90001, "No Placements", 1990, 6, 15, edge_chart, planetary_placements_json=None),
+        _famous_person(90002, "Bad Placements", 1990, 6, 15, edge_chart, planetary_placements_json="not json"),
+        _famous_person(90003, "Bad Chart", 1990, 6, 15, edge_chart, chart_data_json="{broken"),
+        _famous_person(90004, "No Aspects", 1990, 6, 15, edge_chart, top_aspects_json=None),
+        _famous_person(90005, "Master Numbers", 1990, 6, 15, edge_chart, life_path_number="33/6", day_number="11/2"),
+        _famous_person(90006, "No Numerology", 1990, 6, 15, edge_chart, life_path_number=None, day_number=""),
+        _famous_person(90007, "Upper Animal", 1990, 6, 15, edge_chart, chinese_zodiac_animal="HORSE"),
+    ]
+    index_session.add_all(people)
+    index_session.commit()
+    return people
+
+
+USER_CHARTS = [
+    ("Known Time", 1990, 6, 15, 14, 30, 40.7, -74.0, False),
+    ("Unknown Time", 1985, 2, 3, 12, 0, 51.5, -0.1, True),
+    ("Millennium", 2000, 1, 1, 0, 0, -33.9, 151.2, False),
+]
+
+
+class TestSimilarityIndex:
+    """Tests for FamousPeopleIndex."""
+
+    @pytest.mark.parametrize("user", USER_CHARTS)
+    def test_scores_match_scalar_scorer(self, index_session, corpus, user):
+        """Index scores equal calculate_comprehensive_similarity_score for every row."""
+        name, year, month, day, hour, minute, lat, lng, unknown_time = user
+        user_chart = _chart(name, year, month, day, hour, minute, lat, lng, unknown_time)
+
+        index = FamousPeopleIndex()
+        index.refresh(index_session)
+        ids, scores = index.score_chart(user_chart)
+
+        expected = {fp.id: calculate_comprehensive_similarity_score(user_chart, fp) for fp in corpus}
+        assert len(ids) == len(corpus)
+        for person_id, score in zip(ids, scores):
+            assert score == pytest.approx(expected[int(person_id)]), person_id
+
+    def test_user_chart_matches_itself(self, index_session, corpus):
+        """A famous person's own chart scores the maximum against themselves."""
+        index = FamousPeopleIndex()
+        index.refresh(index_session)
+        me = corpus[0]
+        ranked = index.top_k(json.loads(me.chart_data_json), k=1, min_score=MIN_MATCH_SCORE)
+        assert ranked[0][0] == me.id
+
+    def test_incremental_refresh(self, index_session, corpus):
+        """Only changed rows are re-encoded and removed rows disappear."""
+        index = FamousPeopleIndex()
+        assert index.refresh(index_session)
+        assert not index.refresh(index_session)
+
+        encoded = []
+        original = index._encode_person
+        index._encode_person = lambda fp: encoded.append(fp.id) or original(fp)
+
+        changed = corpus[1]
+        changed.sun_sign_sidereal = "Ophiuchus"
+        changed.updated_at = datetime(2025, 1, 1) + timedelta(days=1)
+        index_session.delete(corpus[2])
+        index_session.commit()
+
+        assert index.refresh(index_session)
+        assert encoded == [changed.id]
+        assert corpus[2].id not in set(index._arrays.ids.tolist())
+        assert index.size == len(corpus) - 1
+
+    def test_score_block_matches_score_chart(self, index_session, corpus):
+        """Blockwise scores equal per-chart scores, also against a subset of rows."""
+        import numpy as np
+        index = FamousPeopleIndex()
+        index.refresh(index_session)
+        charts = [_chart(*user) for user in USER_CHARTS] + [json.loads(fp.chart_data_json) for fp in corpus[:20]]
+
+        ids, scores = index.score_block(charts)
+        assert scores.shape == (len(charts), index.size)
+        for chart_data, row in zip(charts, scores):
+            assert np.array_equal(row, index.score_chart(chart_data)[1])
+
+        rows = np.array([0, 5, 7, index.size - 1])
+        subset_ids, subset = index.score_block(charts, rows)
+        assert np.array_equal(subset_ids, ids[rows])
+        assert np.array_equal(subset, scores[:, rows])
+
+    def test_select_top_k_breaks_ties_by_row(self):
+        """Top-k keeps the highest scores and resolves ties in row order."""
+        import numpy as np
+        ids = np.array([10, 11, 12, 13, 14])
+        scores = np.array([30.0, 45.0, 30.0, 10.0, 30.0])
+        assert select_top_k(ids, scores, 2, 20.0) == [(11, 45.0), (10, 30.0)]
+        assert select_top_k(ids, scores, None, 20.0) == [(11, 45.0), (10, 30.0), (12, 30.0), (14, 30.0)]
+
+
+class TestPlacementPrefilter:
+    """Tests for the placement tables and the SQL candidate prefilter."""
+
+    @pytest.mark.parametrize("user", USER_CHARTS)
+    def test_prefilter_keeps_every_match(self, index_session, corpus, user):
+        """Every person reaching the threshold is a candidate, with a bound no lower than their score."""
+        name, year, month, day, hour, minute, lat, lng, unknown_time = user
+        user_chart = _chart(name, year, month, day, hour, minute, lat, lng, unknown_time)
+
+        candidates = dict(prefilter_candidates(index_session, user_chart, MIN_MATCH_SCORE))
+        for fp in corpus:
+            score = calculate_comprehensive_similarity_score(user_chart, fp)
+            if score >= MIN_MATCH_SCORE:
+                assert candidates[fp.id] >= score, fp.name
+        assert len(candidates) < len(corpus)
+
+    @pytest.mark.parametrize("user", USER_CHARTS)
+    def test_ranking_matches_index(self, index_session, corpus, user, monkeypatch):
+        """Prefiltered ranking returns the same people and scores as scoring everyone."""
+        name, year, month, day, hour, minute, lat, lng, unknown_time = user
+        user_chart = _chart(name, year, month, day, hour, minute, lat, lng, unknown_time)
+
+        matches, total = rank_famous_people(user_chart, index_session, {}, None)
+        index = FamousPeopleIndex()
+        index.refresh(index_session)
+        assert total == len(corpus)
+        assert [(m["famous_person"].id, m["similarity_score"]) for m in matches] == \
+            index.top_k(user_chart, min_score=MIN_MATCH_SCORE)
+
+    @pytest.mark.parametrize("limit", [1, 3, 10])
+    def test_top_k_matches_index(self, index_session, corpus, limit):
+        """Branch and bound returns exactly the index's top k."""
+        user_chart = _chart(*USER_CHARTS[0][:-1])
+        index = FamousPeopleIndex()
+        index.refresh(index_session)
+
+        matches, _ = rank_famous_people(user_chart, index_session, {}, None, limit=limit)
+        assert [(m["famous_person"].id, m["similarity_score"]) for m in matches] == \
+            index.top_k(user_chart, k=limit, min_score=MIN_MATCH_SCORE)
+
+    def test_top_k_scores_only_what_it_needs(self, index_session, corpus, monkeypatch):
+        """Candidates whose bound cannot beat the k-th score are never loaded or scored."""
+        from services import similarity_service
+        user_chart = json.loads(corpus[0].chart_data_json)
+        scored = []
+        original = similarity_service.calculate_comprehensive_similarity_score
+        monkeypatch.setattr(
+            similarity_service, "calculate_comprehensive_similarity_score",
+            lambda chart, fp: scored.append(fp.id) or original(chart, fp)
+        )
+
+        all_matches, _ = rank_famous_people(user_chart, index_session, {}, None)
+        scored.clear()
+        top, _ = rank_famous_people(user_chart, index_session, {}, None, limit=2)
+        assert [m["famous_person"].id for m in top] == [m["famous_person"].id for m in all_matches[:2]]
+        assert len(scored) < len(all_matches)
+
+    def test_rows_follow_famous_person_writes(self, index_session, corpus):
+        """Mapper events rewrite rows on insert, update and delete."""
+        def signs(person_id):
+            rows = index_session.query(FamousPersonPlacement).filter_by(person_id=person_id, system="sidereal")
+            return {row.body: row.sign_code for row in rows}
+
+        person = corpus[0]
+        assert signs(person.id)["Sun"] == SIGN_CODES[person.sun_sign_sidereal]
+        assert index_session.query(FamousPersonAspect).filter_by(person_id=person.id).count() > 0
+
+        placements = json.loads(person.planetary_placements_json)
+        placements["sidereal"]["Sun"]["sign"] = "Ophiuchus"
+        person.planetary_placements_json = json.dumps(placements)
+        index_session.commit()
+        assert signs(person.id)["Sun"] == SIGN_CODES["Ophiuchus"]
+
+        index_session.delete(person)
+        index_session.commit()
+        assert signs(person.id) == {}
+        assert not index_session.query(FamousPersonAspect).filter_by(person_id=person.id).count()
+
+    def test_backfill_and_fallback(self, index_session, corpus):
+        """Empty tables disable the prefilter until the backfill repopulates them."""
+        user_chart = json.loads(corpus[0].chart_data_json)
+        expected = prefilter_candidates(index_session, user_chart, MIN_MATCH_SCORE)
+
+        index_session.query(FamousPersonPlacement).delete()
+        index_session.query(FamousPersonAspect).delete()
+        assert prefilter_candidates(index_session, user_chart, MIN_MATCH_SCORE) is None
+        matches, total = rank_famous_people(user_chart, index_session, {}, None)
+        assert matches[0]["famous_person"].id == corpus[0].id and total == len(corpus)
+
+        assert backfill_famous_person_rows(index_session.connection(), batch_size=7) == len(corpus)
+        assert prefilter_candidates(index_session, user_chart, MIN_MATCH_SCORE) == expected
+
+
+def _stored_graph(db):
+    rows = db.query(FamousPersonNeighbor).order_by(FamousPersonNeighbor.person_id, FamousPersonNeighbor.rank)
+    graph = {}
+    for row in rows:
+        graph.setdefault(row.person_id, []).append((row.neighbor_id, row.score))
+    return graph
+
+
+class TestNeighborGraph:
+    """Tests for the precomputed famous people neighbor graph."""
+
+    def test_graph_matches_brute_force(self, index_session, corpus):
+        """Every stored list is the top k of the scalar scorer, excluding the person."""
+        stats = refresh_famous_neighbors(index_session, k=5, block_size=16)
+        assert stats["recomputed"] == len(corpus)
+
+        graph = _stored_graph(index_session)
+        for fp in corpus:
+            try:
+                chart_data = json.loads(fp.chart_data_json)
+            except ValueError:
+                assert fp.id not in graph
+                continue
+            scored = [(other.id, calculate_comprehensive_similarity_score(chart_data, other))
+                      for other in corpus if other.id != fp.id]
+            expected = sorted((item for item in scored if item[1] >= MIN_MATCH_SCORE), key=lambda item: (-item[1], item[0]))[:5]
+            assert graph.get(fp.id, []) == [(pid, pytest.approx(score)) for pid, score in expected], fp.id
+
+        twins = get_famous_neighbors(index_session, corpus[0].id, limit=3)
+        assert [t["id"] for t in twins] == [pid for pid, _ in graph[corpus[0].id][:3]]
+        assert twins[0]["name"] and twins[0]["similarity_score"] >= MIN_MATCH_SCORE
+
+    def test_incremental_refresh_matches_full_rebuild(self, index_session, corpus):
+        """Edits, deletions and additions are folded in without rebuilding everything."""
+        refresh_famous_neighbors(index_session, k=5)
+        assert refresh_famous_neighbors(index_session, k=5)["recomputed"] == 0
+
+        edited = corpus[1]
+        edited.chart_data_json = corpus[10].chart_data_json
+        edited.top_aspects_json = corpus[10].top_aspects_json
+        edited.updated_at = datetime(2025, 1, 2)
+        index_session.delete(corpus[2])
+        index_session.add(_famous_person(90100, "Newcomer", 1990, 6, 15))
+        index_session.commit()
+
+        stats = refresh_famous_neighbors(index_session, k=5)
+        assert stats["removed"] == 1
+        assert stats["recomputed"] < stats["people"]
+        incremental = _stored_graph(index_session)
+        assert corpus[2].id not in incremental
+        assert all(corpus[2].id not in {pid for pid, _ in neighbors} for neighbors in incremental.values())
+
+        refresh_famous_neighbors(index_session, k=5, full=True)
+        assert incremental == _stored_graph(index_session)
+
+    def test_worker_processes_match_in_process(self, index_session, corpus):
+        """Scoring blocks in worker processes stores the same graph."""
+        refresh_famous_neighbors(index_session, k=5, block_size=16)
+        in_process = _stored_graph(index_session)
+        refresh_famous_neighbors(index_session, k=5, block_size=16, processes=2, full=True)
+        assert _stored_graph(index_session) == in_process
+
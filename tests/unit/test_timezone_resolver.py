@@ -0,0 +1,70 @@
+"""
+Unit tests for the offline timezone resolver.
+
+Accuracy is checked against birth locations from famous_people_export.csv
+(coordinates and expected zones in tests/fixtures/famous_birth_locations.json).
+"""
+
+import csv
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services.timezone_resolver import nautical_timezone, resolve_timezone
+
+ROOT = Path(__file__).parent.parent.parent
+CSV_PATH = ROOT / "famous_people_export.csv"
+FIXTURE_PATH = ROOT / "tests" / "fixtures" / "famous_birth_locations.json"
+
+with open(FIXTURE_PATH, encoding="utf-8") as f:
+    LOCATIONS = json.load(f)
+
+
+def _same_zone(a: str, b: str) -> bool:
+    """Zones are equivalent if they agree on UTC offset across the last 120 years (handles tz links)."""
+    if a == b:
+        return True
+    za, zb = ZoneInfo(a), ZoneInfo(b)
+    for year in range(1905, 2030, 5):
+        for month in (1, 7):
+            moment = datetime(year, month, 15, 12, tzinfo=timezone.utc)
+            if moment.astimezone(za).utcoffset() != moment.astimezone(zb).utcoffset():
+                return False
+    return True
+
+
+class TestTimezoneResolver:
+    """Tests for resolve_timezone."""
+
+    def test_fixture_locations_come_from_export(self):
+        """Every fixture location is a real birth_location in the export."""
+        with open(CSV_PATH, encoding="utf-8") as f:
+            export_locations = {row["birth_location"] for row in csv.DictReader(f)}
+        missing = [loc["birth_location"] for loc in LOCATIONS if loc["birth_location"] not in export_locations]
+        assert missing == []
+
+    @pytest.mark.parametrize("location", LOCATIONS, ids=lambda loc: loc["birth_location"])
+    def test_famous_birth_locations(self, location):
+        """Resolved zones match the expected zone for each birth location."""
+        resolved = resolve_timezone(location["latitude"], location["longitude"])
+        assert resolved is not None
+        assert _same_zone(resolved, location["timezone"]), (resolved, location["timezone"])
+
+    def test_ocean_uses_nautical_zone(self):
+        """Open ocean resolves to an Etc/GMT zone instead of UTC."""
+        assert resolve_timezone(0.0, -150.0) == "Etc/GMT+10"
+
+    def test_invalid_coordinates(self):
+        """Out-of-range or missing coordinates return None."""
+        assert resolve_timezone(91.0, 0.0) is None
+        assert resolve_timezone(0.0, 181.0) is None
+        assert resolve_timezone(None, 10.0) is None
+
+    def test_nautical_timezone_sign_convention(self):
+        """Etc/GMT names use inverted signs."""
+        assert nautical_timezone(45.0) == "Etc/GMT-3"
+        assert nautical_timezone(-75.0) == "Etc/GMT+5"
+        assert nautical_timezone(3.0) == "Etc/GMT"
@@ -0,0 +1,108 @@
+"""
+Unit tests for the transit timeline.
+
+Event times are checked against direct Swiss Ephemeris evaluation and
+against calculate_current_transits at sample instants.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import swisseph as swe
+
+from natal_chart import NatalChart
+from app.services.transit_service import (
+    TRANSIT_PLANETS, julian_day, calculate_current_transits, calculate_transit_timeline
+)
+
+CODES = dict(TRANSIT_PLANETS)
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 12, 31, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def natal():
+    chart = NatalChart("Test", 1990, 6, 15, 14, 30, 40.7128, -74.0060)
+    chart.calculate_chart()
+    return chart
+
+
+@pytest.fixture(scope="module")
+def timeline(natal):
+    return calculate_transit_timeline(natal, START, END)
+
+
+def _longitude(natal, planet, moment, system="sidereal"):
+    offset = natal.ascendant_data["ayanamsa"] if system == "sidereal" else 0.0
+    return (swe.calc_ut(julian_day(moment), CODES[planet])[0][0] - offset) % 360
+
+
+def _separation(a, b):
+    diff = abs(a - b) % 360
+    return min(diff, 360 - diff)
+
+
+class TestTransitTimeline:
+    """Tests for transit periods, stations and ingresses over a year."""
+
+    def test_exact_and_orb_edges_match_ephemeris(self, natal, timeline):
+        periods = timeline["transit_periods"]
+        assert len(periods) > 1000 and timeline["summary"]["total_exact_hits"] > 1000
+        for period in periods:
+            def distance(iso):
+                lon = _longitude(natal, period["transiting_planet"], datetime.fromisoformat(iso))
+                return abs(_separation(lon, period["natal_position"]) - period["angle"])
+            for iso in period["exact"]:
+                assert distance(iso) < 2e-3
+            for iso in (period["begin"], period["end"]):
+                if iso is not None:
+                    assert abs(distance(iso) - period["orb"]) < 2e-3
+
+    def test_periods_agree_with_current_transits(self, natal, timeline):
+        for moment in (datetime(2025, 3, 10, 6, tzinfo=timezone.utc), datetime(2025, 8, 21, 18, tzinfo=timezone.utc)):
+            iso = moment.isoformat()
+            active = {
+                (p["transiting_planet"], p["natal_planet"], p["aspect"])
+                for p in timeline["transit_periods"]
+                if (p["begin"] is None or p["begin"] <= iso) and (p["end"] is None or p["end"] > iso)
+            }
+            current = calculate_current_transits(natal, moment)["transit_aspects"]["all"]
+            # Skip aspects within a hair of their orb edge, where the two rounding schemes can disagree
+            expected = {
+                (t["transiting_planet"], t["natal_planet"], t["aspect"])
+                for t in current if t["strength"] > 0.001
+            }
+            assert expected <= active
+            assert len(active - expected) <= sum(1 for t in current if t["strength"] <= 0.001)
+
+    def test_retrograde_stations(self, natal, timeline):
+        mercury = [s for s in timeline["stations"] if s["planet"] == "Mercury"]
+        assert [s["station"] for s in mercury][:2] == ["retrograde", "direct"]
+        for station in timeline["stations"]:
+            jd = julian_day(datetime.fromisoformat(station["time"]))
+            before, after = swe.calc_ut(jd - 0.01, CODES[station["planet"]])[0][3], swe.calc_ut(jd + 0.01, CODES[station["planet"]])[0][3]
+            assert (before > 0 > after) if station["station"] == "retrograde" else (before < 0 < after)
+        assert not any(s["planet"] in ("Sun", "Moon") for s in timeline["stations"])
+
+    def test_tropical_sun_ingress_is_the_equinox(self, natal):
+        result = calculate_transit_timeline(natal, START, END, system="tropical", planets=["Sun"])
+        assert [i["sign"] for i in result["ingresses"]][:4] == ["Aquarius", "Pisces", "Aries", "Taurus"]
+        aries = datetime.fromisoformat(result["ingresses"][2]["time"])
+        # March equinox 2025: 20 March 09:01 UTC
+        assert abs(aries - datetime(2025, 3, 20, 9, 1, tzinfo=timezone.utc)) < timedelta(minutes=2)
+        assert result["stations"] == [] and result["transiting_planets"] == ["Sun"]
+
+    def test_sidereal_ingresses_follow_retrograde_motion(self, timeline):
+        # Every ingress is followed by the next sign in zodiac order, or the previous one when retrograde
+        assert timeline["summary"]["total_ingresses"] == len(timeline["ingresses"]) > 200
+        assert any(i["retrograde"] for i in timeline["ingresses"])
+        assert all(i["planet"] != "Sun" or not i["retrograde"] for i in timeline["ingresses"])
+
+    @pytest.mark.parametrize("start,end,planets", [
+        (END, START, None),
+        (START, START + timedelta(days=800), None),
+        (START, END, ["Sun", "Chiron"]),
+    ])
+    def test_invalid_requests(self, natal, start, end, planets):
+        with pytest.raises(ValueError):
+            calculate_transit_timeline(natal, start, end, planets=planets)